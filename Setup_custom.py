@@ -47,7 +47,9 @@ def GetConfigurations() -> Union[
         Configuration.Configuration,
     ],
 ]:
-    common_python_libraries: list[Configuration.VersionInfo] = []
+    common_python_libraries: list[Configuration.VersionInfo] = [
+        Configuration.VersionInfo("numpy", SemVer("1.26.1")),
+    ]
 
     configurations: dict[str, Configuration.Configuration] = {
         "standard": Configuration.Configuration(
@@ -0,0 +1,500 @@
+# ----------------------------------------------------------------------
+# |
+# |  BenchmarkSuite.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-14 11:27:09
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Measures the time and peak memory of WorkItemExtractor's core operations with synthetic data and compares them to baselines."""
+
+import gc
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import typer
+
+from Common_Foundation import PathEx
+from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
+from Common_Foundation import TextwrapEx
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from MockAzureDevOpsServer import ServerConfiguration, SyntheticData            # type: ignore; pylint: disable=import-error
+from SyntheticHierarchies import GenerateHierarchyResults                       # type: ignore; pylint: disable=import-error
+
+from Common.WorkItem import GenerateDailyWorkItemHistory, StoryPointsWorkItem, TeeShirtWorkItem  # type: ignore; pylint: disable=import-error
+from GenerateEvents import GenerateEvents                                       # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyResult                                 # type: ignore; pylint: disable=import-error
+from ProjectManagementPlugins.AzureDevOpsPlugin import Plugin as AzureDevOpsPlugin  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_ROOT_DIR                                   = PathEx.EnsureDir(Path(__file__).resolve().parent.parent)
+_DEFAULT_BASELINE_FILENAME                  = Path(__file__).resolve().parent / "Baselines" / "BenchmarkSuite.json"
+
+# The updates parsed by the 'GetWorkItemChanges' benchmark are generated for the work items in this
+# configuration and reused for the remainder, as the parsing cost doesn't depend on the ids.
+_UPDATES_POOL_CONFIGURATION                 = ServerConfiguration(num_epics=50, features_per_epic=19)
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class BenchmarkResult(object):
+    name: str
+    scale: int
+    seconds: float                          # Median of all iterations
+    peak_bytes: int                         # Measured with tracemalloc during an additional iteration
+
+    # ----------------------------------------------------------------------
+    @property
+    def key(self) -> str:
+        return "{}/{}".format(self.name, self.scale)
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    help=__doc__,
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    scales: list[int]=typer.Option([1000, 10000, 100000], "--scale", min=1, help="Number of work items in the generated dataset(s)."),
+    benchmark_names: list[str]=typer.Option(None, "--benchmark", help="Name of a benchmark to run (all benchmarks are run by default)."),
+    iterations: int=typer.Option(3, "--iterations", min=1, help="Number of times to run each benchmark; the median is reported."),
+    seed: int=typer.Option(0, "--seed", help="Seed used to generate the synthetic data."),
+    baseline_filename: Path=typer.Option(_DEFAULT_BASELINE_FILENAME, "--baseline", dir_okay=False, help="Baseline filename."),
+    threshold: float=typer.Option(0.25, "--threshold", min=0.0, help="Allowed regression, as a ratio of the baseline, before the benchmark fails."),
+    update_baseline: bool=typer.Option(False, "--update-baseline", help="Write the measured values as the new baseline (values for benchmarks that weren't run are preserved)."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Runs the benchmarks at each scale."""
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        benchmarks = _GetBenchmarks()
+
+        if benchmark_names:
+            for benchmark_name in benchmark_names:
+                if benchmark_name not in benchmarks:
+                    dm.WriteError(
+                        "'{}' is not a valid benchmark name; valid values are {}.\n".format(
+                            benchmark_name,
+                            ", ".join("'{}'".format(name) for name in benchmarks),
+                        ),
+                    )
+
+            if dm.result != 0:
+                return
+
+            benchmarks = {name: benchmarks[name] for name in benchmark_names}
+
+        # Baselines are machine-specific, so they aren't committed; fail rather than silently passing
+        # when there is nothing to compare against.
+        if not update_baseline and not baseline_filename.is_file():
+            dm.WriteError("No baseline exists at '{}'; run with '--update-baseline' to create one.\n".format(baseline_filename))
+            return
+
+        # Prepare shared state so that it isn't included in the measurements
+        if "WriteJson" in benchmarks:
+            _GetMainModule()
+
+        if "GetWorkItemChanges" in benchmarks:
+            with dm.Nested("Generating updates..."):
+                _GetUpdatePages()
+
+        results: list[BenchmarkResult] = []
+
+        for scale in scales:
+            with dm.Nested("Generating {} work items...".format(scale)):
+                dataset = GenerateHierarchyResults(scale, seed=seed)
+
+            for benchmark_name, benchmark_func in benchmarks.items():
+                with dm.Nested(
+                    "Running '{}' ({} work items)...".format(benchmark_name, scale),
+                    lambda key="{}/{}".format(benchmark_name, scale): None if not results or results[-1].key != key else "{:.3f}s".format(results[-1].seconds),
+                ) as benchmark_dm:
+                    result = _Measure(
+                        benchmark_dm,
+                        benchmark_name,
+                        scale,
+                        iterations,
+                        lambda dm, benchmark_func=benchmark_func, dataset=dataset, scale=scale: benchmark_func(dm, dataset, scale),
+                    )
+                    if result is None:
+                        return
+
+                    results.append(result)
+
+            del dataset
+
+        baseline: dict[str, dict[str, Any]] = {}
+
+        if baseline_filename.is_file():
+            with baseline_filename.open(encoding="UTF-8") as f:
+                baseline = json.load(f)
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+
+                {}
+
+                """,
+            ).format(
+                TextwrapEx.CreateTable(
+                    ["Benchmark", "Work Items", "Seconds", "Baseline", "Peak MB", "Baseline"],
+                    [
+                        [
+                            result.name,
+                            str(result.scale),
+                            "{:.3f}".format(result.seconds),
+                            "{:.3f}".format(baseline[result.key]["seconds"]) if result.key in baseline else "",
+                            "{:.1f}".format(result.peak_bytes / (1024 * 1024)),
+                            "{:.1f}".format(baseline[result.key]["peak_bytes"] / (1024 * 1024)) if result.key in baseline else "",
+                        ]
+                        for result in results
+                    ],
+                ),
+            ),
+        )
+
+        if update_baseline:
+            with dm.Nested("Writing '{}'...".format(baseline_filename)):
+                for result in results:
+                    baseline[result.key] = {
+                        "seconds": result.seconds,
+                        "peak_bytes": result.peak_bytes,
+                    }
+
+                baseline_filename.parent.mkdir(parents=True, exist_ok=True)
+
+                with baseline_filename.open("w", encoding="UTF-8") as f:
+                    json.dump(baseline, f, indent=2, sort_keys=True)
+
+            return
+
+        for result in results:
+            baseline_values = baseline.get(result.key, None)
+            if baseline_values is None:
+                dm.WriteError("'{}' doesn't have a baseline in '{}'; run with '--update-baseline' to create one.\n".format(result.key, baseline_filename))
+                continue
+
+            for name, value, baseline_value in [
+                ("Time", result.seconds, baseline_values["seconds"]),
+                ("Peak memory", result.peak_bytes, baseline_values["peak_bytes"]),
+            ]:
+                if value > baseline_value * (1.0 + threshold):
+                    dm.WriteError(
+                        "{} for '{}' regressed by {:.1f}% (baseline: {}, current: {}, threshold: {:.1f}%).\n".format(
+                            name,
+                            result.key,
+                            (value / baseline_value - 1.0) * 100,
+                            baseline_value,
+                            value,
+                            threshold * 100,
+                        ),
+                    )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# Returns the peak memory when it is measured in a different process (or None to measure it in this process)
+_BenchmarkFuncType                          = Callable[[DoneManager, list[HierarchyResult], int], Optional[int]]
+
+
+# ----------------------------------------------------------------------
+def _GetBenchmarks() -> dict[str, _BenchmarkFuncType]:
+    return {
+        "GenerateEvents": _BenchmarkGenerateEvents,
+        "GenerateDailyWorkItemHistory": _BenchmarkGenerateDailyWorkItemHistory,
+        "WriteJson": _BenchmarkWriteJson,
+        "GetWorkItemChanges": _BenchmarkGetWorkItemChanges,
+        "PluginLoading": _BenchmarkPluginLoading,
+    }
+
+
+# ----------------------------------------------------------------------
+def _Measure(
+    dm: DoneManager,
+    name: str,
+    scale: int,
+    iterations: int,
+    func: Callable[[DoneManager], Optional[int]],
+) -> Optional[BenchmarkResult]:
+    timings: list[float] = []
+
+    for _ in range(iterations):
+        gc.collect()
+
+        with dm.VerboseNested("Timing...") as timing_dm:
+            start = time.perf_counter()
+            func(timing_dm)
+            timings.append(time.perf_counter() - start)
+
+        if dm.result != 0:
+            return None
+
+    # tracemalloc slows execution considerably, so memory is measured separately from time
+    gc.collect()
+
+    with dm.VerboseNested("Measuring memory...") as memory_dm:
+        tracemalloc.start()
+
+        try:
+            peak_bytes = func(memory_dm)
+            if peak_bytes is None:
+                _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    if dm.result != 0:
+        return None
+
+    return BenchmarkResult(name, scale, statistics.median(timings), peak_bytes)
+
+
+# ----------------------------------------------------------------------
+def _BenchmarkGenerateEvents(
+    dm: DoneManager,
+    dataset: list[HierarchyResult],
+    scale: int,  # pylint: disable=unused-argument
+) -> Optional[int]:
+    GenerateEvents(dm, AzureDevOpsPlugin(), dataset)
+    return None
+
+
+# ----------------------------------------------------------------------
+def _BenchmarkGenerateDailyWorkItemHistory(
+    dm: DoneManager,  # pylint: disable=unused-argument
+    dataset: list[HierarchyResult],
+    scale: int,  # pylint: disable=unused-argument
+) -> Optional[int]:
+    type_map = {
+        "Epic": TeeShirtWorkItem,
+        "Feature": StoryPointsWorkItem,
+    }
+
+    for hierarchy_result in dataset:
+        for hierarchy_item in [hierarchy_result.root, *hierarchy_result.children]:
+            for _ in GenerateDailyWorkItemHistory(
+                # Copy the work item, as it is modified in place
+                hierarchy_item.work_item.Clone(),
+                hierarchy_item.changes,
+                type_map.__getitem__,
+                datetime_field_name="dt",
+                story_points_field_name="story_points",
+                tee_shirt_field_name="estimate",
+            ):
+                pass
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def _BenchmarkWriteJson(
+    dm: DoneManager,
+    dataset: list[HierarchyResult],
+    scale: int,  # pylint: disable=unused-argument
+) -> Optional[int]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _GetMainModule()._WriteJson(dm, Path(temp_dir) / "output.json", dataset)  # pylint: disable=protected-access
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def _BenchmarkGetWorkItemChanges(
+    dm: DoneManager,  # pylint: disable=unused-argument
+    dataset: list[HierarchyResult],  # pylint: disable=unused-argument
+    scale: int,
+) -> Optional[int]:
+    pages = _GetUpdatePages()
+
+    # ----------------------------------------------------------------------
+    class Response(object):
+        # ----------------------------------------------------------------------
+        def __init__(
+            self,
+            content: bytes,
+        ):
+            self._content                   = content
+
+        # ----------------------------------------------------------------------
+        def raise_for_status(self) -> None:  # pylint: disable=invalid-name
+            pass
+
+        # ----------------------------------------------------------------------
+        def json(self) -> Any:
+            return json.loads(self._content)
+
+    # ----------------------------------------------------------------------
+    class Session(object):
+        # ----------------------------------------------------------------------
+        def get(  # pylint: disable=invalid-name
+            self,
+            url: str,
+            params: dict[str, Any],
+        ) -> Response:
+            work_item_id = int(url.split("/")[1])
+            return Response(pages[(work_item_id - 1) % len(pages)].get(params["$skip"], _EMPTY_PAGE))
+
+    # ----------------------------------------------------------------------
+
+    plugin = AzureDevOpsPlugin()
+    object.__setattr__(plugin, "_session", Session())
+
+    pool_data = SyntheticData(_UPDATES_POOL_CONFIGURATION)
+
+    epic = TeeShirtWorkItem("", "", None, None, "Epic", None)  # type: ignore
+    feature = StoryPointsWorkItem("", "", None, None, "Feature", None)  # type: ignore
+
+    for index in range(scale):
+        work_item = epic if pool_data.IsEpic(index % len(pages) + 1) else feature
+        work_item = work_item.Clone(work_item_id=str(index + 1))
+
+        for _ in plugin.GetWorkItemChanges(work_item):
+            pass
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def _BenchmarkPluginLoading(
+    dm: DoneManager,
+    dataset: list[HierarchyResult],  # pylint: disable=unused-argument
+    scale: int,  # pylint: disable=unused-argument
+) -> Optional[int]:
+    # A plugin's module (and its dependencies) is only imported once per process, so plugins are
+    # discovered and loaded in a new process (whose startup is included in the time).
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            textwrap.dedent(
+                """\
+                import json
+                import sys
+                import tracemalloc
+
+                from pathlib import Path
+
+                tracemalloc.start()
+
+                sys.path.insert(0, {root_dir!r})
+
+                from Common.PluginRegistry import PluginRegistry
+
+                registry = PluginRegistry(Path({root_dir!r}) / "ProjectManagementPlugins", Path({root_dir!r}).parent)
+
+                for name in registry.infos:
+                    registry.Load(name)
+
+                print(json.dumps({{"peak_bytes": tracemalloc.get_traced_memory()[1]}}))
+                """,
+            ).format(
+                root_dir=str(_ROOT_DIR),
+            ),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    if result.returncode != 0:
+        dm.WriteError("Loading plugins failed ({}):\n{}\n".format(result.returncode, result.stderr))
+        return 0
+
+    return json.loads(result.stdout.strip().splitlines()[-1])["peak_bytes"]
+
+
+# ----------------------------------------------------------------------
+_EMPTY_PAGE                                 = json.dumps({"count": 0, "value": []}).encode("UTF-8")
+
+_update_pages: Optional[list[dict[int, bytes]]] = None
+_main_module: Optional[Any]                 = None
+
+
+def _GetUpdatePages() -> list[dict[int, bytes]]:
+    """Returns the serialized update pages (keyed by `$skip`) for each work item in the pool"""
+
+    global _update_pages  # pylint: disable=global-statement
+
+    if _update_pages is None:
+        configuration = _UPDATES_POOL_CONFIGURATION
+        data = SyntheticData(configuration)
+
+        pages: list[dict[int, bytes]] = []
+
+        for work_item_id in range(1, configuration.num_items + 1):
+            work_item_pages: dict[int, bytes] = {}
+            skip = 0
+
+            while True:
+                updates = data.GetUpdates(work_item_id, skip, configuration.page_size)
+                if not updates:
+                    break
+
+                work_item_pages[skip] = json.dumps({"count": len(updates), "value": updates}).encode("UTF-8")
+                skip += len(updates)
+
+            pages.append(work_item_pages)
+
+        _update_pages = pages
+
+    return _update_pages
+
+
+# ----------------------------------------------------------------------
+def _GetMainModule() -> Any:
+    global _main_module  # pylint: disable=global-statement
+
+    if _main_module is None:
+        # `__main__.py` can't be imported by name
+        spec = importlib.util.spec_from_file_location("WorkItemExtractor_main", _ROOT_DIR / "__main__.py")
+        assert spec is not None and spec.loader is not None
+
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        _main_module = module
+
+    return _main_module
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,208 @@
+# ----------------------------------------------------------------------
+# |
+# |  LoadTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-13 13:02:47
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Measures the end-to-end throughput of WorkItemExtractor against MockAzureDevOpsServer at different concurrency settings."""
+
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from Common_Foundation import PathEx
+from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
+from Common_Foundation import TextwrapEx
+
+from MockAzureDevOpsServer import LatencyDistribution, MockAzureDevOpsServer, ServerConfiguration  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_MAIN_FILENAME                              = PathEx.EnsureFile(Path(__file__).resolve().parent.parent / "__main__.py")
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class LoadTestResult(object):
+    max_num_threads: int
+    wall_seconds: float
+    requests: int
+    bytes_sent: int
+    injected_429s: int
+    injected_5xxs: int
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    help=__doc__,
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    max_num_threads_values: list[int]=typer.Option([1, 4, 16], "--max-threads", min=1, help="Concurrency setting(s) to measure."),
+    num_epics: int=typer.Option(100, "--epics", min=1, help="Number of epics (root work items)."),
+    features_per_epic: int=typer.Option(20, "--features-per-epic", min=0, help="Number of features within each epic."),
+    updates_per_item: int=typer.Option(10, "--updates-per-item", min=1, help="Average number of updates for each work item."),
+    latency_ms: float=typer.Option(20.0, "--latency-ms", min=0.0, help="Mean latency of each response."),
+    latency_distribution: LatencyDistribution=typer.Option(LatencyDistribution.LogNormal, "--latency-distribution", case_sensitive=False, help="Distribution of response latencies."),
+    rate_429: float=typer.Option(0.0, "--rate-429", min=0.0, max=1.0, help="Probability that a request is throttled."),
+    rate_5xx: float=typer.Option(0.0, "--rate-5xx", min=0.0, max=1.0, help="Probability that a request fails with a server error."),
+    generate_events: bool=typer.Option(False, "--events", help="Measure 'GenerateEvents' rather than 'GenerateHierarchies'."),
+    seed: int=typer.Option(0, "--seed", help="Seed used to generate the synthetic data."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Extracts all work items from a freshly started mock server for each concurrency setting."""
+
+    configuration = ServerConfiguration(
+        num_epics=num_epics,
+        features_per_epic=features_per_epic,
+        updates_per_item=updates_per_item,
+        seed=seed,
+        latency_ms=latency_ms,
+        latency_distribution=latency_distribution,
+        rate_429=rate_429,
+        rate_5xx=rate_5xx,
+    )
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        results: list[LoadTestResult] = []
+
+        for max_num_threads in max_num_threads_values:
+            with dm.Nested(
+                "Measuring with {} thread(s)...".format(max_num_threads),
+                lambda: None if not results or results[-1].max_num_threads != max_num_threads else "{:.2f}s".format(results[-1].wall_seconds),
+            ) as measure_dm:
+                result = _Measure(
+                    measure_dm,
+                    configuration,
+                    max_num_threads,
+                    "GenerateEvents" if generate_events else "GenerateHierarchies",
+                )
+
+                if result is None:
+                    return
+
+                results.append(result)
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+
+                Work items:     {}
+
+                {}
+
+                """,
+            ).format(
+                configuration.num_items,
+                TextwrapEx.CreateTable(
+                    ["Threads", "Seconds", "Items/sec", "Requests", "Requests/sec", "MB", "429s", "5xxs"],
+                    [
+                        [
+                            str(result.max_num_threads),
+                            "{:.2f}".format(result.wall_seconds),
+                            "{:.1f}".format(configuration.num_items / result.wall_seconds),
+                            str(result.requests),
+                            "{:.1f}".format(result.requests / result.wall_seconds),
+                            "{:.2f}".format(result.bytes_sent / (1024 * 1024)),
+                            str(result.injected_429s),
+                            str(result.injected_5xxs),
+                        ]
+                        for result in results
+                    ],
+                ),
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Measure(
+    dm: DoneManager,
+    configuration: ServerConfiguration,
+    max_num_threads: int,
+    command_name: str,
+) -> Optional[LoadTestResult]:
+    # A new server is started for each measurement so that the statistics are isolated
+    server = MockAzureDevOpsServer(configuration)
+
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    str(_MAIN_FILENAME),
+                    command_name,
+                    "AzureDevOps",
+                    server.url,
+                    "load_test",
+                    "load_test_token",
+                    str(Path(temp_dir) / "output.json"),
+                    "--max-threads",
+                    str(max_num_threads),
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+
+            wall_seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server_thread.join()
+        server.server_close()
+
+    if result.returncode != 0:
+        dm.WriteError("The CLI failed ({}):\n{}\n{}\n".format(result.returncode, result.stdout, result.stderr))
+        return None
+
+    dm.WriteVerbose(result.stdout)
+
+    stats = server.GetStats()
+
+    return LoadTestResult(
+        max_num_threads,
+        wall_seconds,
+        stats["requests"],
+        stats["bytes_sent"],
+        stats["injected_429s"],
+        stats["injected_5xxs"],
+    )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
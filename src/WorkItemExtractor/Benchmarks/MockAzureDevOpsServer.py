@@ -0,0 +1,712 @@
+# ----------------------------------------------------------------------
+# |
+# |  MockAzureDevOpsServer.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-13 09:18:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Local http server that implements the Azure DevOps endpoints used by the AzureDevOps plugin with synthetic data."""
+
+import gzip
+import json
+import math
+import random
+import re
+import threading
+import time
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+import typer
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+class LatencyDistribution(str, Enum):
+    Fixed                                   = "fixed"
+    Exponential                             = "exponential"
+    LogNormal                               = "lognormal"
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class ServerConfiguration(object):
+    """Configuration of the synthetic data and the server's behavior"""
+
+    # ----------------------------------------------------------------------
+    num_epics: int                          = 100
+    features_per_epic: int                  = 20
+    updates_per_item: int                   = 10            # Average number of updates per work item
+    extra_fields_per_update: int            = 5             # Unused fields included in each update, to simulate wide work item types
+    seed: int                               = 0
+
+    page_size: int                          = 200           # Default `$top` for updates and revisions
+    max_page_size: int                      = 200
+    wiql_limit: int                         = 20000
+
+    latency_ms: float                       = 0.0
+    latency_distribution: LatencyDistribution   = LatencyDistribution.Fixed
+    rate_429: float                         = 0.0
+    rate_5xx: float                         = 0.0
+
+    start_date: datetime                    = field(default_factory=lambda: datetime(2023, 1, 1, tzinfo=timezone.utc))
+
+    # ----------------------------------------------------------------------
+    @property
+    def num_items(self) -> int:
+        return self.num_epics * (1 + self.features_per_epic)
+
+
+# ----------------------------------------------------------------------
+class SyntheticData(object):
+    """Generates work items and their updates deterministically (and on demand) from a seed"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        configuration: ServerConfiguration,
+    ):
+        self.configuration                  = configuration
+
+    # ----------------------------------------------------------------------
+    def IsValid(
+        self,
+        work_item_id: int,
+    ) -> bool:
+        return 1 <= work_item_id <= self.configuration.num_items
+
+    # ----------------------------------------------------------------------
+    def IsEpic(
+        self,
+        work_item_id: int,
+    ) -> bool:
+        return work_item_id <= self.configuration.num_epics
+
+    # ----------------------------------------------------------------------
+    def GetEpicIds(self) -> list[int]:
+        return list(range(1, self.configuration.num_epics + 1))
+
+    # ----------------------------------------------------------------------
+    def GetChildIds(
+        self,
+        work_item_id: int,
+    ) -> list[int]:
+        if not self.IsEpic(work_item_id):
+            return []
+
+        first_child_id = self.configuration.num_epics + (work_item_id - 1) * self.configuration.features_per_epic + 1
+
+        return list(range(first_child_id, first_child_id + self.configuration.features_per_epic))
+
+    # ----------------------------------------------------------------------
+    def GetNumUpdates(
+        self,
+        work_item_id: int,
+    ) -> int:
+        mean = self.configuration.updates_per_item
+
+        return self._Random(work_item_id, -1).randint(1, max(1, 2 * mean - 1))
+
+    # ----------------------------------------------------------------------
+    def GetUpdates(
+        self,
+        work_item_id: int,
+        skip: int,
+        top: int,
+    ) -> list[dict[str, Any]]:
+        num_updates = self.GetNumUpdates(work_item_id)
+
+        return [self._CreateUpdate(work_item_id, index, num_updates) for index in range(skip, min(num_updates, skip + top))]
+
+    # ----------------------------------------------------------------------
+    def GetRevisions(
+        self,
+        work_item_id: int,
+        skip: int,
+        top: int,
+    ) -> list[dict[str, Any]]:
+        num_updates = self.GetNumUpdates(work_item_id)
+
+        fields: dict[str, Any] = {}
+        results: list[dict[str, Any]] = []
+
+        for index in range(min(num_updates, skip + top)):
+            for field_name, value in self._CreateUpdate(work_item_id, index, num_updates)["fields"].items():
+                if "newValue" in value:
+                    fields[field_name] = value["newValue"]
+                else:
+                    fields.pop(field_name, None)
+
+            if index >= skip:
+                results.append({"id": work_item_id, "rev": index + 1, "fields": dict(fields)})
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def GetFields(
+        self,
+        work_item_id: int,
+    ) -> dict[str, Any]:
+        """Returns the fields of the work item as they exist after the last update"""
+
+        fields: dict[str, Any] = {}
+
+        for index in range(self.GetNumUpdates(work_item_id)):
+            for field_name, value in self._CreateUpdate(work_item_id, index, None)["fields"].items():
+                fields[field_name] = value["newValue"]
+
+        return fields
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _Random(
+        self,
+        work_item_id: int,
+        index: int,
+    ) -> random.Random:
+        return random.Random((self.configuration.seed * 1000003 + work_item_id) * 1000003 + index)
+
+    # ----------------------------------------------------------------------
+    def _GetDate(
+        self,
+        work_item_id: int,
+        index: int,
+    ) -> datetime:
+        created = self.configuration.start_date + timedelta(days=self._Random(work_item_id, -2).randint(0, 30))
+
+        return created + timedelta(days=index * 2, hours=self._Random(work_item_id, index).randint(0, 23))
+
+    # ----------------------------------------------------------------------
+    def _GetState(
+        self,
+        work_item_id: int,
+        index: int,
+        num_updates: int,
+    ) -> str:
+        if index < num_updates / 3:
+            return "New"
+        if index < num_updates * 2 / 3 or self._Random(work_item_id, -3).random() < 0.3:
+            return "Active"
+
+        return "Closed"
+
+    # ----------------------------------------------------------------------
+    def _CreateUpdate(
+        self,
+        work_item_id: int,
+        index: int,
+        num_updates: Optional[int],
+    ) -> dict[str, Any]:
+        if num_updates is None:
+            num_updates = self.GetNumUpdates(work_item_id)
+
+        rng = self._Random(work_item_id, index)
+        is_epic = self.IsEpic(work_item_id)
+
+        dt = self._GetDate(work_item_id, index)
+        fields: dict[str, Any] = {}
+
+        # ----------------------------------------------------------------------
+        def Add(
+            name: str,
+            new_value: Any,
+            old_value: Any=None,
+        ) -> None:
+            value = {"newValue": new_value}
+
+            if old_value is not None:
+                value["oldValue"] = old_value
+
+            fields[name] = value
+
+        # ----------------------------------------------------------------------
+
+        if index == 0:
+            Add("System.WorkItemType", "Epic" if is_epic else "Feature")
+            Add("System.Title", "{} {}".format("Epic" if is_epic else "Feature", work_item_id))
+            Add("System.CreatedDate", _ToString(dt))
+            Add("System.State", "New")
+        else:
+            state = self._GetState(work_item_id, index, num_updates)
+            prev_state = self._GetState(work_item_id, index - 1, num_updates)
+
+            if state != prev_state:
+                Add("System.State", state, prev_state)
+
+        if index == 0 or rng.random() < 0.2:
+            if is_epic:
+                Add("Custom.EffortasTShirtSize", rng.choice(["S", "M", "L", "XL", "XXL"]))
+            else:
+                Add("Microsoft.VSTS.Scheduling.StoryPoints", float(rng.choice([1, 2, 3, 5, 8, 13])))
+
+        # Azure DevOps uses this value to indicate that the revision is the current one
+        revised_date = "9999-01-01T00:00:00Z" if index == num_updates - 1 else _ToString(self._GetDate(work_item_id, index + 1))
+
+        Add("System.ChangedDate", _ToString(dt))
+        Add("System.RevisedDate", revised_date)
+        Add("System.Rev", index + 1, index if index else None)
+
+        for extra_index in range(self.configuration.extra_fields_per_update):
+            Add("Custom.Extra{}".format(extra_index), "x" * rng.randint(10, 200))
+
+        return {
+            "id": index + 1,
+            "workItemId": work_item_id,
+            "rev": index + 1,
+            "revisedDate": revised_date,
+            "fields": fields,
+        }
+
+
+# ----------------------------------------------------------------------
+@dataclass
+class ServerStats(object):
+    requests: int                           = 0
+    bytes_sent: int                         = 0
+    injected_429s: int                      = 0
+    injected_5xxs: int                      = 0
+    endpoints: dict[str, int]               = field(default_factory=dict)
+
+
+# ----------------------------------------------------------------------
+class MockAzureDevOpsServer(ThreadingHTTPServer):
+    """Serves `SyntheticData`; the url provided to the AzureDevOps plugin is `http://<host>:<port>/<org>/<project>`"""
+
+    daemon_threads                          = True
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        configuration: ServerConfiguration,
+        host: str="127.0.0.1",
+        port: int=0,
+    ):
+        self.configuration                  = configuration
+        self.data                           = SyntheticData(configuration)
+        self.stats                          = ServerStats()
+
+        self._stats_lock                    = threading.Lock()
+        self._random                        = random.Random(configuration.seed)
+
+        super(MockAzureDevOpsServer, self).__init__((host, port), _RequestHandler)
+
+    # ----------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://{}:{}/MockOrganization/MockProject".format(host, port)
+
+    # ----------------------------------------------------------------------
+    def GetStats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            return json.loads(json.dumps(self.stats.__dict__))
+
+    # ----------------------------------------------------------------------
+    def OnRequest(
+        self,
+        endpoint: str,
+    ) -> tuple[Optional[int], float]:
+        """Returns the injected error status code (if any) and the latency to simulate"""
+
+        with self._stats_lock:
+            self.stats.requests += 1
+            self.stats.endpoints[endpoint] = self.stats.endpoints.get(endpoint, 0) + 1
+
+            value = self._random.random()
+
+            if value < self.configuration.rate_429:
+                self.stats.injected_429s += 1
+                status_code = 429
+            elif value < self.configuration.rate_429 + self.configuration.rate_5xx:
+                self.stats.injected_5xxs += 1
+                status_code = self._random.choice([500, 502, 504])
+            else:
+                status_code = None
+
+            mean = self.configuration.latency_ms / 1000
+
+            if mean == 0:
+                latency = 0.0
+            elif self.configuration.latency_distribution == LatencyDistribution.Exponential:
+                latency = self._random.expovariate(1 / mean)
+            elif self.configuration.latency_distribution == LatencyDistribution.LogNormal:
+                # sigma of 0.5; mu is chosen so that the mean of the distribution is `mean`
+                latency = self._random.lognormvariate(_LogNormalMu(mean, 0.5), 0.5)
+            else:
+                latency = mean
+
+        return status_code, latency
+
+    # ----------------------------------------------------------------------
+    def OnResponse(
+        self,
+        num_bytes: int,
+    ) -> None:
+        with self._stats_lock:
+            self.stats.bytes_sent += num_bytes
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    help=__doc__,
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+@app.command()
+def Serve(
+    port: int=typer.Option(8080, "--port", help="Port to listen on."),
+    num_epics: int=typer.Option(100, "--epics", min=1, help="Number of epics (root work items)."),
+    features_per_epic: int=typer.Option(20, "--features-per-epic", min=0, help="Number of features within each epic."),
+    updates_per_item: int=typer.Option(10, "--updates-per-item", min=1, help="Average number of updates for each work item."),
+    extra_fields_per_update: int=typer.Option(5, "--extra-fields", min=0, help="Number of unused fields included in each update."),
+    latency_ms: float=typer.Option(0.0, "--latency-ms", min=0.0, help="Mean latency of each response."),
+    latency_distribution: LatencyDistribution=typer.Option(LatencyDistribution.Fixed, "--latency-distribution", case_sensitive=False, help="Distribution of response latencies."),
+    rate_429: float=typer.Option(0.0, "--rate-429", min=0.0, max=1.0, help="Probability that a request is throttled."),
+    rate_5xx: float=typer.Option(0.0, "--rate-5xx", min=0.0, max=1.0, help="Probability that a request fails with a server error."),
+    seed: int=typer.Option(0, "--seed", help="Seed used to generate the synthetic data."),
+) -> None:
+    """Runs the server until interrupted."""
+
+    server = MockAzureDevOpsServer(
+        ServerConfiguration(
+            num_epics=num_epics,
+            features_per_epic=features_per_epic,
+            updates_per_item=updates_per_item,
+            extra_fields_per_update=extra_fields_per_update,
+            seed=seed,
+            latency_ms=latency_ms,
+            latency_distribution=latency_distribution,
+            rate_429=rate_429,
+            rate_5xx=rate_5xx,
+        ),
+        port=port,
+    )
+
+    print("Serving {} work items at '{}' (Ctrl+C to exit)...".format(server.configuration.num_items, server.url))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+    print(json.dumps(server.GetStats(), indent=2))
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: MockAzureDevOpsServer
+    protocol_version                        = "HTTP/1.1"
+
+    _WORK_ITEM_REGEX                        = re.compile(r"/_apis/wit/workitems/(?P<id>\d+)(?:/(?P<history>updates|revisions))?/?$", re.IGNORECASE)
+    _WIQL_REGEX                             = re.compile(r"/_apis/wit/wiql/?$", re.IGNORECASE)
+    _WORK_ITEMS_BATCH_REGEX                 = re.compile(r"/_apis/wit/workitemsbatch/?$", re.IGNORECASE)
+    _REPORTING_REVISIONS_REGEX              = re.compile(r"/_apis/wit/reporting/workitemrevisions/?$", re.IGNORECASE)
+
+    _WIQL_MIN_ID_REGEX                      = re.compile(r"\[System\.Id\]\s*>=\s*(?P<value>\d+)", re.IGNORECASE)
+    _WIQL_MAX_ID_REGEX                      = re.compile(r"\[System\.Id\]\s*<=\s*(?P<value>\d+)", re.IGNORECASE)
+    _WIQL_ID_DESC_REGEX                     = re.compile(r"ORDER\s+BY\s+\[System\.Id\]\s+desc", re.IGNORECASE)
+
+    # ----------------------------------------------------------------------
+    def log_message(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        # Don't write information about every request to stderr
+        pass
+
+    # ----------------------------------------------------------------------
+    def do_GET(self):  # pylint: disable=invalid-name
+        parsed_url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+
+        if self.__class__._REPORTING_REVISIONS_REGEX.search(parsed_url.path) is not None:
+            self._SendReportingRevisions(query)
+            return
+
+        match = self.__class__._WORK_ITEM_REGEX.search(parsed_url.path)
+        if match is None:
+            self._Send(404, {"message": "Not found"})
+            return
+
+        work_item_id = int(match.group("id"))
+
+        history = (match.group("history") or "").lower()
+
+        if history:
+            if not self._OnRequest(history):
+                return
+
+            if not self.server.data.IsValid(work_item_id):
+                self._Send(404, {"message": "Work item {} does not exist".format(work_item_id)})
+                return
+
+            skip = int(query.get("$skip", "0"))
+            top = min(int(query.get("$top", str(self.server.configuration.page_size))), self.server.configuration.max_page_size)
+
+            if history == "updates":
+                items = self.server.data.GetUpdates(work_item_id, skip, top)
+            else:
+                items = self.server.data.GetRevisions(work_item_id, skip, top)
+
+                requested_fields = query.get("fields", None)
+                if requested_fields is not None:
+                    requested_fields = set(requested_fields.split(","))
+
+                    for item in items:
+                        item["fields"] = {k: v for k, v in item["fields"].items() if k in requested_fields}
+
+            self._Send(200, {"count": len(items), "value": items})
+            return
+
+        if not self._OnRequest("workitems"):
+            return
+
+        if not self.server.data.IsValid(work_item_id):
+            self._Send(404, {"message": "Work item {} does not exist".format(work_item_id)})
+            return
+
+        content: dict[str, Any] = {
+            "id": work_item_id,
+            "rev": self.server.data.GetNumUpdates(work_item_id),
+            "fields": self.server.data.GetFields(work_item_id),
+        }
+
+        requested_fields = query.get("fields", None)
+        if requested_fields is not None:
+            requested_fields = set(requested_fields.split(","))
+            content["fields"] = {k: v for k, v in content["fields"].items() if k in requested_fields}
+
+        if query.get("$expand", "").lower() in ["relations", "all"]:
+            base_url = "http://{}:{}/_apis/wit/workItems".format(*self.server.server_address[:2])
+
+            content["relations"] = [
+                {
+                    "rel": "System.LinkTypes.Hierarchy-Forward",
+                    "url": "{}/{}".format(base_url, child_id),
+                    "attributes": {"name": "Child"},
+                }
+                for child_id in self.server.data.GetChildIds(work_item_id)
+            ]
+
+        self._Send(200, content)
+
+    # ----------------------------------------------------------------------
+    def do_POST(self):  # pylint: disable=invalid-name
+        parsed_url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+
+        content_length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(content_length) if content_length else b""
+
+        if self.__class__._WORK_ITEMS_BATCH_REGEX.search(parsed_url.path) is not None:
+            if not self._OnRequest("workitemsbatch"):
+                return
+
+            request = json.loads(body or b"{}")
+            requested_fields = set(request.get("fields", []))
+
+            values: list[Optional[dict[str, Any]]] = []
+
+            for work_item_id in request.get("ids", [])[:200]:
+                if not self.server.data.IsValid(work_item_id):
+                    values.append(None)
+                    continue
+
+                fields = self.server.data.GetFields(work_item_id)
+
+                if requested_fields:
+                    fields = {k: v for k, v in fields.items() if k in requested_fields}
+
+                values.append({"id": work_item_id, "fields": fields})
+
+            self._Send(200, {"count": len(values), "value": values})
+            return
+
+        if self.__class__._WIQL_REGEX.search(parsed_url.path) is None:
+            self._Send(404, {"message": "Not found"})
+            return
+
+        if not self._OnRequest("wiql"):
+            return
+
+        wiql = json.loads(body or b"{}").get("query", "")
+
+        work_item_ids = self.server.data.GetEpicIds()
+
+        # Id ranges (used to partition queries) are the only clauses supported
+        for regex, is_match_func in [
+            (self.__class__._WIQL_MIN_ID_REGEX, lambda work_item_id, value: work_item_id >= value),
+            (self.__class__._WIQL_MAX_ID_REGEX, lambda work_item_id, value: work_item_id <= value),
+        ]:
+            match = regex.search(wiql)
+            if match is not None:
+                value = int(match.group("value"))
+                work_item_ids = [work_item_id for work_item_id in work_item_ids if is_match_func(work_item_id, value)]
+
+        if self.__class__._WIQL_ID_DESC_REGEX.search(wiql) is not None:
+            work_item_ids.reverse()
+
+        top = query.get("$top", None)
+        if top is not None:
+            work_item_ids = work_item_ids[:int(top)]
+
+        # Like Azure DevOps, queries that return too many work items fail
+        if len(work_item_ids) > self.server.configuration.wiql_limit:
+            self._Send(
+                400,
+                {
+                    "message": "VS402337: The number of work items returned exceeds the size limit of {}. Change the query to return fewer work items.".format(
+                        self.server.configuration.wiql_limit,
+                    ),
+                },
+            )
+            return
+
+        self._Send(200, {"workItems": [{"id": work_item_id} for work_item_id in work_item_ids]})
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _SendReportingRevisions(
+        self,
+        query: dict[str, str],
+    ) -> None:
+        if not self._OnRequest("workitemrevisions"):
+            return
+
+        # The continuation token is the id of the work item and the index of its revision that begin the batch
+        work_item_id, skip = (int(value) for value in query.get("continuationToken", "1.0").split("."))
+
+        page_size = min(int(query.get("$maxPageSize", str(self.server.configuration.page_size))), self.server.configuration.max_page_size)
+
+        work_item_types = query.get("types", None)
+        if work_item_types is not None:
+            work_item_types = set(work_item_types.split(","))
+
+        values: list[dict[str, Any]] = []
+
+        while self.server.data.IsValid(work_item_id) and len(values) < page_size:
+            if work_item_types is not None and ("Epic" if self.server.data.IsEpic(work_item_id) else "Feature") not in work_item_types:
+                work_item_id += 1
+                skip = 0
+
+                continue
+
+            revisions = self.server.data.GetRevisions(work_item_id, skip, page_size - len(values))
+
+            values += revisions
+            skip += len(revisions)
+
+            if skip >= self.server.data.GetNumUpdates(work_item_id):
+                work_item_id += 1
+                skip = 0
+
+        requested_fields = query.get("fields", None)
+        if requested_fields is not None:
+            requested_fields = set(requested_fields.split(","))
+
+            for value in values:
+                value["fields"] = {k: v for k, v in value["fields"].items() if k in requested_fields}
+
+        self._Send(
+            200,
+            {
+                "values": values,
+                "continuationToken": "{}.{}".format(work_item_id, skip),
+                "isLastBatch": not self.server.data.IsValid(work_item_id),
+            },
+        )
+
+    # ----------------------------------------------------------------------
+    def _OnRequest(
+        self,
+        endpoint: str,
+    ) -> bool:
+        status_code, latency = self.server.OnRequest(endpoint)
+
+        if latency:
+            time.sleep(latency)
+
+        if status_code is None:
+            return True
+
+        self._Send(status_code, {"message": "Injected error"}, {"Retry-After": "0"} if status_code == 429 else None)
+        return False
+
+    # ----------------------------------------------------------------------
+    def _Send(
+        self,
+        status_code: int,
+        content: Any,
+        headers: Optional[dict[str, str]]=None,
+    ) -> None:
+        content_bytes = json.dumps(content).encode("UTF-8")
+
+        is_compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+        if is_compressed:
+            content_bytes = gzip.compress(content_bytes, compresslevel=6)
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content_bytes)))
+
+        if is_compressed:
+            self.send_header("Content-Encoding", "gzip")
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        self.wfile.write(content_bytes)
+
+        self.server.OnResponse(len(content_bytes))
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _ToString(
+    dt: datetime,
+) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# ----------------------------------------------------------------------
+def _LogNormalMu(
+    mean: float,
+    sigma: float,
+) -> float:
+    return math.log(mean) - sigma * sigma / 2
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,212 @@
+# ----------------------------------------------------------------------
+# |
+# |  StartupBenchmark.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-07 14:52:19
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Measures the startup time of WorkItemExtractor (via `python -X importtime`) and compares it to a baseline."""
+
+import json
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from Common_Foundation import PathEx
+from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
+from Common_Foundation import TextwrapEx
+
+
+# ----------------------------------------------------------------------
+_MAIN_FILENAME                              = PathEx.EnsureFile(Path(__file__).resolve().parent.parent / "__main__.py")
+_DEFAULT_BASELINE_FILENAME                  = Path(__file__).resolve().parent / "Baselines" / "Startup.json"
+
+# Modules that should never be imported when the CLI is invoked without selecting a plugin
+_FORBIDDEN_STARTUP_MODULES                  = ["requests", "urllib3", ]
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class ImportTimeResult(object):
+    wall_seconds: float
+    import_us: int
+    modules: dict[str, int]                 # module name -> cumulative import time (us)
+
+
+# ----------------------------------------------------------------------
+app                                         = typer.Typer(
+    help=__doc__,
+    no_args_is_help=False,
+    pretty_exceptions_show_locals=False,
+)
+
+
+# ----------------------------------------------------------------------
+@app.command()
+def Execute(
+    iterations: int=typer.Option(7, "--iterations", min=1, help="Number of times to invoke the CLI; the median is reported."),
+    baseline_filename: Path=typer.Option(_DEFAULT_BASELINE_FILENAME, "--baseline", dir_okay=False, help="Baseline filename."),
+    threshold: float=typer.Option(0.25, "--threshold", min=0.0, help="Allowed regression, as a ratio of the baseline, before the benchmark fails."),
+    update_baseline: bool=typer.Option(False, "--update-baseline", help="Write the measured values as the new baseline."),
+    num_modules: int=typer.Option(15, "--num-modules", min=0, help="Number of most-expensive top-level imports to display."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Measures the import time of `WorkItemExtractor --help`."""
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm:
+        results: list[ImportTimeResult] = []
+
+        with dm.Nested("Measuring startup ({} iterations)...".format(iterations)):
+            for _ in range(iterations):
+                result = _Measure(dm)
+                if result is None:
+                    return
+
+                results.append(result)
+
+        wall_seconds = statistics.median(result.wall_seconds for result in results)
+        import_us = int(statistics.median(result.import_us for result in results))
+
+        modules = results[-1].modules
+        sorted_modules = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:num_modules]
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+
+                Wall time:      {:.3f}s
+                Import time:    {:.3f}s
+
+                {}
+
+                """,
+            ).format(
+                wall_seconds,
+                import_us / 1000000,
+                TextwrapEx.CreateTable(
+                    ["Module", "Cumulative (ms)"],
+                    [[name, "{:.1f}".format(value / 1000)] for name, value in sorted_modules],
+                ),
+            ),
+        )
+
+        forbidden_modules = [name for name in _FORBIDDEN_STARTUP_MODULES if name in modules]
+        if forbidden_modules:
+            dm.WriteError(
+                "The {} imported during startup: {}.\n".format(
+                    "module was" if len(forbidden_modules) == 1 else "modules were",
+                    ", ".join("'{}'".format(name) for name in forbidden_modules),
+                ),
+            )
+
+        if update_baseline:
+            with dm.Nested("Writing '{}'...".format(baseline_filename)):
+                baseline_filename.parent.mkdir(parents=True, exist_ok=True)
+
+                with baseline_filename.open("w", encoding="UTF-8") as f:
+                    json.dump(
+                        {
+                            "wall_seconds": wall_seconds,
+                            "import_us": import_us,
+                        },
+                        f,
+                        indent=2,
+                    )
+
+            return
+
+        if not baseline_filename.is_file():
+            dm.WriteLine("No baseline exists at '{}'; run with '--update-baseline' to create one.\n".format(baseline_filename))
+            return
+
+        with baseline_filename.open(encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+        for name, value, baseline_value in [
+            ("Import time", import_us, baseline["import_us"]),
+            ("Wall time", wall_seconds, baseline["wall_seconds"]),
+        ]:
+            if value > baseline_value * (1.0 + threshold):
+                dm.WriteError(
+                    "{} regressed by {:.1f}% (baseline: {}, current: {}, threshold: {:.1f}%).\n".format(
+                        name,
+                        (value / baseline_value - 1.0) * 100,
+                        baseline_value,
+                        value,
+                        threshold * 100,
+                    ),
+                )
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _Measure(
+    dm: DoneManager,
+) -> Optional[ImportTimeResult]:
+    start = time.perf_counter()
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(_MAIN_FILENAME), "--help"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    wall_seconds = time.perf_counter() - start
+
+    if result.returncode != 0:
+        dm.WriteError("The CLI failed ({}):\n{}\n".format(result.returncode, result.stderr))
+        return None
+
+    import_us = 0
+    modules: dict[str, int] = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+
+        cumulative = int(parts[1].strip())
+        name = parts[2]
+
+        # Nested imports are indented by 2 spaces per level
+        if len(name) - len(name.lstrip()) > 1:
+            modules.setdefault(name.strip(), cumulative)
+            continue
+
+        name = name.strip()
+
+        import_us += cumulative
+        modules[name] = cumulative
+
+    return ImportTimeResult(wall_seconds, import_us, modules)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,148 @@
+# ----------------------------------------------------------------------
+# |
+# |  SyntheticHierarchies.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-14 08:51:33
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Generates seeded HierarchyResult datasets that resemble those produced by the AzureDevOps plugin"""
+
+import random
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+from Common.ChangeLog import ChangeLog                                                               # type: ignore; pylint: disable=import-error,wrong-import-position
+from Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error,wrong-import-position
+from GenerateHierarchies import HierarchyItem, HierarchyResult                                       # type: ignore; pylint: disable=import-error,wrong-import-position
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def GenerateHierarchyResults(
+    num_items: int,
+    *,
+    seed: int=0,
+    children_per_root: int=20,
+    changes_per_item: int=10,
+    start_date: datetime=datetime(2023, 1, 1, tzinfo=timezone.utc),
+) -> list[HierarchyResult]:
+    """\
+    Generates hierarchies containing (approximately) `num_items` work items in total. The same arguments
+    always produce the same results.
+    """
+
+    rng = random.Random(seed)
+
+    num_roots = max(1, num_items // (1 + children_per_root))
+
+    results: list[HierarchyResult] = []
+    next_id = 1
+
+    for root_index in range(num_roots):
+        # The last root takes any remaining items
+        num_children = children_per_root if root_index != num_roots - 1 else max(0, num_items - next_id)
+
+        root = _CreateHierarchyItem(rng, str(next_id), True, changes_per_item, start_date)
+        next_id += 1
+
+        children: list[HierarchyItem] = []
+
+        for _ in range(num_children):
+            children.append(_CreateHierarchyItem(rng, str(next_id), False, changes_per_item, start_date))
+            next_id += 1
+
+        results.append(HierarchyResult(root, children))
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _CreateHierarchyItem(
+    rng: random.Random,
+    work_item_id: str,
+    is_epic: bool,
+    changes_per_item: int,
+    start_date: datetime,
+) -> HierarchyItem:
+    work_item_type = "Epic" if is_epic else "Feature"
+    title = "{} {}".format(work_item_type, work_item_id)
+
+    dt = start_date + timedelta(days=rng.randint(0, 90), hours=rng.randint(0, 23))
+    created = dt
+
+    # ----------------------------------------------------------------------
+    def CreateSize():
+        if is_epic:
+            return rng.choice(list(TeeShirtWorkItem.Size))
+
+        return float(rng.choice([1, 2, 3, 5, 8, 13]))
+
+    # ----------------------------------------------------------------------
+
+    size_field_name = "estimate" if is_epic else "story_points"
+
+    size = CreateSize()
+    state = State.New
+
+    changes: list[WorkItemChange] = [
+        WorkItemChange(dt, "type", work_item_type, None),
+        WorkItemChange(dt, "title", title, None),
+        WorkItemChange(dt, "dt", created, None),
+        WorkItemChange(dt, "state", state, None),
+        WorkItemChange(dt, size_field_name, size, None),
+    ]
+
+    num_updates = rng.randint(1, max(1, 2 * changes_per_item - 1))
+
+    for update_index in range(1, num_updates):
+        dt += timedelta(days=rng.randint(0, 5), hours=rng.randint(0, 23))
+
+        if rng.random() < 0.3:
+            new_size = CreateSize()
+
+            changes.append(WorkItemChange(dt, size_field_name, new_size, size))
+            size = new_size
+
+        if update_index < num_updates / 3:
+            new_state = State.New
+        elif update_index < num_updates * 2 / 3:
+            new_state = State.Active
+        else:
+            new_state = State.Closed
+
+        if new_state != state:
+            changes.append(WorkItemChange(dt, "state", new_state, state))
+            state = new_state
+
+    work_item: WorkItem
+
+    if is_epic:
+        work_item = TeeShirtWorkItem(work_item_id, title, created, state, work_item_type, size)
+    else:
+        work_item = StoryPointsWorkItem(work_item_id, title, created, state, work_item_type, size)
+
+    return HierarchyItem(work_item, ChangeLog(changes))
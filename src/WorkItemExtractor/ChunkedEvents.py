@@ -0,0 +1,281 @@
+# ----------------------------------------------------------------------
+# |
+# |  ChunkedEvents.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-26 10:18:44
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to split events into content-addressed chunks described by a manifest"""
+
+import calendar
+import hashlib
+import json
+import os
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+
+from Common.Profiling import YieldProfiledNested                            # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from GenerateEvents import EpicSeries, Event, GenerateEventsResult          # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+MANIFEST_FILENAME                           = "manifest.json"
+MANIFEST_FORMAT_VERSION                     = 1
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Chunk(object):
+    """The events that occur within a period"""
+
+    # ----------------------------------------------------------------------
+    start_date: str                         # First day of the period (inclusive)
+    end_date: str                           # Last day of the period (inclusive)
+    num_events: int
+
+    # A GenerateEventsResult with the events of the period, the epic series of the period (see
+    # `EpicSeries.Slice`), and the titles of the work items that they reference; the counts of each event
+    # are totals (rather than deltas), so a chunk is meaningful on its own.
+    content: bytes
+
+    # ----------------------------------------------------------------------
+    @cached_property
+    def hash(self) -> str:
+        return hashlib.sha256(self.content).hexdigest()[:32]
+
+    @property
+    def filename(self) -> str:
+        return "{}.json".format(self.hash)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def CreateChunks(
+    result: GenerateEventsResult,
+    *,
+    chunk_days: Optional[int]=None,         # Chunks contain a month of events when None
+) -> list[Chunk]:
+    """\
+    Splits the events into chunks. Periods are aligned to calendar months (or to multiples of `chunk_days`
+    days since 0001-01-01) rather than to the first event, so that changes to events only change the
+    chunks of the periods in which those events occur. Periods without events don't have chunks.
+    """
+
+    if chunk_days is not None and chunk_days < 1:
+        raise Exception("The number of days in a chunk must be greater than 0 ('{}').".format(chunk_days))
+
+    chunks: list[Chunk] = []
+
+    period: Optional[tuple[str, str]] = None
+    period_events: list[Event] = []
+
+    # ----------------------------------------------------------------------
+    def CreateChunk() -> Chunk:
+        assert period is not None
+
+        epics: dict[str, EpicSeries] = {}
+
+        for epic_id, epic_series in result.epics.items():
+            epic_series = epic_series.Slice(period[0], period[1])
+
+            if epic_series.dates:
+                epics[epic_id] = epic_series
+
+        # Titles of the work items referenced by the period's events and epics (in the order that they are referenced)
+        work_item_ids: dict[str, None] = {}
+
+        for event in period_events:
+            for change in event.changes:
+                work_item_ids[change.epic_id] = None
+                work_item_ids[change.work_item_id] = None
+
+        for epic_id in epics:
+            work_item_ids[epic_id] = None
+
+        return Chunk(
+            period[0],
+            period[1],
+            len(period_events),
+            ToJsonString(
+                GenerateEventsResult(
+                    {
+                        work_item_id: result.titles[work_item_id]
+                        for work_item_id in work_item_ids
+                        if work_item_id in result.titles
+                    },
+                    period_events,
+                    epics,
+                ),
+            ).encode("UTF-8"),
+        )
+
+    # ----------------------------------------------------------------------
+
+    for event in result.events:
+        # Dates are ISO-8601, so they can be compared as strings
+        if period is None or event.date > period[1]:
+            if period is not None:
+                chunks.append(CreateChunk())
+
+            period = _GetPeriod(event.date, chunk_days)
+            period_events = []
+
+        period_events.append(event)
+
+    if period is not None:
+        chunks.append(CreateChunk())
+
+    return chunks
+
+
+# ----------------------------------------------------------------------
+def CreateManifest(
+    chunks: list[Chunk],
+    *,
+    chunk_days: Optional[int]=None,
+) -> dict[str, Any]:
+    """\
+    Returns the manifest that describes the chunks. Clients fetch the manifest (which changes whenever the
+    events change) and then only the chunks that overlap the dates displayed; chunks never change once
+    created, as their names are derived from their content.
+    """
+
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "chunk_days": chunk_days,
+        "first_date": chunks[0].start_date if chunks else None,
+        "last_date": chunks[-1].end_date if chunks else None,
+        "chunks": [
+            {
+                "start_date": chunk.start_date,
+                "end_date": chunk.end_date,
+                "num_events": chunk.num_events,
+                "hash": chunk.hash,
+                "filename": chunk.filename,
+            }
+            for chunk in chunks
+        ],
+    }
+
+
+# ----------------------------------------------------------------------
+def WriteChunkedEvents(
+    dm: DoneManager,
+    output_dir: Path,
+    result: GenerateEventsResult,
+    *,
+    chunk_days: Optional[int]=None,
+) -> None:
+    """\
+    Writes the chunks and their manifest to `output_dir`. Chunks that already exist (from a previous
+    invocation) aren't written again, and the manifest is written after the chunks that it references.
+    Chunks referenced by the previous manifest but not by the new one are removed.
+    """
+
+    with YieldProfiledNested(dm, "Writing '{}'...".format(output_dir)) as this_dm:
+        chunks = CreateChunks(result, chunk_days=chunk_days)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest_filename = output_dir / MANIFEST_FILENAME
+
+        previous_filenames: set[str] = set()
+
+        if manifest_filename.is_file():
+            try:
+                with manifest_filename.open(encoding="UTF-8") as f:
+                    previous_manifest = json.load(f)
+
+                if previous_manifest.get("format_version", None) == MANIFEST_FORMAT_VERSION:
+                    previous_filenames.update(chunk["filename"] for chunk in previous_manifest["chunks"])
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                this_dm.WriteVerbose("The existing manifest is not valid and will be replaced.\n")
+
+        num_written = 0
+
+        for chunk in chunks:
+            chunk_filename = output_dir / chunk.filename
+
+            # The content of a chunk is identified by its name
+            if chunk_filename.is_file():
+                continue
+
+            _WriteFile(chunk_filename, chunk.content)
+            num_written += 1
+
+        _WriteFile(manifest_filename, json.dumps(CreateManifest(chunks, chunk_days=chunk_days)).encode("UTF-8"))
+
+        stale_filenames = previous_filenames.difference(chunk.filename for chunk in chunks)
+
+        for stale_filename in stale_filenames:
+            (output_dir / stale_filename).unlink(missing_ok=True)
+
+        this_dm.WriteVerbose(
+            "{} chunks written, {} unchanged, {} removed.\n".format(
+                num_written,
+                len(chunks) - num_written,
+                len(stale_filenames),
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _GetPeriod(
+    event_date: str,
+    chunk_days: Optional[int],
+) -> tuple[str, str]:
+    """Returns the first and last day of the period that contains the date"""
+
+    dt = date.fromisoformat(event_date)
+
+    if chunk_days is None:
+        return (
+            dt.replace(day=1).isoformat(),
+            dt.replace(day=calendar.monthrange(dt.year, dt.month)[1]).isoformat(),
+        )
+
+    start = date.fromordinal(((dt.toordinal() - 1) // chunk_days) * chunk_days + 1)
+
+    return start.isoformat(), (start + timedelta(days=chunk_days - 1)).isoformat()
+
+
+# ----------------------------------------------------------------------
+def _WriteFile(
+    filename: Path,
+    content: bytes,
+) -> None:
+    # Written to a temporary file first so that readers never observe a partially written file
+    temp_filename = filename.with_name("{}.tmp".format(filename.name))
+
+    temp_filename.write_bytes(content)
+    os.replace(temp_filename, filename)
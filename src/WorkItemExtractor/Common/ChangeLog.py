@@ -0,0 +1,644 @@
+# ----------------------------------------------------------------------
+# |
+# |  ChangeLog.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-27 09:12:05
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the ChangeLog object"""
+
+import textwrap
+import threading
+
+from array import array
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from enum import Enum
+from typing import Any, Generator, Iterable, Iterator, Optional, Protocol
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation import TextwrapEx
+
+from .WorkItem import WorkItemChange
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+class ChangeLike(Protocol):
+    """Anything that looks like a WorkItemChange (e.g. a WorkItemChange or a ChangeView)"""
+
+    dt: datetime
+    field: str
+    new_value: Any
+    old_value: Any
+
+
+# ----------------------------------------------------------------------
+class ChangeLog(object):
+    """\
+    The changes made to a work item, stored as parallel arrays (a struct of arrays) rather than as
+    WorkItemChange objects.
+
+    Each change requires 29 bytes (an 8-byte timestamp, a 2-byte field code, a 1-byte time zone code, and
+    two 8-byte value codes) plus the storage for values that aren't encoded inline, compared to roughly 160
+    bytes for a WorkItemChange and its datetime.
+
+    Value codes contain a 3-bit tag and a payload:
+        - None
+        - Integers (e.g. story points) are stored inline
+        - Enums (e.g. states and tee shirt sizes) are stored as codes in a table shared by all logs
+        - Floats (e.g. days and hours) are stored in a float array
+        - Strings (e.g. titles) are stored as ids in a table of the log's unique strings
+        - Everything else is stored as an object
+    """
+
+    __slots__ = (
+        "_timestamps",
+        "_timezone_codes",
+        "_field_codes",
+        "_new_value_codes",
+        "_old_value_codes",
+        "_floats",
+        "_strings",
+        "_string_ids",
+        "_objects",
+    )
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        changes: Iterable[ChangeLike]=(),
+    ):
+        self._timestamps                    = array("q")        # Microseconds since the epoch
+        self._timezone_codes                = array("B")
+        self._field_codes                   = array("H")
+        self._new_value_codes               = array("q")
+        self._old_value_codes               = array("q")
+
+        # Created on demand, as most logs don't need all of them
+        self._floats: Optional[array]                   = None
+        self._strings: Optional[list[str]]              = None
+        self._string_ids: Optional[dict[str, int]]      = None
+        self._objects: Optional[list[Any]]              = None
+
+        self.Extend(changes)
+
+    # ----------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    # ----------------------------------------------------------------------
+    def __iter__(self) -> Iterator["ChangeView"]:
+        for index in range(len(self._timestamps)):
+            yield ChangeView(self, index)
+
+    # ----------------------------------------------------------------------
+    def __getitem__(
+        self,
+        index: int,
+    ) -> "ChangeView":
+        if index < 0:
+            index += len(self._timestamps)
+
+        if index < 0 or index >= len(self._timestamps):
+            raise IndexError(index)
+
+        return ChangeView(self, index)
+
+    # ----------------------------------------------------------------------
+    def __eq__(
+        self,
+        other: Any,
+    ) -> bool:
+        if not isinstance(other, ChangeLog):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        return all(
+            this_change.ToTuple() == other_change.ToTuple()
+            for this_change, other_change in zip(self, other)
+        )
+
+    __hash__ = None                                         # type: ignore
+
+    # ----------------------------------------------------------------------
+    def __repr__(self) -> str:
+        return "ChangeLog({})".format(len(self))
+
+    # ----------------------------------------------------------------------
+    def Append(
+        self,
+        change: ChangeLike,
+    ) -> None:
+        timestamp, timezone_code = _EncodeDateTime(change.dt)
+
+        # Encode the values first so that the log isn't modified if an exception is raised
+        field_code = _field_names.GetCode(change.field)
+        new_value_code = self._EncodeValue(change.new_value)
+        old_value_code = self._EncodeValue(change.old_value)
+
+        self._timestamps.append(timestamp)
+        self._timezone_codes.append(timezone_code)
+        self._field_codes.append(field_code)
+        self._new_value_codes.append(new_value_code)
+        self._old_value_codes.append(old_value_code)
+
+    # ----------------------------------------------------------------------
+    def Extend(
+        self,
+        changes: Iterable[ChangeLike],
+    ) -> None:
+        for change in changes:
+            self.Append(change)
+
+    # ----------------------------------------------------------------------
+    def Sort(self) -> None:
+        """\
+        Sorts the changes by time (the relative order of changes made at the same time is preserved); the
+        arrays are permuted without decoding the changes. Views created before the log is sorted refer to
+        the change now at their index.
+        """
+
+        timestamps = self._timestamps
+
+        if all(timestamps[index - 1] <= timestamps[index] for index in range(1, len(timestamps))):
+            return
+
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+
+        self._timestamps = array("q", (timestamps[index] for index in order))
+        self._timezone_codes = array("B", (self._timezone_codes[index] for index in order))
+        self._field_codes = array("H", (self._field_codes[index] for index in order))
+        self._new_value_codes = array("q", (self._new_value_codes[index] for index in order))
+        self._old_value_codes = array("q", (self._old_value_codes[index] for index in order))
+
+    # ----------------------------------------------------------------------
+    def EnumFieldChanges(
+        self,
+        field_names: Iterable[str],
+    ) -> Generator[tuple[str, datetime, Any], None, None]:
+        """\
+        Yields (field, dt, new_value) for the changes made to the specified fields; changes made to
+        other fields are skipped without being decoded.
+        """
+
+        field_codes: dict[int, str] = {}
+
+        for field_name in field_names:
+            field_code = _field_names.GetCodeIfExists(field_name)
+            if field_code is not None:
+                field_codes[field_code] = field_name
+
+        if not field_codes:
+            return
+
+        for index, field_code in enumerate(self._field_codes):
+            field_name = field_codes.get(field_code, None)
+            if field_name is None:
+                continue
+
+            yield (
+                field_name,
+                self._DecodeDateTime(index),
+                self._DecodeValue(self._new_value_codes[index]),
+            )
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _EncodeValue(
+        self,
+        value: Any,
+    ) -> int:
+        if value is None:
+            return _NONE_TAG
+
+        value_type = type(value)
+
+        # Note that bools are ints, but they are stored as objects so that they are decoded as bools
+        if value_type is int and _MIN_INLINE_INT <= value <= _MAX_INLINE_INT:
+            return (value << _TAG_BITS) | _INT_TAG
+
+        if isinstance(value, Enum):
+            return (_enum_members.GetCode(value) << _TAG_BITS) | _ENUM_TAG
+
+        if value_type is float:
+            if self._floats is None:
+                self._floats = array("d")
+
+            self._floats.append(value)
+            return ((len(self._floats) - 1) << _TAG_BITS) | _FLOAT_TAG
+
+        if value_type is str:
+            if self._strings is None:
+                self._strings = []
+                self._string_ids = {}
+
+            assert self._string_ids is not None
+
+            string_id = self._string_ids.get(value, None)
+            if string_id is None:
+                string_id = len(self._strings)
+
+                self._strings.append(value)
+                self._string_ids[value] = string_id
+
+            return (string_id << _TAG_BITS) | _STRING_TAG
+
+        if self._objects is None:
+            self._objects = []
+
+        self._objects.append(value)
+        return ((len(self._objects) - 1) << _TAG_BITS) | _OBJECT_TAG
+
+    # ----------------------------------------------------------------------
+    def _DecodeValue(
+        self,
+        value_code: int,
+    ) -> Any:
+        tag = value_code & _TAG_MASK
+        payload = value_code >> _TAG_BITS
+
+        if tag == _NONE_TAG:
+            return None
+        if tag == _INT_TAG:
+            return payload
+        if tag == _ENUM_TAG:
+            return _enum_members.values[payload]
+        if tag == _FLOAT_TAG:
+            assert self._floats is not None
+            return self._floats[payload]
+        if tag == _STRING_TAG:
+            assert self._strings is not None
+            return self._strings[payload]
+        if tag == _OBJECT_TAG:
+            assert self._objects is not None
+            return self._objects[payload]
+
+        assert False, tag  # pragma: no cover
+
+    # ----------------------------------------------------------------------
+    def _DecodeDateTime(
+        self,
+        index: int,
+    ) -> datetime:
+        tz = _timezones.values[self._timezone_codes[index]]
+        delta = timedelta(microseconds=self._timestamps[index])
+
+        if tz is None:
+            return _NAIVE_EPOCH + delta
+
+        return (_AWARE_EPOCH + delta).astimezone(tz)
+
+
+# ----------------------------------------------------------------------
+class ChangeView(object):
+    """A WorkItemChange-like view of a change in a ChangeLog; values are decoded when they are accessed"""
+
+    __slots__ = ("_log", "_index")
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        log: ChangeLog,
+        index: int,
+    ):
+        self._log                           = log
+        self._index                         = index
+
+    # ----------------------------------------------------------------------
+    @property
+    def dt(self) -> datetime:
+        return self._log._DecodeDateTime(self._index)  # pylint: disable=protected-access
+
+    @property
+    def field(self) -> str:
+        return _field_names.values[self._log._field_codes[self._index]]  # pylint: disable=protected-access
+
+    @property
+    def new_value(self) -> Any:
+        return self._log._DecodeValue(self._log._new_value_codes[self._index])  # pylint: disable=protected-access
+
+    @property
+    def old_value(self) -> Any:
+        return self._log._DecodeValue(self._log._old_value_codes[self._index])  # pylint: disable=protected-access
+
+    # ----------------------------------------------------------------------
+    def __lt__(
+        self,
+        other: ChangeLike,
+    ) -> bool:
+        return self.dt < other.dt
+
+    # ----------------------------------------------------------------------
+    def __repr__(self) -> str:
+        return "ChangeView{}".format(self.ToTuple())
+
+    # ----------------------------------------------------------------------
+    def ToTuple(self) -> tuple[datetime, str, Any, Any]:
+        return self.dt, self.field, self.new_value, self.old_value
+
+    # ----------------------------------------------------------------------
+    def ToWorkItemChange(self) -> WorkItemChange:
+        return WorkItemChange(*self.ToTuple())
+
+
+# ----------------------------------------------------------------------
+class ChangeLogNormalizer(object):
+    """\
+    Creates ChangeLogs that only contain the changes that affect consumers:
+
+        - Changes to fields that consumers don't read are removed (when `field_names` is provided)
+        - Changes made to a field on the same day are collapsed into a single change, where the new value
+          is the last value of the day and the old value is the value before the first change of the day
+        - Changes (including collapsed changes) whose new value is the old value are removed
+
+    Consumers that only read the value of a field at the end of each day (like GenerateEvents) see the
+    same values, but no longer see entries for days on which the values didn't change.
+
+    Counts are accumulated for all of the logs created, which may be created on multiple threads. The
+    serialized size of the changes is only accumulated when `measure_sizes` is True, as serializing each
+    change costs more than normalizing it.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        field_names: Optional[Iterable[str]]=None,
+        *,
+        measure_sizes: bool=False,
+    ):
+        self.field_names: Optional[frozenset[str]]      = None if field_names is None else frozenset(field_names)
+        self.measure_sizes                  = measure_sizes
+
+        self.num_logs                       = 0
+        self.num_changes                    = 0
+        self.num_unread_changes             = 0         # Removed, as the field isn't read by consumers
+        self.num_collapsed_changes          = 0         # Removed, as a later change to the field was made on the same day
+        self.num_unchanged_changes          = 0         # Removed, as the new value is the old value
+
+        self.num_bytes                      = 0         # Serialized size of the extracted changes (when measured)
+        self.num_normalized_bytes           = 0         # Serialized size of the retained changes (when measured)
+
+        self._lock                          = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    @property
+    def num_normalized_changes(self) -> int:
+        return self.num_changes - self.num_unread_changes - self.num_collapsed_changes - self.num_unchanged_changes
+
+    @property
+    def num_removed_bytes(self) -> int:
+        return self.num_bytes - self.num_normalized_bytes
+
+    # ----------------------------------------------------------------------
+    def Normalize(
+        self,
+        changes: Iterable[ChangeLike],
+    ) -> ChangeLog:
+        # Imported here, as Serialization imports this module
+        from .Serialization import ToJsonString  # pylint: disable=import-outside-toplevel
+
+        num_changes = 0
+        num_unread_changes = 0
+        num_collapsed_changes = 0
+        num_unchanged_changes = 0
+        num_bytes = 0
+        num_normalized_bytes = 0
+
+        measure_sizes = self.measure_sizes
+
+        # [first dt, last dt, new_value, old_value] for each field and day (in the order first encountered)
+        days: dict[tuple[str, date], list[Any]] = {}
+
+        for change in changes:
+            num_changes += 1
+
+            if measure_sizes:
+                num_bytes += len(ToJsonString(WorkItemChange(change.dt, change.field, change.new_value, change.old_value)))
+
+            if self.field_names is not None and change.field not in self.field_names:
+                num_unread_changes += 1
+                continue
+
+            dt = change.dt
+            key = (change.field, dt.date())
+
+            day = days.get(key, None)
+            if day is None:
+                days[key] = [dt, dt, change.new_value, change.old_value]
+                continue
+
+            num_collapsed_changes += 1
+
+            # Changes are usually ordered by time, but that isn't required
+            if dt >= day[1]:
+                day[1] = dt
+                day[2] = change.new_value
+
+            if dt < day[0]:
+                day[0] = dt
+                day[3] = change.old_value
+
+        result = ChangeLog()
+
+        for (field_name, _), (_, dt, new_value, old_value) in days.items():
+            if new_value == old_value:
+                num_unchanged_changes += 1
+                continue
+
+            change = WorkItemChange(dt, field_name, new_value, old_value)
+
+            if measure_sizes:
+                num_normalized_bytes += len(ToJsonString(change))
+
+            result.Append(change)
+
+        result.Sort()
+
+        with self._lock:
+            self.num_logs += 1
+            self.num_changes += num_changes
+            self.num_unread_changes += num_unread_changes
+            self.num_collapsed_changes += num_collapsed_changes
+            self.num_unchanged_changes += num_unchanged_changes
+            self.num_bytes += num_bytes
+            self.num_normalized_bytes += num_normalized_bytes
+
+        return result
+
+    # ----------------------------------------------------------------------
+    def WriteSummary(
+        self,
+        dm: DoneManager,
+    ) -> None:
+        # ----------------------------------------------------------------------
+        def Percentage(
+            value: int,
+            total: int,
+        ) -> str:
+            return "{:.1f}%".format(value * 100 / total if total else 0.0)
+
+        # ----------------------------------------------------------------------
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+
+                Normalized changes:
+
+                    {}
+
+                """,
+            ).format(
+                TextwrapEx.Indent(
+                    TextwrapEx.CreateTable(
+                        ["Changes", "Count", "Percentage"],
+                        [
+                            ["Extracted ({} work items)".format(self.num_logs), str(self.num_changes), Percentage(self.num_changes, self.num_changes)],
+                            ["Fields not read", str(self.num_unread_changes), Percentage(self.num_unread_changes, self.num_changes)],
+                            ["Collapsed (same day)", str(self.num_collapsed_changes), Percentage(self.num_collapsed_changes, self.num_changes)],
+                            ["Unchanged values", str(self.num_unchanged_changes), Percentage(self.num_unchanged_changes, self.num_changes)],
+                            ["Retained", str(self.num_normalized_changes), Percentage(self.num_normalized_changes, self.num_changes)],
+                        ],
+                    ),
+                    4,
+                    skip_first_line=True,
+                ),
+            ),
+        )
+
+        if not self.measure_sizes:
+            return
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+                Serialized size of the changes:
+
+                    {}
+
+                """,
+            ).format(
+                TextwrapEx.Indent(
+                    TextwrapEx.CreateTable(
+                        ["Changes", "Bytes", "Percentage"],
+                        [
+                            ["Extracted", str(self.num_bytes), Percentage(self.num_bytes, self.num_bytes)],
+                            ["Removed", str(self.num_removed_bytes), Percentage(self.num_removed_bytes, self.num_bytes)],
+                            ["Retained", str(self.num_normalized_bytes), Percentage(self.num_normalized_bytes, self.num_bytes)],
+                        ],
+                    ),
+                    4,
+                    skip_first_line=True,
+                ),
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+class _InternTable(object):
+    """Assigns codes to values; shared by all logs, as the number of unique fields, time zones, and enum members is small"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        initial_values: Iterable[Any]=(),
+    ):
+        self.values: list[Any]              = []
+
+        self._codes: dict[Any, int]         = {}
+        self._lock                          = threading.Lock()
+
+        for value in initial_values:
+            self.GetCode(value)
+
+    # ----------------------------------------------------------------------
+    def GetCodeIfExists(
+        self,
+        value: Any,
+    ) -> Optional[int]:
+        return self._codes.get(value, None)
+
+    # ----------------------------------------------------------------------
+    def GetCode(
+        self,
+        value: Any,
+    ) -> int:
+        code = self._codes.get(value, None)
+        if code is not None:
+            return code
+
+        with self._lock:
+            code = self._codes.get(value, None)
+            if code is None:
+                code = len(self.values)
+
+                # Append the value before publishing the code so that readers never see a code without a value
+                self.values.append(value)
+                self._codes[value] = code
+
+        return code
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_TAG_BITS                                   = 3
+_TAG_MASK                                   = (1 << _TAG_BITS) - 1
+
+_NONE_TAG                                   = 0
+_INT_TAG                                    = 1
+_ENUM_TAG                                   = 2
+_FLOAT_TAG                                  = 3
+_STRING_TAG                                 = 4
+_OBJECT_TAG                                 = 5
+
+_MAX_INLINE_INT                             = (1 << (63 - _TAG_BITS)) - 1
+_MIN_INLINE_INT                             = -(1 << (63 - _TAG_BITS))
+
+_NAIVE_EPOCH                                = datetime(1970, 1, 1)
+_AWARE_EPOCH                                = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND                            = timedelta(microseconds=1)
+
+_field_names                                = _InternTable()
+_timezones                                  = _InternTable([None])  # Code 0 is used for naive datetimes
+_enum_members                               = _InternTable()
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _EncodeDateTime(
+    dt: datetime,
+) -> tuple[int, int]:
+    """Returns the number of microseconds since the epoch and the code of the datetime's time zone"""
+
+    tz: Optional[tzinfo] = dt.tzinfo
+
+    if tz is None:
+        return (dt - _NAIVE_EPOCH) // _ONE_MICROSECOND, 0
+
+    return (dt - _AWARE_EPOCH) // _ONE_MICROSECOND, _timezones.GetCode(tz)
@@ -0,0 +1,214 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoalescingPlugin.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-09 08:44:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the CoalescingPlugin object"""
+
+import threading
+
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generator, Iterable, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation.Types import overridemethod
+
+from .Plugin import Plugin
+from .WorkItem import WorkItem, WorkItemChange
+
+
+# ----------------------------------------------------------------------
+@dataclass
+class CoalescingCounters(object):
+    """Counts for a single Plugin method"""
+
+    # ----------------------------------------------------------------------
+    calls: int                              = 0
+    fetches: int                            = 0     # Calls that were forwarded to the plugin
+    waits: int                              = 0     # Calls that waited on an in-flight fetch
+
+    # ----------------------------------------------------------------------
+    @property
+    def avoided(self) -> int:
+        return self.calls - self.fetches
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class CoalescingPlugin(Plugin):
+    """\
+    Wraps a Plugin so that work items, changes, and children are fetched once per run, no matter how many
+    times (or from how many threads) they are requested; concurrent requests for the same id wait on the
+    single in-flight fetch.
+    """
+
+    # ----------------------------------------------------------------------
+    plugin: Plugin
+
+    # When False, results are only shared with requests made while the fetch is in flight; this bounds
+    # memory when results are streamed, at the cost of fetching items requested at different times again.
+    retain_results: bool
+
+    counters: dict[str, CoalescingCounters] = field(init=False, default_factory=dict)
+
+    _lock: threading.Lock                   = field(init=False, default_factory=threading.Lock)
+    _futures: dict[tuple[str, str], Future] = field(init=False, default_factory=dict)
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Create(
+        cls,
+        plugin: Plugin,
+        *,
+        retain_results: bool=True,
+    ) -> "CoalescingPlugin":
+        return cls(
+            plugin.name,
+            plugin.epic_size_field_name,
+            plugin.feature_size_field_name,
+            plugin.state_field_name,
+            plugin,
+            retain_results,
+        )
+
+    # ----------------------------------------------------------------------
+    def __post_init__(self):
+        for method_name in ["EnumChildren", "GetWorkItem", "GetWorkItemChanges", ]:
+            self.counters[method_name] = CoalescingCounters()
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def Initialize(
+        self,
+        verbose_dm: DoneManager,
+        url: str,
+        username: str,
+        api_token: str,
+        **kwargs,
+    ) -> None:
+        self.plugin.Initialize(verbose_dm, url, username, api_token, **kwargs)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRootWorkItems(self, **kwargs) -> Iterable[str]:
+        return self.plugin.GetRootWorkItems(**kwargs)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def EnumChildren(
+        self,
+        root_id: str,
+        **kwargs,
+    ) -> Generator[str, None, None]:
+        if kwargs:
+            yield from self.plugin.EnumChildren(root_id, **kwargs)
+            return
+
+        yield from self._GetOrFetch(
+            "EnumChildren",
+            root_id,
+            lambda: list(self.plugin.EnumChildren(root_id)),
+        )
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItem(
+        self,
+        work_item_id: str,
+        **kwargs,
+    ) -> Optional[WorkItem]:
+        if kwargs:
+            return self.plugin.GetWorkItem(work_item_id, **kwargs)
+
+        return self._GetOrFetch(
+            "GetWorkItem",
+            work_item_id,
+            lambda: self.plugin.GetWorkItem(work_item_id),
+        )
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        **kwargs,
+    ) -> Generator[WorkItemChange, None, None]:
+        if kwargs:
+            yield from self.plugin.GetWorkItemChanges(work_item, **kwargs)
+            return
+
+        yield from self._GetOrFetch(
+            "GetWorkItemChanges",
+            work_item.work_item_id,
+            lambda: list(self.plugin.GetWorkItemChanges(work_item)),
+        )
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRevisionCounts(
+        self,
+        work_item_ids: list[str],
+        **kwargs,
+    ) -> dict[str, Optional[int]]:
+        return self.plugin.GetRevisionCounts(work_item_ids, **kwargs)
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _GetOrFetch(
+        self,
+        method_name: str,
+        work_item_id: str,
+        fetch_func: Callable[[], Any],
+    ) -> Any:
+        key = (method_name, work_item_id)
+        counters = self.counters[method_name]
+
+        with self._lock:
+            counters.calls += 1
+
+            future = self._futures.get(key, None)
+            if future is None:
+                future = Future()
+                self._futures[key] = future
+
+                counters.fetches += 1
+                is_owner = True
+            else:
+                if not future.done():
+                    counters.waits += 1
+
+                is_owner = False
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = fetch_func()
+        except Exception as ex:
+            # Don't cache errors; waiters receive this exception, but subsequent requests will try again
+            with self._lock:
+                del self._futures[key]
+
+            future.set_exception(ex)
+            raise
+
+        if not self.retain_results:
+            with self._lock:
+                del self._futures[key]
+
+        future.set_result(result)
+        return result
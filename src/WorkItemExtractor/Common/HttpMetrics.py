@@ -0,0 +1,239 @@
+# ----------------------------------------------------------------------
+# |
+# |  HttpMetrics.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-15 10:12:41
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the HttpMetrics object, which collects per-endpoint (and per-root) information about http requests made by plugins"""
+
+import bisect
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKET_BOUNDS_MS                    = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, ]
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass
+class EndpointMetrics(object):
+    """Metrics for requests made to a single endpoint"""
+
+    # ----------------------------------------------------------------------
+    calls: int                              = 0
+    errors: int                             = 0     # Requests that failed after all retries
+    total_seconds: float                    = 0.0   # Includes time spent retrying
+    bytes_received: int                     = 0     # Bytes read from the network (compressed bytes when compression is used)
+    retries: int                            = 0
+    status_429s: int                        = 0
+    throttled_seconds: float                = 0.0   # Time spent waiting after 429 responses
+    latency_buckets: list[int]              = field(default_factory=lambda: [0] * (len(LATENCY_BUCKET_BOUNDS_MS) + 1))
+
+    # ----------------------------------------------------------------------
+    def ToJson(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_ms": (self.total_seconds / self.calls * 1000) if self.calls else 0.0,
+            "bytes_received": self.bytes_received,
+            "mean_bytes": (self.bytes_received / self.calls) if self.calls else 0.0,
+            "retries": self.retries,
+            "status_429s": self.status_429s,
+            "throttled_seconds": self.throttled_seconds,
+            "latency_histogram_ms": {
+                ("<= {}".format(bound) if bound is not None else "> {}".format(LATENCY_BUCKET_BOUNDS_MS[-1])): count
+                for bound, count in zip([*LATENCY_BUCKET_BOUNDS_MS, None], self.latency_buckets)
+            },
+        }
+
+
+# ----------------------------------------------------------------------
+@dataclass
+class RequestInfo(object):
+    """Information about a single request that is populated while the request is in flight"""
+
+    # ----------------------------------------------------------------------
+    endpoint: str
+    root_id: Optional[str]
+
+    bytes_received: int                     = 0
+    retries: int                            = 0
+    status_429s: int                        = 0
+    throttled_seconds: float                = 0.0
+    succeeded: bool                         = False
+
+
+# ----------------------------------------------------------------------
+class HttpMetrics(object):
+    """\
+    Collects metrics for http requests. Plugins wrap each request in `YieldRequest` and report retries
+    (which happen within the request) via `OnRetry`; requests are attributed to the root active on the
+    calling thread (see `YieldRootScope`).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self._lock                          = threading.Lock()
+
+        self._endpoints: dict[str, EndpointMetrics]                 = {}
+        self._roots: dict[str, dict[str, EndpointMetrics]]          = {}
+
+        self._start                         = time.perf_counter()
+
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def YieldRequest(
+        self,
+        endpoint: str,
+    ) -> Iterator[RequestInfo]:
+        request_info = RequestInfo(endpoint, GetRootId())
+
+        prev_request_info = getattr(_thread_data, "request_info", None)
+        _thread_data.request_info = request_info
+
+        start = time.perf_counter()
+
+        try:
+            yield request_info
+        finally:
+            seconds = time.perf_counter() - start
+            _thread_data.request_info = prev_request_info
+
+            self._Record(request_info, seconds)
+
+    # ----------------------------------------------------------------------
+    def OnRetry(
+        self,
+        status_code: Optional[int],
+        sleep_seconds: float,
+    ) -> None:
+        """Called before a request is retried (on the thread making the request)"""
+
+        # This is an instance method so that the thread data of the instance's module is used; plugins
+        # and the command line may import this module via different names.
+
+        request_info = getattr(_thread_data, "request_info", None)
+        if request_info is None:
+            return
+
+        request_info.retries += 1
+
+        if status_code == 429:
+            request_info.status_429s += 1
+            request_info.throttled_seconds += sleep_seconds
+
+    # ----------------------------------------------------------------------
+    def ToJson(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "elapsed_seconds": time.perf_counter() - self._start,
+                "latency_bucket_bounds_ms": LATENCY_BUCKET_BOUNDS_MS,
+                "endpoints": {
+                    endpoint: metrics.ToJson()
+                    for endpoint, metrics in sorted(self._endpoints.items())
+                },
+                # Most expensive roots first
+                "roots": {
+                    root_id: {
+                        "total_seconds": sum(metrics.total_seconds for metrics in endpoints.values()),
+                        "endpoints": {
+                            endpoint: metrics.ToJson()
+                            for endpoint, metrics in sorted(endpoints.items())
+                        },
+                    }
+                    for root_id, endpoints in sorted(
+                        self._roots.items(),
+                        key=lambda item: sum(metrics.total_seconds for metrics in item[1].values()),
+                        reverse=True,
+                    )
+                },
+            }
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _Record(
+        self,
+        request_info: RequestInfo,
+        seconds: float,
+    ) -> None:
+        bucket_index = bisect.bisect_left(LATENCY_BUCKET_BOUNDS_MS, seconds * 1000)
+
+        with self._lock:
+            all_metrics = [self._endpoints.setdefault(request_info.endpoint, EndpointMetrics())]
+
+            if request_info.root_id is not None:
+                all_metrics.append(
+                    self._roots.setdefault(request_info.root_id, {}).setdefault(request_info.endpoint, EndpointMetrics()),
+                )
+
+            for metrics in all_metrics:
+                metrics.calls += 1
+                metrics.total_seconds += seconds
+                metrics.bytes_received += request_info.bytes_received
+                metrics.retries += request_info.retries
+                metrics.status_429s += request_info.status_429s
+                metrics.throttled_seconds += request_info.throttled_seconds
+                metrics.latency_buckets[bucket_index] += 1
+
+                if not request_info.succeeded:
+                    metrics.errors += 1
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldRootScope(
+    root_id: str,
+) -> Iterator[None]:
+    """Attributes requests made on this thread to the root work item"""
+
+    prev_root_id = getattr(_thread_data, "root_id", None)
+    _thread_data.root_id = root_id
+
+    try:
+        yield
+    finally:
+        _thread_data.root_id = prev_root_id
+
+
+# ----------------------------------------------------------------------
+def GetRootId() -> Optional[str]:
+    return getattr(_thread_data, "root_id", None)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_thread_data                                = threading.local()
@@ -17,11 +17,11 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Generator, Optional
+from typing import Any, ClassVar, Generator, Iterable, Optional
 
 from Common_Foundation.Streams.DoneManager import DoneManager
 
-from .WorkItem import WorkItem, WorkItemChange
+from .WorkItem import WorkItem, WorkItemChange, WorkItemNotification
 
 
 # ----------------------------------------------------------------------
@@ -36,6 +36,16 @@ class Plugin(ABC):
     feature_size_field_name: str
     state_field_name: str
 
+    # Update this value when a change to a plugin alters the information that it produces; cached
+    # information produced by a different version of the plugin will not be reused.
+    version: ClassVar[str]                  = "1.0.0"
+
+    # True if the plugin implements `GetRevisionCounts`
+    supports_revision_counts: ClassVar[bool] = False
+
+    # True if the plugin implements `ParseNotification`
+    supports_notifications: ClassVar[bool]  = False
+
     # ----------------------------------------------------------------------
     @abstractmethod
     def Initialize(
@@ -51,8 +61,8 @@ class Plugin(ABC):
 
     # ----------------------------------------------------------------------
     @abstractmethod
-    def GetRootWorkItems(self, **kwargs) -> list[str]:
-        """Returns a list of items that serve as the root of hierarchies that should be queried for changes over time."""
+    def GetRootWorkItems(self, **kwargs) -> Iterable[str]:
+        """Returns the items that serve as the root of hierarchies that should be queried for changes over time (the items may be generated as they are retrieved)."""
         raise Exception("Abstract method")  # pragma: no cover
 
     # ----------------------------------------------------------------------
@@ -84,3 +94,29 @@ class Plugin(ABC):
     ) -> Generator[WorkItemChange, None, None]:
         """Generates changes to the work item, ordered from most-recent to least-recent"""
         raise Exception("Abstract method")  # pragma: no cover
+
+    # ----------------------------------------------------------------------
+    def GetRevisionCounts(
+        self,
+        work_item_ids: list[str],
+        **kwargs,
+    ) -> dict[str, Optional[int]]:
+        """\
+        Returns the number of revisions of each work item without retrieving its history (None for work
+        items whose changes are not extracted); used to estimate the cost of an extraction and to detect
+        work items that have changed since they were extracted.
+        """
+        raise Exception("The '{}' plugin does not support revision counts.".format(self.name))
+
+    # ----------------------------------------------------------------------
+    def ParseNotification(
+        self,
+        payload: dict[str, Any],
+        **kwargs,
+    ) -> Optional[WorkItemNotification]:
+        """\
+        Returns the changes described by a notification (for example, a webhook payload) sent by the project
+        management tool when a work item is created or updated; returns None for notifications that don't
+        describe changes to a work item.
+        """
+        raise Exception("The '{}' plugin does not support notifications.".format(self.name))
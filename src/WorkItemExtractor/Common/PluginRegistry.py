@@ -0,0 +1,182 @@
+# ----------------------------------------------------------------------
+# |
+# |  PluginRegistry.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-07 10:21:03
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the PluginRegistry object"""
+
+import ast
+import importlib
+import sys
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast, Optional
+
+from Common_Foundation.ContextlibEx import ExitStack
+
+from .Plugin import Plugin
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class PluginInfo(object):
+    """Information about a plugin that is available without importing the plugin's module"""
+
+    # ----------------------------------------------------------------------
+    name: str
+    description: str
+    filename: Path
+
+
+# ----------------------------------------------------------------------
+class PluginRegistry(object):
+    """\
+    Discovers plugins within a directory without importing them; a plugin's module is imported
+    (along with its dependencies) only when the plugin is loaded.
+    """
+
+    # ----------------------------------------------------------------------
+    POTENTIAL_PLUGIN_CLASS_NAMES            = ["Plugin", ]
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        plugin_dir: Path,
+        root_dir: Path,
+    ):
+        infos: dict[str, PluginInfo] = {}
+
+        for filename in sorted(plugin_dir.iterdir()):
+            if filename.suffix != ".py":
+                continue
+
+            if not filename.stem.endswith("Plugin"):
+                continue
+
+            info = self.__class__._ExtractInfo(filename)
+            if info is None:
+                # The info couldn't be determined statically, so import the module to get it
+                plugin = self.__class__._ImportPlugin(filename, root_dir)
+
+                info = PluginInfo(plugin.name, plugin.__doc__ or "", filename)
+
+            prev_info = infos.get(info.name, None)
+            if prev_info is not None:
+                raise Exception(
+                    "The plugin '{}', defined in '{}', was already defined in '{}'.".format(
+                        info.name,
+                        filename,
+                        prev_info.filename,
+                    ),
+                )
+
+            infos[info.name] = info
+
+        if not infos:
+            raise Exception("No plugins were found in '{}'.".format(plugin_dir))
+
+        # If here, all plugins are valid and there weren't any conflicts
+        self.root_dir                       = root_dir
+        self.infos                          = infos
+
+        self._plugins: dict[str, Plugin]    = {}
+
+    # ----------------------------------------------------------------------
+    def Load(
+        self,
+        name: str,
+    ) -> Plugin:
+        """Imports and instantiates the plugin; subsequent calls return the same instance."""
+
+        plugin = self._plugins.get(name, None)
+        if plugin is None:
+            info = self.infos[name]
+
+            plugin = self.__class__._ImportPlugin(info.filename, self.root_dir)
+
+            if plugin.name != info.name:
+                raise Exception(
+                    "The plugin defined in '{}' was discovered as '{}' but loaded as '{}'.".format(
+                        info.filename,
+                        info.name,
+                        plugin.name,
+                    ),
+                )
+
+            self._plugins[name] = plugin
+
+        return plugin
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _ExtractInfo(
+        cls,
+        filename: Path,
+    ) -> Optional[PluginInfo]:
+        try:
+            module = ast.parse(filename.read_text(encoding="UTF-8"), str(filename))
+        except SyntaxError:
+            return None
+
+        for statement in module.body:
+            if not isinstance(statement, ast.ClassDef) or statement.name not in cls.POTENTIAL_PLUGIN_CLASS_NAMES:
+                continue
+
+            for class_statement in statement.body:
+                if isinstance(class_statement, ast.AnnAssign):
+                    targets = [class_statement.target, ]
+                elif isinstance(class_statement, ast.Assign):
+                    targets = class_statement.targets
+                else:
+                    continue
+
+                if not any(isinstance(target, ast.Name) and target.id == "name" for target in targets):
+                    continue
+
+                if not isinstance(class_statement.value, ast.Constant) or not isinstance(class_statement.value.value, str):
+                    return None
+
+                return PluginInfo(
+                    class_statement.value.value,
+                    ast.get_docstring(statement) or "",
+                    filename,
+                )
+
+        return None
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def _ImportPlugin(
+        cls,
+        filename: Path,
+        root_dir: Path,
+    ) -> Plugin:
+        sys.path.insert(0, str(root_dir))
+        with ExitStack(lambda: sys.path.pop(0)):
+            sys.path.insert(0, str(filename.parent))
+            with ExitStack(lambda: sys.path.pop(0)):
+                mod = importlib.import_module(filename.stem)
+
+        for potential_plugin_name in cls.POTENTIAL_PLUGIN_CLASS_NAMES:
+            potential_plugin = getattr(mod, potential_plugin_name, None)
+            if potential_plugin is None:
+                continue
+
+            return cast(Plugin, potential_plugin())
+
+        raise Exception("A plugin was not found in '{}'.".format(filename))
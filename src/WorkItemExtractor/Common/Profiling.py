@@ -0,0 +1,345 @@
+# ----------------------------------------------------------------------
+# |
+# |  Profiling.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-16 09:37:15
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to profile (time, cpu, and memory) the stages of a command"""
+
+import cProfile
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation import TextwrapEx
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class StageInfo(object):
+    name: str
+    seconds: float
+    cpu_seconds: float                      # Process-wide cpu time (all threads)
+    peak_bytes: int                         # Peak memory allocated (as measured by tracemalloc) during the stage
+    pstats_filename: Path
+
+
+# ----------------------------------------------------------------------
+class StageProfiler(object):
+    """\
+    Profiles stages with cProfile (for the thread executing the stage and any threads that it starts),
+    tracemalloc, and a sampler that records the call stacks of all threads. Stages nested within a stage
+    that is being profiled are included in that stage's results.
+
+    Output:
+        <output_dir>/<index>-<stage>.pstats     cProfile statistics for each stage
+        <output_dir>/stacks.collapsed           Sampled call stacks in the collapsed format used by flame graph tools
+        <output_dir>/summary.json               Time and memory for each stage
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        output_dir: Path,
+        *,
+        sampling_interval: float=0.005,
+    ):
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.output_dir                     = output_dir
+        self.sampling_interval              = sampling_interval
+
+        self.stages: list[StageInfo]        = []
+
+        self._lock                          = threading.Lock()
+        self._active_stage_name: Optional[str]              = None
+        self._thread_profiles: list[cProfile.Profile]       = []
+        self._stack_counts: dict[str, int]  = {}
+
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def YieldStage(
+        self,
+        name: str,
+    ) -> Iterator[None]:
+        with self._lock:
+            if self._active_stage_name is not None:
+                is_nested = True
+            else:
+                is_nested = False
+                self._active_stage_name = name
+                self._thread_profiles = []
+
+        if is_nested:
+            yield
+            return
+
+        started_tracemalloc = not tracemalloc.is_tracing()
+
+        if started_tracemalloc:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+
+        profile = cProfile.Profile()
+
+        stop_sampling_event = threading.Event()
+        sampling_thread = threading.Thread(target=lambda: self._Sample(name, stop_sampling_event), daemon=True)
+
+        sampling_thread.start()
+
+        # Threads started during the stage (for example, by ExecuteTasks) are profiled as well
+        threading.setprofile(self._OnThreadStart)
+
+        start_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+
+        profile.enable()
+
+        try:
+            yield
+        finally:
+            profile.disable()
+
+            seconds = time.perf_counter() - start_time
+            cpu_seconds = time.process_time() - start_cpu_time
+
+            threading.setprofile(None)  # type: ignore
+
+            stop_sampling_event.set()
+            sampling_thread.join()
+
+            _, peak_bytes = tracemalloc.get_traced_memory()
+
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+            with self._lock:
+                thread_profiles = self._thread_profiles
+
+                self._thread_profiles = []
+                self._active_stage_name = None
+
+            pstats_filename = self.output_dir / "{:02}-{}.pstats".format(
+                len(self.stages) + 1,
+                re.sub(r"[^A-Za-z0-9_\-]+", "_", name).strip("_"),
+            )
+
+            stats: Optional[pstats.Stats] = None
+
+            for this_profile in [profile, *thread_profiles]:
+                this_profile.create_stats()
+
+                # Stats can't be created from a profile without any calls
+                if not this_profile.stats:  # type: ignore
+                    continue
+
+                if stats is None:
+                    stats = pstats.Stats(this_profile)
+                else:
+                    stats.add(this_profile)
+
+            if stats is not None:
+                stats.dump_stats(pstats_filename)
+
+            self.stages.append(StageInfo(name, seconds, cpu_seconds, peak_bytes, pstats_filename))
+
+    # ----------------------------------------------------------------------
+    def Close(self) -> None:
+        with (self.output_dir / "stacks.collapsed").open("w", encoding="UTF-8") as f:
+            for stack, count in sorted(self._stack_counts.items()):
+                f.write("{} {}\n".format(stack, count))
+
+        with (self.output_dir / "summary.json").open("w", encoding="UTF-8") as f:
+            json.dump(
+                [
+                    {
+                        "name": stage.name,
+                        "seconds": stage.seconds,
+                        "cpu_seconds": stage.cpu_seconds,
+                        "peak_bytes": stage.peak_bytes,
+                        "pstats_filename": stage.pstats_filename.name,
+                    }
+                    for stage in self.stages
+                ],
+                f,
+                indent=2,
+            )
+
+    # ----------------------------------------------------------------------
+    def WriteSummary(
+        self,
+        dm: DoneManager,
+    ) -> None:
+        dm.WriteLine(
+            "\nProfiling results ('{}'):\n\n{}\n\n".format(
+                self.output_dir,
+                TextwrapEx.Indent(
+                    TextwrapEx.CreateTable(
+                        ["Stage", "Seconds", "CPU Seconds", "Peak MB", "Statistics"],
+                        [
+                            [
+                                stage.name,
+                                "{:.3f}".format(stage.seconds),
+                                "{:.3f}".format(stage.cpu_seconds),
+                                "{:.1f}".format(stage.peak_bytes / (1024 * 1024)),
+                                stage.pstats_filename.name,
+                            ]
+                            for stage in self.stages
+                        ],
+                    ),
+                    4,
+                ),
+            ),
+        )
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _OnThreadStart(
+        self,
+        frame: Any,  # pylint: disable=unused-argument
+        event: str,  # pylint: disable=unused-argument
+        arg: Any,  # pylint: disable=unused-argument
+    ) -> None:
+        # This function is invoked for the first event in a new thread; replace it with a profile
+        profile = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:
+            # Newer versions of python only support a single (process-wide) profiler, which is
+            # already capturing this thread.
+            sys.setprofile(None)
+            return
+
+        with self._lock:
+            self._thread_profiles.append(profile)
+
+    # ----------------------------------------------------------------------
+    def _Sample(
+        self,
+        stage_name: str,
+        stop_event: threading.Event,
+    ) -> None:
+        this_thread_id = threading.get_ident()
+        stack_counts: dict[str, int] = {}
+
+        while not stop_event.wait(self.sampling_interval):
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id == this_thread_id:
+                    continue
+
+                frames: list[str] = []
+
+                while frame is not None:
+                    frames.append(
+                        "{} ({}:{})".format(
+                            frame.f_code.co_name,
+                            Path(frame.f_code.co_filename).name,
+                            frame.f_code.co_firstlineno,
+                        ).replace(";", ":"),
+                    )
+
+                    frame = frame.f_back
+
+                frames.append(stage_name.replace(";", ":"))
+                frames.reverse()
+
+                stack = ";".join(frames)
+                stack_counts[stack] = stack_counts.get(stack, 0) + 1
+
+        with self._lock:
+            for stack, count in stack_counts.items():
+                self._stack_counts[stack] = self._stack_counts.get(stack, 0) + count
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldProfiler(
+    output_dir: Path,
+) -> Iterator[StageProfiler]:
+    """Profiles stages (see `YieldProfiledStage` and `YieldProfiledNested`) executed within the context"""
+
+    global _active_profiler  # pylint: disable=global-statement
+
+    if _active_profiler is not None:
+        raise Exception("A profiler is already active.")
+
+    profiler = StageProfiler(output_dir)
+    _active_profiler = profiler
+
+    try:
+        yield profiler
+    finally:
+        _active_profiler = None
+        profiler.Close()
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldProfiledStage(
+    name: str,
+) -> Iterator[None]:
+    """Profiles the stage if a profiler is active"""
+
+    profiler = _active_profiler
+
+    if profiler is None:
+        yield
+        return
+
+    with profiler.YieldStage(name):
+        yield
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldProfiledNested(
+    dm: DoneManager,
+    header: str,
+    *args,
+    **kwargs,
+) -> Iterator[DoneManager]:
+    """Equivalent to `dm.Nested`, where the nested section is profiled as a stage if a profiler is active"""
+
+    with dm.Nested(header, *args, **kwargs) as nested_dm:
+        with YieldProfiledStage(header.rstrip(".")):
+            yield nested_dm
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_active_profiler: Optional[StageProfiler]   = None
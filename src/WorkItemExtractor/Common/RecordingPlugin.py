@@ -0,0 +1,247 @@
+# ----------------------------------------------------------------------
+# |
+# |  RecordingPlugin.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-10 13:06:58
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the RecordingPlugin object and functionality to read and write the fixture archives that it produces"""
+
+import hashlib
+import json
+import threading
+import zipfile
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generator, Iterable, Optional
+from urllib.parse import quote
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation.Types import overridemethod
+
+from .Plugin import Plugin
+from .Serialization import ToJsonString
+from .WorkItem import WorkItem, WorkItemChange, WorkItemNotification
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+FIXTURE_FORMAT_VERSION                      = 1
+METADATA_ENTRY_NAME                         = "metadata.json"
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class RecordingPlugin(Plugin):
+    """Wraps a Plugin and saves every response to a compressed fixture archive that can be served by the Replay plugin"""
+
+    # ----------------------------------------------------------------------
+    plugin: Plugin
+    archive_filename: Path
+
+    _lock: threading.Lock                   = field(init=False, default_factory=threading.Lock)
+    _archive: zipfile.ZipFile               = field(init=False)
+    _entry_names: set[str]                  = field(init=False, default_factory=set)
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Create(
+        cls,
+        plugin: Plugin,
+        archive_filename: Path,
+    ) -> "RecordingPlugin":
+        return cls(
+            plugin.name,
+            plugin.epic_size_field_name,
+            plugin.feature_size_field_name,
+            plugin.state_field_name,
+            plugin,
+            archive_filename,
+        )
+
+    # ----------------------------------------------------------------------
+    def __post_init__(self):
+        # The wrapped plugin's capabilities are available to callers that check them before invoking methods
+        object.__setattr__(self, "supports_revision_counts", self.plugin.supports_revision_counts)
+        object.__setattr__(self, "supports_notifications", self.plugin.supports_notifications)
+
+        self.archive_filename.parent.mkdir(parents=True, exist_ok=True)
+
+        object.__setattr__(
+            self,
+            "_archive",
+            zipfile.ZipFile(self.archive_filename, "w", compression=zipfile.ZIP_DEFLATED),
+        )
+
+    # ----------------------------------------------------------------------
+    def __enter__(self) -> "RecordingPlugin":
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args) -> None:
+        self.Close()
+
+    # ----------------------------------------------------------------------
+    def Close(self) -> None:
+        with self._lock:
+            self._archive.writestr(
+                METADATA_ENTRY_NAME,
+                json.dumps(
+                    {
+                        "format_version": FIXTURE_FORMAT_VERSION,
+                        "plugin_name": self.plugin.name,
+                        "plugin_version": self.plugin.version,
+                        "epic_size_field_name": self.plugin.epic_size_field_name,
+                        "feature_size_field_name": self.plugin.feature_size_field_name,
+                        "state_field_name": self.plugin.state_field_name,
+                    },
+                ),
+            )
+
+            self._archive.close()
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def Initialize(
+        self,
+        verbose_dm: DoneManager,
+        url: str,
+        username: str,
+        api_token: str,
+        **kwargs,
+    ) -> None:
+        self.plugin.Initialize(verbose_dm, url, username, api_token, **kwargs)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRootWorkItems(self, **kwargs) -> Iterable[str]:
+        # Calculate the key before invoking the plugin, as the plugin may modify the arguments
+        entry_name = GetEntryName("GetRootWorkItems", GetRootWorkItemsKey(kwargs))
+
+        work_item_ids = self.plugin.GetRootWorkItems(**kwargs)
+
+        # ----------------------------------------------------------------------
+        def Impl() -> Generator[str, None, None]:
+            # The work items are recorded once all of them have been generated
+            result: list[str] = []
+
+            for work_item_id in work_item_ids:
+                result.append(work_item_id)
+                yield work_item_id
+
+            self._Write(entry_name, result)
+
+        # ----------------------------------------------------------------------
+
+        return Impl()
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def EnumChildren(
+        self,
+        root_id: str,
+        **kwargs,
+    ) -> Generator[str, None, None]:
+        result = list(self.plugin.EnumChildren(root_id, **kwargs))
+
+        self._Write(GetEntryName("EnumChildren", root_id), result)
+        yield from result
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItem(
+        self,
+        work_item_id: str,
+        **kwargs,
+    ) -> Optional[WorkItem]:
+        result = self.plugin.GetWorkItem(work_item_id, **kwargs)
+
+        self._Write(GetEntryName("GetWorkItem", work_item_id), result)
+        return result
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        **kwargs,
+    ) -> Generator[WorkItemChange, None, None]:
+        result = list(self.plugin.GetWorkItemChanges(work_item, **kwargs))
+
+        self._Write(GetEntryName("GetWorkItemChanges", work_item.work_item_id), result)
+        yield from result
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRevisionCounts(
+        self,
+        work_item_ids: list[str],
+        **kwargs,
+    ) -> dict[str, Optional[int]]:
+        # Revision counts are only used to estimate costs, so they aren't recorded
+        return self.plugin.GetRevisionCounts(work_item_ids, **kwargs)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def ParseNotification(
+        self,
+        payload: dict[str, Any],
+        **kwargs,
+    ) -> Optional[WorkItemNotification]:
+        # Notifications are received rather than requested, so they aren't recorded
+        return self.plugin.ParseNotification(payload, **kwargs)
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _Write(
+        self,
+        entry_name: str,
+        content: Any,
+    ) -> None:
+        content_str = ToJsonString(content)
+
+        with self._lock:
+            # The same item may be requested multiple times; only the first response is recorded
+            if entry_name in self._entry_names:
+                return
+
+            self._archive.writestr(entry_name, content_str)
+            self._entry_names.add(entry_name)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def GetEntryName(
+    method_name: str,
+    key: str,
+) -> str:
+    return "{}/{}.json".format(method_name, quote(key, safe=""))
+
+
+# ----------------------------------------------------------------------
+def GetRootWorkItemsKey(
+    kwargs: dict[str, Any],
+) -> str:
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode("UTF-8")).hexdigest()
@@ -0,0 +1,165 @@
+# ----------------------------------------------------------------------
+# |
+# |  Serialization.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-08 09:03:37
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to convert objects to and from json"""
+
+import json
+
+from datetime import date, datetime
+from enum import Enum
+from functools import singledispatchmethod
+from typing import Any, Optional
+
+from .ChangeLog import ChangeLog, ChangeView
+from .WorkItem import DaysWorkItem, HoursWorkItem, State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+class JsonEncoder(json.JSONEncoder):
+    """Encodes objects produced by WorkItemExtractor"""
+
+    # ----------------------------------------------------------------------
+    @singledispatchmethod
+    def default(self, o) -> Any:
+        return o.__dict__
+
+    @default.register
+    def _(self, o: date) -> Any:
+        return o.isoformat()
+
+    @default.register
+    def _(self, o: datetime) -> Any:
+        return o.isoformat()
+
+    @default.register
+    def _(self, o: Enum) -> Any:
+        return str(o)
+
+    @default.register
+    def _(self, o: ChangeLog) -> Any:
+        return list(o)
+
+    @default.register
+    def _(self, o: ChangeView) -> Any:
+        # Encoded in the same way as a WorkItemChange
+        return {
+            "dt": o.dt,
+            "field": o.field,
+            "new_value": o.new_value,
+            "old_value": o.old_value,
+        }
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def ToJsonString(
+    content: Any,
+) -> str:
+    return json.dumps(content, cls=JsonEncoder)
+
+
+# ----------------------------------------------------------------------
+def WorkItemFromJson(
+    data: dict[str, Any],
+) -> WorkItem:
+    """Creates a WorkItem from json produced by JsonEncoder"""
+
+    # The work item type isn't serialized, but it can be inferred from the estimate attribute
+    for attribute_name, work_item_type, decode_func in [
+        ("story_points", StoryPointsWorkItem, lambda value: value),
+        ("estimate", TeeShirtWorkItem, lambda value: EnumFromJson(TeeShirtWorkItem.Size, value)),
+        ("days", DaysWorkItem, lambda value: value),
+        ("hours", HoursWorkItem, lambda value: value),
+    ]:
+        if attribute_name in data:
+            extra_args = [decode_func(data[attribute_name]), ]
+            break
+    else:
+        work_item_type = WorkItem
+        extra_args = []
+
+    return work_item_type(
+        data["work_item_id"],
+        data["title"],
+        datetime.fromisoformat(data["dt"]),
+        EnumFromJson(State, data["state"]),
+        data["type"],
+        *extra_args,
+    )
+
+
+# ----------------------------------------------------------------------
+def WorkItemChangeFromJson(
+    data: dict[str, Any],
+) -> WorkItemChange:
+    """Creates a WorkItemChange from json produced by JsonEncoder"""
+
+    field_name = data["field"]
+    new_value = data["new_value"]
+    old_value = data["old_value"]
+
+    # Values are only decoded as enums when the field is known to contain them, as other fields (for
+    # example, titles) may contain strings that look like encoded enums.
+    enum_type = _CHANGE_ENUM_TYPES.get(field_name, None)
+    if enum_type is not None:
+        new_value = EnumFromJson(enum_type, new_value)
+        old_value = EnumFromJson(enum_type, old_value)
+
+    return WorkItemChange(datetime.fromisoformat(data["dt"]), field_name, new_value, old_value)
+
+
+# ----------------------------------------------------------------------
+def EnumFromJson(
+    enum_type: type[Enum],
+    value: Any,
+) -> Any:
+    """\
+    Converts a value of `enum_type` encoded by JsonEncoder (e.g. "State.Active") back into an enum;
+    values that aren't strings (e.g. None or numeric sizes) are returned as-is.
+    """
+
+    if not isinstance(value, str):
+        return value
+
+    enum_name, sep, member_name = value.partition(".")
+
+    member: Optional[Enum] = None
+
+    if sep and enum_name == enum_type.__name__:
+        member = enum_type.__members__.get(member_name, None)
+
+    if member is None:
+        raise Exception("'{}' is not a valid '{}' value.".format(value, enum_type.__name__))
+
+    return member
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+# Changes are named after the WorkItem attribute that they modify
+_CHANGE_ENUM_TYPES: dict[str, type[Enum]]   = {
+    "state": State,
+    "estimate": TeeShirtWorkItem.Size,
+}
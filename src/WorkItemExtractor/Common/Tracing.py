@@ -0,0 +1,309 @@
+# ----------------------------------------------------------------------
+# |
+# |  Tracing.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-17 10:05:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to record spans during a run and export them as Chrome trace events or OTLP-JSON"""
+
+import json
+import os
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+class TraceFormat(str, Enum):
+    Chrome                                  = "chrome"      # Viewable with chrome://tracing, edge://tracing, or https://ui.perfetto.dev
+    Otlp                                    = "otlp"        # OpenTelemetry protocol (JSON encoding)
+
+
+# ----------------------------------------------------------------------
+@dataclass
+class Span(object):
+    name: str
+    span_id: int
+    parent_span_id: Optional[int]
+
+    thread_id: int
+    thread_name: str
+
+    start_ns: int
+    end_ns: Optional[int]                   = None
+
+    attributes: dict[str, Any]              = field(default_factory=dict)
+    error: Optional[str]                    = None
+
+    # ----------------------------------------------------------------------
+    def SetAttribute(
+        self,
+        name: str,
+        value: Any,
+    ) -> None:
+        self.attributes[name] = value
+
+
+# ----------------------------------------------------------------------
+class Tracer(object):
+    """\
+    Records spans; a span's parent is the innermost span open on the same thread or, if none exists,
+    the first span recorded (which represents the run as a whole).
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(self):
+        self.trace_id                       = random.getrandbits(128)
+
+        self._lock                          = threading.Lock()
+        self._thread_data                   = threading.local()
+
+        self._root_span: Optional[Span]     = None
+        self._spans: list[Span]             = []
+
+    # ----------------------------------------------------------------------
+    @contextmanager
+    def YieldSpan(
+        self,
+        name: str,
+        **attributes: Any,
+    ) -> Iterator[Span]:
+        stack: list[Span] = self._thread_data.__dict__.setdefault("stack", [])
+
+        current_thread = threading.current_thread()
+
+        span = Span(
+            name,
+            random.getrandbits(64),
+            stack[-1].span_id if stack else (self._root_span.span_id if self._root_span is not None else None),
+            current_thread.ident or 0,
+            current_thread.name,
+            time.time_ns(),
+            attributes=attributes,
+        )
+
+        with self._lock:
+            if self._root_span is None:
+                self._root_span = span
+
+        stack.append(span)
+
+        try:
+            yield span
+        except Exception as ex:
+            span.error = str(ex)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            stack.pop()
+
+            with self._lock:
+                self._spans.append(span)
+
+    # ----------------------------------------------------------------------
+    def Save(
+        self,
+        filename: Path,
+        trace_format: TraceFormat,
+    ) -> None:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span.start_ns)
+
+        if trace_format == TraceFormat.Chrome:
+            content = self.__class__._ToChromeTrace(spans)
+        elif trace_format == TraceFormat.Otlp:
+            content = self._ToOtlp(spans)
+        else:
+            assert False, trace_format  # pragma: no cover
+
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        with filename.open("w", encoding="UTF-8") as f:
+            json.dump(content, f)
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _ToChromeTrace(
+        spans: list[Span],
+    ) -> dict[str, Any]:
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+
+        thread_names: dict[int, str] = {}
+
+        for span in spans:
+            thread_names.setdefault(span.thread_id, span.thread_name)
+
+            args = dict(span.attributes)
+
+            if span.error is not None:
+                args["error"] = span.error
+
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "WorkItemExtractor",
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": ((span.end_ns or span.start_ns) - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": args,
+                },
+            )
+
+        for thread_id, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                },
+            )
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+        }
+
+    # ----------------------------------------------------------------------
+    def _ToOtlp(
+        self,
+        spans: list[Span],
+    ) -> dict[str, Any]:
+        # ----------------------------------------------------------------------
+        def ToAttributes(
+            attributes: dict[str, Any],
+        ) -> list[dict[str, Any]]:
+            results: list[dict[str, Any]] = []
+
+            for key, value in attributes.items():
+                if isinstance(value, bool):
+                    value = {"boolValue": value}
+                elif isinstance(value, int):
+                    value = {"intValue": str(value)}
+                elif isinstance(value, float):
+                    value = {"doubleValue": value}
+                else:
+                    value = {"stringValue": str(value)}
+
+                results.append({"key": key, "value": value})
+
+            return results
+
+        # ----------------------------------------------------------------------
+
+        trace_id = "{:032x}".format(self.trace_id)
+
+        otlp_spans: list[dict[str, Any]] = []
+
+        for span in spans:
+            otlp_span: dict[str, Any] = {
+                "traceId": trace_id,
+                "spanId": "{:016x}".format(span.span_id),
+                "name": span.name,
+                "kind": 1,                  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": ToAttributes({**span.attributes, "thread.id": span.thread_id, "thread.name": span.thread_name}),
+                "status": {"code": 1} if span.error is None else {"code": 2, "message": span.error},
+            }
+
+            if span.parent_span_id is not None:
+                otlp_span["parentSpanId"] = "{:016x}".format(span.parent_span_id)
+
+            otlp_spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": ToAttributes({"service.name": "WorkItemExtractor"}),
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "WorkItemExtractor"},
+                            "spans": otlp_spans,
+                        },
+                    ],
+                },
+            ],
+        }
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldTracer(
+    tracer: Tracer,
+    name: str,
+    **attributes: Any,
+) -> Iterator[Span]:
+    """Activates the tracer (see `YieldSpan`) and records a span that represents the run as a whole"""
+
+    global _active_tracer  # pylint: disable=global-statement
+
+    if _active_tracer is not None:
+        raise Exception("A tracer is already active.")
+
+    _active_tracer = tracer
+
+    try:
+        with tracer.YieldSpan(name, **attributes) as span:
+            yield span
+    finally:
+        _active_tracer = None
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def YieldSpan(
+    name: str,
+    **attributes: Any,
+) -> Iterator[Optional[Span]]:
+    """Records a span with the active tracer (if any)"""
+
+    tracer = _active_tracer
+
+    if tracer is None:
+        yield None
+        return
+
+    with tracer.YieldSpan(name, **attributes) as span:
+        yield span
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_active_tracer: Optional[Tracer]            = None
@@ -171,6 +171,22 @@ class WorkItemChange(object):
         return self.dt < other.dt
 
 
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class WorkItemNotification(object):
+    """The changes made to a work item by a single revision, as reported by a notification"""
+
+    # ----------------------------------------------------------------------
+    work_item_id: str
+    revision: int                           # Revisions are numbered sequentially, beginning at 1
+
+    parent_id: Optional[str]
+
+    # The work item after the revision (None if changes to work items of its type are not extracted)
+    work_item: Optional[WorkItem]
+    changes: list[WorkItemChange]
+
+
 # ----------------------------------------------------------------------
 # |
 # |  Public Functions
@@ -0,0 +1,364 @@
+# ----------------------------------------------------------------------
+# |
+# |  WorkItemHistoryMatrix.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-06 08:12:44
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to replay the history of many work items into items x days matrices"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+
+from .WorkItem import DaysWorkItem, HoursWorkItem, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+NO_STATE                                    = 0         # Value in `states` for days before a work item exists
+NO_TYPE                                     = -1        # Value in `types` for days before a work item exists
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class WorkItemHistoryMatrix(object):
+    """Dense items x days representation of work item histories"""
+
+    # ----------------------------------------------------------------------
+    work_item_ids: list[str]
+    type_names: list[str]
+    start_date: date
+
+    states: np.ndarray                      # int8[items, days]; State.value or NO_STATE
+    estimates: np.ndarray                   # float64[items, days]; NaN when unestimated
+    types: np.ndarray                       # int16[items, days]; index into `type_names` or NO_TYPE
+
+    # ----------------------------------------------------------------------
+    @property
+    def dates(self) -> np.ndarray:
+        return np.datetime64(self.start_date, "D") + np.arange(self.states.shape[1])
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class WorkItemHistorySparseMatrix(object):
+    """Change-point representation of work item histories; values hold until the next change point for the same row"""
+
+    # ----------------------------------------------------------------------
+    work_item_ids: list[str]
+    type_names: list[str]
+    start_date: date
+    num_days: int
+
+    rows: np.ndarray                        # int32[changes]; sorted by (row, day)
+    days: np.ndarray                        # int32[changes]
+    states: np.ndarray                      # int8[changes]
+    estimates: np.ndarray                   # float64[changes]
+    types: np.ndarray                       # int16[changes]
+
+    # ----------------------------------------------------------------------
+    def ToDense(self) -> WorkItemHistoryMatrix:
+        shape = (len(self.work_item_ids), self.num_days)
+
+        # Calculate the index of the most recent change point for every cell; cells before the first
+        # change point of a row reference the sentinel value at the end of each value column.
+        indexes = np.full(shape, -1, dtype=np.int64)
+        indexes[self.rows, self.days] = np.arange(len(self.rows))
+
+        np.maximum.accumulate(indexes, axis=1, out=indexes)
+
+        # ----------------------------------------------------------------------
+        def Expand(
+            values: np.ndarray,
+            sentinel: Any,
+        ) -> np.ndarray:
+            return np.append(values, np.array([sentinel], dtype=values.dtype))[indexes]
+
+        # ----------------------------------------------------------------------
+
+        return WorkItemHistoryMatrix(
+            self.work_item_ids,
+            self.type_names,
+            self.start_date,
+            Expand(self.states, NO_STATE),
+            Expand(self.estimates, np.nan),
+            Expand(self.types, NO_TYPE),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def GenerateDailyWorkItemHistoryMatrix(
+    items: Iterable[
+        tuple[
+            Union[str, WorkItem],
+            Iterable[WorkItemChange],
+        ],
+    ],
+    *,
+    sparse: bool=False,
+    start_date: Optional[date]=None,
+    end_date: Optional[date]=None,
+    max_workers: Optional[int]=None,
+    chunk_size: int=5000,
+    state_field_name: str="state",
+    type_field_name: str="type",
+    estimate_field_names: Optional[list[str]]=None,
+) -> Union[WorkItemHistoryMatrix, WorkItemHistorySparseMatrix]:
+    """\
+    Replays the changes of many work items into matrices with one row per work item and one column per day.
+
+    Values follow the semantics of `GenerateDailyWorkItemHistory`: the work item (when provided) acts as the
+    baseline, changes are applied in chronological order, the last change on a day wins, and values are
+    filled forward until the next change. Days before a work item's first change are NO_STATE/NaN/NO_TYPE.
+
+    Items are processed across a process pool when `max_workers` is not 1 and there is more than one chunk.
+    """
+
+    if estimate_field_names is None:
+        estimate_field_names = ["story_points", "estimate", "days", "hours", ]
+
+    all_items = [(work_item_or_id, list(changes)) for work_item_or_id, changes in items]
+
+    chunks = [
+        all_items[index:index + chunk_size]
+        for index in range(0, len(all_items), chunk_size)
+    ]
+
+    args = (state_field_name, type_field_name, estimate_field_names)
+
+    if max_workers == 1 or len(chunks) <= 1:
+        chunk_results = [_ProcessChunk(chunk, *args) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_results = list(
+                executor.map(
+                    _ProcessChunk,
+                    chunks,
+                    *[[arg] * len(chunks) for arg in args],
+                ),
+            )
+
+    # Merge the chunk results, remapping the chunk-local type codes to global type codes
+    work_item_ids: list[str] = []
+    type_names: list[str] = []
+    type_lookup: dict[str, int] = {}
+
+    rows: list[np.ndarray] = []
+    ordinals: list[np.ndarray] = []
+    states: list[np.ndarray] = []
+    estimates: list[np.ndarray] = []
+    types: list[np.ndarray] = []
+
+    for chunk_result in chunk_results:
+        remap = np.array(
+            [type_lookup.setdefault(type_name, len(type_lookup)) for type_name in chunk_result.type_names] + [NO_TYPE],
+            dtype=np.int16,
+        )
+
+        rows.append(chunk_result.rows + len(work_item_ids))
+        ordinals.append(chunk_result.ordinals)
+        states.append(chunk_result.states)
+        estimates.append(chunk_result.estimates)
+        types.append(remap[chunk_result.types])
+
+        work_item_ids += chunk_result.work_item_ids
+
+    type_names = list(type_lookup.keys())
+
+    all_rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+    all_ordinals = np.concatenate(ordinals) if ordinals else np.zeros(0, dtype=np.int32)
+
+    if start_date is None:
+        start_date = date.fromordinal(int(all_ordinals.min())) if len(all_ordinals) else date.today()
+    if end_date is None:
+        end_date = date.fromordinal(int(all_ordinals.max())) if len(all_ordinals) else start_date
+
+    if end_date < start_date:
+        raise ValueError("The end date must be greater than or equal to the start date.")
+
+    num_days = (end_date - start_date).days + 1
+
+    all_days = all_ordinals - start_date.toordinal()
+    all_states = np.concatenate(states) if states else np.zeros(0, dtype=np.int8)
+    all_estimates = np.concatenate(estimates) if estimates else np.zeros(0, dtype=np.float64)
+    all_types = np.concatenate(types) if types else np.zeros(0, dtype=np.int16)
+
+    # Changes before the start date establish the initial values on the first day; changes after the
+    # end date are dropped. Change points are sorted by (row, day) within each chunk, so the last
+    # clamped change point for a row is the one that remains in effect.
+    all_days = np.clip(all_days, 0, None)
+
+    mask = all_days < num_days
+
+    if len(mask):
+        is_last = np.ones(len(all_rows), dtype=bool)
+        is_last[:-1] = (all_rows[:-1] != all_rows[1:]) | (all_days[:-1] != all_days[1:])
+
+        mask &= is_last
+
+    result = WorkItemHistorySparseMatrix(
+        work_item_ids,
+        type_names,
+        start_date,
+        num_days,
+        all_rows[mask].astype(np.int32),
+        all_days[mask].astype(np.int32),
+        all_states[mask],
+        all_estimates[mask],
+        all_types[mask],
+    )
+
+    if sparse:
+        return result
+
+    return result.ToDense()
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _ChunkResult(object):
+    work_item_ids: list[str]
+    type_names: list[str]
+
+    rows: np.ndarray
+    ordinals: np.ndarray
+    states: np.ndarray
+    estimates: np.ndarray
+    types: np.ndarray
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _ProcessChunk(
+    items: list[tuple[Union[str, WorkItem], list[WorkItemChange]]],
+    state_field_name: str,
+    type_field_name: str,
+    estimate_field_names: list[str],
+) -> _ChunkResult:
+    work_item_ids: list[str] = []
+    type_lookup: dict[str, int] = {}
+
+    rows: list[int] = []
+    ordinals: list[int] = []
+    states: list[int] = []
+    estimates: list[float] = []
+    types: list[int] = []
+
+    estimate_field_names_set = set(estimate_field_names)
+
+    for row, (work_item_or_id, changes) in enumerate(items):
+        if isinstance(work_item_or_id, str):
+            work_item_ids.append(work_item_or_id)
+
+            state = NO_STATE
+            estimate = np.nan
+            type_code = NO_TYPE
+        elif isinstance(work_item_or_id, WorkItem):
+            work_item_ids.append(work_item_or_id.work_item_id)
+
+            state = _ToNumber(work_item_or_id.state, NO_STATE)
+            estimate = _ToNumber(_GetEstimate(work_item_or_id), np.nan)
+            type_code = type_lookup.setdefault(work_item_or_id.type, len(type_lookup)) if work_item_or_id.type else NO_TYPE
+        else:
+            assert False, work_item_or_id  # pragma: no cover
+
+        if not changes:
+            continue
+
+        changes = sorted(changes)
+
+        current_ordinal = changes[0].dt.toordinal()
+
+        for change in changes:
+            change_ordinal = change.dt.toordinal()
+
+            if change_ordinal != current_ordinal:
+                rows.append(row)
+                ordinals.append(current_ordinal)
+                states.append(state)
+                estimates.append(estimate)
+                types.append(type_code)
+
+                current_ordinal = change_ordinal
+
+            if change.field == state_field_name:
+                state = _ToNumber(change.new_value, NO_STATE)
+            elif change.field in estimate_field_names_set:
+                estimate = _ToNumber(change.new_value, np.nan)
+            elif change.field == type_field_name:
+                type_code = type_lookup.setdefault(change.new_value, len(type_lookup)) if change.new_value else NO_TYPE
+
+        rows.append(row)
+        ordinals.append(current_ordinal)
+        states.append(state)
+        estimates.append(estimate)
+        types.append(type_code)
+
+    return _ChunkResult(
+        work_item_ids,
+        list(type_lookup.keys()),
+        np.array(rows, dtype=np.int32),
+        np.array(ordinals, dtype=np.int32),
+        np.array(states, dtype=np.int8),
+        np.array(estimates, dtype=np.float64),
+        np.array(types, dtype=np.int16),
+    )
+
+
+# ----------------------------------------------------------------------
+def _GetEstimate(
+    work_item: WorkItem,
+) -> Any:
+    if isinstance(work_item, StoryPointsWorkItem):
+        return work_item.story_points
+    if isinstance(work_item, TeeShirtWorkItem):
+        return work_item.estimate
+    if isinstance(work_item, DaysWorkItem):
+        return work_item.days
+    if isinstance(work_item, HoursWorkItem):
+        return work_item.hours
+
+    return None
+
+
+# ----------------------------------------------------------------------
+def _ToNumber(
+    value: Any,
+    default: Any,
+) -> Any:
+    if value is None:
+        return default
+
+    # Enum values are compared by value, as enums imported via different paths are considered to be
+    # different types (see the comments in `EventInfo.StateToAttributeName`).
+    if isinstance(value, Enum):
+        return value.value
+
+    return float(value) if isinstance(default, float) else value
@@ -0,0 +1,373 @@
+# ----------------------------------------------------------------------
+# |
+# |  EstimateCosts.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-20 09:14:27
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains types and functionality to estimate the cost of extracting hierarchies without extracting them"""
+
+import heapq
+import math
+import os
+import textwrap
+import threading
+import time
+import traceback
+
+from dataclasses import dataclass
+from typing import Any, Callable, cast, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation import TextwrapEx
+
+from Common_FoundationEx import ExecuteTasks
+
+from Common.Plugin import Plugin                                            # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+DEFAULT_BYTES_PER_UPDATE                    = 1500      # Typical size of a single update returned by Azure DevOps
+DEFAULT_UPDATES_PAGE_SIZE                   = 200       # Maximum number of updates returned by a single request
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class RootEstimate(object):
+    """Estimated cost of extracting a single hierarchy"""
+
+    # ----------------------------------------------------------------------
+    root_id: str
+
+    # Work items shared by multiple hierarchies are only fetched once; they are attributed to the
+    # first hierarchy that contains them.
+    num_work_items: int
+    num_updates: int
+    num_update_pages: int
+    num_requests: int                       # Requests made sequentially when extracting the hierarchy
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class CostEstimate(object):
+    """Estimated cost of extracting a set of hierarchies"""
+
+    # ----------------------------------------------------------------------
+    roots: list[RootEstimate]
+
+    latency_seconds: float
+    latency_was_measured: bool
+    max_num_threads: int
+    bytes_per_update: int
+
+    # ----------------------------------------------------------------------
+    @property
+    def num_work_items(self) -> int:
+        return sum(root.num_work_items for root in self.roots)
+
+    @property
+    def num_updates(self) -> int:
+        return sum(root.num_updates for root in self.roots)
+
+    @property
+    def num_update_pages(self) -> int:
+        return sum(root.num_update_pages for root in self.roots)
+
+    @property
+    def num_requests(self) -> int:
+        return sum(root.num_requests for root in self.roots)
+
+    @property
+    def num_bytes(self) -> int:
+        return self.num_updates * self.bytes_per_update
+
+    @property
+    def seconds(self) -> float:
+        """Projected wall-clock time, where hierarchies are extracted concurrently on `max_num_threads` threads"""
+
+        # Hierarchies are scheduled (longest first) on the thread that becomes available first
+        thread_requests = [0] * self.max_num_threads
+
+        for root in sorted(self.roots, key=lambda root: root.num_requests, reverse=True):
+            heapq.heapreplace(thread_requests, thread_requests[0] + root.num_requests)
+
+        return max(thread_requests) * self.latency_seconds
+
+    # ----------------------------------------------------------------------
+    def ToJson(self) -> dict[str, Any]:
+        return {
+            "num_roots": len(self.roots),
+            "num_work_items": self.num_work_items,
+            "num_updates": self.num_updates,
+            "num_update_pages": self.num_update_pages,
+            "num_requests": self.num_requests,
+            "num_bytes": self.num_bytes,
+            "seconds": self.seconds,
+            "assumptions": {
+                "latency_seconds": self.latency_seconds,
+                "latency_was_measured": self.latency_was_measured,
+                "max_num_threads": self.max_num_threads,
+                "bytes_per_update": self.bytes_per_update,
+            },
+            "roots": [
+                {
+                    "root_id": root.root_id,
+                    "num_work_items": root.num_work_items,
+                    "num_updates": root.num_updates,
+                    "num_update_pages": root.num_update_pages,
+                    "num_requests": root.num_requests,
+                }
+                for root in self.roots
+            ],
+        }
+
+    # ----------------------------------------------------------------------
+    def WriteSummary(
+        self,
+        dm: DoneManager,
+        *,
+        max_num_roots: int=10,
+    ) -> None:
+        seconds = self.seconds
+
+        dm.WriteLine(
+            textwrap.dedent(
+                """\
+
+                Estimated cost:
+
+                    {}
+
+                Most expensive hierarchies:
+
+                    {}
+
+                """,
+            ).format(
+                TextwrapEx.Indent(
+                    TextwrapEx.CreateTable(
+                        ["Measure", "Value"],
+                        [
+                            ["Hierarchies", str(len(self.roots))],
+                            ["Work items", str(self.num_work_items)],
+                            ["Updates", str(self.num_updates)],
+                            ["Update pages", str(self.num_update_pages)],
+                            ["Requests", str(self.num_requests)],
+                            ["MB (updates)", "{:.1f}".format(self.num_bytes / (1024 * 1024))],
+                            [
+                                "Latency (ms)",
+                                "{:.1f} ({})".format(self.latency_seconds * 1000, "measured" if self.latency_was_measured else "provided"),
+                            ],
+                            ["Threads", str(self.max_num_threads)],
+                            ["Wall-clock", "{:.0f}:{:02.0f}:{:02.0f}".format(seconds // 3600, (seconds % 3600) // 60, seconds % 60)],
+                        ],
+                    ),
+                    4,
+                    skip_first_line=True,
+                ),
+                TextwrapEx.Indent(
+                    TextwrapEx.CreateTable(
+                        ["Root", "Work Items", "Updates", "Requests", "Seconds"],
+                        [
+                            [
+                                root.root_id,
+                                str(root.num_work_items),
+                                str(root.num_updates),
+                                str(root.num_requests),
+                                "{:.1f}".format(root.num_requests * self.latency_seconds),
+                            ]
+                            for root in sorted(self.roots, key=lambda root: root.num_requests, reverse=True)[:max_num_roots]
+                        ],
+                    ),
+                    4,
+                    skip_first_line=True,
+                ),
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def EstimateCosts(
+    dm: DoneManager,
+    plugin: Plugin,
+    root_work_item_ids: list[str],
+    *,
+    max_num_threads: Optional[int]=None,
+    latency_ms: Optional[float]=None,
+    bytes_per_update: int=DEFAULT_BYTES_PER_UPDATE,
+    updates_page_size: int=DEFAULT_UPDATES_PAGE_SIZE,
+) -> Optional[CostEstimate]:
+    """\
+    Estimates the cost of extracting the hierarchy associated with each root work item without retrieving
+    the history of any work item; the children of each root are enumerated and the number of revisions of
+    each work item is retrieved in batches (see `Plugin.GetRevisionCounts`).
+
+    When `latency_ms` is not provided, the latency is measured from the requests made to enumerate children.
+
+    The estimate assumes that the history of each work item is retrieved from its own pages of updates
+    (`updates_page_size` updates per page); it doesn't apply to plugins that retrieve the history of all
+    work items at once (for example, the AzureDevOps plugin when `minimal_history` is set).
+    """
+
+    # Enumerate the children of each root
+    latencies: list[float] = []
+    latencies_lock = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def ExecuteTask(
+        context: str,
+        on_simple_status_func: Callable[[str], None],  # pylint: disable=unused-argument
+    ) -> tuple[Optional[int], ExecuteTasks.TransformTypes.FuncType[list[str]]]:
+        root_work_item_id = context
+        del context
+
+        # ----------------------------------------------------------------------
+        def Impl(
+            status: ExecuteTasks.Status,  # pylint: disable=unused-argument
+        ) -> list[str]:
+            start = time.perf_counter()
+
+            children = list(plugin.EnumChildren(root_work_item_id))
+
+            with latencies_lock:
+                latencies.append(time.perf_counter() - start)
+
+            return children
+
+        # ----------------------------------------------------------------------
+
+        return None, Impl
+
+    # ----------------------------------------------------------------------
+
+    # Roots specified multiple times are only extracted once
+    unique_root_work_item_ids = list(dict.fromkeys(root_work_item_ids))
+
+    children_results = cast(
+        list[list[str] | Exception],
+        ExecuteTasks.Transform(
+            dm,
+            "Enumerating hierarchies...",
+            [
+                ExecuteTasks.TaskData(root_work_item_id, root_work_item_id)
+                for root_work_item_id in unique_root_work_item_ids
+            ],
+            ExecuteTask,
+            max_num_threads=max_num_threads,
+            return_exceptions=True,
+        ),
+    )
+
+    for root_work_item_id, result in zip(unique_root_work_item_ids, children_results):
+        if not isinstance(result, Exception):
+            continue
+
+        dm.WriteError(
+            textwrap.dedent(
+                """\
+
+                Error enumerating the hierarchy of '{}':
+                    {}
+                """,
+            ).format(
+                root_work_item_id,
+                TextwrapEx.Indent(
+                    ("\n".join(traceback.format_exception(result)) if dm.is_debug else str(result)).rstrip(),
+                    4,
+                    skip_first_line=True,
+                ),
+            ),
+        )
+
+    if dm.result != 0:
+        return None
+
+    # Attribute each work item to the first hierarchy that contains it
+    hierarchy_work_item_ids: dict[str, list[str]] = {}
+    all_work_item_ids: set[str] = set()
+
+    for root_work_item_id, children in zip(unique_root_work_item_ids, cast(list[list[str]], children_results)):
+        these_work_item_ids: list[str] = []
+
+        for work_item_id in [root_work_item_id, *children]:
+            if work_item_id in all_work_item_ids:
+                continue
+
+            all_work_item_ids.add(work_item_id)
+            these_work_item_ids.append(work_item_id)
+
+        hierarchy_work_item_ids[root_work_item_id] = these_work_item_ids
+
+    with dm.Nested("Counting revisions..."):
+        revision_counts = plugin.GetRevisionCounts(
+            [
+                work_item_id
+                for work_item_ids in hierarchy_work_item_ids.values()
+                for work_item_id in work_item_ids
+            ],
+        )
+
+    # Calculate the cost of each hierarchy
+    roots: list[RootEstimate] = []
+
+    for root_work_item_id, work_item_ids in hierarchy_work_item_ids.items():
+        num_updates = 0
+        num_update_pages = 0
+
+        for work_item_id in work_item_ids:
+            # Work items that don't exist or whose changes aren't extracted only require a single request
+            revision_count = revision_counts.get(work_item_id, None)
+            if revision_count is None:
+                continue
+
+            num_updates += revision_count
+
+            # Changes are requested until an empty page is returned
+            num_update_pages += math.ceil(revision_count / updates_page_size) + 1
+
+        roots.append(
+            RootEstimate(
+                root_work_item_id,
+                len(work_item_ids),
+                num_updates,
+                num_update_pages,
+                # Children enumeration + work item info + update pages
+                1 + len(work_item_ids) + num_update_pages,
+            ),
+        )
+
+    if latency_ms is not None:
+        latency_seconds = latency_ms / 1000
+    elif latencies:
+        # Median
+        latency_seconds = sorted(latencies)[len(latencies) // 2]
+    else:
+        latency_seconds = 0.0
+
+    return CostEstimate(
+        roots,
+        latency_seconds,
+        latency_ms is None,
+        max_num_threads or os.cpu_count() or 1,
+        bytes_per_update,
+    )
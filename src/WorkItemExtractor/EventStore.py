@@ -0,0 +1,423 @@
+# ----------------------------------------------------------------------
+# |
+# |  EventStore.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-25 08:51:37
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to write events to (and query events from) an indexed SQLite database"""
+
+import dataclasses
+import json
+import os
+import sqlite3
+
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+
+from Common.Profiling import YieldProfiledNested                            # type: ignore; pylint: disable=import-error
+from Common.Serialization import EnumFromJson                              # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, TeeShirtWorkItem                        # type: ignore; pylint: disable=import-error
+from GenerateEvents import EpicSeries, Event, EventChange, EventInfo, GenerateEventsResult  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+FORMAT_VERSION                              = 2         # Stored as the database's `user_version`
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+class EventStore(object):
+    """\
+    Queries events written by `WriteEventStore`; each query reads only the rows that it returns (by way of
+    the indexes on dates, epics, and work items), so the dataset is never loaded in its entirety.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        filename: Path,
+    ):
+        if not filename.is_file():
+            raise Exception("The event store '{}' does not exist.".format(filename))
+
+        connection = sqlite3.connect("{}?mode=ro".format(filename.resolve().as_uri()), uri=True)
+
+        try:
+            format_version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if format_version != FORMAT_VERSION:
+                raise Exception(
+                    "'{}' is not an event store produced by this version (format version '{}', '{}' was expected).".format(
+                        filename,
+                        format_version,
+                        FORMAT_VERSION,
+                    ),
+                )
+        except:
+            connection.close()
+            raise
+
+        self.filename                       = filename
+        self._connection                    = connection
+
+    # ----------------------------------------------------------------------
+    def __enter__(self) -> "EventStore":
+        return self
+
+    # ----------------------------------------------------------------------
+    def __exit__(self, *args, **kwargs) -> None:
+        self.Close()
+
+    # ----------------------------------------------------------------------
+    def Close(self) -> None:
+        self._connection.close()
+
+    # ----------------------------------------------------------------------
+    def GetTitles(
+        self,
+        work_item_ids: Optional[list[str]]=None,    # All titles are returned when None
+    ) -> dict[str, str]:
+        if work_item_ids is None:
+            cursor = self._connection.execute("SELECT work_item_id, title FROM titles")
+        else:
+            cursor = self._connection.execute(
+                "SELECT work_item_id, title FROM titles WHERE work_item_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(work_item_ids), ),
+            )
+
+        return dict(cursor)
+
+    # ----------------------------------------------------------------------
+    def EnumEvents(
+        self,
+        start_date: Optional[str]=None,     # Inclusive; ISO 8601 date
+        end_date: Optional[str]=None,       # Inclusive; ISO 8601 date
+    ) -> Iterator[Event]:
+        """Enumerates the events (and their changes) within the range, in date order"""
+
+        where_clause, parameters = _CreateDateRangeClause(start_date, end_date)
+
+        changes_cursor = self._connection.execute(
+            "SELECT date, work_item_id, epic_id, size, state FROM changes {} ORDER BY date, position".format(where_clause),
+            parameters,
+        )
+
+        pending_change: Optional[tuple[Any, ...]] = changes_cursor.fetchone()
+
+        for row in self._connection.execute(
+            "SELECT {} FROM events {} ORDER BY date".format(", ".join(_EVENTS_COLUMN_NAMES), where_clause),
+            parameters,
+        ):
+            values = dict(zip(_EVENTS_COLUMN_NAMES, row))
+
+            changes: list[EventChange] = []
+
+            # Changes are enumerated alongside events, as both are ordered by date
+            while pending_change is not None and pending_change[0] == values["date"]:
+                changes.append(_CreateEventChange(*pending_change[1:]))
+                pending_change = changes_cursor.fetchone()
+
+            event_infos: dict[str, EventInfo] = {}
+
+            for attribute_name, counter_name, column_name in _EVENT_INFO_COLUMNS:
+                event_info = event_infos.get(attribute_name, None)
+                if event_info is None:
+                    event_info = EventInfo()
+                    event_infos[attribute_name] = event_info
+
+                setattr(event_info, counter_name, values[column_name])
+
+            yield Event(
+                date=values["date"],
+                team=values["team"],
+                changes=changes,
+                **event_infos,
+            )
+
+    # ----------------------------------------------------------------------
+    def GetEpicSeries(
+        self,
+        epic_id: str,
+        start_date: Optional[str]=None,     # Inclusive; ISO 8601 date
+        end_date: Optional[str]=None,       # Inclusive; ISO 8601 date
+    ) -> EpicSeries:
+        """Returns the epic's change points within the range, preceded by the change point in effect on `start_date` (see `EpicSeries.Slice`)"""
+
+        conditions = ["epic_id = ?"]
+        parameters: list[Any] = [epic_id]
+
+        if start_date is not None:
+            conditions.append("date >= COALESCE((SELECT MAX(date) FROM epic_series WHERE epic_id = ? AND date <= ?), '')")
+            parameters += [epic_id, start_date]
+
+        if end_date is not None:
+            conditions.append("date <= ?")
+            parameters.append(end_date)
+
+        rows = self._connection.execute(
+            "SELECT date, {} FROM epic_series WHERE {} ORDER BY date".format(
+                ", ".join(column_name for _, _, column_name in _EPIC_SERIES_COLUMNS),
+                " AND ".join(conditions),
+            ),
+            parameters,
+        ).fetchall()
+
+        values: dict[str, dict[str, list[Any]]] = {}
+
+        for column_index, (attribute_name, counter_name, _) in enumerate(_EPIC_SERIES_COLUMNS):
+            values.setdefault(attribute_name, {})[counter_name] = [row[column_index + 1] for row in rows]
+
+        return EpicSeries(
+            [row[0] for row in rows],
+            **{
+                attribute_name: values.get(attribute_name, {})
+                for attribute_name in _EPIC_SERIES_ATTRIBUTE_NAMES
+            },
+        )
+
+    # ----------------------------------------------------------------------
+    def EnumChanges(
+        self,
+        start_date: Optional[str]=None,     # Inclusive; ISO 8601 date
+        end_date: Optional[str]=None,       # Inclusive; ISO 8601 date
+        *,
+        epic_id: Optional[str]=None,
+        work_item_id: Optional[str]=None,
+    ) -> Iterator[tuple[str, EventChange]]:
+        """Enumerates (date, change) for changes within the range (optionally limited to an epic or work item), in date order"""
+
+        where_clause, parameters = _CreateDateRangeClause(start_date, end_date)
+
+        for column_name, value in [
+            ("epic_id", epic_id),
+            ("work_item_id", work_item_id),
+        ]:
+            if value is None:
+                continue
+
+            where_clause = "{} {} = ?".format("{} AND".format(where_clause) if where_clause else "WHERE", column_name)
+            parameters.append(value)
+
+        for row in self._connection.execute(
+            "SELECT date, work_item_id, epic_id, size, state FROM changes {} ORDER BY date, position".format(where_clause),
+            parameters,
+        ):
+            yield row[0], _CreateEventChange(*row[1:])
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def WriteEventStore(
+    dm: DoneManager,
+    output_filename: Path,
+    results: GenerateEventsResult,
+) -> None:
+    """\
+    Writes the events to a SQLite database that can be queried with `EventStore`. All rows are inserted
+    within a single transaction, and the indexes are created once the rows have been inserted. The database
+    is written to a temporary file that replaces `output_filename` once complete, so readers never observe
+    a partially written database.
+    """
+
+    with YieldProfiledNested(dm, "Writing '{}'...".format(output_filename)):
+        output_filename.parent.mkdir(parents=True, exist_ok=True)
+
+        temp_filename = output_filename.with_name("{}.tmp".format(output_filename.name))
+        temp_filename.unlink(missing_ok=True)
+
+        # The temporary file is discarded on failure, so the journal isn't necessary
+        connection = sqlite3.connect(temp_filename, isolation_level=None)
+
+        try:
+            connection.execute("PRAGMA journal_mode = OFF")
+            connection.execute("PRAGMA synchronous = OFF")
+
+            connection.execute("BEGIN")
+
+            for statement in _CREATE_TABLE_STATEMENTS:
+                connection.execute(statement)
+
+            connection.executemany("INSERT INTO titles VALUES (?, ?)", results.titles.items())
+
+            connection.executemany(
+                "INSERT INTO events VALUES ({})".format(", ".join("?" * len(_EVENTS_COLUMN_NAMES))),
+                (
+                    [
+                        event.date,
+                        *(
+                            getattr(getattr(event, attribute_name), counter_name)
+                            for attribute_name, counter_name, _ in _EVENT_INFO_COLUMNS
+                        ),
+                        event.team,
+                    ]
+                    for event in results.events
+                ),
+            )
+
+            connection.executemany(
+                "INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (event.date, position, change.work_item_id, change.epic_id, _ToColumnValue(change.size), _ToColumnValue(change.state))
+                    for event in results.events
+                    for position, change in enumerate(event.changes)
+                ),
+            )
+
+            connection.executemany(
+                "INSERT INTO epic_series VALUES ({})".format(", ".join("?" * (len(_EPIC_SERIES_COLUMNS) + 2))),
+                (
+                    [
+                        epic_id,
+                        epic_date,
+                        *(
+                            getattr(epic_series, attribute_name)[counter_name][index]
+                            for attribute_name, counter_name, _ in _EPIC_SERIES_COLUMNS
+                        ),
+                    ]
+                    for epic_id, epic_series in results.epics.items()
+                    for index, epic_date in enumerate(epic_series.dates)
+                ),
+            )
+
+            for statement in _CREATE_INDEX_STATEMENTS:
+                connection.execute(statement)
+
+            connection.execute("PRAGMA user_version = {}".format(FORMAT_VERSION))
+
+            connection.execute("COMMIT")
+        except:
+            connection.close()
+            temp_filename.unlink(missing_ok=True)
+            raise
+
+        connection.close()
+
+        os.replace(temp_filename, output_filename)
+
+        dm.WriteVerbose(
+            "{} events, {} changes, {} epics, and {} titles.\n".format(
+                len(results.events),
+                sum(len(event.changes) for event in results.events),
+                len(results.epics),
+                len(results.titles),
+            ),
+        )
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+# (attribute_name, counter_name, column_name) for each EventInfo counter of an Event
+_EVENT_INFO_COLUMNS: list[tuple[str, str, str]] = [
+    (field.name, counter_name, "{}_{}".format(field.name, counter_name))
+    for field in dataclasses.fields(Event)
+    if field.type is EventInfo
+    for counter_name in EventInfo().__dict__.keys()
+]
+
+_EPIC_SERIES_ATTRIBUTE_NAMES: list[str]     = [
+    field.name for field in dataclasses.fields(EpicSeries) if field.name != "dates"
+]
+
+# (attribute_name, counter_name, column_name) for each counter of an EpicSeries
+_EPIC_SERIES_COLUMNS: list[tuple[str, str, str]] = [
+    (attribute_name, counter_name, "{}_{}".format(attribute_name, counter_name))
+    for attribute_name in _EPIC_SERIES_ATTRIBUTE_NAMES
+    for counter_name in EventInfo().__dict__.keys()
+]
+
+_EVENTS_COLUMN_NAMES: list[str]             = [
+    "date",
+    *(column_name for _, _, column_name in _EVENT_INFO_COLUMNS),
+    "team",
+]
+
+# Counters and sizes are declared without a type so that values are stored as provided (a numeric type
+# would convert 8.0 to 8, which changes the json produced for the events).
+_CREATE_TABLE_STATEMENTS: list[str]         = [
+    "CREATE TABLE titles (work_item_id TEXT PRIMARY KEY, title TEXT NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE events (date TEXT PRIMARY KEY, {}, team TEXT) WITHOUT ROWID".format(
+        ", ".join("{} NOT NULL".format(column_name) for column_name in _EVENTS_COLUMN_NAMES[1:-1]),
+    ),
+    # `position` preserves the order of changes within an event
+    "CREATE TABLE changes (date TEXT NOT NULL, position INTEGER NOT NULL, work_item_id TEXT NOT NULL, epic_id TEXT NOT NULL, size, state TEXT NOT NULL, PRIMARY KEY (date, position)) WITHOUT ROWID",
+    "CREATE TABLE epic_series (epic_id TEXT NOT NULL, date TEXT NOT NULL, {}, PRIMARY KEY (epic_id, date)) WITHOUT ROWID".format(
+        ", ".join("{} NOT NULL".format(column_name) for _, _, column_name in _EPIC_SERIES_COLUMNS),
+    ),
+]
+
+_CREATE_INDEX_STATEMENTS: list[str]         = [
+    "CREATE INDEX changes_epic_id ON changes (epic_id, date)",
+    "CREATE INDEX changes_work_item_id ON changes (work_item_id, date)",
+]
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _CreateDateRangeClause(
+    start_date: Optional[str],
+    end_date: Optional[str],
+) -> tuple[str, list[Any]]:
+    conditions: list[str] = []
+    parameters: list[Any] = []
+
+    if start_date is not None:
+        conditions.append("date >= ?")
+        parameters.append(start_date)
+
+    if end_date is not None:
+        conditions.append("date <= ?")
+        parameters.append(end_date)
+
+    if not conditions:
+        return "", parameters
+
+    return "WHERE {}".format(" AND ".join(conditions)), parameters
+
+
+# ----------------------------------------------------------------------
+def _ToColumnValue(
+    value: Any,
+) -> Any:
+    # Enums are stored as they are encoded by JsonEncoder (e.g. "State.Active"); sizes are numbers or
+    # t-shirt sizes, depending on the work item.
+    if isinstance(value, Enum):
+        return str(value)
+
+    return value
+
+
+# ----------------------------------------------------------------------
+def _CreateEventChange(
+    work_item_id: str,
+    epic_id: str,
+    size: Any,
+    state: str,
+) -> EventChange:
+    return EventChange(work_item_id, epic_id, EnumFromJson(TeeShirtWorkItem.Size, size), EnumFromJson(State, state))
@@ -15,16 +15,33 @@
 # ----------------------------------------------------------------------
 """Contains types and functionality to generate events"""
 
+import bisect
+import dataclasses
+import queue
+import threading
+
 from dataclasses import dataclass
 from datetime import date, datetime
 from functools import cached_property
-from typing import Optional
+from pathlib import Path
+from typing import Any, Optional
 
 from Common_Foundation.Streams.DoneManager import DoneManager
 
+from Common.ChangeLog import ChangeLogNormalizer                             # type: ignore; pylint: disable=import-error
 from Common.Plugin import Plugin                                            # type: ignore; pylint: disable=import-error
+from Common.Profiling import YieldProfiledNested                            # type: ignore; pylint: disable=import-error
 from Common.WorkItem import State                                           # type: ignore; pylint: disable=import-error
-from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult, StreamHierarchies  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+DEFAULT_CHECKPOINT_INTERVAL                 = 32        # Events between saved states (see `EventsGenerator`)
+DEFAULT_MAX_PENDING_HIERARCHIES             = 32        # Hierarchies waiting to be organized (see `StreamEvents`)
 
 
 # ----------------------------------------------------------------------
@@ -91,12 +108,358 @@ class Event(object):
     changes: list[EventChange]
 
 
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class EpicSeries(object):
+    """\
+    The totals of an epic's features, stored as change points: the values at an index are in effect from
+    the date at that index until the date at the next index (values before the first date are 0). Values
+    are keyed by EventInfo attribute name.
+    """
+
+    # ----------------------------------------------------------------------
+    dates: list[str]
+
+    features_estimated_num: dict[str, list[int]]
+    features_unestimated_num: dict[str, list[int]]
+    features_estimated_size: dict[str, list[int]]
+
+    # ----------------------------------------------------------------------
+    def Slice(
+        self,
+        start_date: Optional[str]=None,     # Inclusive; ISO 8601 date
+        end_date: Optional[str]=None,       # Inclusive; ISO 8601 date
+    ) -> "EpicSeries":
+        """Returns the change points within the range, preceded by the change point in effect on `start_date`"""
+
+        # Dates are ISO-8601, so they can be compared as strings
+        start_index = 0 if start_date is None else max(bisect.bisect_right(self.dates, start_date) - 1, 0)
+        end_index = len(self.dates) if end_date is None else bisect.bisect_right(self.dates, end_date)
+
+        return EpicSeries(
+            self.dates[start_index:end_index],
+            *(
+                {
+                    counter_name: values[start_index:end_index]
+                    for counter_name, values in getattr(self, attribute_name).items()
+                }
+                for attribute_name in _EPIC_SERIES_ATTRIBUTE_NAMES
+            ),
+        )
+
+
 # ----------------------------------------------------------------------
 @dataclass(frozen=True)
 class GenerateEventsResult(object):
     titles: dict[str, str]
     events: list[Event]
 
+    # Series for each epic, so that the events of an epic can be displayed without generating them again
+    epics: dict[str, EpicSeries]
+
+
+# ----------------------------------------------------------------------
+class EventsGenerator(object):
+    """\
+    Generates events for hierarchies and regenerates them when work items change (see `Update`).
+
+    The counts of an event depend on all of the events that precede it, so a change to a work item requires
+    that the events on or after the earliest day affected by the change are regenerated. The state of all
+    work items is saved every `checkpoint_interval` events so that regeneration can begin at the checkpoint
+    that precedes that day rather than at the first event.
+    """
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def Create(
+        cls,
+        dm: DoneManager,
+        plugin: Plugin,
+        hierarchy_results: list[HierarchyResult],
+        *,
+        checkpoint_interval: Optional[int]=DEFAULT_CHECKPOINT_INTERVAL,
+    ) -> "EventsGenerator":
+        """Creates a generator that contains the events of the hierarchies"""
+
+        generator = cls(plugin, checkpoint_interval=checkpoint_interval)
+
+        with YieldProfiledNested(dm, "Organizing events..."):
+            # Extract titles and group events by date
+            for hierarchy_result in hierarchy_results:
+                generator.Add(hierarchy_result)
+
+        with YieldProfiledNested(dm, "Normalizing events..."):
+            generator.Normalize()
+
+        return generator
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        plugin: Plugin,
+        *,
+        checkpoint_interval: Optional[int]=DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        """\
+        Creates a generator without any hierarchies; hierarchies are organized as they become available
+        (see `Add`) and events are generated once all of them have been added (see `Normalize`).
+        """
+
+        self.plugin                         = plugin
+        self.checkpoint_interval            = checkpoint_interval
+
+        self._titles: dict[str, str]        = {}
+        self._resolved_work_item_data: dict[
+            date,
+            dict[
+                str,                        # work_item_id
+                _WorkItemData,
+            ],
+        ]                                   = {}
+
+        # The dates that each work item contributes to
+        self._work_item_dates: dict[str, set[date]]             = {}
+
+        self._dates: list[date]             = []
+        self._events: list[Event]           = []
+
+        # The change points of each epic (see `EpicSeries`), where values are the counters of
+        # `_EPIC_SERIES_ATTRIBUTE_NAMES` (in that order)
+        self._epic_points: dict[str, list[tuple[str, tuple[int, ...]]]]    = {}
+
+        # The state of all work items before the event at the index
+        self._checkpoints: dict[int, dict[str, _WorkItemData]]  = {}
+
+    # ----------------------------------------------------------------------
+    @property
+    def result(self) -> GenerateEventsResult:
+        # Sort titles
+        title_keys = list(self._titles.keys())
+        title_keys.sort()
+
+        # Sort epics, as the order in which they are encountered depends on the updates applied
+        epics: dict[str, EpicSeries] = {}
+
+        for epic_id in sorted(self._epic_points.keys()):
+            points = self._epic_points[epic_id]
+            if not points:
+                continue
+
+            counter_values = list(zip(*(values for _, values in points)))
+
+            epics[epic_id] = EpicSeries(
+                [point_date for point_date, _ in points],
+                *(
+                    {
+                        counter_name: list(counter_values[attribute_index * len(_EVENT_INFO_COUNTER_NAMES) + counter_index])
+                        for counter_index, counter_name in enumerate(_EVENT_INFO_COUNTER_NAMES)
+                    }
+                    for attribute_index in range(len(_EPIC_SERIES_ATTRIBUTE_NAMES))
+                ),
+            )
+
+        return GenerateEventsResult(
+            { key: self._titles[key] for key in title_keys },
+            list(self._events),
+            epics,
+        )
+
+    # ----------------------------------------------------------------------
+    def Update(
+        self,
+        hierarchy_results: list[HierarchyResult],
+        work_item_ids: set[str],
+    ) -> Optional[date]:
+        """\
+        Regenerates events after the work items have changed (or have been added to or removed from
+        `hierarchy_results`); returns the earliest date affected by the changes (None if no dates were
+        affected).
+        """
+
+        previous_work_item_data: dict[tuple[date, str], _WorkItemData] = {}
+
+        # Remove the information associated with the work items...
+        for work_item_id in work_item_ids:
+            self._titles.pop(work_item_id, None)
+
+            for work_item_date in self._work_item_dates.pop(work_item_id, set()):
+                work_item_data_items = self._resolved_work_item_data[work_item_date]
+
+                previous_work_item_data[(work_item_date, work_item_id)] = work_item_data_items.pop(work_item_id)
+
+                if not work_item_data_items:
+                    del self._resolved_work_item_data[work_item_date]
+
+        # ...and add it again (in hierarchy order, as is done during construction)
+        for hierarchy_result in hierarchy_results:
+            epic_id = hierarchy_result.root.work_item.work_item_id
+
+            for hierarchy_item in [hierarchy_result.root, *hierarchy_result.children]:
+                if hierarchy_item.work_item.work_item_id in work_item_ids:
+                    self._ProcessHierarchyItem(epic_id, hierarchy_item)
+
+        # Only dates whose information changed are affected
+        affected_dates: set[date] = set()
+
+        for work_item_id in work_item_ids:
+            for work_item_date in self._work_item_dates.get(work_item_id, set()):
+                if previous_work_item_data.pop((work_item_date, work_item_id), None) != self._resolved_work_item_data[work_item_date][work_item_id]:
+                    affected_dates.add(work_item_date)
+
+        # Dates that no longer have information about the work items
+        affected_dates.update(work_item_date for work_item_date, _ in previous_work_item_data)
+
+        if not affected_dates:
+            return None
+
+        earliest_date = min(affected_dates)
+
+        # Events before the earliest date are not affected
+        self._Normalize(bisect.bisect_left(self._dates, earliest_date))
+
+        return earliest_date
+
+    # ----------------------------------------------------------------------
+    def Add(
+        self,
+        hierarchy_result: HierarchyResult,
+    ) -> None:
+        """Organizes the changes of a hierarchy; events aren't generated until `Normalize` is called"""
+
+        epic_id = hierarchy_result.root.work_item.work_item_id
+
+        self._ProcessHierarchyItem(epic_id, hierarchy_result.root)
+
+        for child in hierarchy_result.children:
+            self._ProcessHierarchyItem(epic_id, child)
+
+    # ----------------------------------------------------------------------
+    def Normalize(self) -> None:
+        """Generates all events from the hierarchies that have been added"""
+
+        self._Normalize(0)
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _ProcessHierarchyItem(
+        self,
+        epic_id: str,
+        hierarchy_item: HierarchyItem,
+    ) -> None:
+        work_item_id = hierarchy_item.work_item.work_item_id
+
+        if work_item_id not in self._titles:
+            self._titles[work_item_id] = hierarchy_item.work_item.title
+
+        # Changes to other fields are skipped without being decoded
+        for field, dt, new_value in hierarchy_item.changes.EnumFieldChanges(GetEventFieldNames(self.plugin)):
+            work_item_data: Optional[_WorkItemData] = None
+
+            if field == self.plugin.feature_size_field_name:
+                work_item_data = _WorkItemData(
+                    dt,
+                    epic_id,
+                    work_item_id if work_item_id != epic_id else None,
+                    new_value,
+                    None,
+                )
+            elif field == self.plugin.epic_size_field_name:
+                assert work_item_id == epic_id, (work_item_id, epic_id)
+
+                work_item_data = _WorkItemData(
+                    dt,
+                    epic_id,
+                    None,
+                    new_value,
+                    None,
+                )
+            elif field == self.plugin.state_field_name:
+                work_item_data = _WorkItemData(
+                    dt,
+                    epic_id,
+                    work_item_id if work_item_id != epic_id else None,
+                    None,
+                    new_value,
+                )
+
+            if work_item_data is None:
+                continue
+
+            this_date = dt.date()
+            this_day = self._resolved_work_item_data.setdefault(this_date, {})
+
+            if work_item_id not in this_day:
+                this_day[work_item_id] = work_item_data
+                self._work_item_dates.setdefault(work_item_id, set()).add(this_date)
+            else:
+                this_day[work_item_id].Merge(work_item_data)
+
+    # ----------------------------------------------------------------------
+    def _Normalize(
+        self,
+        start_index: int,
+    ) -> None:
+        """Regenerates the events at and after `start_index`"""
+
+        # Begin at the latest checkpoint that precedes the index; checkpoints aren't saved for indexes
+        # beyond the events that existed when they were last generated, and index 0 is the empty state.
+        checkpoint_index = max(
+            (index for index in self._checkpoints.keys() if index <= start_index),
+            default=0,
+        )
+
+        previous_work_item_data = {
+            work_item_id: dataclasses.replace(work_item_data)
+            for work_item_id, work_item_data in self._checkpoints.get(checkpoint_index, {}).items()
+        }
+
+        self._dates = list(self._resolved_work_item_data.keys())
+        self._dates.sort()
+
+        # Remove the change points of the events that are regenerated
+        if checkpoint_index < len(self._events):
+            first_date = self._events[checkpoint_index].date
+
+            for points in self._epic_points.values():
+                del points[bisect.bisect_left(points, first_date, key=lambda point: point[0]):]
+
+        del self._events[checkpoint_index:]
+
+        self._checkpoints = {
+            index: checkpoint
+            for index, checkpoint in self._checkpoints.items()
+            if index <= checkpoint_index
+        }
+
+        for index in range(checkpoint_index, len(self._dates)):
+            if (
+                self.checkpoint_interval is not None
+                and index != 0
+                and index % self.checkpoint_interval == 0
+                and index not in self._checkpoints
+            ):
+                self._checkpoints[index] = {
+                    work_item_id: dataclasses.replace(work_item_data)
+                    for work_item_id, work_item_data in previous_work_item_data.items()
+                }
+
+            sorted_date = self._dates[index]
+
+            event, epic_values = _CreateEvent(sorted_date, self._resolved_work_item_data[sorted_date], previous_work_item_data)
+
+            self._events.append(event)
+
+            # Epics without features on this date have values of 0
+            for epic_id in epic_values.keys() | self._epic_points.keys():
+                values = epic_values.get(epic_id, _EMPTY_EPIC_VALUES)
+                points = self._epic_points.setdefault(epic_id, [])
+
+                if values != (points[-1][1] if points else _EMPTY_EPIC_VALUES):
+                    points.append((event.date, values))
+
 
 # ----------------------------------------------------------------------
 # |
@@ -108,163 +471,115 @@ def GenerateEvents(
     plugin: Plugin,
     hierarchy_results: list[HierarchyResult],
 ) -> GenerateEventsResult:
-    titles: dict[str, str] = {}
-    resolved_work_item_data: dict[
-        date,
-        dict[
-            str,                    # work_item_id
-            _WorkItemData,
-        ],
-    ] = {}
-
-    with dm.Nested("Organizing events..."):
-        # Extract titles and group events by date
-
-        # ----------------------------------------------------------------------
-        def ProcessHierarchyItem(
-            epic_id: str,
-            hierarchy_item: HierarchyItem,
-        ) -> None:
-            work_item_id = hierarchy_item.work_item.work_item_id
-
-            if work_item_id not in titles:
-                titles[work_item_id] = hierarchy_item.work_item.title
-
-            for change in hierarchy_item.changes:
-                work_item_data: Optional[_WorkItemData] = None
-
-                if change.field == plugin.feature_size_field_name:
-                    work_item_data = _WorkItemData(
-                        change.dt,
-                        epic_id,
-                        work_item_id if work_item_id != epic_id else None,
-                        change.new_value,
-                        None,
-                    )
-                elif change.field == plugin.epic_size_field_name:
-                    assert work_item_id == epic_id, (work_item_id, epic_id)
-
-                    work_item_data = _WorkItemData(
-                        change.dt,
-                        epic_id,
-                        None,
-                        change.new_value,
-                        None,
-                    )
-                elif change.field == plugin.state_field_name:
-                    work_item_data = _WorkItemData(
-                        change.dt,
-                        epic_id,
-                        work_item_id if work_item_id != epic_id else None,
-                        None,
-                        change.new_value,
-                    )
-
-                if work_item_data is None:
-                    continue
-
-                this_day = resolved_work_item_data.setdefault(change.dt.date(), {})
-
-                if work_item_id not in this_day:
-                    this_day[work_item_id] = work_item_data
-                else:
-                    this_day[work_item_id].Merge(work_item_data)
-
-        # ----------------------------------------------------------------------
+    return EventsGenerator.Create(dm, plugin, hierarchy_results, checkpoint_interval=None).result
 
-        for hierarchy_result in hierarchy_results:
-            epic_id = hierarchy_result.root.work_item.work_item_id
 
-            ProcessHierarchyItem(epic_id, hierarchy_result.root)
+# ----------------------------------------------------------------------
+def GetEventFieldNames(
+    plugin: Plugin,
+) -> list[str]:
+    """Returns the names of the work item fields whose changes are used to generate events"""
+
+    return [
+        plugin.feature_size_field_name,
+        plugin.epic_size_field_name,
+        plugin.state_field_name,
+    ]
+
+
+# ----------------------------------------------------------------------
+def StreamEvents(
+    dm: DoneManager,
+    plugin: Plugin,
+    root_work_item_ids: list[str],
+    *,
+    checkpoint_dir: Optional[Path]=None,
+    resume: bool=False,
+    checkpoint_options: Optional[dict[str, Any]]=None,
+    max_num_threads: Optional[int]=None,
+    change_log_normalizer: Optional[ChangeLogNormalizer]=None,
+    max_pending_hierarchies: int=DEFAULT_MAX_PENDING_HIERARCHIES,
+) -> Optional[GenerateEventsResult]:
+    """\
+    Extracts the hierarchy associated with each root work item (see `StreamHierarchies`) and generates
+    their events. The events of each hierarchy are organized on a separate thread once the hierarchy has
+    been extracted, so that organization overlaps extraction and only normalization remains once
+    extraction is complete; hierarchies aren't retained once they have been organized.
+
+    Hierarchies are organized in the order of `root_work_item_ids` (regardless of the order in which they
+    are extracted), so the result is the same as the result of `GenerateEvents`. Memory is bounded by
+    `max_pending_hierarchies`: at most that many hierarchies wait to be organized, and the extraction of a
+    root doesn't begin while it is that many roots or more beyond the first root whose hierarchy hasn't
+    been queued. Extraction stops if a hierarchy can't be organized. Returns None if errors were
+    encountered.
+    """
+
+    generator = EventsGenerator(plugin, checkpoint_interval=None)
+
+    # None indicates that extraction is complete
+    hierarchy_queue: queue.Queue[Optional[HierarchyResult]] = queue.Queue(max_pending_hierarchies)
+    organize_exceptions: list[Exception] = []
 
-            for child in hierarchy_result.children:
-                ProcessHierarchyItem(epic_id, child)
+    # ----------------------------------------------------------------------
+    def Organize() -> None:
+        while True:
+            hierarchy_result = hierarchy_queue.get()
+            if hierarchy_result is None:
+                break
+
+            # Once a hierarchy can't be organized, the queue is drained (without organizing the hierarchies)
+            # so that extraction isn't blocked while it stops.
+            if organize_exceptions:
+                continue
+
+            try:
+                generator.Add(hierarchy_result)
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                organize_exceptions.append(ex)
 
-    all_event_results: list[Event] = []
+    # ----------------------------------------------------------------------
+    def OnResult(
+        hierarchy_result: HierarchyResult,
+    ) -> None:
+        if organize_exceptions:
+            raise Exception("The events couldn't be organized.")
 
-    with dm.Nested("Normalizing events..."):
-        previous_work_item_data: dict[str, _WorkItemData] = {}
+        hierarchy_queue.put(hierarchy_result)
 
-        sorted_dates = list(resolved_work_item_data.keys())
-        sorted_dates.sort()
+    # ----------------------------------------------------------------------
 
-        for sorted_date in sorted_dates:
-            work_item_data_items = resolved_work_item_data[sorted_date]
-            changes: list[EventChange] = []
+    organize_thread = threading.Thread(target=Organize, daemon=True)
+    organize_thread.start()
 
-            for work_item_id, work_item_data in work_item_data_items.items():
-                changes.append(
-                    EventChange(
-                        work_item_id,
-                        work_item_data.epic_id,
-                        work_item_data.size,
-                        work_item_data.state or State.New,
-                    ),
-                )
+    try:
+        succeeded = StreamHierarchies(
+            dm,
+            plugin,
+            root_work_item_ids,
+            OnResult,
+            checkpoint_dir=checkpoint_dir,
+            resume=resume,
+            checkpoint_options=checkpoint_options,
+            max_num_threads=max_num_threads,
+            change_log_normalizer=change_log_normalizer,
+            max_pending_results=max_pending_hierarchies,
+        )
+    finally:
+        hierarchy_queue.put(None)
 
-                if work_item_data.state is not None and work_item_data.state.value == State.Removed.value:
-                    previous_work_item_data.pop(work_item_id, None)
-                    continue
-
-                if work_item_id not in previous_work_item_data:
-                    previous_work_item_data[work_item_id] = work_item_data
-                else:
-                    previous_work_item_data[work_item_id].Merge(work_item_data)
-
-            # Sort changes by feature then epic & id
-            changes.sort(key=lambda change: (change.work_item_id == change.epic_id, change.work_item_id))
-
-            epics_estimated_num = EventInfo()
-            epics_unestimated_num = EventInfo()
-
-            features_estimated_num = EventInfo()
-            features_unestimated_num = EventInfo()
-            features_estimated_size = EventInfo()
-
-            for work_item_data in previous_work_item_data.values():
-                if work_item_data.feature_id is None:
-                    estimated_num = epics_estimated_num
-                    unestimated_num = epics_unestimated_num
-                    estimated_size = None
-
-                else:
-                    estimated_num = features_estimated_num
-                    unestimated_num = features_unestimated_num
-                    estimated_size = features_estimated_size
-
-                attribute_name = EventInfo.StateToAttributeName(work_item_data.state)
-
-                if work_item_data.size is None:
-                    setattr(unestimated_num, attribute_name, getattr(unestimated_num, attribute_name) + 1)
-                else:
-                    setattr(estimated_num, attribute_name, getattr(estimated_num, attribute_name) + 1)
-
-                    if estimated_size is not None:
-                        # We only update the sizes for features
-                        assert work_item_data.feature_id is not None, work_item_data
-
-                        setattr(estimated_size, attribute_name, getattr(estimated_size, attribute_name) + work_item_data.size)
-
-            all_event_results.append(
-                Event(
-                    sorted_date.isoformat(),
-                    epics_estimated_num,
-                    epics_unestimated_num,
-                    features_estimated_num,
-                    features_unestimated_num,
-                    features_estimated_size,
-                    None, # TODO: Team
-                    changes,
-                ),
-            )
+        with YieldProfiledNested(dm, "Organizing events..."):
+            organize_thread.join()
 
-    # Sort titles
-    title_keys = list(titles.keys())
-    title_keys.sort()
+    if organize_exceptions:
+        raise organize_exceptions[0]
 
-    titles = { key: titles[key] for key in title_keys }
+    if not succeeded:
+        return None
 
-    return GenerateEventsResult(titles, all_event_results)
+    with YieldProfiledNested(dm, "Normalizing events..."):
+        generator.Normalize()
+
+    return generator.result
 
 
 # ----------------------------------------------------------------------
@@ -299,3 +614,116 @@ class _WorkItemData(object):
 
         if other.state is not None and (self.state is None or other.dt >= self.dt):
             object.__setattr__(self, "state", other.state)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_EPIC_SERIES_ATTRIBUTE_NAMES: list[str]     = [
+    field.name for field in dataclasses.fields(EpicSeries) if field.name != "dates"
+]
+
+_EVENT_INFO_COUNTER_NAMES: list[str]        = list(EventInfo().__dict__.keys())
+
+_EMPTY_EPIC_VALUES: tuple[int, ...]         = (0, ) * (len(_EPIC_SERIES_ATTRIBUTE_NAMES) * len(_EVENT_INFO_COUNTER_NAMES))
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _CreateEvent(
+    event_date: date,
+    work_item_data_items: dict[str, _WorkItemData],
+    previous_work_item_data: dict[str, _WorkItemData],
+) -> tuple[Event, dict[str, tuple[int, ...]]]:
+    """\
+    Creates the event for the date, updating `previous_work_item_data` with the changes made on that date;
+    the totals of each epic's features (see `EpicSeries`) are calculated as well.
+    """
+
+    changes: list[EventChange] = []
+
+    for work_item_id, work_item_data in work_item_data_items.items():
+        changes.append(
+            EventChange(
+                work_item_id,
+                work_item_data.epic_id,
+                work_item_data.size,
+                work_item_data.state or State.New,
+            ),
+        )
+
+        if work_item_data.state is not None and work_item_data.state.value == State.Removed.value:
+            previous_work_item_data.pop(work_item_id, None)
+            continue
+
+        if work_item_id not in previous_work_item_data:
+            # Copied, as merging changes on later dates must not alter the information associated with this date
+            previous_work_item_data[work_item_id] = dataclasses.replace(work_item_data)
+        else:
+            previous_work_item_data[work_item_id].Merge(work_item_data)
+
+    # Sort changes by feature then epic & id
+    changes.sort(key=lambda change: (change.work_item_id == change.epic_id, change.work_item_id))
+
+    epics_estimated_num = EventInfo()
+    epics_unestimated_num = EventInfo()
+
+    features_estimated_num = EventInfo()
+    features_unestimated_num = EventInfo()
+    features_estimated_size = EventInfo()
+
+    # (features_estimated_num, features_unestimated_num, features_estimated_size) for each epic
+    epic_infos: dict[str, tuple[EventInfo, EventInfo, EventInfo]] = {}
+
+    for work_item_data in previous_work_item_data.values():
+        if work_item_data.feature_id is None:
+            estimated_nums = [epics_estimated_num]
+            unestimated_nums = [epics_unestimated_num]
+            estimated_sizes = []
+
+        else:
+            these_epic_infos = epic_infos.get(work_item_data.epic_id, None)
+            if these_epic_infos is None:
+                these_epic_infos = (EventInfo(), EventInfo(), EventInfo())
+                epic_infos[work_item_data.epic_id] = these_epic_infos
+
+            estimated_nums = [features_estimated_num, these_epic_infos[0]]
+            unestimated_nums = [features_unestimated_num, these_epic_infos[1]]
+            estimated_sizes = [features_estimated_size, these_epic_infos[2]]
+
+        attribute_name = EventInfo.StateToAttributeName(work_item_data.state)
+
+        if work_item_data.size is None:
+            for unestimated_num in unestimated_nums:
+                setattr(unestimated_num, attribute_name, getattr(unestimated_num, attribute_name) + 1)
+        else:
+            for estimated_num in estimated_nums:
+                setattr(estimated_num, attribute_name, getattr(estimated_num, attribute_name) + 1)
+
+            # We only update the sizes for features
+            for estimated_size in estimated_sizes:
+                assert work_item_data.feature_id is not None, work_item_data
+
+                setattr(estimated_size, attribute_name, getattr(estimated_size, attribute_name) + work_item_data.size)
+
+    return (
+        Event(
+            event_date.isoformat(),
+            epics_estimated_num,
+            epics_unestimated_num,
+            features_estimated_num,
+            features_unestimated_num,
+            features_estimated_size,
+            None, # TODO: Team
+            changes,
+        ),
+        {
+            epic_id: tuple(value for event_info in event_infos for value in event_info.__dict__.values())
+            for epic_id, event_infos in epic_infos.items()
+        },
+    )
@@ -15,19 +15,33 @@
 # ----------------------------------------------------------------------
 """Contains the GenerateHierarchies function"""
 
+import json
+import os
+import shutil
 import textwrap
+import threading
 import traceback
+import uuid
 
+from collections import Counter
 from dataclasses import dataclass
-from typing import Callable, cast, Optional
+from pathlib import Path
+from typing import Any, Callable, cast, Optional
+from urllib.parse import quote
 
 from Common_Foundation.Streams.DoneManager import DoneManager
 from Common_Foundation import TextwrapEx
 
 from Common_FoundationEx import ExecuteTasks
 
-from Common.Plugin import Plugin                        # pylint: disable=import-error
-from Common.WorkItem import WorkItem, WorkItemChange    # pylint: disable=import-error
+from Common.ChangeLog import ChangeLog, ChangeLogNormalizer                     # pylint: disable=import-error
+from Common.CoalescingPlugin import CoalescingPlugin                            # pylint: disable=import-error
+from Common.HttpMetrics import YieldRootScope                                   # pylint: disable=import-error
+from Common.Plugin import Plugin                                                # pylint: disable=import-error
+from Common.Profiling import YieldProfiledStage                                 # pylint: disable=import-error
+from Common.Serialization import ToJsonString, WorkItemChangeFromJson, WorkItemFromJson  # pylint: disable=import-error
+from Common.Tracing import YieldSpan                                            # pylint: disable=import-error
+from Common.WorkItem import WorkItem                                            # pylint: disable=import-error
 
 
 # ----------------------------------------------------------------------
@@ -38,7 +52,18 @@ from Common.WorkItem import WorkItem, WorkItemChange    # pylint: disable=import
 @dataclass(frozen=True)
 class HierarchyItem(object):
     work_item: WorkItem
-    changes: list[WorkItemChange]
+    changes: ChangeLog
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def FromJson(
+        cls,
+        data: dict[str, Any],
+    ) -> "HierarchyItem":
+        return cls(
+            WorkItemFromJson(data["work_item"]),
+            ChangeLog(WorkItemChangeFromJson(change) for change in data["changes"]),
+        )
 
 
 # ----------------------------------------------------------------------
@@ -47,6 +72,17 @@ class HierarchyResult(object):
     root: HierarchyItem
     children: list[HierarchyItem]
 
+    # ----------------------------------------------------------------------
+    @classmethod
+    def FromJson(
+        cls,
+        data: dict[str, Any],
+    ) -> "HierarchyResult":
+        return cls(
+            HierarchyItem.FromJson(data["root"]),
+            [HierarchyItem.FromJson(child) for child in data["children"]],
+        )
+
 
 # ----------------------------------------------------------------------
 # |
@@ -57,73 +93,617 @@ def GenerateHierarchies(
     dm: DoneManager,
     plugin: Plugin,
     root_work_item_ids: list[str],
+    *,
+    checkpoint_dir: Optional[Path]=None,
+    resume: bool=False,
+    checkpoint_options: Optional[dict[str, Any]]=None,
+    max_num_threads: Optional[int]=None,
+    change_log_normalizer: Optional[ChangeLogNormalizer]=None,
 ) -> Optional[list[HierarchyResult]]:
+    """\
+    Extracts the hierarchy associated with each root work item.
+
+    When `checkpoint_dir` is provided, each work item is persisted as soon as it has been extracted and each
+    hierarchy is persisted as soon as it is complete. When `resume` is True, persisted information is reused
+    so that only incomplete hierarchies (and the incomplete work items within them) are extracted.
+    `checkpoint_options` are options that affect the information extracted (for example, options used to
+    initialize the plugin); they are persisted with each hierarchy (along with whether changes are
+    normalized), and a resumed extraction must use the same options.
+
+    `max_num_threads` limits the number of hierarchies extracted concurrently (the default is based on the
+    number of cores).
+
+    When `change_log_normalizer` is provided, the changes of each work item are normalized as soon as they
+    have been extracted (see `ChangeLogNormalizer`), and a summary of the changes removed is written once
+    all hierarchies have been extracted.
+    """
+
+    results = _GenerateHierarchiesImpl(
+        dm,
+        plugin,
+        root_work_item_ids,
+        None,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        checkpoint_options=checkpoint_options,
+        max_num_threads=max_num_threads,
+        change_log_normalizer=change_log_normalizer,
+        max_pending_results=None,
+    )
+
+    if results is None:
+        return None
+
+    return cast(list[HierarchyResult], results)
+
+
+# ----------------------------------------------------------------------
+def StreamHierarchies(
+    dm: DoneManager,
+    plugin: Plugin,
+    root_work_item_ids: list[str],
+    on_result_func: Callable[[HierarchyResult], None],
+    *,
+    checkpoint_dir: Optional[Path]=None,
+    resume: bool=False,
+    checkpoint_options: Optional[dict[str, Any]]=None,
+    max_num_threads: Optional[int]=None,
+    change_log_normalizer: Optional[ChangeLogNormalizer]=None,
+    max_pending_results: Optional[int]=None,
+) -> bool:
+    """\
+    Extracts the hierarchy associated with each root work item, passing each hierarchy to `on_result_func` as
+    soon as it is complete (in completion order) rather than retaining it. `on_result_func` may be invoked
+    from multiple threads.
+
+    When `max_pending_results` is provided, hierarchies are passed to `on_result_func` in the order of
+    `root_work_item_ids` (one at a time) instead. Hierarchies completed before those of the roots that
+    precede them are retained until they can be passed, and the extraction of a root doesn't begin while
+    it is `max_pending_results` or more roots beyond the first root whose hierarchy hasn't been passed.
+    Once `on_result_func` raises an exception, extractions that haven't begun fail.
+
+    Peak memory is bounded by the number of hierarchies extracted concurrently (and `max_pending_results`);
+    as a result, work items shared by multiple hierarchies are only coalesced while a fetch is in flight.
+    Returns False if errors were encountered.
+    """
+
+    return _GenerateHierarchiesImpl(
+        dm,
+        plugin,
+        root_work_item_ids,
+        on_result_func,
+        checkpoint_dir=checkpoint_dir,
+        resume=resume,
+        checkpoint_options=checkpoint_options,
+        max_num_threads=max_num_threads,
+        change_log_normalizer=change_log_normalizer,
+        max_pending_results=max_pending_results,
+    ) is not None
+
+
+# ----------------------------------------------------------------------
+def GetCheckpointOptionsMismatch(
+    checkpoint_dir: Path,
+    root_work_item_ids: list[str],
+    *,
+    checkpoint_options: Optional[dict[str, Any]]=None,
+    change_log_normalizer: Optional[ChangeLogNormalizer]=None,
+) -> Optional[str]:
+    """\
+    Returns a description of the first hierarchy persisted in `checkpoint_dir` with options that differ from
+    those provided (see `GenerateHierarchies`), as its extraction can't be resumed. Returns None if the
+    extraction of all hierarchies can be resumed.
+    """
+
+    options = _CreateCheckpointOptions(checkpoint_options, change_log_normalizer)
+
+    for root_work_item_id in dict.fromkeys(root_work_item_ids):
+        persisted_options = _RootCheckpoint.LoadOptions(checkpoint_dir, root_work_item_id)
+
+        if persisted_options is not None and persisted_options != options:
+            return _RootCheckpoint.DescribeOptionsMismatch(root_work_item_id, persisted_options, options)
+
+    return None
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+class _RootCheckpoint(object):
+    """Persists the progress made when extracting the hierarchy of a single root work item"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        checkpoint_dir: Path,
+        root_work_item_id: str,
+        *,
+        resume: bool,
+        options: dict[str, Any],
+    ):
+        root_dir = self.__class__._GetRootDir(checkpoint_dir, root_work_item_id)
+
+        if not resume and root_dir.is_dir():
+            shutil.rmtree(root_dir)
+
+        root_dir.mkdir(parents=True, exist_ok=True)
+
+        persisted_options = self.__class__.LoadOptions(checkpoint_dir, root_work_item_id)
+
+        if persisted_options is None:
+            self.__class__._WriteAtomic(root_dir / "options.json", json.dumps(options))
+        elif persisted_options != options:
+            # Mismatches should have been detected (and reported) via `GetCheckpointOptionsMismatch`
+            raise Exception(self.__class__.DescribeOptionsMismatch(root_work_item_id, persisted_options, options))
+
+        self._result_filename               = root_dir / "result.json"
+        self._children_filename             = root_dir / "children.json"
+        self._items_filename                = root_dir / "items.jsonl"
+
+    # ----------------------------------------------------------------------
+    @classmethod
+    def LoadOptions(
+        cls,
+        checkpoint_dir: Path,
+        root_work_item_id: str,
+    ) -> Optional[dict[str, Any]]:
+        options_filename = cls._GetRootDir(checkpoint_dir, root_work_item_id) / "options.json"
+
+        if not options_filename.is_file():
+            return None
+
+        with options_filename.open(encoding="UTF-8") as f:
+            return json.load(f)
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def DescribeOptionsMismatch(
+        root_work_item_id: str,
+        persisted_options: dict[str, Any],
+        options: dict[str, Any],
+    ) -> str:
+        return "The checkpoint for '{}' was created with different options ({}) than those provided ({}).".format(
+            root_work_item_id,
+            json.dumps(persisted_options, sort_keys=True),
+            json.dumps(options, sort_keys=True),
+        )
+
+    # ----------------------------------------------------------------------
+    def LoadResult(self) -> Optional[HierarchyResult]:
+        if not self._result_filename.is_file():
+            return None
+
+        with self._result_filename.open(encoding="UTF-8") as f:
+            return HierarchyResult.FromJson(json.load(f))
+
+    # ----------------------------------------------------------------------
+    def SaveResult(
+        self,
+        result: HierarchyResult,
+    ) -> None:
+        self.__class__._WriteAtomic(self._result_filename, ToJsonString(result))
+
+    # ----------------------------------------------------------------------
+    def LoadChildren(self) -> Optional[list[str]]:
+        if not self._children_filename.is_file():
+            return None
+
+        with self._children_filename.open(encoding="UTF-8") as f:
+            return json.load(f)
+
+    # ----------------------------------------------------------------------
+    def SaveChildren(
+        self,
+        work_item_ids: list[str],
+    ) -> None:
+        self.__class__._WriteAtomic(self._children_filename, json.dumps(work_item_ids))
+
+    # ----------------------------------------------------------------------
+    def LoadItems(self) -> dict[str, Optional[HierarchyItem]]:
+        results: dict[str, Optional[HierarchyItem]] = {}
+
+        if not self._items_filename.is_file():
+            return results
+
+        with self._items_filename.open(encoding="UTF-8") as f:
+            lines = f.readlines()
+
+        for index, line in enumerate(lines):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be incomplete if the previous run was terminated while writing it;
+                # remove it so that new items aren't appended to the incomplete line.
+                self.__class__._WriteAtomic(self._items_filename, "".join(lines[:index]))
+                break
+
+            item = data["item"]
+            results[data["work_item_id"]] = None if item is None else HierarchyItem.FromJson(item)
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def SaveItem(
+        self,
+        work_item_id: str,
+        item: Optional[HierarchyItem],
+    ) -> None:
+        with self._items_filename.open("a", encoding="UTF-8") as f:
+            f.write(
+                ToJsonString(
+                    {
+                        "work_item_id": work_item_id,
+                        "item": item,
+                    },
+                ),
+            )
+            f.write("\n")
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _GetRootDir(
+        checkpoint_dir: Path,
+        root_work_item_id: str,
+    ) -> Path:
+        return checkpoint_dir / quote(root_work_item_id, safe="")
+
+    # ----------------------------------------------------------------------
+    @staticmethod
+    def _WriteAtomic(
+        filename: Path,
+        content: str,
+    ) -> None:
+        temp_filename = filename.with_name("{}.{}.tmp".format(filename.name, uuid.uuid4().hex))
+
+        with temp_filename.open("w", encoding="UTF-8") as f:
+            f.write(content)
+
+        os.replace(temp_filename, filename)
+
+
+# ----------------------------------------------------------------------
+class _OrderedResults(object):
+    """Passes hierarchies to a function in the order of their roots (see `StreamHierarchies`)"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        max_pending_results: int,
+        on_result_func: Callable[[HierarchyResult], None],
+    ):
+        self._max_pending_results           = max_pending_results
+        self._on_result_func                = on_result_func
+
+        self._condition                     = threading.Condition()
+
+        # Results (None for roots whose extraction failed) by position in the list of roots; results can't
+        # be passed until the results of the roots that precede them have been passed
+        self._pending_results: dict[int, Optional[HierarchyResult]]  = {}
+        self._next_index                    = 0
+
+        self._exception: Optional[Exception]                        = None
+
+    # ----------------------------------------------------------------------
+    def Wait(
+        self,
+        root_index: int,
+    ) -> None:
+        """Waits until the extraction of the root (at the provided position) can begin"""
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._exception is not None or root_index - self._next_index < self._max_pending_results,
+            )
+
+            if self._exception is not None:
+                raise Exception("The hierarchy wasn't extracted, as a previous hierarchy couldn't be processed.")
+
+    # ----------------------------------------------------------------------
+    def Add(
+        self,
+        root_indexes: list[int],
+        result: Optional[HierarchyResult],
+    ) -> None:
+        """Adds the result of a root (at each of its positions), passing the results that are no longer pending"""
+
+        with self._condition:
+            if self._exception is not None:
+                return
+
+            for root_index in root_indexes:
+                self._pending_results[root_index] = result
+
+            try:
+                while self._next_index in self._pending_results:
+                    result = self._pending_results.pop(self._next_index)
+
+                    if result is not None:
+                        self._on_result_func(result)
+
+                    self._next_index += 1
+
+            except Exception as ex:
+                self._exception = ex
+                self._pending_results.clear()
+
+                raise
+
+            finally:
+                self._condition.notify_all()
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _GenerateHierarchiesImpl(
+    dm: DoneManager,
+    plugin: Plugin,
+    root_work_item_ids: list[str],
+    on_result_func: Optional[Callable[[HierarchyResult], None]],
+    *,
+    checkpoint_dir: Optional[Path],
+    resume: bool,
+    checkpoint_options: Optional[dict[str, Any]],
+    max_num_threads: Optional[int],
+    change_log_normalizer: Optional[ChangeLogNormalizer],
+    max_pending_results: Optional[int],
+) -> Optional[list[Optional[HierarchyResult]]]:
+    if resume and checkpoint_dir is None:
+        raise Exception("A checkpoint directory must be provided when resuming.")
+
+    # Work items shared by multiple hierarchies are only fetched once
+    coalescing_plugin = CoalescingPlugin.Create(plugin, retain_results=on_result_func is None)
+    plugin = coalescing_plugin
+
+    # Roots specified multiple times are only extracted once (concurrent extractions of a root would write
+    # to the same checkpoint), and the result is provided for each time the root was specified.
+    unique_root_work_item_ids = list(dict.fromkeys(root_work_item_ids))
+    root_work_item_id_counts = Counter(root_work_item_ids)
+
+    checkpoints: dict[str, _RootCheckpoint] = {}
+
+    if checkpoint_dir is not None:
+        options = _CreateCheckpointOptions(checkpoint_options, change_log_normalizer)
+
+        for root_work_item_id in unique_root_work_item_ids:
+            checkpoints[root_work_item_id] = _RootCheckpoint(checkpoint_dir, root_work_item_id, resume=resume, options=options)
+
+    ordered_results: Optional[_OrderedResults] = None
+    root_work_item_indexes: dict[str, list[int]] = {}
+
+    if on_result_func is not None and max_pending_results is not None:
+        ordered_results = _OrderedResults(max_pending_results, on_result_func)
+
+        for root_index, root_work_item_id in enumerate(root_work_item_ids):
+            root_work_item_indexes.setdefault(root_work_item_id, []).append(root_index)
+
     # ----------------------------------------------------------------------
     def ExecuteTask(
         context: str,
         on_simple_status_func: Callable[[str], None],
-    ) -> tuple[Optional[int], ExecuteTasks.TransformTypes.FuncType[HierarchyResult]]:
+    ) -> tuple[Optional[int], ExecuteTasks.TransformTypes.FuncType[Optional[HierarchyResult]]]:
+        if ordered_results is None:
+            return ExecuteTaskImpl(context, on_simple_status_func)
+
+        root_indexes = root_work_item_indexes[context]
+
+        ordered_results.Wait(root_indexes[0])
+
+        # The results of the roots that follow this one are retained until this root is complete, even if
+        # its extraction fails.
+        try:
+            num_steps, func = ExecuteTaskImpl(context, on_simple_status_func)
+        except Exception:
+            ordered_results.Add(root_indexes, None)
+            raise
+
+        # ----------------------------------------------------------------------
+        def Impl(
+            status: ExecuteTasks.Status,
+        ) -> Optional[HierarchyResult]:
+            assert ordered_results is not None
+
+            try:
+                return func(status)
+            except Exception:
+                ordered_results.Add(root_indexes, None)
+                raise
+
+        # ----------------------------------------------------------------------
+
+        return num_steps, Impl
+
+    # ----------------------------------------------------------------------
+    def ExecuteTaskImpl(
+        context: str,
+        on_simple_status_func: Callable[[str], None],
+    ) -> tuple[Optional[int], ExecuteTasks.TransformTypes.FuncType[Optional[HierarchyResult]]]:
         root_work_item_id = context
         del context
 
-        on_simple_status_func("Extracting work item hierarchy...")
-        hierarchy_work_item_ids: list[str] = list(plugin.EnumChildren(root_work_item_id))
+        # ----------------------------------------------------------------------
+        def Complete(
+            result: HierarchyResult,
+        ) -> Optional[HierarchyResult]:
+            if on_result_func is None:
+                return result
+
+            if ordered_results is not None:
+                ordered_results.Add(root_work_item_indexes[root_work_item_id], result)
+                return None
+
+            for _ in range(root_work_item_id_counts[root_work_item_id]):
+                on_result_func(result)
+
+            return None
+
+        # ----------------------------------------------------------------------
+
+        checkpoint = checkpoints.get(root_work_item_id, None)
+
+        if checkpoint is not None:
+            completed_result = checkpoint.LoadResult()
+            if completed_result is not None:
+                return None, lambda status: Complete(cast(HierarchyResult, completed_result))
+
+        hierarchy_work_item_ids: Optional[list[str]] = None
+
+        if checkpoint is not None:
+            hierarchy_work_item_ids = checkpoint.LoadChildren()
+
+        if hierarchy_work_item_ids is None:
+            on_simple_status_func("Extracting work item hierarchy...")
+
+            with YieldRootScope(root_work_item_id), YieldSpan("Enumerate children", root_id=root_work_item_id) as span:
+                hierarchy_work_item_ids = list(plugin.EnumChildren(root_work_item_id))
+
+                if span is not None:
+                    span.SetAttribute("num_children", len(hierarchy_work_item_ids))
+
+            if checkpoint is not None:
+                checkpoint.SaveChildren(hierarchy_work_item_ids)
+
+        completed_items: dict[str, Optional[HierarchyItem]] = {}
+
+        if checkpoint is not None:
+            completed_items = checkpoint.LoadItems()
 
         # ----------------------------------------------------------------------
         def Impl(
             status: ExecuteTasks.Status,
-        ) -> HierarchyResult:
-            status.OnProgress(0, "Extracting work item info...")
-            root_work_item = plugin.GetWorkItem(root_work_item_id)
-            if root_work_item is None:
-                raise Exception("Root work item is None")
+        ) -> Optional[HierarchyResult]:
+            assert hierarchy_work_item_ids is not None
+
+            # ----------------------------------------------------------------------
+            def GetHierarchyItem(
+                index: int,
+                work_item_id: str,
+                info_status: str,
+                changes_status: str,
+            ) -> Optional[HierarchyItem]:
+                if work_item_id in completed_items:
+                    return completed_items[work_item_id]
+
+                with YieldSpan("Work item", work_item_id=work_item_id, index=index) as span:
+                    status.OnProgress(index, info_status)
+                    work_item = plugin.GetWorkItem(work_item_id)
+
+                    if work_item is None:
+                        hierarchy_item = None
+                    else:
+                        status.OnProgress(index, changes_status)
+
+                        changes = plugin.GetWorkItemChanges(work_item)
+
+                        hierarchy_item = HierarchyItem(
+                            work_item,
+                            ChangeLog(changes) if change_log_normalizer is None else change_log_normalizer.Normalize(changes),
+                        )
+
+                        if span is not None:
+                            span.SetAttribute("num_changes", len(hierarchy_item.changes))
+
+                if checkpoint is not None:
+                    checkpoint.SaveItem(work_item_id, hierarchy_item)
+
+                return hierarchy_item
+
+            # ----------------------------------------------------------------------
+
+            root_item = GetHierarchyItem(
+                0,
+                root_work_item_id,
+                "Extracting work item info...",
+                "Extracting work item changes...",
+            )
 
-            status.OnProgress(0, "Extracting work item changes...")
-            root_work_item_changes = list(plugin.GetWorkItemChanges(root_work_item))
+            if root_item is None:
+                raise Exception("Root work item is None")
 
             hierarchy_results: list[HierarchyItem] = []
 
             for hierarchy_work_item_id in hierarchy_work_item_ids:
-                index = 1 + len(hierarchy_results)
-
-                status.OnProgress(index, "Extracting '{}'...".format(hierarchy_work_item_id))
-                work_item = plugin.GetWorkItem(hierarchy_work_item_id)
-                if work_item is None:
+                hierarchy_item = GetHierarchyItem(
+                    1 + len(hierarchy_results),
+                    hierarchy_work_item_id,
+                    "Extracting '{}'...".format(hierarchy_work_item_id),
+                    "Extracting '{}' changes...".format(hierarchy_work_item_id),
+                )
+
+                if hierarchy_item is None:
                     continue
 
-                status.OnProgress(index, "Extracting '{}' changes...".format(hierarchy_work_item_id))
-                work_item_changes = list(plugin.GetWorkItemChanges(work_item))
+                hierarchy_results.append(hierarchy_item)
 
-                hierarchy_results.append(HierarchyItem(work_item, work_item_changes))
+            result = HierarchyResult(root_item, hierarchy_results)
 
-            return HierarchyResult(
-                HierarchyItem(root_work_item, root_work_item_changes),
-                hierarchy_results,
-            )
+            if checkpoint is not None:
+                checkpoint.SaveResult(result)
+
+            return Complete(result)
+
+        # ----------------------------------------------------------------------
+        def ScopedImpl(
+            status: ExecuteTasks.Status,
+        ) -> Optional[HierarchyResult]:
+            # Attribute requests and spans made while extracting this hierarchy to its root
+            with YieldRootScope(root_work_item_id), YieldSpan("Root", root_id=root_work_item_id):
+                return Impl(status)
 
         # ----------------------------------------------------------------------
 
-        return 1 + len(hierarchy_work_item_ids), Impl
+        return 1 + len(hierarchy_work_item_ids), ScopedImpl
 
     # ----------------------------------------------------------------------
 
-    results = cast(
-        list[HierarchyResult | Exception | None],
-        ExecuteTasks.Transform(
-            dm,
-            "Extracting...",
-            [
-                ExecuteTasks.TaskData(root_work_item_id, root_work_item_id)
-                for root_work_item_id in root_work_item_ids
-            ],
-            ExecuteTask,
-            return_exceptions=True,
+    with YieldProfiledStage("Extracting"):
+        results = cast(
+            list[Optional[HierarchyResult] | Exception],
+            ExecuteTasks.Transform(
+                dm,
+                "Extracting...",
+                [
+                    ExecuteTasks.TaskData(root_work_item_id, root_work_item_id)
+                    for root_work_item_id in unique_root_work_item_ids
+                ],
+                ExecuteTask,
+                max_num_threads=max_num_threads,
+                return_exceptions=True,
+            ),
+        )
+
+    dm.WriteVerbose(
+        textwrap.dedent(
+            """\
+
+            Duplicate fetches avoided:
+
+                {}
+
+            """,
+        ).format(
+            TextwrapEx.Indent(
+                TextwrapEx.CreateTable(
+                    ["Method", "Calls", "Fetches", "Waited on In-Flight", "Avoided"],
+                    [
+                        [method_name, str(counters.calls), str(counters.fetches), str(counters.waits), str(counters.avoided)]
+                        for method_name, counters in coalescing_plugin.counters.items()
+                    ],
+                ),
+                4,
+                skip_first_line=True,
+            ),
         ),
     )
 
-    for root_work_item_id, result in zip(root_work_item_ids, results):
-        assert result is not None
+    if change_log_normalizer is not None:
+        change_log_normalizer.WriteSummary(dm)
 
+    for root_work_item_id, result in zip(unique_root_work_item_ids, results):
         if isinstance(result, Exception):
             if dm.is_debug:
                 error = "\n".join(traceback.format_exception(result))
@@ -145,9 +725,23 @@ def GenerateHierarchies(
 
             continue
 
-        assert isinstance(result, HierarchyResult), result
+        assert (result is None) == (on_result_func is not None), result
+        assert result is None or isinstance(result, HierarchyResult), result
 
     if dm.result != 0:
         return None
 
-    return cast(list[HierarchyResult], results)
+    result_map = dict(zip(unique_root_work_item_ids, cast(list[Optional[HierarchyResult]], results)))
+
+    return [result_map[root_work_item_id] for root_work_item_id in root_work_item_ids]
+
+
+# ----------------------------------------------------------------------
+def _CreateCheckpointOptions(
+    checkpoint_options: Optional[dict[str, Any]],
+    change_log_normalizer: Optional[ChangeLogNormalizer],
+) -> dict[str, Any]:
+    return {
+        **(checkpoint_options or {}),
+        "normalize_changes": change_log_normalizer is not None,
+    }
@@ -0,0 +1,359 @@
+# ----------------------------------------------------------------------
+# |
+# |  MergeEvents.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-22 10:27:46
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to merge the events generated for multiple projects into a single timeline"""
+
+import dataclasses
+import heapq
+import json
+
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Generator, Iterator, Optional, TextIO
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+
+from GenerateEvents import Event, EventInfo                                 # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def MergeEvents(
+    dm: DoneManager,
+    inputs: list[tuple[str, Path]],         # (namespace, GenerateEventsResult filename)
+    output_filename: Path,
+) -> None:
+    """\
+    Merges GenerateEventsResult files into a single GenerateEventsResult written to `output_filename`.
+
+    Events are merged by date; the counts of a merged event are the sum of the counts of each input's most
+    recent event on or before that date. Work item ids are qualified by the input's namespace
+    ("<namespace>:<id>"), and the epic series of each input are included as-is (as epics are not shared
+    across inputs). Inputs are read (and the output is written) incrementally, so memory is bounded by the
+    number of inputs rather than the size of the inputs.
+    """
+
+    namespaces = [namespace for namespace, _ in inputs]
+
+    if len(set(namespaces)) != len(namespaces):
+        raise Exception("Namespaces must be unique ({}).".format(", ".join(namespaces)))
+
+    output_filename.parent.mkdir(parents=True, exist_ok=True)
+
+    with ExitStack() as exit_stack:
+        readers = [
+            _EventsFileReader(exit_stack.enter_context(filename.open(encoding="UTF-8")), namespace)
+            for namespace, filename in inputs
+        ]
+
+        f = exit_stack.enter_context(output_filename.open("w", encoding="UTF-8"))
+
+        with dm.Nested("Merging titles..."):
+            f.write('{"titles": {')
+
+            is_first = True
+
+            for reader in readers:
+                for work_item_id, title in reader.EnumTitles():
+                    if not is_first:
+                        f.write(", ")
+
+                    f.write("{}: {}".format(json.dumps(_Qualify(reader.namespace, work_item_id)), json.dumps(title)))
+                    is_first = False
+
+            f.write("}, ")
+
+        with dm.Nested("Merging events...") as merge_dm:
+            f.write('"events": [')
+
+            num_events = 0
+
+            for event in _MergeEvents(readers):
+                if num_events:
+                    f.write(", ")
+
+                f.write(json.dumps(event))
+                num_events += 1
+
+            f.write("], ")
+
+            merge_dm.WriteVerbose("{} events from {} inputs.\n".format(num_events, len(readers)))
+
+        with dm.Nested("Merging epics..."):
+            f.write('"epics": {')
+
+            is_first = True
+
+            for reader in readers:
+                for epic_id, epic_series in reader.EnumEpics():
+                    if not is_first:
+                        f.write(", ")
+
+                    f.write("{}: {}".format(json.dumps(_Qualify(reader.namespace, epic_id)), json.dumps(epic_series)))
+                    is_first = False
+
+            f.write("}}")
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+class _EventsFileReader(object):
+    """Incrementally reads a json file written from a GenerateEventsResult"""
+
+    _CHUNK_SIZE                             = 64 * 1024
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        f: TextIO,
+        namespace: str,
+    ):
+        self.namespace                      = namespace
+
+        self._f                             = f
+        self._decoder                       = json.JSONDecoder()
+
+        self._buffer                        = ""
+        self._offset                        = 0
+
+    # ----------------------------------------------------------------------
+    def EnumTitles(self) -> Iterator[tuple[str, str]]:
+        self._Expect("{")
+        self._ExpectKey("titles")
+
+        for _ in self._EnumItems("{", "}"):
+            work_item_id = self._ReadValue()
+            self._Expect(":")
+            title = self._ReadValue()
+
+            yield work_item_id, title
+
+        self._Expect(",")
+
+    # ----------------------------------------------------------------------
+    def EnumEvents(self) -> Iterator[dict[str, Any]]:
+        """Must be called after `EnumTitles` has been exhausted"""
+
+        self._ExpectKey("events")
+
+        for _ in self._EnumItems("[", "]"):
+            yield self._ReadValue()
+
+    # ----------------------------------------------------------------------
+    def EnumEpics(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Must be called after `EnumEvents` has been exhausted"""
+
+        # Files written before epic series were generated don't contain them
+        if self._Peek() == ",":
+            self._Expect(",")
+            self._ExpectKey("epics")
+
+            for _ in self._EnumItems("{", "}"):
+                epic_id = self._ReadValue()
+                self._Expect(":")
+                epic_series = self._ReadValue()
+
+                yield epic_id, epic_series
+
+        self._Expect("}")
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _EnumItems(
+        self,
+        open_char: str,
+        close_char: str,
+    ) -> Generator[None, None, None]:
+        """Yields before each item in a json object or array; the item must be consumed by the caller"""
+
+        self._Expect(open_char)
+
+        if self._Peek() == close_char:
+            self._Expect(close_char)
+            return
+
+        while True:
+            yield
+
+            if self._Peek() == close_char:
+                self._Expect(close_char)
+                return
+
+            self._Expect(",")
+
+    # ----------------------------------------------------------------------
+    def _ExpectKey(
+        self,
+        key: str,
+    ) -> None:
+        value = self._ReadValue()
+        if value != key:
+            raise Exception("'{}' was expected but '{}' was found in '{}'.".format(key, value, self._f.name))
+
+        self._Expect(":")
+
+    # ----------------------------------------------------------------------
+    def _Expect(
+        self,
+        value: str,
+    ) -> None:
+        found = self._Peek()
+        if found != value:
+            raise Exception("'{}' was expected but '{}' was found in '{}'.".format(value, found, self._f.name))
+
+        self._offset += 1
+
+    # ----------------------------------------------------------------------
+    def _Peek(self) -> str:
+        """Returns the next non-whitespace character (or an empty string at the end of the file)"""
+
+        while True:
+            while self._offset < len(self._buffer) and self._buffer[self._offset].isspace():
+                self._offset += 1
+
+            if self._offset < len(self._buffer) or not self._ReadChunk():
+                return self._buffer[self._offset:self._offset + 1]
+
+    # ----------------------------------------------------------------------
+    def _ReadValue(self) -> Any:
+        self._Peek()
+
+        while True:
+            try:
+                # Values are strings or containers, so a value that ends at the end of the buffer is complete
+                value, self._offset = self._decoder.raw_decode(self._buffer, self._offset)
+                return value
+            except json.JSONDecodeError:
+                if not self._ReadChunk():
+                    raise
+
+    # ----------------------------------------------------------------------
+    def _ReadChunk(self) -> bool:
+        chunk = self._f.read(self.__class__._CHUNK_SIZE)
+        if not chunk:
+            return False
+
+        # Discard content that has already been consumed
+        self._buffer = self._buffer[self._offset:] + chunk
+        self._offset = 0
+
+        return True
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_EVENT_INFO_ATTRIBUTE_NAMES: list[str]      = [
+    field.name for field in dataclasses.fields(Event) if field.type is EventInfo
+]
+
+_EVENT_INFO_COUNTER_NAMES: list[str]        = list(EventInfo().__dict__.keys())
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _Qualify(
+    namespace: str,
+    work_item_id: str,
+) -> str:
+    return "{}:{}".format(namespace, work_item_id)
+
+
+# ----------------------------------------------------------------------
+def _MergeEvents(
+    readers: list[_EventsFileReader],
+) -> Iterator[dict[str, Any]]:
+    # The counts of the most recent event from each input; inputs without events contribute nothing
+    latest_counts: list[Optional[dict[str, dict[str, Any]]]] = [None] * len(readers)
+
+    current_date: Optional[str] = None
+    current_changes: list[dict[str, Any]] = []
+
+    # ----------------------------------------------------------------------
+    def CreateEvent() -> dict[str, Any]:
+        assert current_date is not None
+
+        event: dict[str, Any] = {"date": current_date}
+
+        for attribute_name in _EVENT_INFO_ATTRIBUTE_NAMES:
+            totals = {counter_name: 0 for counter_name in _EVENT_INFO_COUNTER_NAMES}
+
+            for counts in latest_counts:
+                if counts is None:
+                    continue
+
+                for counter_name in _EVENT_INFO_COUNTER_NAMES:
+                    totals[counter_name] += counts[attribute_name][counter_name]
+
+            event[attribute_name] = totals
+
+        event["team"] = None
+        event["changes"] = current_changes
+
+        return event
+
+    # ----------------------------------------------------------------------
+    def EnumReaderEvents(
+        reader_index: int,
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        for event in readers[reader_index].EnumEvents():
+            yield reader_index, event
+
+    # ----------------------------------------------------------------------
+
+    # Ties are resolved in input order
+    for reader_index, event in heapq.merge(
+        *(EnumReaderEvents(reader_index) for reader_index in range(len(readers))),
+        key=lambda item: item[1]["date"],
+    ):
+        if event["date"] != current_date:
+            if current_date is not None:
+                yield CreateEvent()
+
+            current_date = event["date"]
+            current_changes = []
+
+        namespace = readers[reader_index].namespace
+
+        latest_counts[reader_index] = {
+            attribute_name: event[attribute_name]
+            for attribute_name in _EVENT_INFO_ATTRIBUTE_NAMES
+        }
+
+        for change in event["changes"]:
+            current_changes.append(
+                {
+                    **change,
+                    "work_item_id": _Qualify(namespace, change["work_item_id"]),
+                    "epic_id": _Qualify(namespace, change["epic_id"]),
+                },
+            )
+
+    if current_date is not None:
+        yield CreateEvent()
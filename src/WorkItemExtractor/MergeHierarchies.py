@@ -0,0 +1,212 @@
+# ----------------------------------------------------------------------
+# |
+# |  MergeHierarchies.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-21 08:42:19
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to split root work items into shards and merge the hierarchies extracted for each shard"""
+
+import hashlib
+import json
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+
+from GenerateHierarchies import HierarchyResult                             # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Data
+# |
+# ----------------------------------------------------------------------
+PARTIAL_FORMAT_VERSION                      = 1
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class PartialResult(object):
+    """Hierarchies extracted for a single shard, along with the information required to merge them"""
+
+    # ----------------------------------------------------------------------
+    command_name: str                       # The command that produced the partial result (the merged output is equivalent to this command's output)
+    plugin_name: str
+
+    shard_index: int
+    shard_count: int
+
+    root_work_item_ids: list[str]           # All root work items, in the order that they were provided to the command
+    hierarchies: list[Any]                  # HierarchyResults (or their json representation) for the roots in this shard
+
+    format_version: int                     = PARTIAL_FORMAT_VERSION
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class MergeResult(object):
+    command_name: str
+    plugin_name: str
+
+    # The json representation of HierarchyResults for all roots, in the order that they were provided
+    hierarchies: list[Any]
+
+    # ----------------------------------------------------------------------
+    def ToHierarchyResults(self) -> list[HierarchyResult]:
+        return [HierarchyResult.FromJson(hierarchy) for hierarchy in self.hierarchies]
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def GetShardIndex(
+    work_item_id: str,
+    shard_count: int,
+) -> int:
+    """Returns the shard that the root work item belongs to; the value is the same on every machine"""
+
+    # `hash` isn't used, as its value differs across processes
+    return int.from_bytes(hashlib.sha256(work_item_id.encode("UTF-8")).digest()[:8], "big") % shard_count
+
+
+# ----------------------------------------------------------------------
+def GetShardRootWorkItemIds(
+    root_work_item_ids: list[str],
+    shard_index: int,
+    shard_count: int,
+) -> list[str]:
+    """Returns the root work items that belong to the shard, in their original order"""
+
+    if not 0 <= shard_index < shard_count:
+        raise Exception("The shard index '{}' must be less than the shard count '{}'.".format(shard_index, shard_count))
+
+    return [
+        root_work_item_id
+        for root_work_item_id in root_work_item_ids
+        if GetShardIndex(root_work_item_id, shard_count) == shard_index
+    ]
+
+
+# ----------------------------------------------------------------------
+def MergeHierarchies(
+    dm: DoneManager,
+    partial_filenames: list[Path],
+) -> Optional[MergeResult]:
+    """\
+    Merges the partial results produced by each shard into hierarchies that are identical to those produced
+    by a single invocation that extracted all of the roots. Work items shared by hierarchies in different
+    shards are fetched by each shard; the first occurrence (in root order) is used for all hierarchies.
+    """
+
+    partials: list[PartialResult] = []
+
+    with dm.Nested("Reading {} partial results...".format(len(partial_filenames))):
+        for partial_filename in partial_filenames:
+            with partial_filename.open(encoding="UTF-8") as f:
+                data = json.load(f)
+
+            if not isinstance(data, dict) or data.get("format_version", None) != PARTIAL_FORMAT_VERSION:
+                dm.WriteError("'{}' is not a partial result produced with '--shard-count'.\n".format(partial_filename))
+                continue
+
+            partials.append(PartialResult(**data))
+
+    if dm.result != 0:
+        return None
+
+    if not partials:
+        dm.WriteError("No partial results were provided.\n")
+        return None
+
+    first = partials[0]
+
+    # Validate
+    shards: dict[int, PartialResult] = {}
+
+    for partial_filename, partial in zip(partial_filenames, partials):
+        for attribute_name in ["command_name", "plugin_name", "shard_count", "root_work_item_ids"]:
+            if getattr(partial, attribute_name) != getattr(first, attribute_name):
+                dm.WriteError(
+                    "The '{}' value in '{}' does not match the value in '{}'.\n".format(
+                        attribute_name,
+                        partial_filename,
+                        partial_filenames[0],
+                    ),
+                )
+
+        if partial.shard_index in shards:
+            dm.WriteError("The shard '{}' was provided multiple times ('{}').\n".format(partial.shard_index, partial_filename))
+
+        shards[partial.shard_index] = partial
+
+    for shard_index in range(first.shard_count):
+        if shard_index not in shards:
+            dm.WriteError("The partial result for shard '{}' was not provided.\n".format(shard_index))
+
+    if dm.result != 0:
+        return None
+
+    with dm.Nested("Merging hierarchies..."):
+        # Associate hierarchies with roots
+        root_hierarchies: dict[str, Any] = {}
+
+        for partial in shards.values():
+            shard_root_work_item_ids = GetShardRootWorkItemIds(first.root_work_item_ids, partial.shard_index, partial.shard_count)
+
+            if len(shard_root_work_item_ids) != len(partial.hierarchies):
+                dm.WriteError(
+                    "The shard '{}' contains {} hierarchies, but {} were expected.\n".format(
+                        partial.shard_index,
+                        len(partial.hierarchies),
+                        len(shard_root_work_item_ids),
+                    ),
+                )
+                continue
+
+            for root_work_item_id, hierarchy in zip(shard_root_work_item_ids, partial.hierarchies):
+                root_hierarchies[root_work_item_id] = hierarchy
+
+        if dm.result != 0:
+            return None
+
+        # Order the hierarchies and use a single version of work items that appear in multiple hierarchies
+        items: dict[str, Any] = {}
+
+        # ----------------------------------------------------------------------
+        def Deduplicate(
+            item: dict[str, Any],
+        ) -> dict[str, Any]:
+            return items.setdefault(item["work_item"]["work_item_id"], item)
+
+        # ----------------------------------------------------------------------
+
+        hierarchies: list[Any] = []
+
+        for root_work_item_id in first.root_work_item_ids:
+            hierarchy = root_hierarchies[root_work_item_id]
+
+            hierarchies.append(
+                {
+                    "root": Deduplicate(hierarchy["root"]),
+                    "children": [Deduplicate(child) for child in hierarchy["children"]],
+                },
+            )
+
+    return MergeResult(first.command_name, first.plugin_name, hierarchies)
@@ -0,0 +1,196 @@
+# ----------------------------------------------------------------------
+# |
+# |  Pipeline.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-08 11:37:52
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains types and functionality to execute stages whose outputs are cached in a work directory"""
+
+import hashlib
+import json
+import os
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+
+from Common.Serialization import ToJsonString               # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Stage(object):
+    """A step in the pipeline; the stage's output is reused when its inputs, parameters, and version info are unchanged"""
+
+    # ----------------------------------------------------------------------
+    name: str
+    input_names: list[str]
+    parameters: dict[str, Any]
+
+    # Returns None if errors were encountered (errors should be written to the DoneManager)
+    execute_func: Callable[[DoneManager, list[Any]], Optional[Any]]
+
+    # Converts the json content of a cached output into the objects consumed by downstream stages
+    load_func: Callable[[Any], Any]         = field(default=lambda data: data)
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class StageResult(object):
+    name: str
+    key: str
+    content_hash: str
+    artifact_filename: Path
+    was_cached: bool
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def ExecutePipeline(
+    dm: DoneManager,
+    work_dir: Path,
+    stages: list[Stage],
+    version_info: dict[str, Any],
+    *,
+    force_stage_names: Optional[set[str]]=None,
+) -> Optional[dict[str, StageResult]]:
+    """Executes the stages in order, skipping those whose cached outputs are still valid."""
+
+    force_stage_names = force_stage_names or set()
+
+    stage_names = set()
+
+    for stage in stages:
+        for input_name in stage.input_names:
+            if input_name not in stage_names:
+                raise Exception("The input '{}' for the stage '{}' is not produced by a previous stage.".format(input_name, stage.name))
+
+        stage_names.add(stage.name)
+
+    for force_stage_name in force_stage_names:
+        if force_stage_name not in stage_names:
+            raise Exception("'{}' is not a valid stage name.".format(force_stage_name))
+
+    artifacts_dir = work_dir / "artifacts"
+    records_dir = work_dir / "stages"
+
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    records_dir.mkdir(parents=True, exist_ok=True)
+
+    stage_map: dict[str, Stage] = {stage.name: stage for stage in stages}
+
+    results: dict[str, StageResult] = {}
+    contents: dict[str, Any] = {}
+
+    # ----------------------------------------------------------------------
+    def GetContent(
+        stage_name: str,
+    ) -> Any:
+        content = contents.get(stage_name, None)
+        if content is None:
+            with results[stage_name].artifact_filename.open(encoding="UTF-8") as f:
+                content = stage_map[stage_name].load_func(json.load(f))
+
+            contents[stage_name] = content
+
+        return content
+
+    # ----------------------------------------------------------------------
+
+    for stage in stages:
+        key = hashlib.sha256(
+            json.dumps(
+                {
+                    "stage": stage.name,
+                    "parameters": stage.parameters,
+                    "version_info": version_info,
+                    "inputs": {
+                        input_name: results[input_name].content_hash
+                        for input_name in stage.input_names
+                    },
+                },
+                sort_keys=True,
+            ).encode("UTF-8"),
+        ).hexdigest()
+
+        record_filename = records_dir / "{}.json".format(stage.name)
+
+        was_cached = False
+
+        with dm.Nested(
+            "Stage '{}'...".format(stage.name),
+            lambda: "cached" if was_cached else None,
+        ) as stage_dm:
+            if stage.name not in force_stage_names and record_filename.is_file():
+                with record_filename.open(encoding="UTF-8") as f:
+                    record = json.load(f)
+
+                artifact_filename = artifacts_dir / "{}.json".format(record["content_hash"])
+
+                if record["key"] == key and artifact_filename.is_file():
+                    results[stage.name] = StageResult(stage.name, key, record["content_hash"], artifact_filename, True)
+                    was_cached = True
+
+                    continue
+
+            content = stage.execute_func(stage_dm, [GetContent(input_name) for input_name in stage.input_names])
+            if content is None or stage_dm.result != 0:
+                return None
+
+            content_bytes = ToJsonString(content).encode("UTF-8")
+            content_hash = hashlib.sha256(content_bytes).hexdigest()
+
+            artifact_filename = artifacts_dir / "{}.json".format(content_hash)
+
+            if not artifact_filename.is_file():
+                _WriteAtomic(artifact_filename, content_bytes)
+
+            _WriteAtomic(
+                record_filename,
+                json.dumps(
+                    {
+                        "key": key,
+                        "content_hash": content_hash,
+                    },
+                ).encode("UTF-8"),
+            )
+
+            contents[stage.name] = content
+            results[stage.name] = StageResult(stage.name, key, content_hash, artifact_filename, False)
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _WriteAtomic(
+    filename: Path,
+    content: bytes,
+) -> None:
+    temp_filename = filename.with_name("{}.tmp".format(filename.name))
+
+    with temp_filename.open("wb") as f:
+        f.write(content)
+
+    os.replace(temp_filename, filename)
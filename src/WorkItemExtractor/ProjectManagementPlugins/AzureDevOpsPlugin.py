@@ -16,10 +16,15 @@
 """Contains the Plugin object"""
 
 import textwrap
+import threading
+import time
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import ClassVar, Generator, Optional, Type as PythonType
+from typing import Any, Callable, ClassVar, Generator, Iterable, Optional, Type as PythonType
 from urllib.parse import urljoin
 from urllib3 import Retry
 
@@ -30,8 +35,10 @@ from requests.adapters import HTTPAdapter
 from Common_Foundation.Streams.DoneManager import DoneManager
 from Common_Foundation.Types import overridemethod
 
+from WorkItemExtractor.Common.HttpMetrics import HttpMetrics
 from WorkItemExtractor.Common.Plugin import Plugin as PluginBase
-from WorkItemExtractor.Common.WorkItem import DaysWorkItem, HoursWorkItem, State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange
+from WorkItemExtractor.Common.Tracing import Tracer
+from WorkItemExtractor.Common.WorkItem import DaysWorkItem, HoursWorkItem, State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange, WorkItemNotification
 
 
 # ----------------------------------------------------------------------
@@ -57,7 +64,13 @@ class Plugin(PluginBase):
     feature_size_field_name: ClassVar[str]              = "story_points"
     state_field_name: ClassVar[str]                     = "state"
 
+    supports_revision_counts: ClassVar[bool]            = True
+    supports_notifications: ClassVar[bool]              = True
+
     _session: requests.Session                          = field(init=False)
+    _tracer: Optional[Tracer]                           = field(init=False, default=None)
+    _minimal_history: bool                              = field(init=False, default=False)
+    _revision_cache: "_RevisionCache"                   = field(init=False, compare=False, default_factory=lambda: _RevisionCache())  # pylint: disable=unnecessary-lambda
 
     # ----------------------------------------------------------------------
     # |  Public Methods
@@ -70,7 +83,16 @@ class Plugin(PluginBase):
         api_token: str,
         *,
         api_version: str="7.0",
+        metrics: Optional[HttpMetrics]=None,
+        tracer: Optional[Tracer]=None,
+        minimal_history: bool=False,
     ) -> None:
+        """\
+        When `minimal_history` is True, the changes of work items whose types are extracted are retrieved
+        from work item revisions rather than updates; only the fields that are extracted are requested (see
+        `_GetRevisions`).
+        """
+
         if not url.endswith("/"):
             url += "/"
 
@@ -80,6 +102,20 @@ class Plugin(PluginBase):
         original_url = url; del url         # pylint: disable=multiple-statements
         original_self = self; del self      # pylint: disable=multiple-statements
 
+        # ----------------------------------------------------------------------
+        class InstrumentedRetry(Retry):
+            # ----------------------------------------------------------------------
+            def sleep(self, response=None):
+                start = time.perf_counter()
+
+                super(InstrumentedRetry, self).sleep(response)
+
+                if metrics is not None:
+                    metrics.OnRetry(
+                        response.status if response is not None else None,
+                        time.perf_counter() - start,
+                    )
+
         # ----------------------------------------------------------------------
         class CustomSession(requests.Session):
             # ----------------------------------------------------------------------
@@ -90,27 +126,35 @@ class Plugin(PluginBase):
                 self.headers.update(
                     {
                         "Accept": "application/json",
+                        "Accept-Encoding": "gzip",
                         "Connection": "keep-alive",
                     },
                 )
 
-                self.mount(
-                    "https://",
-                    HTTPAdapter(
-                        max_retries=Retry(
-                            total=7,
-                            backoff_factor=0.5,
-                            allowed_methods=None,
-                            status_forcelist=[429, 500, 502, 504, 504, ],
-                        ),
+                adapter = HTTPAdapter(
+                    max_retries=InstrumentedRetry(
+                        total=7,
+                        backoff_factor=0.5,
+                        allowed_methods=None,
+                        status_forcelist=[429, 500, 502, 504, 504, ],
                     ),
                 )
 
+                self.mount("https://", adapter)
+
+                # Plain http is only used by local servers (for example, Benchmarks/MockAzureDevOpsServer.py)
+                self.mount("http://", adapter)
+
             # ----------------------------------------------------------------------
             def request(self, method, url, *args, **kwargs):
                 if url.startswith("/"):
                     url = url[1:]
 
+                if url.endswith("/updates") or url.endswith("/revisions") or url.startswith("reporting/"):
+                    endpoint = url.rsplit("/", 1)[1]
+                else:
+                    endpoint = url.split("/", 1)[0]
+
                 url = urljoin(original_url, url)
 
                 if "params" not in kwargs:
@@ -119,7 +163,35 @@ class Plugin(PluginBase):
                 if "api-version" not in kwargs["params"]:
                     kwargs["params"]["api-version"] = api_version
 
-                return super(CustomSession, self).request(method, url, *args, **kwargs)
+                if metrics is None and tracer is None:
+                    return super(CustomSession, self).request(method, url, *args, **kwargs)
+
+                with (
+                    tracer.YieldSpan("HTTP {}".format(method), endpoint=endpoint, url=url)
+                    if tracer is not None else nullcontext()
+                ) as span:
+                    with metrics.YieldRequest(endpoint) if metrics is not None else nullcontext() as request_info:
+                        response = super(CustomSession, self).request(method, url, *args, **kwargs)
+
+                        # `tell` returns the number of bytes read from the network, which differs from the
+                        # length of the content when the response is compressed.
+                        num_bytes = getattr(response.raw, "tell", lambda: 0)() or len(response.content)
+
+                        if request_info is not None:
+                            request_info.bytes_received = num_bytes
+                            request_info.succeeded = response.ok
+
+                            if response.status_code == 429:
+                                request_info.status_429s += 1
+
+                    if span is not None:
+                        retries = getattr(response.raw, "retries", None)
+
+                        span.SetAttribute("status_code", response.status_code)
+                        span.SetAttribute("bytes", num_bytes)
+                        span.SetAttribute("retry_count", len(retries.history) if retries is not None else 0)
+
+                return response
 
             # ----------------------------------------------------------------------
             def prepare_request(self, *args, **kwargs):
@@ -133,6 +205,8 @@ class Plugin(PluginBase):
         # ----------------------------------------------------------------------
 
         object.__setattr__(original_self, "_session", CustomSession())
+        object.__setattr__(original_self, "_tracer", tracer)
+        object.__setattr__(original_self, "_minimal_history", minimal_history)
 
     # ----------------------------------------------------------------------
     @overridemethod
@@ -141,36 +215,27 @@ class Plugin(PluginBase):
         *,
         work_item_type: Optional[str]="Epic",
         where_clauses: Optional[list[str]]=None,
-    ) -> list[str]:
-        where_clauses = where_clauses or []
+    ) -> Iterable[str]:
+        """\
+        Work items are returned in order of priority and creation date. Azure DevOps limits the number of
+        work items returned by a query; when there are more root work items than that, the query is
+        partitioned into ranges of work item ids that are queried concurrently, and the work items are
+        generated in order of id as each partition completes (the ordering fields aren't returned by
+        queries, so the results of the partitions can't be merged by priority).
+        """
+
+        where_clauses = list(where_clauses or [])
 
         if work_item_type is not None:
             where_clauses.append("[System.WorkItemType] = '{}'".format(work_item_type))
 
-        response = self._session.post(
-            "wiql",
-            json={
-                "query": textwrap.dedent(
-                    """\
-                    SELECT
-                        [System.Id]
-                    FROM
-                        WorkItems
-                    {where}
-                    ORDER BY
-                        [Microsoft.VSTS.Common.Priority] asc,
-                        [System.CreatedDate] desc
-                    """,
-                ).format(
-                    where="" if not where_clauses else "WHERE {}".format(" AND ".join(where_clauses)),
-                ),
-            },
+        results = self._QueryWorkItemIds(
+            where_clauses,
+            "[Microsoft.VSTS.Common.Priority] asc, [System.CreatedDate] desc",
         )
 
-        response.raise_for_status()
-        response = response.json()
-
-        results: list[str] = [str(work_item["id"]) for work_item in response["workItems"]]
+        if results is None:
+            return self._EnumPartitionedWorkItemIds(where_clauses)
 
         return results
 
@@ -226,8 +291,274 @@ class Plugin(PluginBase):
         response.raise_for_status()
         response = response.json()
 
-        fields = response["fields"]
+        if self._minimal_history and "rev" in response:
+            self._revision_cache.OnRevision(work_item_id, int(response["rev"]))
+
+        return self._CreateWorkItem(work_item_id, response["fields"], work_item_mapping)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        *,
+        work_item_mapping: Optional[dict[str, Optional[PythonType[WorkItem]]]]=None,
+    ) -> Generator[WorkItemChange, None, None]:
+        if work_item_mapping is None:
+            work_item_mapping = self.__class__.DefaultWorkItemTypeMapping
+
+        GetTypeAttributeName, CreateChange = self._GetChangeFuncs(work_item)
+
+        if self._minimal_history and work_item.type in self.__class__._REVISION_WORK_ITEM_TYPES:
+            yield from self._EnumChangesFromRevisions(work_item, GetTypeAttributeName, CreateChange)
+            return
+
+        index = 0
+        page_index = 0
+
+        previously_revised_date: Optional[datetime] = None
+
+        while True:
+            with (
+                self._tracer.YieldSpan("Updates page", work_item_id=work_item.work_item_id, page_index=page_index, skip=index)
+                if self._tracer is not None else nullcontext()
+            ) as span:
+                response = self._session.get(
+                    "workitems/{}/updates".format(work_item.work_item_id),
+                    params={
+                        "$skip": index,
+                    },
+                )
+
+                response.raise_for_status()
+                response = response.json()
+
+                if span is not None:
+                    span.SetAttribute("count", response["count"])
+
+            page_index += 1
+
+            count = response["count"]
+            if count == 0:
+                break
+
+            index += count
+            response = response["value"]
+
+            for response_item in response:
+                revised_date: Optional[datetime] = None
+
+                for name, value in response_item.get("fields", {}).items():
+                    attribute_name = GetTypeAttributeName(name)
+                    if attribute_name is None:
+                        continue
+
+                    if revised_date is None:
+                        try:
+                            revised_date = self.__class__._DatetimeFromString(response_item["revisedDate"])  # pylint: disable=protected-access
+                            previously_revised_date = revised_date
+                        except ValueError:
+                            # Sometimes, ADO will give us a bogus dates for revised date; attempt to find another version.
+                            for potential_attribute_name in [
+                                "System.RevisedDate",
+                                "System.ChangedDate",
+                            ]:
+                                try:
+                                    revised_date = self.__class__._DatetimeFromString(response_item["fields"][potential_attribute_name]["newValue"])  # pylint: disable=protected-access
+                                    break
+                                except ValueError:
+                                    continue
+
+                            if revised_date is None:
+                                assert previously_revised_date is not None, "previously_revised_date is None"
+                                revised_date = previously_revised_date
+
+                    yield CreateChange(revised_date, attribute_name, value.get("newValue", None), value.get("oldValue", None))
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRevisionCounts(
+        self,
+        work_item_ids: list[str],
+        *,
+        work_item_mapping: Optional[dict[str, Optional[PythonType[WorkItem]]]]=None,
+    ) -> dict[str, Optional[int]]:
+        if work_item_mapping is None:
+            work_item_mapping = self.__class__.DefaultWorkItemTypeMapping
+
+        results: dict[str, Optional[int]] = {}
+
+        for index in range(0, len(work_item_ids), self.__class__._MAX_BATCH_SIZE):  # pylint: disable=protected-access
+            response = self._session.post(
+                "workitemsbatch",
+                json={
+                    "ids": [int(work_item_id) for work_item_id in work_item_ids[index:index + self.__class__._MAX_BATCH_SIZE]],  # pylint: disable=protected-access
+                    "fields": ["System.Id", "System.Rev", "System.WorkItemType"],
+                    # Work items that don't exist are returned as null rather than failing the request
+                    "errorPolicy": "omit",
+                },
+            )
+
+            response.raise_for_status()
+            response = response.json()
+
+            for response_item in response["value"]:
+                if response_item is None:
+                    continue
+
+                fields = response_item["fields"]
+
+                # Changes aren't extracted for work items whose types map to None
+                if fields["System.WorkItemType"] in work_item_mapping and work_item_mapping[fields["System.WorkItemType"]] is None:
+                    revision_count = None
+                else:
+                    revision_count = int(fields["System.Rev"])
+
+                    if self._minimal_history:
+                        self._revision_cache.OnRevision(str(response_item["id"]), revision_count)
+
+                results[str(response_item["id"])] = revision_count
+
+        return results
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def ParseNotification(
+        self,
+        payload: dict[str, Any],
+        *,
+        work_item_mapping: Optional[dict[str, Optional[PythonType[WorkItem]]]]=None,
+    ) -> Optional[WorkItemNotification]:
+        """Parses the payload of a 'workitem.created' or 'workitem.updated' service hook (webhook)"""
+
+        if work_item_mapping is None:
+            work_item_mapping = self.__class__.DefaultWorkItemTypeMapping
+
+        event_type = payload.get("eventType", None)
+        resource = payload.get("resource", None)
+
+        if resource is None:
+            return None
+
+        if event_type == "workitem.created":
+            # The resource is the work item; every field was set by the revision
+            work_item_id = str(resource["id"])
+            fields = resource["fields"]
+
+            field_changes = {name: {"newValue": value} for name, value in fields.items()}
+
+        elif event_type == "workitem.updated":
+            # The resource is the update (in the format returned by the updates endpoint); the work item
+            # after the update is provided as the update's revision.
+            work_item_id = str(resource["workItemId"])
+            fields = resource["revision"]["fields"]
+
+            field_changes = resource.get("fields", {})
+
+        else:
+            return None
+
+        # The revised date of the latest revision is '9999-01-01'; the changed date of the work item is
+        # the date of the revision.
+        revised_date: Optional[datetime] = None
+
+        for potential_value in [
+            resource.get("revisedDate", None),
+            fields.get("System.ChangedDate", None),
+            fields.get("System.CreatedDate", None),
+        ]:
+            if potential_value is None:
+                continue
+
+            try:
+                revised_date = self.__class__._DatetimeFromString(potential_value)
+                break
+            except ValueError:
+                continue
 
+        if revised_date is None:
+            raise Exception("The notification for '{}' does not contain a valid date.".format(work_item_id))
+
+        work_item = self._CreateWorkItem(work_item_id, fields, work_item_mapping)
+
+        changes: list[WorkItemChange] = []
+
+        if work_item is not None:
+            GetTypeAttributeName, CreateChange = self._GetChangeFuncs(work_item)
+
+            for name, value in field_changes.items():
+                attribute_name = GetTypeAttributeName(name)
+                if attribute_name is None:
+                    continue
+
+                changes.append(CreateChange(revised_date, attribute_name, value.get("newValue", None), value.get("oldValue", None)))
+
+        parent_id = fields.get("System.Parent", None)
+
+        return WorkItemNotification(
+            work_item_id,
+            int(resource["rev"]),
+            None if parent_id is None else str(parent_id),
+            work_item,
+            changes,
+        )
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Types
+    # |
+    # ----------------------------------------------------------------------
+    _ITEM_ATTRIBUTE_TO_ADO_MAP: ClassVar[
+        dict[
+            tuple[
+                PythonType[WorkItem],       # Matching type
+                str,                        # Attribute name for type
+            ],
+            str | list[str],                # ADO Type or Types
+        ]
+    ]                                       = {
+        (WorkItem, "title"): "System.Title",
+        (WorkItem, "dt"): "System.CreatedDate",
+        (WorkItem, "state"): "System.State",
+        (WorkItem, "type"): "System.WorkItemType",
+        (StoryPointsWorkItem, "story_points"): ["Microsoft.VSTS.Scheduling.Effort", "Microsoft.VSTS.Scheduling.StoryPoints"],
+        (TeeShirtWorkItem, "estimate"): "Custom.EffortasTShirtSize",
+        (DaysWorkItem, "days"): "Microsoft.VSTS.Scheduling.Effort",
+        (HoursWorkItem, "hours"): "Microsoft.VSTS.Scheduling.Effort",
+    }
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Data
+    # |
+    # ----------------------------------------------------------------------
+    _MAX_BATCH_SIZE: ClassVar[int]          = 200   # Maximum number of ids accepted by the workitemsbatch endpoint
+
+    _MAX_WIQL_RESULTS: ClassVar[int]        = 20000 # Maximum number of work items returned by a wiql query
+    _WIQL_LIMIT_ERROR_CODE: ClassVar[str]   = "VS402337"
+    _MAX_WIQL_THREADS: ClassVar[int]        = 8     # Maximum number of partitioned wiql queries in flight
+    _WIQL_PARTITION_SPLIT: ClassVar[int]    = 4     # Number of partitions created when a partition exceeds the limit
+
+    _MAX_REVISIONS_PAGE_SIZE: ClassVar[int] = 1000  # Maximum number of revisions returned by a single reporting request
+
+    # Work item types whose revisions are retrieved from the reporting endpoint (see `_GetRevisions`)
+    _REVISION_WORK_ITEM_TYPES: ClassVar[list[str]]  = [
+        work_item_type
+        for work_item_type, python_type in DefaultWorkItemTypeMapping.items()
+        if python_type is not None
+    ]
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _CreateWorkItem(
+        self,
+        work_item_id: str,
+        fields: dict[str, Any],
+        work_item_mapping: dict[str, Optional[PythonType[WorkItem]]],
+    ) -> Optional[WorkItem]:
         # ----------------------------------------------------------------------
         class DoesNotExist(object):
             pass
@@ -273,16 +604,13 @@ class Plugin(PluginBase):
         )
 
     # ----------------------------------------------------------------------
-    @overridemethod
-    def GetWorkItemChanges(
+    def _GetChangeFuncs(
         self,
         work_item: WorkItem,
-        *,
-        work_item_mapping: Optional[dict[str, Optional[PythonType[WorkItem]]]]=None,
-    ) -> Generator[WorkItemChange, None, None]:
-        if work_item_mapping is None:
-            work_item_mapping = self.__class__.DefaultWorkItemTypeMapping
-
+    ) -> tuple[
+        Callable[[str], Optional[str]],                             # Returns the attribute name for an ADO field
+        Callable[[datetime, str, Any, Any], WorkItemChange],        # Creates a change
+    ]:
         current_type: PythonType[WorkItem] = type(work_item)
 
         # ----------------------------------------------------------------------
@@ -304,94 +632,320 @@ class Plugin(PluginBase):
             return None
 
         # ----------------------------------------------------------------------
+        def CreateChange(
+            revised_date: datetime,
+            attribute_name: str,
+            new_value: Any,
+            old_value: Any,
+        ) -> WorkItemChange:
+            if attribute_name in ["System.State", "state"]:
+                new_value = self.__class__._ToState(new_value)                      # pylint: disable=protected-access
+                old_value = self.__class__._ToState(old_value)                      # pylint: disable=protected-access
+            elif isinstance(work_item, TeeShirtWorkItem) and attribute_name == "estimate":
+                if new_value is not None:
+                    new_value = TeeShirtWorkItem.Size.FromString(new_value)
+                if old_value is not None:
+                    old_value = TeeShirtWorkItem.Size.FromString(old_value)
+
+            return WorkItemChange(revised_date, attribute_name, new_value, old_value)
 
-        index = 0
+        # ----------------------------------------------------------------------
 
-        previously_revised_date: Optional[datetime] = None
+        return GetTypeAttributeName, CreateChange
 
-        while True:
-            response = self._session.get(
-                "workitems/{}/updates".format(work_item.work_item_id),
-                params={
-                    "$skip": index,
-                },
-            )
+    # ----------------------------------------------------------------------
+    def _QueryWorkItemIds(
+        self,
+        where_clauses: list[str],
+        order_by: str,
+        *,
+        top: Optional[int]=None,
+    ) -> Optional[list[str]]:
+        """Returns the ids of the work items that match the query, or None if they exceed the wiql limit"""
 
-            response.raise_for_status()
-            response = response.json()
+        response = self._session.post(
+            "wiql",
+            params={} if top is None else {"$top": top},
+            json={
+                "query": textwrap.dedent(
+                    """\
+                    SELECT
+                        [System.Id]
+                    FROM
+                        WorkItems
+                    {where}
+                    ORDER BY
+                        {order_by}
+                    """,
+                ).format(
+                    where="" if not where_clauses else "WHERE {}".format(" AND ".join(where_clauses)),
+                    order_by=order_by,
+                ),
+            },
+        )
 
-            count = response["count"]
-            if count == 0:
-                break
+        if response.status_code == 400 and self.__class__._WIQL_LIMIT_ERROR_CODE in response.text:
+            return None
 
-            index += count
-            response = response["value"]
+        response.raise_for_status()
+        response = response.json()
 
-            for response_item in response:
-                revised_date: Optional[datetime] = None
+        results: list[str] = [str(work_item["id"]) for work_item in response["workItems"]]
+
+        # Some servers truncate the results rather than returning an error
+        if top is None and len(results) >= self.__class__._MAX_WIQL_RESULTS:
+            return None
+
+        return results
+
+    # ----------------------------------------------------------------------
+    def _EnumPartitionedWorkItemIds(
+        self,
+        where_clauses: list[str],
+    ) -> Generator[str, None, None]:
+        """\
+        Generates the ids of the work items that match the query in order of id by querying ranges of ids
+        concurrently; ranges whose results exceed the wiql limit are split and queried again. Ids are
+        generated as soon as the preceding ranges have completed.
+        """
+
+        max_id_results = self._QueryWorkItemIds(where_clauses, "[System.Id] desc", top=1)
+        assert max_id_results is not None
+
+        if not max_id_results:
+            return
+
+        # ----------------------------------------------------------------------
+        def SplitRange(
+            min_id: int,
+            max_id: int,
+            num_partitions: int,
+        ) -> list[tuple[int, int]]:
+            partition_size = max(1, -(-(max_id - min_id + 1) // num_partitions))
+
+            return [
+                (partition_min_id, min(partition_min_id + partition_size - 1, max_id))
+                for partition_min_id in range(min_id, max_id + 1, partition_size)
+            ]
+
+        # ----------------------------------------------------------------------
+
+        with ThreadPoolExecutor(self.__class__._MAX_WIQL_THREADS) as executor:
+            # ----------------------------------------------------------------------
+            def Submit(
+                min_id: int,
+                max_id: int,
+            ) -> tuple[int, int, Future]:
+                return (
+                    min_id,
+                    max_id,
+                    executor.submit(
+                        self._QueryWorkItemIds,
+                        [
+                            *where_clauses,
+                            "[System.Id] >= {}".format(min_id),
+                            "[System.Id] <= {}".format(max_id),
+                        ],
+                        "[System.Id] asc",
+                    ),
+                )
+
+            # ----------------------------------------------------------------------
+
+            # Partitions are processed in order of id
+            partitions = deque(
+                Submit(min_id, max_id)
+                for min_id, max_id in SplitRange(1, int(max_id_results[0]), self.__class__._MAX_WIQL_THREADS)
+            )
+
+            try:
+                while partitions:
+                    min_id, max_id, future = partitions.popleft()
+
+                    results = future.result()
+
+                    if results is None:
+                        if min_id == max_id:
+                            raise Exception("The query for the work item '{}' exceeds the wiql limit.".format(min_id))
+
+                        partitions.extendleft(
+                            reversed(
+                                [
+                                    Submit(partition_min_id, partition_max_id)
+                                    for partition_min_id, partition_max_id in SplitRange(
+                                        min_id,
+                                        max_id,
+                                        self.__class__._WIQL_PARTITION_SPLIT,
+                                    )
+                                ],
+                            ),
+                        )
 
-                for name, value in response_item.get("fields", {}).items():
-                    attribute_name = GetTypeAttributeName(name)
-                    if attribute_name is None:
                         continue
 
-                    if revised_date is None:
-                        try:
-                            revised_date = self.__class__._DatetimeFromString(response_item["revisedDate"])  # pylint: disable=protected-access
-                            previously_revised_date = revised_date
-                        except ValueError:
-                            # Sometimes, ADO will give us a bogus dates for revised date; attempt to find another version.
-                            for potential_attribute_name in [
-                                "System.RevisedDate",
-                                "System.ChangedDate",
-                            ]:
-                                try:
-                                    revised_date = self.__class__._DatetimeFromString(response_item["fields"][potential_attribute_name]["newValue"])  # pylint: disable=protected-access
-                                    break
-                                except ValueError:
-                                    continue
+                    yield from results
+            finally:
+                for _, _, future in partitions:
+                    future.cancel()
 
-                            if revised_date is None:
-                                assert previously_revised_date is not None, "previously_revised_date is None"
-                                revised_date = previously_revised_date
+    # ----------------------------------------------------------------------
+    def _EnumChangesFromRevisions(
+        self,
+        work_item: WorkItem,
+        get_type_attribute_name_func: Callable[[str], Optional[str]],
+        create_change_func: Callable[[datetime, str, Any, Any], WorkItemChange],
+    ) -> Generator[WorkItemChange, None, None]:
+        """Generates changes by comparing the extracted fields of consecutive revisions"""
 
-                    new_value = value.get("newValue", None)
-                    old_value = value.get("oldValue", None)
+        previous_fields: dict[str, Any] = {}
+        previously_revised_date: Optional[datetime] = None
 
-                    if attribute_name in ["System.State", "state"]:
-                        new_value = self.__class__._ToState(value["newValue"])              # pylint: disable=protected-access
-                        old_value = self.__class__._ToState(value.get("oldValue", None))    # pylint: disable=protected-access
-                    elif isinstance(work_item, TeeShirtWorkItem) and attribute_name == "estimate":
-                        if new_value is not None:
-                            new_value = TeeShirtWorkItem.Size.FromString(new_value)
-                        if old_value is not None:
-                            old_value = TeeShirtWorkItem.Size.FromString(old_value)
+        for fields in self._GetRevisions(work_item.work_item_id):
+            # The revision's revised date corresponds to the revised date of the update that created it
+            revised_date: Optional[datetime] = None
 
-                    yield WorkItemChange(revised_date, attribute_name, new_value, old_value)
+            for potential_attribute_name in [
+                "System.RevisedDate",
+                "System.ChangedDate",
+            ]:
+                try:
+                    revised_date = self.__class__._DatetimeFromString(fields[potential_attribute_name])
+                except (KeyError, ValueError):
+                    continue
+
+                if potential_attribute_name == "System.RevisedDate":
+                    previously_revised_date = revised_date
+
+                break
+
+            if revised_date is None:
+                assert previously_revised_date is not None, "previously_revised_date is None"
+                revised_date = previously_revised_date
+
+            # Fields are processed in the order returned (as is done with updates), followed by fields that were removed
+            for name in [*fields.keys(), *(name for name in previous_fields.keys() if name not in fields)]:
+                new_value = fields.get(name, None)
+                old_value = previous_fields.get(name, None)
+
+                if new_value == old_value:
+                    continue
+
+                attribute_name = get_type_attribute_name_func(name)
+                if attribute_name is None:
+                    continue
+
+                yield create_change_func(revised_date, attribute_name, new_value, old_value)
+
+            previous_fields = fields
 
     # ----------------------------------------------------------------------
-    # |
-    # |  Private Types
-    # |
+    def _GetRevisions(
+        self,
+        work_item_id: str,
+    ) -> list[dict[str, Any]]:
+        """\
+        Returns the extracted fields of the revisions of the work item that change them.
+
+        The revisions endpoint of a work item doesn't support requesting specific fields, so the revisions of
+        the work item types that are extracted are retrieved from the reporting endpoint (which does) and
+        cached. The cache is loaded once and is only brought up to date (with the revisions created since it
+        was last updated) when a work item is known to have revisions that it doesn't contain (see
+        `GetWorkItem` and `GetRevisionCounts`); concurrent requests share a single update, and the cache
+        isn't locked while revisions are retrieved.
+        """
+
+        cache = self._revision_cache
+
+        with cache.lock:
+            # Updates that begin after this point contain all of the work item's existing revisions
+            min_update_index = cache.num_started_updates + 1
+
+        while True:
+            with cache.lock:
+                if cache.completed_update_index is not None and (
+                    cache.completed_update_index >= min_update_index
+                    or cache.latest_revisions.get(work_item_id, 0) >= cache.required_revisions.get(work_item_id, 0)
+                ):
+                    revisions = cache.revisions.get(work_item_id, {})
+                    return [revisions[revision] for revision in sorted(revisions.keys())]
+
+                update_event = cache.update_event
+                is_updater = update_event is None
+
+                if update_event is None:
+                    update_event = threading.Event()
+
+                    cache.update_event = update_event
+                    cache.num_started_updates += 1
+
+                    update_index = cache.num_started_updates
+
+            if not is_updater:
+                update_event.wait()
+                continue
+
+            try:
+                self._UpdateRevisionCache()
+
+                with cache.lock:
+                    cache.completed_update_index = update_index
+            finally:
+                with cache.lock:
+                    cache.update_event = None
+
+                update_event.set()
+
     # ----------------------------------------------------------------------
-    _ITEM_ATTRIBUTE_TO_ADO_MAP: ClassVar[
-        dict[
-            tuple[
-                PythonType[WorkItem],       # Matching type
-                str,                        # Attribute name for type
-            ],
-            str | list[str],                # ADO Type or Types
-        ]
-    ]                                       = {
-        (WorkItem, "title"): "System.Title",
-        (WorkItem, "dt"): "System.CreatedDate",
-        (WorkItem, "state"): "System.State",
-        (WorkItem, "type"): "System.WorkItemType",
-        (StoryPointsWorkItem, "story_points"): ["Microsoft.VSTS.Scheduling.Effort", "Microsoft.VSTS.Scheduling.StoryPoints"],
-        (TeeShirtWorkItem, "estimate"): "Custom.EffortasTShirtSize",
-        (DaysWorkItem, "days"): "Microsoft.VSTS.Scheduling.Effort",
-        (HoursWorkItem, "hours"): "Microsoft.VSTS.Scheduling.Effort",
-    }
+    def _UpdateRevisionCache(self) -> None:
+        """Retrieves the revisions created since the cache was last updated; only one update is made at a time"""
+
+        query_fields: list[str] = []
+
+        for field_values in self.__class__._ITEM_ATTRIBUTE_TO_ADO_MAP.values():
+            if isinstance(field_values, str):
+                field_values = [field_values, ]
+
+            for field_value in field_values:
+                if field_value not in query_fields:
+                    query_fields.append(field_value)
+
+        page_index = 0
+
+        while True:
+            with (
+                self._tracer.YieldSpan("Revisions page", page_index=page_index)
+                if self._tracer is not None else nullcontext()
+            ) as span:
+                params: dict[str, Any] = {
+                    "fields": ",".join([*query_fields, "System.RevisedDate", "System.ChangedDate"]),
+                    "types": ",".join(self.__class__._REVISION_WORK_ITEM_TYPES),
+                    "$maxPageSize": self.__class__._MAX_REVISIONS_PAGE_SIZE,
+                }
+
+                # The continuation token of the last batch is used to retrieve the revisions created since then
+                if self._revision_cache.continuation_token is not None:
+                    params["continuationToken"] = self._revision_cache.continuation_token
+
+                response = self._session.get("reporting/workitemrevisions", params=params)
+
+                response.raise_for_status()
+                response = response.json()
+
+                if span is not None:
+                    span.SetAttribute("count", len(response["values"]))
+
+            page_index += 1
+
+            with self._revision_cache.lock:
+                for revision in response["values"]:
+                    self._revision_cache.Add(str(revision["id"]), revision["rev"], revision.get("fields", {}))
+
+                self._revision_cache.continuation_token = response.get("continuationToken", self._revision_cache.continuation_token)
+
+            # Batches may contain fewer revisions than the maximum page size, so only the server can indicate
+            # that all revisions have been retrieved.
+            if response.get("isLastBatch", not response["values"]):
+                break
 
     # ----------------------------------------------------------------------
     # ----------------------------------------------------------------------
@@ -428,3 +982,74 @@ class Plugin(PluginBase):
             return state
 
         assert False, state
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+@dataclass
+class _RevisionCache(object):
+    """The extracted fields of work item revisions retrieved from the reporting endpoint"""
+
+    # ----------------------------------------------------------------------
+    lock: threading.Lock                                = field(default_factory=threading.Lock)
+
+    # Extracted fields keyed by work item id and revision; only revisions that change the extracted fields
+    # (other than the revision dates) are retained.
+    revisions: dict[str, dict[int, dict[str, Any]]]     = field(default_factory=dict)
+
+    # The latest revision retrieved for each work item
+    latest_revisions: dict[str, int]                    = field(default_factory=dict)
+
+    # The latest revision of each work item known to exist
+    required_revisions: dict[str, int]                  = field(default_factory=dict)
+
+    continuation_token: Optional[str]                   = None
+
+    # Updates are numbered in the order that they begin
+    num_started_updates: int                            = 0
+    completed_update_index: Optional[int]               = None
+    update_event: Optional[threading.Event]             = None      # Set when the update in flight completes
+
+    # ----------------------------------------------------------------------
+    def OnRevision(
+        self,
+        work_item_id: str,
+        revision: int,
+    ) -> None:
+        """Notes that the revision of the work item exists"""
+
+        with self.lock:
+            if revision > self.required_revisions.get(work_item_id, 0):
+                self.required_revisions[work_item_id] = revision
+
+    # ----------------------------------------------------------------------
+    def Add(
+        self,
+        work_item_id: str,
+        revision: int,
+        fields: dict[str, Any],
+    ) -> None:
+        """Adds a revision; must be called with the lock held"""
+
+        if revision > self.latest_revisions.get(work_item_id, 0):
+            self.latest_revisions[work_item_id] = revision
+
+        revisions = self.revisions.setdefault(work_item_id, {})
+
+        if revisions:
+            previous_fields = revisions[max(revisions.keys())]
+
+            if all(
+                fields.get(name, None) == previous_fields.get(name, None)
+                for name in set(fields).union(previous_fields)
+                if name not in self.__class__._DATE_FIELD_NAMES
+            ):
+                return
+
+        revisions[revision] = fields
+
+    # ----------------------------------------------------------------------
+    _DATE_FIELD_NAMES: ClassVar[set[str]]               = {"System.RevisedDate", "System.ChangedDate"}
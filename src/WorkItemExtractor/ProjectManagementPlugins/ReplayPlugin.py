@@ -0,0 +1,173 @@
+# ----------------------------------------------------------------------
+# |
+# |  ReplayPlugin.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-10 15:41:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains the Plugin object"""
+
+import json
+import random
+import threading
+import time
+import zipfile
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar, Generator, Optional
+from urllib.parse import parse_qs
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation.Types import overridemethod
+
+from WorkItemExtractor.Common.Plugin import Plugin as PluginBase
+from WorkItemExtractor.Common.RecordingPlugin import FIXTURE_FORMAT_VERSION, GetEntryName, GetRootWorkItemsKey, METADATA_ENTRY_NAME
+from WorkItemExtractor.Common.Serialization import WorkItemChangeFromJson, WorkItemFromJson
+from WorkItemExtractor.Common.WorkItem import WorkItem, WorkItemChange
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Plugin(PluginBase):
+    """Serves work items recorded with '--record' from a fixture archive; url: '<archive>[?latency=<secs>&jitter=<secs>&seed=<int>]'."""
+
+    # ----------------------------------------------------------------------
+    # |  Public Data
+    name: ClassVar[str]                                 = "Replay"
+
+    # These values are replaced by those of the recorded plugin during initialization
+    epic_size_field_name: str                           = field(init=False, default="estimate")
+    feature_size_field_name: str                        = field(init=False, default="story_points")
+    state_field_name: str                               = field(init=False, default="state")
+
+    _archive: zipfile.ZipFile                           = field(init=False)
+    _lock: threading.Lock                               = field(init=False, default_factory=threading.Lock)
+
+    _latency: float                                     = field(init=False, default=0.0)
+    _jitter: float                                      = field(init=False, default=0.0)
+    _random: random.Random                              = field(init=False, default_factory=random.Random)
+
+    # ----------------------------------------------------------------------
+    # |  Public Methods
+    @overridemethod
+    def Initialize(
+        self,
+        verbose_dm: DoneManager,
+        url: str,
+        username: str,
+        api_token: str,
+        **kwargs,
+    ) -> None:
+        # The url is in the form "<archive_filename>[?<query>]"; the command line ensures that it ends with a '/'
+        archive_filename, _, query_string = url.rstrip("/").partition("?")
+
+        archive_filename = Path(archive_filename.rstrip("/"))
+        query = parse_qs(query_string)
+
+        if not archive_filename.is_file():
+            raise Exception("The fixture archive '{}' does not exist.".format(archive_filename))
+
+        archive = zipfile.ZipFile(archive_filename)
+
+        metadata = json.loads(archive.read(METADATA_ENTRY_NAME))
+
+        if metadata["format_version"] != FIXTURE_FORMAT_VERSION:
+            raise Exception(
+                "The fixture archive '{}' has a format version of '{}' ('{}' was expected).".format(
+                    archive_filename,
+                    metadata["format_version"],
+                    FIXTURE_FORMAT_VERSION,
+                ),
+            )
+
+        verbose_dm.WriteVerbose(
+            "Replaying '{}' (version {}) from '{}'.\n".format(
+                metadata["plugin_name"],
+                metadata["plugin_version"],
+                archive_filename,
+            ),
+        )
+
+        for attribute_name in [
+            "epic_size_field_name",
+            "feature_size_field_name",
+            "state_field_name",
+        ]:
+            object.__setattr__(self, attribute_name, metadata[attribute_name])
+
+        object.__setattr__(self, "_archive", archive)
+        object.__setattr__(self, "_latency", float(query.get("latency", ["0"])[0]))
+        object.__setattr__(self, "_jitter", float(query.get("jitter", ["0"])[0]))
+
+        seed = query.get("seed", None)
+        if seed is not None:
+            self._random.seed(int(seed[0]))
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetRootWorkItems(self, **kwargs) -> list[str]:
+        return self._Read(GetEntryName("GetRootWorkItems", GetRootWorkItemsKey(kwargs)))
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def EnumChildren(
+        self,
+        root_id: str,
+        **kwargs,
+    ) -> Generator[str, None, None]:
+        yield from self._Read(GetEntryName("EnumChildren", root_id))
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItem(
+        self,
+        work_item_id: str,
+        **kwargs,
+    ) -> Optional[WorkItem]:
+        content = self._Read(GetEntryName("GetWorkItem", work_item_id))
+        if content is None:
+            return None
+
+        return WorkItemFromJson(content)
+
+    # ----------------------------------------------------------------------
+    @overridemethod
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        **kwargs,
+    ) -> Generator[WorkItemChange, None, None]:
+        for change in self._Read(GetEntryName("GetWorkItemChanges", work_item.work_item_id)):
+            yield WorkItemChangeFromJson(change)
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _Read(
+        self,
+        entry_name: str,
+    ) -> Any:
+        if self._latency or self._jitter:
+            with self._lock:
+                delay = max(0.0, self._latency + self._random.uniform(-self._jitter, self._jitter))
+
+            time.sleep(delay)
+
+        with self._lock:
+            try:
+                content = self._archive.read(entry_name)
+            except KeyError:
+                raise Exception("'{}' was not recorded.".format(entry_name)) from None
+
+        return json.loads(content)
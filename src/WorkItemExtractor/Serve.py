@@ -0,0 +1,1068 @@
+# ----------------------------------------------------------------------
+# |
+# |  Serve.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-24 09:12:08
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Contains functionality to serve events over http, refreshing them incrementally while the service is running"""
+
+import base64
+import bisect
+import datetime
+import gzip
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import textwrap
+import threading
+import time
+import traceback
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, cast, Optional, TypeVar
+from urllib.parse import parse_qs, urlparse
+
+from Common_Foundation.Streams.DoneManager import DoneManager
+from Common_Foundation import TextwrapEx
+
+from Common_FoundationEx import ExecuteTasks
+
+from ChunkedEvents import CreateChunks, CreateManifest, MANIFEST_FILENAME   # type: ignore; pylint: disable=import-error
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.CoalescingPlugin import CoalescingPlugin                        # type: ignore; pylint: disable=import-error
+from Common.Plugin import Plugin                                            # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import WorkItemNotification                            # type: ignore; pylint: disable=import-error
+from GenerateEvents import EpicSeries, EventsGenerator, GenerateEventsResult    # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Types
+# |
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class RefreshInfo(object):
+    """Information about the most recent refresh"""
+
+    # ----------------------------------------------------------------------
+    timestamp: str                          # ISO-8601 (UTC)
+    seconds: float
+
+    num_roots: int
+    num_work_items: int
+    num_extracted_work_items: int           # Work items that were new or changed since the previous refresh
+
+    error: Optional[str]                    # Data from the previous refresh is served when a refresh fails
+
+
+# ----------------------------------------------------------------------
+class EventsService(object):
+    """\
+    Extracts hierarchies and generates events with a plugin that remains initialized (and whose sessions
+    remain open) for the lifetime of the service.
+
+    Refreshes are incremental: the children of each root are enumerated and the number of revisions of each
+    work item is retrieved in batches (see `Plugin.GetRevisionCounts`); only work items that are new or
+    whose number of revisions has changed are extracted again. Plugins that don't support revision counts
+    extract every work item during each refresh.
+
+    Notifications (see `ApplyNotification`) apply the changes made to a work item without extracting it, so
+    that events remain current between refreshes. Events are regenerated from the earliest day affected by
+    the changes (see `EventsGenerator`).
+
+    Events are also available as chunks described by a manifest (see `ChunkedEvents.py`); the chunks of the
+    previous version of the events remain available so that clients with the previous manifest can complete.
+    """
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        plugin: Plugin,
+        root_work_item_ids: list[str],
+        *,
+        where_clauses: Optional[list[str]]=None,
+        max_num_threads: Optional[int]=None,
+        chunk_days: Optional[int]=None,     # Chunks contain a month of events when None
+    ):
+        self.plugin                         = plugin
+        self.max_num_threads                = max_num_threads
+        self.chunk_days                     = chunk_days
+
+        # Roots are retrieved from the plugin (with `where_clauses`) during each refresh when they aren't provided
+        self._root_work_item_ids            = root_work_item_ids
+        self._where_clauses                 = where_clauses or []
+
+        self._refresh_lock                  = threading.Lock()
+
+        # Work items extracted by previous refreshes (with the revision count at the time that they were extracted)
+        self._items: dict[str, tuple[Optional[int], Optional[HierarchyItem]]]   = {}
+
+        # The hierarchies of the most recent refresh (updated by notifications)
+        self._hierarchy_root_work_item_ids: list[str]           = []
+        self._children: dict[str, list[str]]                    = {}
+        self._generator: Optional[EventsGenerator]              = None
+
+        self._num_notifications             = 0
+
+        # Content served; these values are replaced (rather than modified) by each refresh
+        self._content_lock                  = threading.Lock()
+
+        self._result: Optional[GenerateEventsResult]                = None
+        self._dates: list[str]              = []
+        self._content: Optional[bytes]      = None
+        self._etag: Optional[str]           = None
+        self._refresh_info: Optional[RefreshInfo]                   = None
+
+        self._manifest: Optional[bytes]     = None
+        self._chunks: dict[str, bytes]      = {}                    # Keyed by filename
+        self._previous_chunks: dict[str, bytes]                     = {}
+
+    # ----------------------------------------------------------------------
+    @property
+    def etag(self) -> Optional[str]:
+        with self._content_lock:
+            return self._etag
+
+    # ----------------------------------------------------------------------
+    def Refresh(
+        self,
+        dm: DoneManager,
+    ) -> bool:
+        """Returns True if the events changed"""
+
+        with self._refresh_lock:
+            start_time = time.perf_counter()
+            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+            try:
+                refresh_result = self._RefreshImpl(dm)
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                dm.WriteError(
+                    "{}\n".format(("\n".join(traceback.format_exception(ex)) if dm.is_debug else str(ex)).rstrip()),
+                )
+
+                refresh_result = None
+
+            if refresh_result is None:
+                with self._content_lock:
+                    self._refresh_info = RefreshInfo(
+                        timestamp,
+                        time.perf_counter() - start_time,
+                        self._refresh_info.num_roots if self._refresh_info else 0,
+                        self._refresh_info.num_work_items if self._refresh_info else 0,
+                        0,
+                        "Errors were encountered while refreshing; see the output of the service for more information.",
+                    )
+
+                return False
+
+            num_roots, num_extracted_work_items = refresh_result
+
+            has_changed = self._Publish(dm)
+
+            with self._content_lock:
+                self._refresh_info = RefreshInfo(
+                    timestamp,
+                    time.perf_counter() - start_time,
+                    num_roots,
+                    len(self._items),
+                    num_extracted_work_items,
+                    None,
+                )
+
+            return has_changed
+
+    # ----------------------------------------------------------------------
+    def ApplyNotification(
+        self,
+        dm: DoneManager,
+        notification: WorkItemNotification,
+    ) -> bool:
+        """Applies the changes described by the notification to the hierarchies; returns True if the events changed"""
+
+        with self._refresh_lock:
+            if self._generator is None:
+                # The changes will be included in the initial refresh
+                return False
+
+            work_item_id = notification.work_item_id
+            revision_count, hierarchy_item = self._items.get(work_item_id, (None, None))
+
+            if revision_count is not None and notification.revision <= revision_count:
+                # The changes have already been applied (notifications may be delivered more than once)
+                return False
+
+            # Determine the hierarchies that the work item belongs to
+            is_root = work_item_id in self._children
+
+            current_root_work_item_ids = [
+                root_work_item_id
+                for root_work_item_id, children in self._children.items()
+                if work_item_id in children
+            ]
+
+            new_root_work_item_ids = [
+                root_work_item_id
+                for root_work_item_id in self._children
+                if root_work_item_id == notification.parent_id and root_work_item_id != work_item_id
+            ]
+
+            if not is_root and not current_root_work_item_ids and not new_root_work_item_ids:
+                # The work item doesn't belong to a hierarchy
+                return False
+
+            if not is_root and not new_root_work_item_ids:
+                # The work item has been removed from its hierarchy
+                new_item = self._items.get(work_item_id, (None, None))
+            elif notification.work_item is None:
+                new_item = (None, None)
+            elif hierarchy_item is not None and revision_count == notification.revision - 1:
+                new_item = (
+                    notification.revision,
+                    HierarchyItem(notification.work_item, ChangeLog([*hierarchy_item.changes, *notification.changes])),
+                )
+            elif work_item_id not in self._items and notification.revision == 1:
+                new_item = (notification.revision, HierarchyItem(notification.work_item, ChangeLog(notification.changes)))
+            else:
+                # Notifications were missed (or the work item was added to a hierarchy after it was created),
+                # so the changes made by previous revisions aren't available.
+                with dm.Nested("Extracting '{}'...".format(work_item_id)):
+                    work_item = self.plugin.GetWorkItem(work_item_id)
+
+                    new_item = (
+                        notification.revision,
+                        None if work_item is None else HierarchyItem(work_item, ChangeLog(self.plugin.GetWorkItemChanges(work_item))),
+                    )
+
+            # Commit the changes
+            for root_work_item_id in current_root_work_item_ids:
+                if root_work_item_id not in new_root_work_item_ids:
+                    self._children[root_work_item_id].remove(work_item_id)
+
+            for root_work_item_id in new_root_work_item_ids:
+                if root_work_item_id not in current_root_work_item_ids:
+                    self._children[root_work_item_id].append(work_item_id)
+
+            self._items[work_item_id] = new_item
+            self._num_notifications += 1
+
+            with dm.VerboseNested("Updating events..."):
+                affected_date = self._generator.Update(self._CreateHierarchies(), {work_item_id})
+
+            if affected_date is None:
+                return False
+
+            dm.WriteVerbose("Events on or after {} were regenerated.\n".format(affected_date.isoformat()))
+
+            return self._Publish(dm)
+
+    # ----------------------------------------------------------------------
+    def GetEvents(
+        self,
+        start_date: Optional[str]=None,
+        end_date: Optional[str]=None,
+        if_none_match: Optional[str]=None,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """\
+        Returns the etag and content of the events that occur on or after `start_date` and on or before
+        `end_date` (dates are 'YYYY-MM-DD'). The content is None if the service hasn't been refreshed or
+        if the etag matches `if_none_match`.
+        """
+
+        with self._content_lock:
+            result = self._result
+            dates = self._dates
+            content = self._content
+            base_etag = self._etag
+
+        if result is None:
+            return None, None
+
+        assert content is not None
+        assert base_etag is not None
+
+        if start_date is None and end_date is None:
+            etag = base_etag
+        else:
+            etag = '"{}"'.format(
+                hashlib.sha256("{}|{}|{}".format(base_etag, start_date or "", end_date or "").encode("UTF-8")).hexdigest()[:32],
+            )
+
+        if if_none_match is not None and etag in [value.strip() for value in if_none_match.split(",")]:
+            return etag, None
+
+        if start_date is not None or end_date is not None:
+            # Dates are ISO-8601, so they can be compared as strings
+            start_index = 0 if start_date is None else bisect.bisect_left(dates, start_date)
+            end_index = len(dates) if end_date is None else bisect.bisect_right(dates, end_date)
+
+            epics: dict[str, EpicSeries] = {}
+
+            for epic_id, epic_series in result.epics.items():
+                epic_series = epic_series.Slice(start_date, end_date)
+
+                if epic_series.dates:
+                    epics[epic_id] = epic_series
+
+            # The counts of each event are totals (rather than deltas), so a slice is meaningful on its own
+            content = ToJsonString(
+                GenerateEventsResult(result.titles, result.events[start_index:end_index], epics),
+            ).encode("UTF-8")
+
+        return etag, content
+
+    # ----------------------------------------------------------------------
+    def GetManifest(
+        self,
+        if_none_match: Optional[str]=None,
+    ) -> tuple[Optional[str], Optional[bytes]]:
+        """\
+        Returns the etag and content of the manifest that describes the chunks of the events. The content is
+        None if the service hasn't been refreshed or if the etag matches `if_none_match`.
+        """
+
+        with self._content_lock:
+            manifest = self._manifest
+            etag = self._etag
+
+        if manifest is None:
+            return None, None
+
+        if if_none_match is not None and etag in [value.strip() for value in if_none_match.split(",")]:
+            return etag, None
+
+        return etag, manifest
+
+    # ----------------------------------------------------------------------
+    def GetChunk(
+        self,
+        filename: str,
+    ) -> Optional[bytes]:
+        """Returns the content of a chunk listed by the current (or previous) manifest"""
+
+        with self._content_lock:
+            return self._chunks.get(filename, None) or self._previous_chunks.get(filename, None)
+
+    # ----------------------------------------------------------------------
+    def GetStatus(self) -> dict[str, Any]:
+        with self._content_lock:
+            return {
+                "plugin": self.plugin.name,
+                "etag": self._etag,
+                "num_events": len(self._dates),
+                "first_date": self._dates[0] if self._dates else None,
+                "last_date": self._dates[-1] if self._dates else None,
+                "refresh": None if self._refresh_info is None else self._refresh_info.__dict__,
+                "num_notifications": self._num_notifications,
+            }
+
+    # ----------------------------------------------------------------------
+    # |
+    # |  Private Methods
+    # |
+    # ----------------------------------------------------------------------
+    def _RefreshImpl(
+        self,
+        dm: DoneManager,
+    ) -> Optional[tuple[int, int]]:
+        """Returns the number of hierarchies and the number of work items extracted"""
+
+        # Work items that appear in multiple hierarchies are only extracted once per refresh
+        plugin = CoalescingPlugin.Create(self.plugin)
+
+        root_work_item_ids = self._root_work_item_ids or list(
+            plugin.GetRootWorkItems(
+                where_clauses=list(self._where_clauses),
+            ),
+        )
+
+        # Roots specified multiple times are only extracted once
+        unique_root_work_item_ids = list(dict.fromkeys(root_work_item_ids))
+
+        children_results = _Transform(
+            dm,
+            "Enumerating hierarchies...",
+            unique_root_work_item_ids,
+            lambda root_work_item_id: list(plugin.EnumChildren(root_work_item_id)),
+            max_num_threads=self.max_num_threads,
+        )
+        if children_results is None:
+            return None
+
+        children = dict(zip(unique_root_work_item_ids, children_results))
+
+        all_work_item_ids = list(
+            dict.fromkeys(
+                work_item_id
+                for root_work_item_id in unique_root_work_item_ids
+                for work_item_id in [root_work_item_id, *children[root_work_item_id]]
+            ),
+        )
+
+        # Determine which work items must be extracted
+        if self.plugin.supports_revision_counts:
+            with dm.Nested("Counting revisions..."):
+                revision_counts = plugin.GetRevisionCounts(all_work_item_ids)
+        else:
+            revision_counts = {}
+
+        stale_work_item_ids: list[str] = []
+
+        for work_item_id in all_work_item_ids:
+            revision_count = revision_counts.get(work_item_id, None)
+
+            if (
+                revision_count is None
+                or work_item_id not in self._items
+                or self._items[work_item_id][0] != revision_count
+            ):
+                # Work items without revision counts (for example, those whose type isn't extracted)
+                # are cheap to extract, as their changes are not retrieved.
+                stale_work_item_ids.append(work_item_id)
+
+        # ----------------------------------------------------------------------
+        def ExtractWorkItem(
+            work_item_id: str,
+        ) -> Optional[HierarchyItem]:
+            work_item = plugin.GetWorkItem(work_item_id)
+            if work_item is None:
+                return None
+
+            return HierarchyItem(work_item, ChangeLog(plugin.GetWorkItemChanges(work_item)))
+
+        # ----------------------------------------------------------------------
+
+        extract_results = _Transform(
+            dm,
+            "Extracting {} of {} work items...".format(len(stale_work_item_ids), len(all_work_item_ids)),
+            stale_work_item_ids,
+            ExtractWorkItem,
+            max_num_threads=self.max_num_threads,
+        )
+        if extract_results is None:
+            return None
+
+        # Work items are only updated once all of them have been extracted successfully
+        items = {
+            work_item_id: self._items[work_item_id]
+            for work_item_id in all_work_item_ids
+            if work_item_id in self._items
+        }
+
+        for work_item_id, hierarchy_item in zip(stale_work_item_ids, extract_results):
+            items[work_item_id] = (revision_counts.get(work_item_id, None), hierarchy_item)
+
+        for root_work_item_id in unique_root_work_item_ids:
+            if items[root_work_item_id][1] is None:
+                dm.WriteError("The root work item '{}' does not exist.\n".format(root_work_item_id))
+
+        if dm.result != 0:
+            return None
+
+        # Work items whose hierarchies have changed must be processed again, as must those that changed
+        changed_work_item_ids = set(stale_work_item_ids)
+
+        for root_work_item_id in unique_root_work_item_ids:
+            changed_work_item_ids.update(
+                set(self._children.get(root_work_item_id, [])) ^ set(children[root_work_item_id]),
+            )
+
+        is_incremental = (
+            self._generator is not None
+            and root_work_item_ids == self._hierarchy_root_work_item_ids
+        )
+
+        self._items = items
+        self._hierarchy_root_work_item_ids = root_work_item_ids
+        self._children = children
+
+        hierarchies = self._CreateHierarchies()
+
+        if is_incremental:
+            assert self._generator is not None
+
+            with dm.VerboseNested("Updating events..."):
+                self._generator.Update(hierarchies, changed_work_item_ids)
+        else:
+            self._generator = EventsGenerator.Create(dm, self.plugin, hierarchies)
+
+        return len(hierarchies), len(stale_work_item_ids)
+
+    # ----------------------------------------------------------------------
+    def _CreateHierarchies(self) -> list[HierarchyResult]:
+        hierarchies: list[HierarchyResult] = []
+
+        for root_work_item_id in self._hierarchy_root_work_item_ids:
+            root_item = self._items[root_work_item_id][1]
+            if root_item is None:
+                continue
+
+            hierarchies.append(
+                HierarchyResult(
+                    root_item,
+                    [
+                        hierarchy_item
+                        for hierarchy_item in (
+                            self._items[work_item_id][1]
+                            for work_item_id in self._children[root_work_item_id]
+                        )
+                        if hierarchy_item is not None
+                    ],
+                ),
+            )
+
+        return hierarchies
+
+    # ----------------------------------------------------------------------
+    def _Publish(
+        self,
+        dm: DoneManager,
+    ) -> bool:
+        """Replaces the content served with the current events; returns True if the events changed"""
+
+        assert self._generator is not None
+        result = self._generator.result
+
+        with dm.VerboseNested("Serializing events..."):
+            content = ToJsonString(result).encode("UTF-8")
+            etag = '"{}"'.format(hashlib.sha256(content).hexdigest()[:32])
+
+        with self._content_lock:
+            if etag == self._etag:
+                return False
+
+        with dm.VerboseNested("Creating chunks..."):
+            chunks = CreateChunks(result, chunk_days=self.chunk_days)
+            manifest = json.dumps(CreateManifest(chunks, chunk_days=self.chunk_days)).encode("UTF-8")
+
+        with self._content_lock:
+            self._result = result
+            self._dates = [event.date for event in result.events]
+            self._content = content
+            self._etag = etag
+
+            self._manifest = manifest
+            self._previous_chunks = self._chunks
+            self._chunks = {chunk.filename: chunk.content for chunk in chunks}
+
+        return True
+
+
+# ----------------------------------------------------------------------
+class EventsServer(ThreadingHTTPServer):
+    """\
+    Serves the events produced by an `EventsService`:
+
+        GET  /events[?start=YYYY-MM-DD][&end=YYYY-MM-DD]    GenerateEventsResult (with all titles)
+        GET  /chunks/manifest.json                          The chunks of the events (see `ChunkedEvents.CreateManifest`)
+        GET  /chunks/<filename>                             A chunk listed by the manifest
+        GET  /status                                        Information about the service and its most recent refresh
+        POST /refresh                                       Refreshes the events immediately
+        POST /notifications                                 Applies a work item notification (see `Plugin.ParseNotification`)
+
+    Responses for '/events' and '/chunks/manifest.json' include an ETag that changes only when the events
+    change; requests that include a matching 'If-None-Match' header receive a 304 response without content.
+    Chunks are named by their content, so they can be cached indefinitely.
+
+    When `notification_secret` is provided, notifications and refresh requests must be sent with basic
+    authentication that uses the secret as the password (the user name is ignored). The secret is required
+    when the server listens on an address that isn't a loopback address.
+    """
+
+    daemon_threads                          = True
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        service: EventsService,
+        host: str="127.0.0.1",
+        port: int=0,
+        *,
+        allow_origin: Optional[str]=None,
+        on_refresh_requested_func: Optional[Callable[[], None]]=None,
+        on_notification_func: Optional[Callable[[WorkItemNotification], bool]]=None,
+        notification_secret: Optional[str]=None,
+    ):
+        self.service                        = service
+        self.allow_origin                   = allow_origin
+        self.on_refresh_requested_func      = on_refresh_requested_func
+        self.on_notification_func           = on_notification_func
+        self.notification_secret            = notification_secret
+
+        error = _ValidateHost(host, notification_secret)
+        if error is not None:
+            raise Exception(error)
+
+        super(EventsServer, self).__init__((host, port), _RequestHandler)
+
+    # ----------------------------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Public Functions
+# |
+# ----------------------------------------------------------------------
+def Serve(
+    dm: DoneManager,
+    service: EventsService,
+    *,
+    host: str="127.0.0.1",
+    port: int=8000,
+    refresh_interval_seconds: float=15 * 60,
+    allow_origin: Optional[str]=None,
+    notification_secret: Optional[str]=None,
+) -> None:
+    """\
+    Refreshes the service and serves its events until interrupted, refreshing them every `refresh_interval_seconds`
+    and applying notifications as they are received (when supported by the plugin).
+    """
+
+    # Validated before the initial refresh, which may take a while
+    error = _ValidateHost(host, notification_secret)
+    if error is not None:
+        dm.WriteError("{}\n".format(error))
+        return
+
+    with dm.Nested("Initial refresh...") as refresh_dm:
+        service.Refresh(refresh_dm)
+
+    if dm.result != 0:
+        return
+
+    refresh_requested_event = threading.Event()
+    stop_event = threading.Event()
+
+    # ----------------------------------------------------------------------
+    def RefreshThreadProc() -> None:
+        refresh_index = 1
+
+        while not stop_event.is_set():
+            refresh_requested_event.wait(refresh_interval_seconds)
+            refresh_requested_event.clear()
+
+            if stop_event.is_set():
+                break
+
+            refresh_index += 1
+
+            with dm.Nested("Refresh #{}...".format(refresh_index)) as refresh_dm:
+                if service.Refresh(refresh_dm):
+                    refresh_dm.WriteLine("The events changed ({}).\n".format(service.etag))
+
+    # ----------------------------------------------------------------------
+    def OnNotification(
+        notification: WorkItemNotification,
+    ) -> bool:
+        with dm.Nested(
+            "Notification for '{}' (revision {})...".format(notification.work_item_id, notification.revision),
+        ) as notification_dm:
+            return service.ApplyNotification(notification_dm, notification)
+
+    # ----------------------------------------------------------------------
+
+    server = EventsServer(
+        service,
+        host,
+        port,
+        allow_origin=allow_origin,
+        on_refresh_requested_func=refresh_requested_event.set,
+        on_notification_func=OnNotification if service.plugin.supports_notifications else None,
+        notification_secret=notification_secret,
+    )
+
+    refresh_thread = threading.Thread(target=RefreshThreadProc, daemon=True)
+    refresh_thread.start()
+
+    try:
+        dm.WriteLine("\nServing events at '{}/events' (press Ctrl+C to exit).\n\n".format(server.url))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    finally:
+        stop_event.set()
+        refresh_requested_event.set()
+
+        server.server_close()
+
+        # Daemon threads don't prevent the process from exiting if a refresh is in progress
+        refresh_thread.join(1.0)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Types
+# |
+# ----------------------------------------------------------------------
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: EventsServer
+    protocol_version                        = "HTTP/1.1"
+
+    # ----------------------------------------------------------------------
+    def log_message(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        # Don't write information about every request to stderr
+        pass
+
+    # ----------------------------------------------------------------------
+    def do_OPTIONS(self):  # pylint: disable=invalid-name
+        # CORS preflight
+        self._Send(204, None, {"Access-Control-Allow-Methods": "GET, POST, OPTIONS", "Access-Control-Allow-Headers": "Authorization, Content-Type, If-None-Match"})
+
+    # ----------------------------------------------------------------------
+    def do_GET(self):  # pylint: disable=invalid-name
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path.rstrip("/")
+
+        if path == "/status":
+            self._Send(200, json.dumps(self.server.service.GetStatus()).encode("UTF-8"))
+            return
+
+        if path.startswith("/chunks/"):
+            self._OnChunk(path[len("/chunks/"):])
+            return
+
+        if path != "/events":
+            self._SendMessage(404, "Not found")
+            return
+
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+
+        dates: list[Optional[str]] = []
+
+        for key in ["start", "end"]:
+            value = query.get(key, None)
+
+            if value is not None:
+                try:
+                    value = datetime.date.fromisoformat(value).isoformat()
+                except ValueError:
+                    self._SendMessage(400, "'{}' is not a valid date ('YYYY-MM-DD' was expected).".format(value))
+                    return
+
+            dates.append(value)
+
+        etag, content = self.server.service.GetEvents(*dates, if_none_match=self.headers.get("If-None-Match", None))
+
+        if etag is None:
+            self._SendMessage(503, "Events are not available yet.", {"Retry-After": "5"})
+            return
+
+        headers = {
+            "ETag": etag,
+            # Clients may cache the content, but must revalidate it before it is used
+            "Cache-Control": "no-cache",
+        }
+
+        if content is None:
+            self._Send(304, None, headers)
+            return
+
+        self._Send(200, content, headers)
+
+    # ----------------------------------------------------------------------
+    def do_POST(self):  # pylint: disable=invalid-name
+        content_length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(content_length) if content_length else b""
+
+        path = urlparse(self.path).path.rstrip("/")
+
+        if path == "/notifications":
+            self._OnNotification(body)
+            return
+
+        if path != "/refresh":
+            self._SendMessage(404, "Not found")
+            return
+
+        if not self._IsAuthorized("refresh"):
+            return
+
+        if self.server.on_refresh_requested_func is None:
+            self._SendMessage(501, "Refreshes are not supported.")
+            return
+
+        self.server.on_refresh_requested_func()
+        self._SendMessage(202, "A refresh has been requested.")
+
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    # ----------------------------------------------------------------------
+    def _OnChunk(
+        self,
+        filename: str,
+    ) -> None:
+        if filename == MANIFEST_FILENAME:
+            etag, content = self.server.service.GetManifest(self.headers.get("If-None-Match", None))
+
+            if etag is None:
+                self._SendMessage(503, "Events are not available yet.", {"Retry-After": "5"})
+                return
+
+            headers = {
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+            }
+
+            self._Send(304 if content is None else 200, content, headers)
+            return
+
+        content = self.server.service.GetChunk(filename)
+
+        if content is None:
+            self._SendMessage(404, "Not found")
+            return
+
+        headers = {
+            "ETag": '"{}"'.format(filename.removesuffix(".json")),
+            # The content of a chunk never changes
+            "Cache-Control": "public, max-age=31536000, immutable",
+        }
+
+        if headers["ETag"] in [value.strip() for value in self.headers.get("If-None-Match", "").split(",")]:
+            self._Send(304, None, headers)
+            return
+
+        self._Send(200, content, headers)
+
+    # ----------------------------------------------------------------------
+    def _OnNotification(
+        self,
+        body: bytes,
+    ) -> None:
+        if self.server.on_notification_func is None:
+            self._SendMessage(501, "Notifications are not supported by the '{}' plugin.".format(self.server.service.plugin.name))
+            return
+
+        if not self._IsAuthorized("notifications"):
+            return
+
+        try:
+            payload = json.loads(body)
+            if not isinstance(payload, dict):
+                raise ValueError("A json object was expected.")
+
+            notification = self.server.service.plugin.ParseNotification(payload)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._SendMessage(400, "The notification is not valid ({}).".format(ex))
+            return
+
+        if notification is None:
+            # The notification doesn't describe changes to a work item
+            self._Send(200, json.dumps({"changed": False}).encode("UTF-8"))
+            return
+
+        try:
+            has_changed = self.server.on_notification_func(notification)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            # The sender will retry the notification
+            self._SendMessage(500, str(ex))
+            return
+
+        self._Send(200, json.dumps({"changed": has_changed}).encode("UTF-8"))
+
+    # ----------------------------------------------------------------------
+    def _IsAuthorized(
+        self,
+        realm: str,
+    ) -> bool:
+        """Returns True if the request can be processed; a 401 response is sent when it can't"""
+
+        if self.server.notification_secret is None:
+            return True
+
+        authorization = self.headers.get("Authorization", "")
+        password = ""
+
+        if authorization.startswith("Basic "):
+            try:
+                password = base64.b64decode(authorization[len("Basic "):]).decode("UTF-8").partition(":")[2]
+            except ValueError:
+                pass
+
+        if not hmac.compare_digest(password.encode("UTF-8"), self.server.notification_secret.encode("UTF-8")):
+            self._SendMessage(401, "Unauthorized", {"WWW-Authenticate": 'Basic realm="{}"'.format(realm)})
+            return False
+
+        return True
+
+    # ----------------------------------------------------------------------
+    def _SendMessage(
+        self,
+        status_code: int,
+        message: str,
+        headers: Optional[dict[str, str]]=None,
+    ) -> None:
+        self._Send(status_code, json.dumps({"message": message}).encode("UTF-8"), headers)
+
+    # ----------------------------------------------------------------------
+    def _Send(
+        self,
+        status_code: int,
+        content: Optional[bytes],
+        headers: Optional[dict[str, str]]=None,
+    ) -> None:
+        is_compressed = (
+            content is not None
+            and len(content) > _MIN_COMPRESSED_SIZE
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        )
+
+        if is_compressed:
+            assert content is not None
+            content = gzip.compress(content, compresslevel=6)
+
+        self.send_response(status_code)
+
+        if content is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+
+        self.send_header("Content-Length", str(len(content or b"")))
+
+        if is_compressed:
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Vary", "Accept-Encoding")
+
+        if self.server.allow_origin is not None:
+            self.send_header("Access-Control-Allow-Origin", self.server.allow_origin)
+            self.send_header("Access-Control-Expose-Headers", "ETag")
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+
+        if content is not None:
+            self.wfile.write(content)
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Data
+# |
+# ----------------------------------------------------------------------
+_MIN_COMPRESSED_SIZE                        = 1024
+
+
+# ----------------------------------------------------------------------
+# |
+# |  Private Functions
+# |
+# ----------------------------------------------------------------------
+def _ValidateHost(
+    host: str,
+    notification_secret: Optional[str],
+) -> Optional[str]:
+    """Returns a description of the error if the server can't listen on the host"""
+
+    if notification_secret is not None:
+        return None
+
+    # Requests that modify the service can't be authenticated without a secret, so they must be local
+    try:
+        is_loopback = bool(host) and all(
+            ipaddress.ip_address(address_info[4][0]).is_loopback
+            for address_info in socket.getaddrinfo(host, None)
+        )
+    except (OSError, ValueError):
+        is_loopback = False
+
+    if not is_loopback:
+        return "A notification secret is required when listening on '{}', as it isn't a loopback address.".format(host)
+
+    return None
+
+
+# ----------------------------------------------------------------------
+_TransformResultT                           = TypeVar("_TransformResultT")
+
+
+def _Transform(
+    dm: DoneManager,
+    header: str,
+    work_item_ids: list[str],
+    func: Callable[[str], _TransformResultT],
+    *,
+    max_num_threads: Optional[int],
+) -> Optional[list[_TransformResultT]]:
+    """Invokes `func` for each work item concurrently, returning None if any invocation failed"""
+
+    if not work_item_ids:
+        return []
+
+    # ----------------------------------------------------------------------
+    def ExecuteTask(
+        context: str,
+        on_simple_status_func: Callable[[str], None],  # pylint: disable=unused-argument
+    ) -> tuple[Optional[int], ExecuteTasks.TransformTypes.FuncType[_TransformResultT]]:
+        work_item_id = context
+        del context
+
+        # ----------------------------------------------------------------------
+        def Impl(
+            status: ExecuteTasks.Status,  # pylint: disable=unused-argument
+        ) -> _TransformResultT:
+            return func(work_item_id)
+
+        # ----------------------------------------------------------------------
+
+        return None, Impl
+
+    # ----------------------------------------------------------------------
+
+    results = cast(
+        list[_TransformResultT | Exception],
+        ExecuteTasks.Transform(
+            dm,
+            header,
+            [ExecuteTasks.TaskData(work_item_id, work_item_id) for work_item_id in work_item_ids],
+            ExecuteTask,
+            max_num_threads=max_num_threads,
+            return_exceptions=True,
+        ),
+    )
+
+    for work_item_id, result in zip(work_item_ids, results):
+        if not isinstance(result, Exception):
+            continue
+
+        dm.WriteError(
+            textwrap.dedent(
+                """\
+
+                Error processing '{}':
+                    {}
+                """,
+            ).format(
+                work_item_id,
+                TextwrapEx.Indent(
+                    ("\n".join(traceback.format_exception(result)) if dm.is_debug else str(result)).rstrip(),
+                    4,
+                    skip_first_line=True,
+                ),
+            ),
+        )
+
+    if dm.result != 0:
+        return None
+
+    return cast(list[_TransformResultT], results)
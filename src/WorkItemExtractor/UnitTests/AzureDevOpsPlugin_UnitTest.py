@@ -0,0 +1,236 @@
+# ----------------------------------------------------------------------
+# |
+# |  AzureDevOpsPlugin_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-12-01 10:48:22
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for the root work item queries of AzureDevOpsPlugin.py"""
+
+import re
+import sys
+import threading
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+_src_dir = Path(__file__).resolve().parent.parent.parent
+
+if str(_src_dir) not in sys.path:
+    sys.path.append(str(_src_dir))
+
+del _src_dir
+
+# pylint: disable=wrong-import-position
+from WorkItemExtractor.ProjectManagementPlugins.AzureDevOpsPlugin import Plugin  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _Response(object):
+    status_code: int
+    text: str
+    content: Any
+
+    # ----------------------------------------------------------------------
+    def json(self) -> Any:
+        return self.content
+
+    # ----------------------------------------------------------------------
+    def raise_for_status(self) -> None:
+        if self.status_code != 200:
+            raise Exception("HTTP {}".format(self.status_code))
+
+
+# ----------------------------------------------------------------------
+class _WiqlSession(object):
+    """Answers wiql queries for a set of work item ids, like an Azure DevOps server with a (small) wiql limit"""
+
+    # ----------------------------------------------------------------------
+    def __init__(
+        self,
+        work_item_ids: list[int],
+        wiql_limit: int,
+        *,
+        truncate: bool=False,
+    ):
+        self.work_item_ids                  = sorted(work_item_ids)
+        self.wiql_limit                     = wiql_limit
+        self.truncate                       = truncate
+
+        self.queries: list[str]             = []
+
+        self._lock                          = threading.Lock()
+
+    # ----------------------------------------------------------------------
+    def post(                               # pylint: disable=redefined-outer-name
+        self,
+        url: str,
+        params: dict[str, Any],
+        json: dict[str, Any],
+    ) -> _Response:
+        assert url == "wiql"
+
+        query = json["query"]
+
+        with self._lock:
+            self.queries.append(query)
+
+        min_id = _GetBound(query, ">=")
+        max_id = _GetBound(query, "<=")
+
+        results = [
+            work_item_id
+            for work_item_id in self.work_item_ids
+            if (min_id is None or work_item_id >= min_id) and (max_id is None or work_item_id <= max_id)
+        ]
+
+        if "[System.Id] desc" in query:
+            results.reverse()
+
+        top = params.get("$top", None)
+
+        if top is not None:
+            results = results[:top]
+        elif len(results) > self.wiql_limit:
+            if not self.truncate:
+                return _Response(400, "VS402337: The number of work items returned exceeds the size limit.", None)
+
+            results = results[:self.wiql_limit]
+
+        return _Response(200, "", {"workItems": [{"id": work_item_id} for work_item_id in results]})
+
+
+# ----------------------------------------------------------------------
+def test_WithinLimit():
+    plugin, session = _CreatePlugin(list(range(1, 31)), 100)
+
+    results = plugin.GetRootWorkItems()
+
+    # The results of a single query are returned as a list
+    assert isinstance(results, list)
+    assert results == [str(work_item_id) for work_item_id in range(1, 31)]
+
+    assert len(session.queries) == 1
+    assert "[System.WorkItemType] = 'Epic'" in session.queries[0]
+    assert "[Microsoft.VSTS.Common.Priority] asc" in session.queries[0]
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("wiql_limit", [1, 7, 37, 499])
+def test_Partitioned(wiql_limit):
+    work_item_ids = list(range(1, 501))
+
+    plugin, session = _CreatePlugin(work_item_ids, wiql_limit)
+
+    results = list(plugin.GetRootWorkItems())
+
+    # Partitions are generated in order of id, without duplicates
+    assert results == [str(work_item_id) for work_item_id in work_item_ids]
+
+    _VerifyQueries(session)
+
+
+# ----------------------------------------------------------------------
+def test_PartitionedSparse():
+    # Ids aren't contiguous, and most of them are in a small range
+    work_item_ids = sorted(set([1, 2, 3, 5000, 9999] + list(range(7000, 7300))))
+
+    plugin, session = _CreatePlugin(work_item_ids, 25)
+
+    assert list(plugin.GetRootWorkItems()) == [str(work_item_id) for work_item_id in work_item_ids]
+
+    _VerifyQueries(session)
+
+
+# ----------------------------------------------------------------------
+def test_Truncated(monkeypatch):
+    monkeypatch.setattr(Plugin, "_MAX_WIQL_RESULTS", 40)
+
+    work_item_ids = list(range(1, 201))
+
+    # The server truncates the results instead of returning an error
+    plugin, session = _CreatePlugin(work_item_ids, 40, truncate=True)
+
+    assert list(plugin.GetRootWorkItems()) == [str(work_item_id) for work_item_id in work_item_ids]
+
+    _VerifyQueries(session)
+
+
+# ----------------------------------------------------------------------
+def test_WhereClauses():
+    plugin, session = _CreatePlugin(list(range(1, 101)), 10)
+
+    results = list(
+        plugin.GetRootWorkItems(
+            work_item_type="Feature",
+            where_clauses=["[System.State] = 'Active'"],
+        ),
+    )
+
+    assert results == [str(work_item_id) for work_item_id in range(1, 101)]
+
+    # The clauses are included in every partitioned query
+    for query in session.queries:
+        assert "[System.WorkItemType] = 'Feature'" in query
+        assert "[System.State] = 'Active'" in query
+
+
+# ----------------------------------------------------------------------
+def test_SingleIdExceedsLimit():
+    plugin, _ = _CreatePlugin([1, 2, 3], 0)
+
+    with pytest.raises(Exception, match="exceeds the wiql limit"):
+        list(plugin.GetRootWorkItems())
+
+
+# ----------------------------------------------------------------------
+def _CreatePlugin(
+    work_item_ids: list[int],
+    wiql_limit: int,
+    *,
+    truncate: bool=False,
+) -> tuple[Plugin, _WiqlSession]:
+    session = _WiqlSession(work_item_ids, wiql_limit, truncate=truncate)
+
+    plugin = Plugin()
+    object.__setattr__(plugin, "_session", session)
+
+    return plugin, session
+
+
+# ----------------------------------------------------------------------
+def _GetBound(
+    query: str,
+    operator: str,
+) -> Optional[int]:
+    match = re.search(r"\[System\.Id\] {} (\d+)".format(re.escape(operator)), query)
+    if match is None:
+        return None
+
+    return int(match.group(1))
+
+
+# ----------------------------------------------------------------------
+def _VerifyQueries(
+    session: _WiqlSession,
+) -> None:
+    # The initial query exceeds the limit, which is followed by a query for the maximum id and the
+    # partitioned queries
+    assert "[System.Id] >=" not in session.queries[0]
+    assert "[System.Id] desc" in session.queries[1]
+
+    for query in session.queries[2:]:
+        assert "[System.Id] >=" in query
+        assert "[System.Id] <=" in query
@@ -0,0 +1,259 @@
+# ----------------------------------------------------------------------
+# |
+# |  ChangeLogNormalizer_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-12-04 11:26:40
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ChangeLogNormalizer (in ChangeLog.py)"""
+
+import sys
+import threading
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog, ChangeLogNormalizer                 # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, WorkItemChange                           # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_DT                                         = datetime(2023, 1, 1, 9, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+def test_Unchanged():
+    changes = [
+        WorkItemChange(_DT, "state", State.New, None),
+        WorkItemChange(_DT + timedelta(days=1), "state", State.Active, State.New),
+        WorkItemChange(_DT + timedelta(days=2), "story_points", 3, None),
+    ]
+
+    normalizer = ChangeLogNormalizer()
+
+    assert _ToList(normalizer.Normalize(changes)) == changes
+
+    assert normalizer.num_logs == 1
+    assert normalizer.num_changes == 3
+    assert normalizer.num_normalized_changes == 3
+
+
+# ----------------------------------------------------------------------
+def test_SameDay():
+    normalizer = ChangeLogNormalizer()
+
+    result = normalizer.Normalize(
+        [
+            WorkItemChange(_DT, "state", State.Active, State.New),
+            WorkItemChange(_DT + timedelta(hours=1), "state", State.Pending, State.Active),
+            WorkItemChange(_DT + timedelta(hours=2), "state", State.Closed, State.Pending),
+            WorkItemChange(_DT + timedelta(days=1), "state", State.Removed, State.Closed),
+        ],
+    )
+
+    # The last value of the day replaces the value before the first change of the day
+    assert _ToList(result) == [
+        WorkItemChange(_DT + timedelta(hours=2), "state", State.Closed, State.New),
+        WorkItemChange(_DT + timedelta(days=1), "state", State.Removed, State.Closed),
+    ]
+
+    assert normalizer.num_collapsed_changes == 2
+    assert normalizer.num_normalized_changes == 2
+
+
+# ----------------------------------------------------------------------
+def test_SameDayUnordered():
+    normalizer = ChangeLogNormalizer()
+
+    result = normalizer.Normalize(
+        [
+            WorkItemChange(_DT + timedelta(hours=2), "story_points", 8, 5),
+            WorkItemChange(_DT, "story_points", 3, None),
+            WorkItemChange(_DT + timedelta(hours=1), "story_points", 5, 3),
+        ],
+    )
+
+    assert _ToList(result) == [
+        WorkItemChange(_DT + timedelta(hours=2), "story_points", 8, None),
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_SameDayMultipleFields():
+    normalizer = ChangeLogNormalizer()
+
+    result = normalizer.Normalize(
+        [
+            WorkItemChange(_DT + timedelta(hours=1), "story_points", 3, None),
+            WorkItemChange(_DT, "state", State.Active, State.New),
+            WorkItemChange(_DT + timedelta(hours=2), "state", State.Closed, State.Active),
+        ],
+    )
+
+    # Changes are collapsed per field and sorted by time
+    assert _ToList(result) == [
+        WorkItemChange(_DT + timedelta(hours=1), "story_points", 3, None),
+        WorkItemChange(_DT + timedelta(hours=2), "state", State.Closed, State.New),
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_SameDayLocalTime():
+    pacific = timezone(timedelta(hours=-8))
+
+    normalizer = ChangeLogNormalizer()
+
+    # Both changes are made on the same day in the work item's time zone, but not in UTC
+    result = normalizer.Normalize(
+        [
+            WorkItemChange(datetime(2023, 1, 1, 15, tzinfo=pacific), "state", State.Active, State.New),
+            WorkItemChange(datetime(2023, 1, 1, 17, tzinfo=pacific), "state", State.Closed, State.Active),
+        ],
+    )
+
+    assert _ToList(result) == [
+        WorkItemChange(datetime(2023, 1, 1, 17, tzinfo=pacific), "state", State.Closed, State.New),
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_UnchangedValues():
+    normalizer = ChangeLogNormalizer()
+
+    result = normalizer.Normalize(
+        [
+            # Changed and then changed back on the same day
+            WorkItemChange(_DT, "state", State.Active, State.New),
+            WorkItemChange(_DT + timedelta(hours=1), "state", State.New, State.Active),
+
+            # Saved without a change
+            WorkItemChange(_DT + timedelta(days=1), "story_points", 3, 3),
+
+            WorkItemChange(_DT + timedelta(days=2), "story_points", 5, 3),
+        ],
+    )
+
+    assert _ToList(result) == [
+        WorkItemChange(_DT + timedelta(days=2), "story_points", 5, 3),
+    ]
+
+    assert normalizer.num_changes == 4
+    assert normalizer.num_collapsed_changes == 1
+    assert normalizer.num_unchanged_changes == 2
+    assert normalizer.num_normalized_changes == 1
+
+
+# ----------------------------------------------------------------------
+def test_UnreadFields():
+    normalizer = ChangeLogNormalizer(["state"])
+
+    result = normalizer.Normalize(
+        [
+            WorkItemChange(_DT, "title", "New Title", "Old Title"),
+            WorkItemChange(_DT, "state", State.Active, State.New),
+            WorkItemChange(_DT + timedelta(days=1), "description", "Description", None),
+        ],
+    )
+
+    assert _ToList(result) == [
+        WorkItemChange(_DT, "state", State.Active, State.New),
+    ]
+
+    assert normalizer.num_unread_changes == 2
+    assert normalizer.num_normalized_changes == 1
+
+
+# ----------------------------------------------------------------------
+def test_Sizes():
+    changes = [
+        WorkItemChange(_DT, "title", "Title", None),
+        WorkItemChange(_DT, "state", State.Active, State.New),
+    ]
+
+    normalizer = ChangeLogNormalizer()
+    normalizer.Normalize(changes)
+
+    # Sizes aren't measured by default
+    assert normalizer.num_bytes == 0
+    assert normalizer.num_normalized_bytes == 0
+
+    normalizer = ChangeLogNormalizer(["state"], measure_sizes=True)
+    normalizer.Normalize(changes)
+
+    assert normalizer.num_bytes == sum(len(ToJsonString(change)) for change in changes)
+    assert normalizer.num_normalized_bytes == len(ToJsonString(changes[1]))
+    assert normalizer.num_removed_bytes == len(ToJsonString(changes[0]))
+
+
+# ----------------------------------------------------------------------
+def test_WriteSummary():
+    for measure_sizes, expected_num_writes in [
+        (False, 1),
+        (True, 2),
+    ]:
+        normalizer = ChangeLogNormalizer(measure_sizes=measure_sizes)
+        normalizer.Normalize([WorkItemChange(_DT, "state", State.Active, State.New)])
+
+        dm = mock.MagicMock()
+
+        normalizer.WriteSummary(dm)
+
+        assert dm.WriteLine.call_count == expected_num_writes
+        assert "Retained" in dm.WriteLine.call_args_list[0][0][0]
+
+
+# ----------------------------------------------------------------------
+def test_Threads():
+    normalizer = ChangeLogNormalizer(["state"])
+
+    # ----------------------------------------------------------------------
+    def Normalize():
+        for _ in range(100):
+            normalizer.Normalize(
+                [
+                    WorkItemChange(_DT, "state", State.Active, State.New),
+                    WorkItemChange(_DT + timedelta(hours=1), "state", State.Closed, State.Active),
+                    WorkItemChange(_DT, "title", "Title", None),
+                ],
+            )
+
+    # ----------------------------------------------------------------------
+
+    threads = [threading.Thread(target=Normalize) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert normalizer.num_logs == 800
+    assert normalizer.num_changes == 2400
+    assert normalizer.num_unread_changes == 800
+    assert normalizer.num_collapsed_changes == 800
+    assert normalizer.num_normalized_changes == 800
+
+
+# ----------------------------------------------------------------------
+def _ToList(
+    change_log: ChangeLog,
+) -> list[WorkItemChange]:
+    return [change.ToWorkItemChange() for change in change_log]
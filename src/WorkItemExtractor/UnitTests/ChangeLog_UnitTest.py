@@ -0,0 +1,226 @@
+# ----------------------------------------------------------------------
+# |
+# |  ChangeLog_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-27 14:02:51
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ChangeLog.py"""
+
+import json
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString, WorkItemChangeFromJson       # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, TeeShirtWorkItem, WorkItemChange         # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_DT                                         = datetime(2023, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        0,
+        5,
+        -5,
+        2 ** 62,                            # Too large to be stored inline
+        -(2 ** 62),
+        10 ** 30,
+        True,
+        False,
+        1.5,
+        "Title",
+        "",
+        State.Active,
+        TeeShirtWorkItem.Size.ExtraLarge,
+        ["a", 1],
+        {"key": "value"},
+    ],
+)
+def test_Values(value):
+    change_log = ChangeLog([WorkItemChange(_DT, "field", value, None)])
+
+    new_value = change_log[0].new_value
+
+    assert new_value == value
+    assert type(new_value) is type(value)  # pylint: disable=unidiomatic-typecheck
+
+    assert change_log[0].old_value is None
+
+
+# ----------------------------------------------------------------------
+def test_Strings():
+    change_log = ChangeLog(
+        [
+            WorkItemChange(_DT, "title", "Two", "One"),
+            WorkItemChange(_DT, "title", "Three", "Two"),
+        ],
+    )
+
+    assert [change.ToTuple() for change in change_log] == [
+        (_DT, "title", "Two", "One"),
+        (_DT, "title", "Three", "Two"),
+    ]
+
+    # Strings are only stored once
+    assert change_log._strings == ["Two", "One", "Three"]  # pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "dt",
+    [
+        _DT,
+        datetime(2023, 1, 1, 12, 30, 15, 123456),
+        datetime(2023, 1, 1, 23, 59, 59, tzinfo=timezone(timedelta(hours=-8))),
+        datetime(2023, 1, 1, 0, 0, 1, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        datetime(1960, 6, 15, tzinfo=timezone.utc),
+    ],
+)
+def test_DateTimes(dt):
+    decoded_dt = ChangeLog([WorkItemChange(dt, "field", None, None)])[0].dt
+
+    assert decoded_dt == dt
+    assert decoded_dt.tzinfo == dt.tzinfo
+    assert decoded_dt.utcoffset() == dt.utcoffset()
+
+    # The local date is preserved, which matters to consumers that group changes by day
+    assert decoded_dt.date() == dt.date()
+
+
+# ----------------------------------------------------------------------
+def test_Indexing():
+    changes = [
+        WorkItemChange(_DT + timedelta(days=index), "field", index + 1, index)
+        for index in range(3)
+    ]
+
+    change_log = ChangeLog(changes)
+
+    assert len(change_log) == 3
+    assert change_log[-1].ToWorkItemChange() == changes[-1]
+    assert [change.ToWorkItemChange() for change in change_log] == changes
+
+    with pytest.raises(IndexError):
+        change_log[3]  # pylint: disable=pointless-statement
+
+    with pytest.raises(IndexError):
+        change_log[-4]  # pylint: disable=pointless-statement
+
+
+# ----------------------------------------------------------------------
+def test_Equality():
+    changes = [
+        WorkItemChange(_DT, "state", State.Active, State.New),
+        WorkItemChange(_DT + timedelta(days=1), "title", "New", "Old"),
+    ]
+
+    assert ChangeLog(changes) == ChangeLog(changes)
+    assert ChangeLog(changes) != ChangeLog(changes[:1])
+    assert ChangeLog(changes) != ChangeLog(list(reversed(changes)))
+    assert ChangeLog(changes) != changes
+
+
+# ----------------------------------------------------------------------
+def test_Sort():
+    changes = [
+        WorkItemChange(_DT + timedelta(days=2), "state", State.Closed, State.Active),
+        WorkItemChange(_DT, "title", "First", None),
+        WorkItemChange(_DT + timedelta(days=1), "story_points", 3, None),
+        WorkItemChange(_DT, "state", State.New, None),
+        WorkItemChange(_DT + timedelta(days=1), "estimate", TeeShirtWorkItem.Size.Small, 1.5),
+    ]
+
+    change_log = ChangeLog(changes)
+    change_log.Sort()
+
+    # Changes made at the same time remain in the order added
+    assert [change.ToWorkItemChange() for change in change_log] == [
+        changes[1],
+        changes[3],
+        changes[2],
+        changes[4],
+        changes[0],
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_SortSorted():
+    changes = [
+        WorkItemChange(_DT + timedelta(days=index), "field", index, None)
+        for index in range(3)
+    ]
+
+    change_log = ChangeLog(changes)
+
+    timestamps = change_log._timestamps  # pylint: disable=protected-access
+
+    change_log.Sort()
+
+    # The arrays aren't recreated when the changes are already sorted
+    assert change_log._timestamps is timestamps  # pylint: disable=protected-access
+    assert [change.ToWorkItemChange() for change in change_log] == changes
+
+
+# ----------------------------------------------------------------------
+def test_EnumFieldChanges():
+    change_log = ChangeLog(
+        [
+            WorkItemChange(_DT, "state", State.New, None),
+            WorkItemChange(_DT, "title", "Title", None),
+            WorkItemChange(_DT + timedelta(days=1), "state", State.Active, State.New),
+            WorkItemChange(_DT + timedelta(days=1), "story_points", 5, None),
+        ],
+    )
+
+    assert list(change_log.EnumFieldChanges(["state", "story_points"])) == [
+        ("state", _DT, State.New),
+        ("state", _DT + timedelta(days=1), State.Active),
+        ("story_points", _DT + timedelta(days=1), 5),
+    ]
+
+    assert list(change_log.EnumFieldChanges(["a field that has never been encoded"])) == []
+    assert list(change_log.EnumFieldChanges([])) == []
+
+
+# ----------------------------------------------------------------------
+def test_Json():
+    changes = [
+        WorkItemChange(_DT, "state", State.Active, State.New),
+        WorkItemChange(_DT, "estimate", TeeShirtWorkItem.Size.Large, None),
+        WorkItemChange(datetime(2023, 1, 2, tzinfo=timezone(timedelta(hours=-8))), "title", "State.Active", "Title"),
+        WorkItemChange(_DT, "story_points", 2 ** 62, True),
+    ]
+
+    data = json.loads(ToJsonString(ChangeLog(changes)))
+
+    # Change logs are encoded in the same way as a list of WorkItemChanges
+    assert data == json.loads(ToJsonString(changes))
+
+    # Strings that look like enums are only decoded as enums for fields that contain enums
+    assert [WorkItemChangeFromJson(item) for item in data] == changes
@@ -0,0 +1,286 @@
+# ----------------------------------------------------------------------
+# |
+# |  ChunkedEvents_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-27 09:12:26
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for ChunkedEvents.py"""
+
+import json
+import random
+import sys
+
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from ChunkedEvents import Chunk, CreateChunks, CreateManifest, MANIFEST_FILENAME, WriteChunkedEvents  # type: ignore; pylint: disable=import-error
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error
+from GenerateEvents import GenerateEvents, GenerateEventsResult             # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+class _Plugin(object):
+    feature_size_field_name                 = "story_points"
+    epic_size_field_name                    = "estimate"
+    state_field_name                        = "state"
+
+
+_START_DT                                   = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture(name="result", scope="module")
+def fixture_result() -> GenerateEventsResult:
+    return _CreateResult(random.Random(0))
+
+
+# ----------------------------------------------------------------------
+def test_Monthly(result):
+    chunks = CreateChunks(result)
+
+    assert len(chunks) > 1
+    assert sum(chunk.num_events for chunk in chunks) == len(result.events)
+
+    for chunk in chunks:
+        start_date = date.fromisoformat(chunk.start_date)
+        end_date = date.fromisoformat(chunk.end_date)
+
+        assert start_date.day == 1
+        assert (end_date + timedelta(days=1)).day == 1
+        assert start_date.month == end_date.month
+
+    _VerifyContent(result, chunks)
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("chunk_days", [1, 7, 30])
+def test_Days(result, chunk_days):
+    chunks = CreateChunks(result, chunk_days=chunk_days)
+
+    for chunk in chunks:
+        start_date = date.fromisoformat(chunk.start_date)
+
+        # Periods are aligned to multiples of `chunk_days` days since 0001-01-01
+        assert (start_date.toordinal() - 1) % chunk_days == 0
+        assert date.fromisoformat(chunk.end_date) == start_date + timedelta(days=chunk_days - 1)
+
+    _VerifyContent(result, chunks)
+
+    with pytest.raises(Exception, match="must be greater than 0"):
+        CreateChunks(result, chunk_days=0)
+
+
+# ----------------------------------------------------------------------
+def test_Stable(result):
+    chunks = CreateChunks(result, chunk_days=7)
+
+    # Remove the events of the last period; the chunks of the other periods don't change
+    truncated_chunks = CreateChunks(
+        GenerateEventsResult(result.titles, result.events[:-chunks[-1].num_events], result.epics),
+        chunk_days=7,
+    )
+
+    assert [chunk.hash for chunk in truncated_chunks] == [chunk.hash for chunk in chunks[:-1]]
+    assert all(chunk.filename == "{}.json".format(chunk.hash) for chunk in chunks)
+
+
+# ----------------------------------------------------------------------
+def test_Manifest(result):
+    chunks = CreateChunks(result)
+
+    manifest = CreateManifest(chunks)
+
+    assert manifest["chunk_days"] is None
+    assert manifest["first_date"] == chunks[0].start_date
+    assert manifest["last_date"] == chunks[-1].end_date
+    assert [chunk_info["hash"] for chunk_info in manifest["chunks"]] == [chunk.hash for chunk in chunks]
+    assert [chunk_info["num_events"] for chunk_info in manifest["chunks"]] == [chunk.num_events for chunk in chunks]
+
+    empty_manifest = CreateManifest(CreateChunks(GenerateEventsResult({}, [], {})), chunk_days=7)
+
+    assert empty_manifest["chunk_days"] == 7
+    assert empty_manifest["first_date"] is None
+    assert empty_manifest["chunks"] == []
+
+
+# ----------------------------------------------------------------------
+def test_Write(tmp_path, result):
+    dm = mock.MagicMock()
+
+    WriteChunkedEvents(dm, tmp_path, result, chunk_days=7)
+
+    manifest = _Load(tmp_path / MANIFEST_FILENAME)
+    chunks = CreateChunks(result, chunk_days=7)
+
+    assert manifest == CreateManifest(chunks, chunk_days=7)
+    assert sorted(child.name for child in tmp_path.iterdir()) == sorted([MANIFEST_FILENAME] + [chunk.filename for chunk in chunks])
+
+    for chunk in chunks:
+        assert (tmp_path / chunk.filename).read_bytes() == chunk.content
+
+    _VerifyWriteSummary(dm, "{} chunks written, 0 unchanged, 0 removed.\n".format(len(chunks)))
+
+    # Existing chunks aren't written again
+    dm = mock.MagicMock()
+
+    WriteChunkedEvents(dm, tmp_path, result, chunk_days=7)
+
+    _VerifyWriteSummary(dm, "0 chunks written, {} unchanged, 0 removed.\n".format(len(chunks)))
+
+    # Chunks that are no longer referenced are removed
+    truncated_result = GenerateEventsResult(result.titles, result.events[:-chunks[-1].num_events], result.epics)
+
+    dm = mock.MagicMock()
+
+    WriteChunkedEvents(dm, tmp_path, truncated_result, chunk_days=7)
+
+    _VerifyWriteSummary(dm, "0 chunks written, {} unchanged, 1 removed.\n".format(len(chunks) - 1))
+
+    assert not (tmp_path / chunks[-1].filename).exists()
+    assert _Load(tmp_path / MANIFEST_FILENAME) == CreateManifest(chunks[:-1], chunk_days=7)
+
+
+# ----------------------------------------------------------------------
+def test_WriteInvalidManifest(tmp_path, result):
+    (tmp_path / MANIFEST_FILENAME).write_text("not json", encoding="UTF-8")
+
+    WriteChunkedEvents(mock.MagicMock(), tmp_path, result)
+
+    assert _Load(tmp_path / MANIFEST_FILENAME) == CreateManifest(CreateChunks(result))
+
+
+# ----------------------------------------------------------------------
+def _CreateResult(
+    rng: random.Random,
+) -> GenerateEventsResult:
+    hierarchy_results: list[HierarchyResult] = []
+
+    for epic_index in range(4):
+        epic_id = str(epic_index)
+
+        hierarchy_results.append(
+            HierarchyResult(
+                HierarchyItem(
+                    TeeShirtWorkItem(epic_id, "Epic {}".format(epic_id), _START_DT, State.New, "Epic", None),
+                    _CreateChangeLog(rng, "estimate", list(TeeShirtWorkItem.Size)),
+                ),
+                [
+                    HierarchyItem(
+                        StoryPointsWorkItem(
+                            "{}-{}".format(epic_id, feature_index),
+                            "Feature {}-{}".format(epic_id, feature_index),
+                            _START_DT,
+                            State.New,
+                            "Feature",
+                            None,
+                        ),
+                        _CreateChangeLog(rng, "story_points", [1, 2, 3, 5, 8]),
+                    )
+                    for feature_index in range(rng.randint(2, 6))
+                ],
+            ),
+        )
+
+    return GenerateEvents(mock.MagicMock(), _Plugin, hierarchy_results)
+
+
+# ----------------------------------------------------------------------
+def _CreateChangeLog(
+    rng: random.Random,
+    size_field_name: str,
+    sizes: list[Any],
+) -> ChangeLog:
+    day = rng.randint(0, 20)
+
+    changes = [WorkItemChange(_START_DT + timedelta(days=day), "state", State.New, None)]
+
+    for _ in range(rng.randint(1, 5)):
+        day += rng.randint(1, 30)
+
+        if rng.random() < 0.5:
+            changes.append(WorkItemChange(_START_DT + timedelta(days=day), size_field_name, rng.choice(sizes), None))
+        else:
+            changes.append(
+                WorkItemChange(
+                    _START_DT + timedelta(days=day),
+                    "state",
+                    rng.choice([State.Pending, State.Active, State.Closed]),
+                    None,
+                ),
+            )
+
+    return ChangeLog(changes)
+
+
+# ----------------------------------------------------------------------
+def _Load(
+    filename: Path,
+) -> Any:
+    with filename.open(encoding="UTF-8") as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+def _VerifyContent(
+    result: GenerateEventsResult,
+    chunks: list[Chunk],
+) -> None:
+    """Verifies that each chunk contains the events, epic series, and titles of its period"""
+
+    expected = json.loads(ToJsonString(result))
+
+    all_events: list[Any] = []
+
+    for chunk in chunks:
+        content = json.loads(chunk.content)
+
+        assert len(content["events"]) == chunk.num_events
+        assert all(chunk.start_date <= event["date"] <= chunk.end_date for event in content["events"])
+
+        all_events += content["events"]
+
+        assert content["epics"] == {
+            epic_id: json.loads(ToJsonString(epic_series.Slice(chunk.start_date, chunk.end_date)))
+            for epic_id, epic_series in result.epics.items()
+            if epic_series.Slice(chunk.start_date, chunk.end_date).dates
+        }
+
+        for event in content["events"]:
+            for change in event["changes"]:
+                assert content["titles"][change["work_item_id"]] == result.titles[change["work_item_id"]]
+
+    # The events of all chunks are the events of the result
+    assert all_events == expected["events"]
+
+
+# ----------------------------------------------------------------------
+def _VerifyWriteSummary(
+    dm: mock.MagicMock,
+    expected: str,
+) -> None:
+    # The summary is written to the nested DoneManager
+    dm.Nested.return_value.__enter__.return_value.WriteVerbose.assert_called_once_with(expected)
@@ -0,0 +1,278 @@
+# ----------------------------------------------------------------------
+# |
+# |  CoalescingPlugin_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-09 13:05:31
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for CoalescingPlugin.py"""
+
+import sys
+import threading
+import time
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Optional
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.CoalescingPlugin import CoalescingPlugin                        # type: ignore; pylint: disable=import-error
+from Common.Plugin import Plugin                                            # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, WorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _Plugin(Plugin):
+    """Plugin that counts its calls; fetches block while `release_event` isn't set"""
+
+    # ----------------------------------------------------------------------
+    name: str                               = "Test"
+    epic_size_field_name: str               = "estimate"
+    feature_size_field_name: str            = "story_points"
+    state_field_name: str                   = "state"
+
+    calls: Counter                          = field(init=False, default_factory=Counter)
+    release_event: threading.Event          = field(init=False, default_factory=threading.Event)
+    num_errors: list[int]                   = field(init=False, default_factory=lambda: [0])
+
+    _lock: threading.Lock                   = field(init=False, default_factory=threading.Lock)
+
+    # ----------------------------------------------------------------------
+    def __post_init__(self):
+        self.release_event.set()
+
+    # ----------------------------------------------------------------------
+    def Initialize(self, *args, **kwargs) -> None:
+        pass
+
+    # ----------------------------------------------------------------------
+    def GetRootWorkItems(self, **kwargs) -> Iterable[str]:
+        return ["1"]
+
+    # ----------------------------------------------------------------------
+    def EnumChildren(
+        self,
+        root_id: str,
+        **kwargs,
+    ) -> Generator[str, None, None]:
+        self._OnCall("EnumChildren")
+        yield from ["{}.{}".format(root_id, index) for index in range(3)]
+
+    # ----------------------------------------------------------------------
+    def GetWorkItem(
+        self,
+        work_item_id: str,
+        **kwargs,
+    ) -> Optional[WorkItem]:
+        self._OnCall("GetWorkItem")
+        return _CreateWorkItem(work_item_id)
+
+    # ----------------------------------------------------------------------
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        **kwargs,
+    ) -> Generator[WorkItemChange, None, None]:
+        self._OnCall("GetWorkItemChanges")
+        yield WorkItemChange(_DT, "state", State.New, None)
+
+    # ----------------------------------------------------------------------
+    def _OnCall(
+        self,
+        method_name: str,
+    ) -> None:
+        with self._lock:
+            self.calls[method_name] += 1
+
+            raise_error = self.num_errors[0] > 0
+            if raise_error:
+                self.num_errors[0] -= 1
+
+        self.release_event.wait()
+
+        if raise_error:
+            raise Exception("Fetch error")
+
+
+# ----------------------------------------------------------------------
+_DT                                         = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+def test_Create():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin)
+
+    assert coalescing_plugin.name == plugin.name
+    assert coalescing_plugin.epic_size_field_name == plugin.epic_size_field_name
+    assert coalescing_plugin.feature_size_field_name == plugin.feature_size_field_name
+    assert coalescing_plugin.state_field_name == plugin.state_field_name
+    assert coalescing_plugin.retain_results is True
+
+
+# ----------------------------------------------------------------------
+def test_SingleFlight():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin, retain_results=False)
+
+    # Every request is made while the first fetch is in flight
+    results = _Invoke(plugin, coalescing_plugin, 8, lambda: coalescing_plugin.GetWorkItem("1"))
+
+    assert results == [_CreateWorkItem("1")] * 8
+    assert all(result is results[0] for result in results)
+
+    assert plugin.calls["GetWorkItem"] == 1
+
+    counters = coalescing_plugin.counters["GetWorkItem"]
+
+    assert counters.calls == 8
+    assert counters.fetches == 1
+    assert counters.waits == 7
+    assert counters.avoided == 7
+
+
+# ----------------------------------------------------------------------
+def test_RetainResults():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin)
+
+    for _ in range(3):
+        assert coalescing_plugin.GetWorkItem("1") == _CreateWorkItem("1")
+        assert list(coalescing_plugin.EnumChildren("1")) == ["1.0", "1.1", "1.2"]
+        assert list(coalescing_plugin.GetWorkItemChanges(_CreateWorkItem("1"))) == [WorkItemChange(_DT, "state", State.New, None)]
+
+    assert coalescing_plugin.GetWorkItem("2") == _CreateWorkItem("2")
+
+    assert plugin.calls == Counter({"GetWorkItem": 2, "EnumChildren": 1, "GetWorkItemChanges": 1})
+
+    # Requests made once the fetch is complete don't wait
+    assert coalescing_plugin.counters["GetWorkItem"].calls == 4
+    assert coalescing_plugin.counters["GetWorkItem"].fetches == 2
+    assert coalescing_plugin.counters["GetWorkItem"].waits == 0
+
+
+# ----------------------------------------------------------------------
+def test_DontRetainResults():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin, retain_results=False)
+
+    for _ in range(3):
+        assert coalescing_plugin.GetWorkItem("1") == _CreateWorkItem("1")
+        assert list(coalescing_plugin.EnumChildren("1")) == ["1.0", "1.1", "1.2"]
+
+    # Results are only shared while the fetch is in flight, so they aren't retained
+    assert plugin.calls == Counter({"GetWorkItem": 3, "EnumChildren": 3})
+    assert not coalescing_plugin._futures  # pylint: disable=protected-access
+
+
+# ----------------------------------------------------------------------
+def test_Errors():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin)
+
+    plugin.num_errors[0] = 1
+
+    # ----------------------------------------------------------------------
+    def Func():
+        try:
+            return coalescing_plugin.GetWorkItem("1")
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            return ex
+
+    # ----------------------------------------------------------------------
+
+    results = _Invoke(plugin, coalescing_plugin, 4, Func)
+
+    # Requests waiting on the fetch receive its exception
+    assert all(isinstance(result, Exception) and str(result) == "Fetch error" for result in results)
+    assert plugin.calls["GetWorkItem"] == 1
+
+    # Errors aren't retained
+    assert coalescing_plugin.GetWorkItem("1") == _CreateWorkItem("1")
+    assert plugin.calls["GetWorkItem"] == 2
+
+
+# ----------------------------------------------------------------------
+def test_Kwargs():
+    plugin = _Plugin()
+    coalescing_plugin = CoalescingPlugin.Create(plugin)
+
+    # Requests with arguments aren't coalesced
+    for _ in range(2):
+        assert coalescing_plugin.GetWorkItem("1", option=True) == _CreateWorkItem("1")
+
+    assert plugin.calls["GetWorkItem"] == 2
+    assert coalescing_plugin.counters["GetWorkItem"].calls == 0
+
+
+# ----------------------------------------------------------------------
+def test_RevisionCounts():
+    with pytest.raises(Exception, match="does not support revision counts"):
+        CoalescingPlugin.Create(_Plugin()).GetRevisionCounts(["1"])
+
+
+# ----------------------------------------------------------------------
+def _CreateWorkItem(
+    work_item_id: str,
+) -> WorkItem:
+    return StoryPointsWorkItem(work_item_id, "Title {}".format(work_item_id), _DT, State.New, "Feature", 3)
+
+
+# ----------------------------------------------------------------------
+def _Invoke(
+    plugin: _Plugin,
+    coalescing_plugin: CoalescingPlugin,
+    num_threads: int,
+    func: Callable[[], Any],
+) -> list[Any]:
+    """Invokes `func` on multiple threads while the plugin is blocked, releasing it once every thread has made its request"""
+
+    results: list[Any] = [None] * num_threads
+
+    # ----------------------------------------------------------------------
+    def ThreadProc(
+        index: int,
+    ) -> None:
+        results[index] = func()
+
+    # ----------------------------------------------------------------------
+
+    plugin.release_event.clear()
+
+    threads = [threading.Thread(target=ThreadProc, args=(index, )) for index in range(num_threads)]
+
+    for thread in threads:
+        thread.start()
+
+    deadline = time.monotonic() + 10
+
+    while sum(counters.calls for counters in coalescing_plugin.counters.values()) < num_threads:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    plugin.release_event.set()
+
+    for thread in threads:
+        thread.join()
+
+    return results
@@ -0,0 +1,253 @@
+# ----------------------------------------------------------------------
+# |
+# |  EventStore_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-26 11:04:45
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for EventStore.py"""
+
+import random
+import sqlite3
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error
+from EventStore import EventStore, WriteEventStore                          # type: ignore; pylint: disable=import-error
+from GenerateEvents import GenerateEvents, GenerateEventsResult             # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+class _Plugin(object):
+    feature_size_field_name                 = "story_points"
+    epic_size_field_name                    = "estimate"
+    state_field_name                        = "state"
+
+
+_START_DT                                   = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+@pytest.fixture(name="results", scope="module")
+def fixture_results() -> GenerateEventsResult:
+    return _CreateResults(random.Random(0))
+
+
+# ----------------------------------------------------------------------
+def test_EnumEvents(tmp_path, results):
+    filename = _Write(tmp_path, results)
+
+    with EventStore(filename) as event_store:
+        # The events (and their changes) are the same as those that were written
+        assert ToJsonString(list(event_store.EnumEvents())) == ToJsonString(results.events)
+
+        dates = [event.date for event in results.events]
+
+        for start_date, end_date in [
+            (dates[3], None),
+            (None, dates[-4]),
+            (dates[2], dates[5]),
+            (dates[4], dates[4]),
+            ("2000-01-01", "2000-12-31"),
+        ]:
+            assert ToJsonString(list(event_store.EnumEvents(start_date, end_date))) == ToJsonString(
+                [
+                    event
+                    for event in results.events
+                    if (start_date is None or event.date >= start_date) and (end_date is None or event.date <= end_date)
+                ],
+            )
+
+
+# ----------------------------------------------------------------------
+def test_GetTitles(tmp_path, results):
+    with EventStore(_Write(tmp_path, results)) as event_store:
+        assert event_store.GetTitles() == results.titles
+
+        work_item_ids = list(results.titles.keys())[:3] + ["does_not_exist"]
+
+        assert event_store.GetTitles(work_item_ids) == {
+            work_item_id: results.titles[work_item_id]
+            for work_item_id in work_item_ids[:3]
+        }
+
+
+# ----------------------------------------------------------------------
+def test_GetEpicSeries(tmp_path, results):
+    with EventStore(_Write(tmp_path, results)) as event_store:
+        for epic_id, epic_series in results.epics.items():
+            assert ToJsonString(event_store.GetEpicSeries(epic_id)) == ToJsonString(epic_series)
+
+            dates = epic_series.dates
+
+            for start_date, end_date in [
+                (dates[0], None),
+                (dates[-1], None),
+                ("2000-01-01", None),
+                (None, dates[len(dates) // 2]),
+                (dates[len(dates) // 2], dates[-1]),
+                ("2099-01-01", None),
+            ]:
+                # The series is the same as the slice of the series that was written
+                assert ToJsonString(event_store.GetEpicSeries(epic_id, start_date, end_date)) == ToJsonString(
+                    epic_series.Slice(start_date, end_date),
+                ), (epic_id, start_date, end_date)
+
+        assert event_store.GetEpicSeries("does_not_exist").dates == []
+
+
+# ----------------------------------------------------------------------
+def test_EnumChanges(tmp_path, results):
+    all_changes = [(event.date, change) for event in results.events for change in event.changes]
+
+    epic_id = all_changes[-1][1].epic_id
+    work_item_id = all_changes[-1][1].work_item_id
+
+    start_date = results.events[len(results.events) // 3].date
+
+    with EventStore(_Write(tmp_path, results)) as event_store:
+        assert list(event_store.EnumChanges()) == all_changes
+
+        assert list(event_store.EnumChanges(start_date)) == [
+            (date, change) for date, change in all_changes if date >= start_date
+        ]
+
+        assert list(event_store.EnumChanges(epic_id=epic_id)) == [
+            (date, change) for date, change in all_changes if change.epic_id == epic_id
+        ]
+
+        assert list(event_store.EnumChanges(start_date, epic_id=epic_id, work_item_id=work_item_id)) == [
+            (date, change)
+            for date, change in all_changes
+            if date >= start_date and change.epic_id == epic_id and change.work_item_id == work_item_id
+        ]
+
+
+# ----------------------------------------------------------------------
+def test_Overwrite(tmp_path, results):
+    filename = _Write(tmp_path, results)
+
+    other_results = _CreateResults(random.Random(1))
+
+    WriteEventStore(mock.MagicMock(), filename, other_results)
+
+    # The temporary file replaces the existing database
+    assert [child.name for child in tmp_path.iterdir()] == [filename.name]
+
+    with EventStore(filename) as event_store:
+        assert ToJsonString(list(event_store.EnumEvents())) == ToJsonString(other_results.events)
+
+
+# ----------------------------------------------------------------------
+def test_InvalidStore(tmp_path):
+    with pytest.raises(Exception, match="does not exist"):
+        EventStore(tmp_path / "does_not_exist.db")
+
+    filename = tmp_path / "other.db"
+
+    connection = sqlite3.connect(filename)
+    connection.execute("CREATE TABLE other (value TEXT)")
+    connection.commit()
+    connection.close()
+
+    with pytest.raises(Exception, match="is not an event store produced by this version"):
+        EventStore(filename)
+
+
+# ----------------------------------------------------------------------
+def _Write(
+    output_dir: Path,
+    results: GenerateEventsResult,
+) -> Path:
+    filename = output_dir / "events.db"
+
+    WriteEventStore(mock.MagicMock(), filename, results)
+
+    return filename
+
+
+# ----------------------------------------------------------------------
+def _CreateResults(
+    rng: random.Random,
+) -> GenerateEventsResult:
+    hierarchy_results: list[HierarchyResult] = []
+
+    for epic_index in range(4):
+        epic_id = str(epic_index)
+
+        hierarchy_results.append(
+            HierarchyResult(
+                HierarchyItem(
+                    TeeShirtWorkItem(epic_id, "Epic {}".format(epic_id), _START_DT, State.New, "Epic", None),
+                    _CreateChangeLog(rng, "estimate", list(TeeShirtWorkItem.Size)),
+                ),
+                [
+                    HierarchyItem(
+                        StoryPointsWorkItem(
+                            "{}-{}".format(epic_id, feature_index),
+                            "Feature {}-{}".format(epic_id, feature_index),
+                            _START_DT,
+                            State.New,
+                            "Feature",
+                            None,
+                        ),
+                        _CreateChangeLog(rng, "story_points", [1, 2, 3, 5, 8]),
+                    )
+                    for feature_index in range(rng.randint(2, 6))
+                ],
+            ),
+        )
+
+    return GenerateEvents(mock.MagicMock(), _Plugin, hierarchy_results)
+
+
+# ----------------------------------------------------------------------
+def _CreateChangeLog(
+    rng: random.Random,
+    size_field_name: str,
+    sizes: list,
+) -> ChangeLog:
+    day = rng.randint(0, 20)
+
+    changes = [WorkItemChange(_START_DT + timedelta(days=day), "state", State.New, None)]
+
+    for _ in range(rng.randint(1, 5)):
+        day += rng.randint(1, 10)
+
+        if rng.random() < 0.5:
+            changes.append(WorkItemChange(_START_DT + timedelta(days=day), size_field_name, rng.choice(sizes), None))
+        else:
+            changes.append(
+                WorkItemChange(
+                    _START_DT + timedelta(days=day),
+                    "state",
+                    rng.choice([State.Pending, State.Active, State.Closed]),
+                    None,
+                ),
+            )
+
+    return ChangeLog(changes)
@@ -0,0 +1,190 @@
+# ----------------------------------------------------------------------
+# |
+# |  GenerateEvents_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-28 10:14:37
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for GenerateEvents.py"""
+
+import random
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from unittest import mock
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, WorkItemChange      # type: ignore; pylint: disable=import-error
+from GenerateEvents import EventsGenerator, GenerateEvents                  # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+class _Plugin(object):
+    feature_size_field_name                 = "story_points"
+    epic_size_field_name                    = "estimate"
+    state_field_name                        = "state"
+
+
+_START_DT                                   = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+def test_UpdateAfterLastEvent():
+    # The number of events is a multiple of the checkpoint interval, so there isn't a checkpoint at the
+    # index of the new event.
+    hierarchy_results = [
+        HierarchyResult(
+            _CreateHierarchyItem("1", [(0, "state", State.New)]),
+            [
+                _CreateHierarchyItem(str(100 + index), [(index, "state", State.New)])
+                for index in range(32)
+            ],
+        ),
+    ]
+
+    generator = EventsGenerator.Create(mock.MagicMock(), _Plugin, hierarchy_results, checkpoint_interval=32)
+
+    _UpdateChildChanges(hierarchy_results, 0, [(0, "state", State.New), (40, "state", State.Active)])
+
+    assert generator.Update(hierarchy_results, {"100"}) == (_START_DT + timedelta(days=40)).date()
+
+    last_event = generator.result.events[-1]
+
+    assert last_event.features_unestimated_num.created == 31
+    assert last_event.features_unestimated_num.active == 1
+
+    _VerifyResult(generator, hierarchy_results)
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("checkpoint_interval", [None, 1, 3, 8, 32])
+@pytest.mark.parametrize("seed", range(5))
+def test_UpdateMatchesRegeneration(
+    seed: int,
+    checkpoint_interval: Optional[int],
+):
+    rng = random.Random(seed)
+
+    hierarchy_results = [
+        HierarchyResult(
+            _CreateHierarchyItem(str(epic_index), _CreateRandomChanges(rng, "estimate")),
+            [
+                _CreateHierarchyItem("{}-{}".format(epic_index, feature_index), _CreateRandomChanges(rng, "story_points"))
+                for feature_index in range(rng.randint(0, 8))
+            ],
+        )
+        for epic_index in range(5)
+    ]
+
+    generator = EventsGenerator.Create(mock.MagicMock(), _Plugin, hierarchy_results, checkpoint_interval=checkpoint_interval)
+
+    _VerifyResult(generator, hierarchy_results)
+
+    for _ in range(30):
+        # Change the work items of a random set of children (including those that move changes before
+        # the first event or after the last event)
+        epic_index = rng.randrange(len(hierarchy_results))
+
+        if not hierarchy_results[epic_index].children:
+            continue
+
+        work_item_ids: set[str] = set()
+
+        for _ in range(rng.randint(1, 3)):
+            child_index = rng.randrange(len(hierarchy_results[epic_index].children))
+
+            _UpdateChildChanges(
+                hierarchy_results,
+                epic_index,
+                _CreateRandomChanges(rng, "story_points", first_day=rng.randint(-10, 120)),
+                child_index,
+            )
+
+            work_item_ids.add(hierarchy_results[epic_index].children[child_index].work_item.work_item_id)
+
+        generator.Update(hierarchy_results, work_item_ids)
+
+        _VerifyResult(generator, hierarchy_results)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+# ----------------------------------------------------------------------
+def _CreateHierarchyItem(
+    work_item_id: str,
+    changes: list[tuple[int, str, object]],
+) -> HierarchyItem:
+    return HierarchyItem(
+        StoryPointsWorkItem(work_item_id, "Title {}".format(work_item_id), _START_DT, State.New, "Feature", None),
+        ChangeLog(
+            WorkItemChange(_START_DT + timedelta(days=day), field, value, None)
+            for day, field, value in changes
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def _CreateRandomChanges(
+    rng: random.Random,
+    size_field_name: str,
+    *,
+    first_day: int=0,
+) -> list[tuple[int, str, object]]:
+    changes: list[tuple[int, str, object]] = [(first_day, "state", State.New)]
+
+    day = first_day
+
+    for _ in range(rng.randint(0, 6)):
+        day += rng.randint(0, 10)
+
+        if rng.random() < 0.5:
+            changes.append((day, size_field_name, rng.choice([1, 2, 3, 5, 8])))
+        else:
+            changes.append((day, "state", rng.choice([State.Estimated, State.Pending, State.Active, State.Closed])))
+
+    return changes
+
+
+# ----------------------------------------------------------------------
+def _UpdateChildChanges(
+    hierarchy_results: list[HierarchyResult],
+    epic_index: int,
+    changes: list[tuple[int, str, object]],
+    child_index: int=0,
+) -> None:
+    hierarchy_result = hierarchy_results[epic_index]
+
+    children = list(hierarchy_result.children)
+    children[child_index] = _CreateHierarchyItem(children[child_index].work_item.work_item_id, changes)
+
+    hierarchy_results[epic_index] = HierarchyResult(hierarchy_result.root, children)
+
+
+# ----------------------------------------------------------------------
+def _VerifyResult(
+    generator: EventsGenerator,
+    hierarchy_results: list[HierarchyResult],
+) -> None:
+    assert ToJsonString(generator.result) == ToJsonString(GenerateEvents(mock.MagicMock(), _Plugin, hierarchy_results))
@@ -0,0 +1,308 @@
+# ----------------------------------------------------------------------
+# |
+# |  MergeEvents_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-23 13:52:08
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for MergeEvents.py"""
+
+import json
+import random
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error
+from GenerateEvents import GenerateEvents                                   # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+from MergeEvents import _EventsFileReader, MergeEvents                      # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+class _Plugin(object):
+    feature_size_field_name                 = "story_points"
+    epic_size_field_name                    = "estimate"
+    state_field_name                        = "state"
+
+
+_START_DT                                   = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+_EVENT_INFO_ATTRIBUTE_NAMES                 = [
+    "epics_estimated_num",
+    "epics_unestimated_num",
+    "features_estimated_num",
+    "features_unestimated_num",
+    "features_estimated_size",
+]
+
+
+# ----------------------------------------------------------------------
+def test_Merge(tmp_path):
+    inputs = [
+        ("first", _WriteEvents(tmp_path / "first.json", random.Random(1))),
+        ("second", _WriteEvents(tmp_path / "second.json", random.Random(2))),
+        ("third", _WriteEvents(tmp_path / "third.json", random.Random(3))),
+    ]
+
+    output_filename = tmp_path / "output" / "merged.json"
+
+    MergeEvents(mock.MagicMock(), inputs, output_filename)
+
+    _Verify(output_filename, inputs)
+
+
+# ----------------------------------------------------------------------
+def test_SingleInput(tmp_path):
+    input_filename = _WriteEvents(tmp_path / "input.json", random.Random(4))
+    output_filename = tmp_path / "merged.json"
+
+    MergeEvents(mock.MagicMock(), [("project", input_filename)], output_filename)
+
+    original = _Load(input_filename)
+    merged = _Load(output_filename)
+
+    # The events are the same, other than the qualified ids
+    assert len(merged["events"]) == len(original["events"])
+
+    for merged_event, original_event in zip(merged["events"], original["events"]):
+        assert merged_event["date"] == original_event["date"]
+
+        for attribute_name in _EVENT_INFO_ATTRIBUTE_NAMES:
+            assert merged_event[attribute_name] == original_event[attribute_name]
+
+        assert [change["work_item_id"] for change in merged_event["changes"]] == [
+            "project:{}".format(change["work_item_id"])
+            for change in original_event["changes"]
+        ]
+
+    assert merged["epics"] == {"project:{}".format(epic_id): epic_series for epic_id, epic_series in original["epics"].items()}
+
+
+# ----------------------------------------------------------------------
+def test_SmallChunks(tmp_path, monkeypatch):
+    inputs = [
+        ("first", _WriteEvents(tmp_path / "first.json", random.Random(5))),
+        ("second", _WriteEvents(tmp_path / "second.json", random.Random(6))),
+    ]
+
+    expected_filename = tmp_path / "expected.json"
+    MergeEvents(mock.MagicMock(), inputs, expected_filename)
+
+    # Values span multiple chunks
+    monkeypatch.setattr(_EventsFileReader, "_CHUNK_SIZE", 7)
+
+    output_filename = tmp_path / "merged.json"
+    MergeEvents(mock.MagicMock(), inputs, output_filename)
+
+    assert _Load(output_filename) == _Load(expected_filename)
+
+
+# ----------------------------------------------------------------------
+def test_WithoutEpics(tmp_path):
+    input_filename = _WriteEvents(tmp_path / "input.json", random.Random(7))
+
+    # Files written before epic series were generated don't contain them
+    content = _Load(input_filename)
+    del content["epics"]
+
+    input_filename.write_text(json.dumps(content, indent=2), encoding="UTF-8")
+
+    output_filename = tmp_path / "merged.json"
+
+    MergeEvents(mock.MagicMock(), [("project", input_filename)], output_filename)
+
+    merged = _Load(output_filename)
+
+    assert merged["epics"] == {}
+    assert len(merged["events"]) == len(content["events"])
+
+
+# ----------------------------------------------------------------------
+def test_WithoutEvents(tmp_path):
+    empty_filename = tmp_path / "empty.json"
+    empty_filename.write_text(ToJsonString(GenerateEvents(mock.MagicMock(), _Plugin, [])), encoding="UTF-8")
+
+    inputs = [
+        ("empty", empty_filename),
+        ("project", _WriteEvents(tmp_path / "input.json", random.Random(8))),
+    ]
+
+    output_filename = tmp_path / "merged.json"
+
+    MergeEvents(mock.MagicMock(), inputs, output_filename)
+
+    _Verify(output_filename, inputs)
+
+
+# ----------------------------------------------------------------------
+def test_DuplicateNamespaces(tmp_path):
+    input_filename = _WriteEvents(tmp_path / "input.json", random.Random(9))
+
+    with pytest.raises(Exception, match="Namespaces must be unique"):
+        MergeEvents(mock.MagicMock(), [("project", input_filename), ("project", input_filename)], tmp_path / "merged.json")
+
+
+# ----------------------------------------------------------------------
+def test_InvalidInput(tmp_path):
+    input_filename = tmp_path / "input.json"
+    input_filename.write_text(json.dumps({"events": []}), encoding="UTF-8")
+
+    with pytest.raises(Exception, match="'titles' was expected but 'events' was found"):
+        MergeEvents(mock.MagicMock(), [("project", input_filename)], tmp_path / "merged.json")
+
+
+# ----------------------------------------------------------------------
+def _WriteEvents(
+    filename: Path,
+    rng: random.Random,
+) -> Path:
+    hierarchy_results: list[HierarchyResult] = []
+
+    for epic_index in range(rng.randint(1, 4)):
+        epic_id = str(epic_index)
+
+        hierarchy_results.append(
+            HierarchyResult(
+                HierarchyItem(
+                    TeeShirtWorkItem(epic_id, "Epic {}".format(epic_id), _START_DT, State.New, "Epic", None),
+                    _CreateChangeLog(rng, "estimate", lambda: rng.choice(list(TeeShirtWorkItem.Size))),
+                ),
+                [
+                    HierarchyItem(
+                        StoryPointsWorkItem(
+                            "{}-{}".format(epic_id, feature_index),
+                            "Feature {}-{}".format(epic_id, feature_index),
+                            _START_DT,
+                            State.New,
+                            "Feature",
+                            None,
+                        ),
+                        _CreateChangeLog(rng, "story_points", lambda: rng.choice([1, 2, 3, 5, 8])),
+                    )
+                    for feature_index in range(rng.randint(0, 6))
+                ],
+            ),
+        )
+
+    filename.write_text(ToJsonString(GenerateEvents(mock.MagicMock(), _Plugin, hierarchy_results)), encoding="UTF-8")
+
+    return filename
+
+
+# ----------------------------------------------------------------------
+def _CreateChangeLog(
+    rng: random.Random,
+    size_field_name: str,
+    create_size_func: Callable[[], Any],
+) -> ChangeLog:
+    day = rng.randint(0, 20)
+
+    changes = [WorkItemChange(_START_DT + timedelta(days=day), "state", State.New, None)]
+
+    for _ in range(rng.randint(0, 4)):
+        day += rng.randint(1, 10)
+
+        if rng.random() < 0.5:
+            changes.append(WorkItemChange(_START_DT + timedelta(days=day), size_field_name, create_size_func(), None))
+        else:
+            changes.append(
+                WorkItemChange(
+                    _START_DT + timedelta(days=day),
+                    "state",
+                    rng.choice([State.Pending, State.Active, State.Closed]),
+                    None,
+                ),
+            )
+
+    return ChangeLog(changes)
+
+
+# ----------------------------------------------------------------------
+def _Load(
+    filename: Path,
+) -> dict[str, Any]:
+    with filename.open(encoding="UTF-8") as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+def _Verify(
+    output_filename: Path,
+    inputs: list[tuple[str, Path]],
+) -> None:
+    """Verifies the merged output against the content of the inputs loaded in their entirety"""
+
+    contents = [(namespace, _Load(filename)) for namespace, filename in inputs]
+    merged = _Load(output_filename)
+
+    assert merged["titles"] == {
+        "{}:{}".format(namespace, work_item_id): title
+        for namespace, content in contents
+        for work_item_id, title in content["titles"].items()
+    }
+
+    assert merged["epics"] == {
+        "{}:{}".format(namespace, epic_id): epic_series
+        for namespace, content in contents
+        for epic_id, epic_series in content["epics"].items()
+    }
+
+    dates = sorted(set(event["date"] for _, content in contents for event in content["events"]))
+
+    assert [event["date"] for event in merged["events"]] == dates
+
+    for merged_event in merged["events"]:
+        date = merged_event["date"]
+
+        # The counts are the sum of each input's most recent event on or before the date
+        for attribute_name in _EVENT_INFO_ATTRIBUTE_NAMES:
+            expected_counts = {"created": 0, "pending": 0, "active": 0, "completed": 0}
+
+            for _, content in contents:
+                events = [event for event in content["events"] if event["date"] <= date]
+                if not events:
+                    continue
+
+                for counter_name, value in events[-1][attribute_name].items():
+                    expected_counts[counter_name] += value
+
+            assert merged_event[attribute_name] == expected_counts, (date, attribute_name)
+
+        assert merged_event["team"] is None
+
+        # Changes on the date are included in input order
+        assert merged_event["changes"] == [
+            {
+                **change,
+                "work_item_id": "{}:{}".format(namespace, change["work_item_id"]),
+                "epic_id": "{}:{}".format(namespace, change["epic_id"]),
+            }
+            for namespace, content in contents
+            for event in content["events"]
+            if event["date"] == date
+            for change in event["changes"]
+        ]
@@ -0,0 +1,298 @@
+# ----------------------------------------------------------------------
+# |
+# |  MergeHierarchies_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-22 09:37:51
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for MergeHierarchies.py"""
+
+import json
+import sys
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from unittest import mock
+
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.ChangeLog import ChangeLog                                      # type: ignore; pylint: disable=import-error
+from Common.Serialization import ToJsonString                               # type: ignore; pylint: disable=import-error
+from Common.WorkItem import State, StoryPointsWorkItem, WorkItemChange      # type: ignore; pylint: disable=import-error
+from GenerateHierarchies import HierarchyItem, HierarchyResult              # type: ignore; pylint: disable=import-error
+from MergeHierarchies import GetShardIndex, GetShardRootWorkItemIds, MergeHierarchies, PartialResult  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_DT                                         = datetime(2023, 1, 1, 9, tzinfo=timezone.utc)
+
+_ROOT_WORK_ITEM_IDS                         = [str(work_item_id) for work_item_id in range(100, 120)]
+
+
+# ----------------------------------------------------------------------
+def test_GetShardIndex():
+    for shard_count in [1, 2, 3, 7]:
+        shard_indexes = [GetShardIndex(root_work_item_id, shard_count) for root_work_item_id in _ROOT_WORK_ITEM_IDS]
+
+        assert all(0 <= shard_index < shard_count for shard_index in shard_indexes)
+
+        # The value doesn't change across invocations
+        assert shard_indexes == [GetShardIndex(root_work_item_id, shard_count) for root_work_item_id in _ROOT_WORK_ITEM_IDS]
+
+    # Roots are distributed across shards
+    assert len(set(GetShardIndex(root_work_item_id, 3) for root_work_item_id in _ROOT_WORK_ITEM_IDS)) == 3
+
+
+# ----------------------------------------------------------------------
+def test_GetShardRootWorkItemIds():
+    shard_root_work_item_ids = [GetShardRootWorkItemIds(_ROOT_WORK_ITEM_IDS, shard_index, 3) for shard_index in range(3)]
+
+    # Every root belongs to exactly one shard, and the original order is preserved within each shard
+    assert sorted(sum(shard_root_work_item_ids, [])) == sorted(_ROOT_WORK_ITEM_IDS)
+
+    for root_work_item_ids in shard_root_work_item_ids:
+        assert root_work_item_ids == [
+            root_work_item_id
+            for root_work_item_id in _ROOT_WORK_ITEM_IDS
+            if root_work_item_id in root_work_item_ids
+        ]
+
+    with pytest.raises(Exception, match="The shard index '3' must be less than the shard count '3'."):
+        GetShardRootWorkItemIds(_ROOT_WORK_ITEM_IDS, 3, 3)
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("shard_count", [1, 2, 4])
+def test_Merge(tmp_path, shard_count):
+    hierarchies = [_CreateHierarchy(root_work_item_id) for root_work_item_id in _ROOT_WORK_ITEM_IDS]
+
+    partial_filenames = _WritePartials(tmp_path, hierarchies, shard_count)
+
+    # Partials may be provided in any order
+    partial_filenames.reverse()
+
+    dm = _CreateDoneManager()
+
+    result = MergeHierarchies(dm, partial_filenames)
+
+    assert dm.result == 0
+    assert result is not None
+
+    assert result.command_name == "GenerateHierarchies"
+    assert result.plugin_name == "Test"
+
+    # The merged content is the same as the content produced by a single invocation
+    assert result.hierarchies == json.loads(ToJsonString(hierarchies))
+    assert ToJsonString(result.ToHierarchyResults()) == ToJsonString(hierarchies)
+
+
+# ----------------------------------------------------------------------
+def test_SharedWorkItems(tmp_path):
+    root_work_item_ids = _ROOT_WORK_ITEM_IDS[:6]
+
+    # Each hierarchy contains the shared work item, but its changes differ (as it was fetched at different
+    # times by each shard).
+    hierarchies = [
+        _CreateHierarchy(root_work_item_id, shared_value=index)
+        for index, root_work_item_id in enumerate(root_work_item_ids)
+    ]
+
+    dm = _CreateDoneManager()
+
+    result = MergeHierarchies(dm, _WritePartials(tmp_path, hierarchies, 3))
+
+    assert result is not None
+
+    # The first occurrence (in root order) is used for all hierarchies
+    expected_shared_item = json.loads(ToJsonString(hierarchies[0].children[-1]))
+
+    for hierarchy in result.hierarchies:
+        assert hierarchy["children"][-1] == expected_shared_item
+
+    # Work items that aren't shared are unchanged
+    assert [hierarchy["root"]["work_item"]["work_item_id"] for hierarchy in result.hierarchies] == root_work_item_ids
+
+
+# ----------------------------------------------------------------------
+def test_MissingShard(tmp_path):
+    partial_filenames = _WritePartials(tmp_path, [_CreateHierarchy(root_work_item_id) for root_work_item_id in _ROOT_WORK_ITEM_IDS], 3)
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, partial_filenames[:2]) is None
+    assert _GetErrors(dm) == ["The partial result for shard '2' was not provided.\n"]
+
+
+# ----------------------------------------------------------------------
+def test_DuplicateShard(tmp_path):
+    partial_filenames = _WritePartials(tmp_path, [_CreateHierarchy(root_work_item_id) for root_work_item_id in _ROOT_WORK_ITEM_IDS], 2)
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, partial_filenames + partial_filenames[:1]) is None
+    assert _GetErrors(dm) == ["The shard '0' was provided multiple times ('{}').\n".format(partial_filenames[0])]
+
+
+# ----------------------------------------------------------------------
+def test_MismatchedPartials(tmp_path):
+    hierarchies = [_CreateHierarchy(root_work_item_id) for root_work_item_id in _ROOT_WORK_ITEM_IDS]
+
+    partial_filenames = _WritePartials(tmp_path / "first", hierarchies, 2)
+    other_partial_filenames = _WritePartials(tmp_path / "second", hierarchies[:-1], 2, command_name="GenerateEvents")
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, [partial_filenames[0], other_partial_filenames[1]]) is None
+
+    errors = _GetErrors(dm)
+
+    assert len(errors) == 2
+    assert errors[0].startswith("The 'command_name' value in '{}'".format(other_partial_filenames[1]))
+    assert errors[1].startswith("The 'root_work_item_ids' value in '{}'".format(other_partial_filenames[1]))
+
+
+# ----------------------------------------------------------------------
+def test_InvalidPartial(tmp_path):
+    hierarchies = [_CreateHierarchy(root_work_item_id) for root_work_item_id in _ROOT_WORK_ITEM_IDS]
+
+    # The output of an invocation without '--shard-count'
+    filename = tmp_path / "hierarchies.json"
+    filename.write_text(ToJsonString(hierarchies), encoding="UTF-8")
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, [filename]) is None
+    assert _GetErrors(dm) == ["'{}' is not a partial result produced with '--shard-count'.\n".format(filename)]
+
+    # A partial with the wrong number of hierarchies
+    partial_filename = tmp_path / "partial.json"
+    partial_filename.write_text(
+        ToJsonString(PartialResult("GenerateHierarchies", "Test", 0, 1, _ROOT_WORK_ITEM_IDS, hierarchies[:-1])),
+        encoding="UTF-8",
+    )
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, [partial_filename]) is None
+    assert _GetErrors(dm) == ["The shard '0' contains 19 hierarchies, but 20 were expected.\n"]
+
+    dm = _CreateDoneManager()
+
+    assert MergeHierarchies(dm, []) is None
+    assert _GetErrors(dm) == ["No partial results were provided.\n"]
+
+
+# ----------------------------------------------------------------------
+def _CreateHierarchy(
+    root_work_item_id: str,
+    *,
+    shared_value: Optional[int]=None,
+) -> HierarchyResult:
+    children = [_CreateHierarchyItem("{}.{}".format(root_work_item_id, index), index + 1) for index in range(2)]
+
+    if shared_value is not None:
+        children.append(_CreateHierarchyItem("shared", shared_value))
+
+    return HierarchyResult(_CreateHierarchyItem(root_work_item_id, 0), children)
+
+
+# ----------------------------------------------------------------------
+def _CreateHierarchyItem(
+    work_item_id: str,
+    value: int,
+) -> HierarchyItem:
+    return HierarchyItem(
+        StoryPointsWorkItem(work_item_id, "Title {}".format(work_item_id), _DT, State.New, "Feature", None),
+        ChangeLog(
+            [
+                WorkItemChange(_DT, "state", State.New, None),
+                WorkItemChange(_DT + timedelta(days=1), "story_points", value, None),
+            ],
+        ),
+    )
+
+
+# ----------------------------------------------------------------------
+def _WritePartials(
+    output_dir: Path,
+    hierarchies: list[HierarchyResult],
+    shard_count: int,
+    *,
+    command_name: str="GenerateHierarchies",
+) -> list[Path]:
+    """Writes the partial results that would be produced by each shard"""
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    root_work_item_ids = [hierarchy.root.work_item.work_item_id for hierarchy in hierarchies]
+    root_hierarchies = dict(zip(root_work_item_ids, hierarchies))
+
+    partial_filenames: list[Path] = []
+
+    for shard_index in range(shard_count):
+        partial_filename = output_dir / "partial_{}.json".format(shard_index)
+
+        partial_filename.write_text(
+            ToJsonString(
+                PartialResult(
+                    command_name,
+                    "Test",
+                    shard_index,
+                    shard_count,
+                    root_work_item_ids,
+                    [
+                        root_hierarchies[root_work_item_id]
+                        for root_work_item_id in GetShardRootWorkItemIds(root_work_item_ids, shard_index, shard_count)
+                    ],
+                ),
+            ),
+            encoding="UTF-8",
+        )
+
+        partial_filenames.append(partial_filename)
+
+    return partial_filenames
+
+
+# ----------------------------------------------------------------------
+def _CreateDoneManager() -> mock.MagicMock:
+    dm = mock.MagicMock()
+
+    dm.result = 0
+    dm.Nested.return_value.__enter__.return_value = dm
+
+    # ----------------------------------------------------------------------
+    def WriteError(
+        content: str,
+    ) -> None:
+        dm.result = -1
+
+    # ----------------------------------------------------------------------
+
+    dm.WriteError.side_effect = WriteError
+
+    return dm
+
+
+# ----------------------------------------------------------------------
+def _GetErrors(
+    dm: mock.MagicMock,
+) -> list[str]:
+    return [call_args[0][0] for call_args in dm.WriteError.call_args_list]
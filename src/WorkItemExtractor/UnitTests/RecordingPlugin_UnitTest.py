@@ -0,0 +1,225 @@
+# ----------------------------------------------------------------------
+# |
+# |  RecordingPlugin_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-13 14:21:09
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for RecordingPlugin.py (and the Replay plugin that serves its fixture archives)"""
+
+import json
+import sys
+import zipfile
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Generator, Iterable, Optional
+from unittest import mock
+
+import pytest
+
+# The Replay plugin is imported as part of the WorkItemExtractor package (as it is when loaded by the
+# plugin registry), so the types used by these tests must be imported in the same way.
+_src_dir = Path(__file__).resolve().parent.parent.parent
+
+if str(_src_dir) not in sys.path:
+    sys.path.append(str(_src_dir))
+
+del _src_dir
+
+# pylint: disable=wrong-import-position
+from WorkItemExtractor.Common.Plugin import Plugin                          # type: ignore; pylint: disable=import-error
+from WorkItemExtractor.Common.RecordingPlugin import METADATA_ENTRY_NAME, RecordingPlugin  # type: ignore; pylint: disable=import-error
+from WorkItemExtractor.Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItem, WorkItemChange  # type: ignore; pylint: disable=import-error
+from WorkItemExtractor.ProjectManagementPlugins.ReplayPlugin import Plugin as ReplayPlugin  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_DT                                         = datetime(2023, 1, 1, 9, tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _Plugin(Plugin):
+    name: str                               = "Test"
+    epic_size_field_name: str               = "tee_shirt"
+    feature_size_field_name: str            = "points"
+    state_field_name: str                   = "status"
+
+    # ----------------------------------------------------------------------
+    def Initialize(self, *args, **kwargs) -> None:
+        pass
+
+    # ----------------------------------------------------------------------
+    def GetRootWorkItems(self, **kwargs) -> Iterable[str]:
+        if kwargs.get("where_clauses", None):
+            yield from ["1"]
+        else:
+            yield from ["1", "2"]
+
+    # ----------------------------------------------------------------------
+    def EnumChildren(
+        self,
+        root_id: str,
+        **kwargs,
+    ) -> Generator[str, None, None]:
+        if root_id == "1":
+            yield from ["10", "11"]
+
+    # ----------------------------------------------------------------------
+    def GetWorkItem(
+        self,
+        work_item_id: str,
+        **kwargs,
+    ) -> Optional[WorkItem]:
+        return _WORK_ITEMS.get(work_item_id, None)
+
+    # ----------------------------------------------------------------------
+    def GetWorkItemChanges(
+        self,
+        work_item: WorkItem,
+        **kwargs,
+    ) -> Generator[WorkItemChange, None, None]:
+        yield from _CHANGES.get(work_item.work_item_id, [])
+
+
+# ----------------------------------------------------------------------
+_WORK_ITEMS: dict[str, WorkItem]            = {
+    "1": TeeShirtWorkItem("1", "Epic", _DT, State.Active, "Epic", TeeShirtWorkItem.Size.Large),
+    "2": TeeShirtWorkItem("2", "Unestimated Epic", _DT, State.New, "Epic", None),
+    "10": StoryPointsWorkItem("10", "Feature", _DT, State.Closed, "Feature", 5),
+    "11": WorkItem("11", "Task", _DT, State.Removed, "Task"),
+}
+
+_CHANGES: dict[str, list[WorkItemChange]]   = {
+    "1": [
+        WorkItemChange(_DT + timedelta(days=2), "estimate", TeeShirtWorkItem.Size.Large, TeeShirtWorkItem.Size.Small),
+        WorkItemChange(_DT + timedelta(days=1), "state", State.Active, State.New),
+
+        # Strings that look like enums are only decoded as enums for fields that contain enums
+        WorkItemChange(_DT, "title", "State.Active", None),
+    ],
+    "10": [
+        WorkItemChange(datetime(2023, 1, 3, 17, tzinfo=timezone(timedelta(hours=-8))), "story_points", 5, None),
+        WorkItemChange(_DT, "state", State.Closed, State.Active),
+    ],
+}
+
+
+# ----------------------------------------------------------------------
+def test_RoundTrip(tmp_path):
+    archive_filename = tmp_path / "fixture.zip"
+
+    expected = _Record(archive_filename)
+    replayed = _Extract(_Replay(archive_filename))
+
+    assert replayed == expected
+    assert replayed["work_items"]["1"] == _WORK_ITEMS["1"]
+    assert replayed["changes"]["1"] == _CHANGES["1"]
+
+
+# ----------------------------------------------------------------------
+def test_Metadata(tmp_path):
+    archive_filename = tmp_path / "fixture.zip"
+
+    _Record(archive_filename)
+
+    replay_plugin = _Replay(archive_filename)
+
+    # The field names are those of the recorded plugin
+    assert replay_plugin.name == "Replay"
+    assert replay_plugin.epic_size_field_name == "tee_shirt"
+    assert replay_plugin.feature_size_field_name == "points"
+    assert replay_plugin.state_field_name == "status"
+
+
+# ----------------------------------------------------------------------
+def test_NotRecorded(tmp_path):
+    archive_filename = tmp_path / "fixture.zip"
+
+    with RecordingPlugin.Create(_Plugin(), archive_filename) as recording_plugin:
+        recording_plugin.GetWorkItem("1")
+
+    replay_plugin = _Replay(archive_filename)
+
+    assert replay_plugin.GetWorkItem("1") == _WORK_ITEMS["1"]
+
+    with pytest.raises(Exception, match="'GetWorkItem/2.json' was not recorded."):
+        replay_plugin.GetWorkItem("2")
+
+    with pytest.raises(Exception, match="was not recorded."):
+        replay_plugin.GetRootWorkItems()
+
+
+# ----------------------------------------------------------------------
+def test_InvalidArchive(tmp_path):
+    with pytest.raises(Exception, match="does not exist"):
+        _Replay(tmp_path / "does_not_exist.zip")
+
+    archive_filename = tmp_path / "fixture.zip"
+
+    with zipfile.ZipFile(archive_filename, "w") as archive:
+        archive.writestr(METADATA_ENTRY_NAME, json.dumps({"format_version": 0}))
+
+    with pytest.raises(Exception, match="has a format version of '0'"):
+        _Replay(archive_filename)
+
+
+# ----------------------------------------------------------------------
+def _Record(
+    archive_filename: Path,
+) -> dict:
+    with RecordingPlugin.Create(_Plugin(), archive_filename) as recording_plugin:
+        result = _Extract(recording_plugin)
+
+        # Only the first response is recorded when an item is requested multiple times
+        assert _Extract(recording_plugin) == result
+
+    return result
+
+
+# ----------------------------------------------------------------------
+def _Replay(
+    archive_filename: Path,
+) -> ReplayPlugin:
+    replay_plugin = ReplayPlugin()
+
+    # The command line ensures that urls end with a '/'
+    replay_plugin.Initialize(mock.MagicMock(), "{}/".format(archive_filename), "username", "api_token")
+
+    return replay_plugin
+
+
+# ----------------------------------------------------------------------
+def _Extract(
+    plugin: Plugin,
+) -> dict:
+    root_work_item_ids = list(plugin.GetRootWorkItems())
+
+    work_item_ids = list(root_work_item_ids)
+
+    for root_work_item_id in root_work_item_ids:
+        work_item_ids += plugin.EnumChildren(root_work_item_id)
+
+    work_items = {work_item_id: plugin.GetWorkItem(work_item_id) for work_item_id in work_item_ids}
+
+    return {
+        "root_work_item_ids": root_work_item_ids,
+        "filtered_root_work_item_ids": list(plugin.GetRootWorkItems(where_clauses=["[State] = 'Active'"])),
+        "work_items": work_items,
+        "changes": {
+            work_item_id: list(plugin.GetWorkItemChanges(work_item))
+            for work_item_id, work_item in work_items.items()
+            if work_item is not None
+        },
+        "missing_work_item": plugin.GetWorkItem("404"),
+    }
@@ -0,0 +1,274 @@
+# ----------------------------------------------------------------------
+# |
+# |  WorkItemHistoryMatrix_UnitTest.py
+# |
+# |  David Brownell <db@DavidBrownell.com>
+# |      2023-11-06 15:40:12
+# |
+# ----------------------------------------------------------------------
+# |
+# |  Copyright David Brownell 2023
+# |  Distributed under the Boost Software License, Version 1.0. See
+# |  accompanying file LICENSE_1_0.txt or copy at
+# |  http://www.boost.org/LICENSE_1_0.txt.
+# |
+# ----------------------------------------------------------------------
+"""Unit tests for WorkItemHistoryMatrix.py"""
+
+import random
+import sys
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+_parent_dir = Path(__file__).resolve().parent.parent
+
+if str(_parent_dir) not in sys.path:
+    sys.path.append(str(_parent_dir))
+
+del _parent_dir
+
+# pylint: disable=wrong-import-position
+from Common.WorkItem import State, StoryPointsWorkItem, TeeShirtWorkItem, WorkItemChange       # type: ignore; pylint: disable=import-error
+from Common.WorkItemHistoryMatrix import GenerateDailyWorkItemHistoryMatrix, NO_STATE, NO_TYPE, WorkItemHistoryMatrix, WorkItemHistorySparseMatrix  # type: ignore; pylint: disable=import-error
+
+
+# ----------------------------------------------------------------------
+_START_DT                                   = datetime(2023, 1, 1, 9)
+
+
+# ----------------------------------------------------------------------
+def test_Dense():
+    result = GenerateDailyWorkItemHistoryMatrix(
+        [
+            (
+                "1",
+                [
+                    _Change(0, "type", "Epic"),
+                    _Change(0, "state", State.New),
+                    _Change(2, "state", State.Active),
+                    _Change(2, "story_points", 5),
+                ],
+            ),
+            (
+                "2",
+                [
+                    _Change(1, "type", "Feature"),
+                    _Change(1, "state", State.New),
+                    _Change(3, "estimate", TeeShirtWorkItem.Size.Large),
+                    _Change(3, "state", State.Closed),
+                ],
+            ),
+        ],
+    )
+
+    assert isinstance(result, WorkItemHistoryMatrix)
+
+    assert result.work_item_ids == ["1", "2"]
+    assert result.type_names == ["Epic", "Feature"]
+    assert result.start_date == date(2023, 1, 1)
+    assert list(result.dates) == [np.datetime64(date(2023, 1, 1 + index), "D") for index in range(4)]
+
+    # Values are filled forward, and days before a work item's first change don't have values
+    assert result.states.tolist() == [
+        [State.New.value, State.New.value, State.Active.value, State.Active.value],
+        [NO_STATE, State.New.value, State.New.value, State.Closed.value],
+    ]
+
+    _VerifyEstimates(
+        result.estimates,
+        [
+            [np.nan, np.nan, 5, 5],
+            [np.nan, np.nan, np.nan, TeeShirtWorkItem.Size.Large.value],
+        ],
+    )
+
+    assert result.types.tolist() == [
+        [0, 0, 0, 0],
+        [NO_TYPE, 1, 1, 1],
+    ]
+
+
+# ----------------------------------------------------------------------
+def test_LastChangeOfDay():
+    result = GenerateDailyWorkItemHistoryMatrix(
+        [
+            (
+                "1",
+                [
+                    _Change(0, "state", State.Closed, hours=3),
+                    _Change(0, "state", State.New),
+                    _Change(0, "state", State.Active, hours=1),
+                    _Change(1, "story_points", 3, hours=1),
+                    _Change(1, "story_points", None, hours=2),
+                ],
+            ),
+        ],
+    )
+
+    assert result.states.tolist() == [[State.Closed.value, State.Closed.value]]
+    _VerifyEstimates(result.estimates, [[np.nan, np.nan]])
+
+
+# ----------------------------------------------------------------------
+def test_WorkItemBaseline():
+    work_item = StoryPointsWorkItem("1", "Title", _START_DT, State.Active, "Feature", 8)
+
+    result = GenerateDailyWorkItemHistoryMatrix(
+        [
+            (work_item, [_Change(1, "type", "Feature"), _Change(3, "state", State.Closed)]),
+        ],
+    )
+
+    # The work item provides the values until the first change
+    assert result.states.tolist() == [[State.Active.value, State.Active.value, State.Closed.value]]
+    _VerifyEstimates(result.estimates, [[8, 8, 8]])
+    assert result.types.tolist() == [[0, 0, 0]]
+    assert result.type_names == ["Feature"]
+
+
+# ----------------------------------------------------------------------
+def test_DateRange():
+    items = [
+        (
+            "1",
+            [
+                _Change(0, "state", State.New),
+                _Change(2, "state", State.Active),
+                _Change(5, "state", State.Closed),
+                _Change(9, "state", State.Removed),
+            ],
+        ),
+    ]
+
+    result = GenerateDailyWorkItemHistoryMatrix(
+        items,
+        start_date=date(2023, 1, 4),
+        end_date=date(2023, 1, 7),
+    )
+
+    # Changes before the start date establish the values on the first day, and changes after the end
+    # date are ignored.
+    assert result.start_date == date(2023, 1, 4)
+    assert result.states.tolist() == [
+        [State.Active.value, State.Active.value, State.Closed.value, State.Closed.value],
+    ]
+
+    result = GenerateDailyWorkItemHistoryMatrix(
+        items,
+        start_date=date(2022, 12, 30),
+        end_date=date(2023, 1, 2),
+    )
+
+    assert result.states.tolist() == [[NO_STATE, NO_STATE, State.New.value, State.New.value]]
+
+    with pytest.raises(ValueError):
+        GenerateDailyWorkItemHistoryMatrix(items, start_date=date(2023, 1, 4), end_date=date(2023, 1, 3))
+
+
+# ----------------------------------------------------------------------
+def test_Empty():
+    result = GenerateDailyWorkItemHistoryMatrix([], start_date=date(2023, 1, 1))
+
+    assert result.work_item_ids == []
+    assert result.states.shape == (0, 1)
+
+    result = GenerateDailyWorkItemHistoryMatrix([("1", [])], start_date=date(2023, 1, 1), end_date=date(2023, 1, 2))
+
+    assert result.work_item_ids == ["1"]
+    assert result.states.tolist() == [[NO_STATE, NO_STATE]]
+
+
+# ----------------------------------------------------------------------
+def test_Sparse():
+    items = _CreateRandomItems(20)
+
+    sparse_result = GenerateDailyWorkItemHistoryMatrix(items, sparse=True)
+    dense_result = GenerateDailyWorkItemHistoryMatrix(items)
+
+    assert isinstance(sparse_result, WorkItemHistorySparseMatrix)
+
+    # Change points are sorted by (row, day), with at most one change point for each row and day
+    keys = list(zip(sparse_result.rows.tolist(), sparse_result.days.tolist()))
+    assert keys == sorted(set(keys))
+
+    _VerifyEqual(sparse_result.ToDense(), dense_result)
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_Chunks(max_workers):
+    items = _CreateRandomItems(50)
+
+    expected = GenerateDailyWorkItemHistoryMatrix(items, max_workers=1)
+
+    # Type codes are local to each chunk and are remapped when the chunks are merged
+    _VerifyEqual(
+        GenerateDailyWorkItemHistoryMatrix(items, chunk_size=7, max_workers=max_workers),
+        expected,
+    )
+
+
+# ----------------------------------------------------------------------
+def _Change(
+    day: int,
+    field: str,
+    new_value,
+    *,
+    hours: int=0,
+) -> WorkItemChange:
+    return WorkItemChange(_START_DT + timedelta(days=day, hours=hours), field, new_value, None)
+
+
+# ----------------------------------------------------------------------
+def _CreateRandomItems(
+    num_items: int,
+) -> list[tuple[str, list[WorkItemChange]]]:
+    rng = random.Random(num_items)
+
+    items: list[tuple[str, list[WorkItemChange]]] = []
+
+    for item_index in range(num_items):
+        changes = [_Change(rng.randrange(5), "type", rng.choice(["Epic", "Feature", "Story"]))]
+
+        for _ in range(rng.randrange(10)):
+            day = rng.randrange(30)
+            hours = rng.randrange(12)
+
+            if rng.random() < 0.5:
+                changes.append(_Change(day, "state", rng.choice(list(State)), hours=hours))
+            else:
+                changes.append(_Change(day, "story_points", rng.choice([None, 1, 2, 3, 5, 8]), hours=hours))
+
+        items.append((str(item_index), changes))
+
+    return items
+
+
+# ----------------------------------------------------------------------
+def _VerifyEstimates(
+    estimates: np.ndarray,
+    expected: list[list[float]],
+) -> None:
+    np.testing.assert_array_equal(estimates, np.array(expected, dtype=np.float64))
+
+
+# ----------------------------------------------------------------------
+def _VerifyEqual(
+    result: WorkItemHistoryMatrix,
+    expected: WorkItemHistoryMatrix,
+) -> None:
+    assert result.work_item_ids == expected.work_item_ids
+    assert result.start_date == expected.start_date
+
+    np.testing.assert_array_equal(result.states, expected.states)
+    np.testing.assert_array_equal(result.estimates, expected.estimates)
+
+    # Type codes may differ, but they must refer to the same type names
+    type_names = np.array(result.type_names + [None], dtype=object)
+    expected_type_names = np.array(expected.type_names + [None], dtype=object)
+
+    np.testing.assert_array_equal(type_names[result.types], expected_type_names[expected.types])
@@ -15,30 +15,28 @@
 # ----------------------------------------------------------------------
 """Extracts work items for a project."""
 
-import importlib
 import json
+import shutil
 import sys
 import textwrap
+import threading
 
-from dataclasses import dataclass
-from datetime import date, datetime
-from enum import Enum
-from functools import singledispatchmethod
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+from datetime import datetime, timezone
+from functools import cache
 from pathlib import Path
-from typing import Any, cast, Optional
+from typing import Any, Callable, Iterator, Optional
 
 import typer
 
 from typer.core import TyperGroup
 
-from Common_Foundation.ContextlibEx import ExitStack
 from Common_Foundation import PathEx
 from Common_Foundation.Streams.DoneManager import DoneManager, DoneManagerFlags
 from Common_Foundation import TextwrapEx
 from Common_Foundation import Types
 
-from Common_FoundationEx.InflectEx import inflect
-
 # Ensure that the appropriate path items are available in the scenario when the script is invoked
 # from a symbolic link.
 _parent_dir = Path(__file__).resolve().parent
@@ -50,77 +48,24 @@ del _parent_dir
 
 
 # ----------------------------------------------------------------------
+from Common.ChangeLog import ChangeLogNormalizer                               # type: ignore;  pylint: disable=import-error
+from Common.HttpMetrics import HttpMetrics                                      # type: ignore;  pylint: disable=import-error
 from Common.Plugin import Plugin                                                # type: ignore;  pylint: disable=import-error
-from GenerateEvents import GenerateEvents as GenerateEventsImpl                 # type: ignore;  pylint: disable=import-error
-from GenerateHierarchies import GenerateHierarchies as GenerateHierarchiesImpl  # type: ignore;  pylint: disable=import-error
+from Common.PluginRegistry import PluginRegistry                                # type: ignore;  pylint: disable=import-error
+from Common.RecordingPlugin import RecordingPlugin                              # type: ignore;  pylint: disable=import-error
+from Common.Serialization import JsonEncoder, ToJsonString                      # type: ignore;  pylint: disable=import-error
+from Common.Tracing import Tracer, TraceFormat, YieldTracer                      # type: ignore;  pylint: disable=import-error
 
 
 # ----------------------------------------------------------------------
-def _LoadPlugins() -> dict[str, Plugin]:
-    root_dir = PathEx.EnsureDir(Path(__file__).resolve().parent.parent)
-
-    sys.path.insert(0, str(root_dir))
-    with ExitStack(lambda: sys.path.pop(0)):
-        plugin_dir = PathEx.EnsureDir(root_dir / "WorkItemExtractor" / "ProjectManagementPlugins")
-
-        sys.path.insert(0, str(plugin_dir))
-        with ExitStack(lambda: sys.path.pop(0)):
-            # ----------------------------------------------------------------------
-            @dataclass(frozen=True)
-            class PluginData(object):
-                filename: Path
-                plugin: Plugin
-
-            # ----------------------------------------------------------------------
-
-            potential_plugin_names: list[str] = ["Plugin", ]
-            all_plugins: dict[str, PluginData] = {}
-
-            for filename in plugin_dir.iterdir():
-                if filename.suffix != ".py":
-                    continue
-
-                if not filename.stem.endswith("Plugin"):
-                    continue
-
-                mod = importlib.import_module(filename.stem)
-
-                plugin: Optional[Plugin] = None
-
-                for potential_plugin_name in potential_plugin_names:
-                    potential_plugin = getattr(mod, potential_plugin_name, None)
-                    if potential_plugin is None:
-                        continue
-
-                    plugin = cast(Plugin, potential_plugin())
-                    break
-
-                if plugin is None:
-                    raise Exception("A plugin was not found in '{}'.".format(filename))
-
-                prev_plugin = all_plugins.get(plugin.name, None)
-                if prev_plugin is not None:
-                    raise Exception(
-                        "The plugin '{}', defined in '{}', was already defined in '{}'.".format(
-                            plugin.name,
-                            filename,
-                            prev_plugin.filename,
-                        ),
-                    )
-
-                all_plugins[plugin.name] = PluginData(filename, plugin)
-
-            if not all_plugins:
-                raise Exception("No plugins were found in '{}'.".format(plugin_dir))
-
-            # If here, all plugins are valid and there weren't any conflicts
-            return {k: v.plugin for k, v in all_plugins.items()}
-
-
-_PLUGINS                                    = _LoadPlugins()
-_PLUGIN_NAMES_ENUM                          = Types.StringsToEnum("_PLUGIN_NAMES_ENUM", _PLUGINS.keys())
+# Plugins are discovered without importing them; a plugin's module (and its dependencies) is only
+# imported when the plugin is selected on the command line.
+_PLUGIN_REGISTRY                            = PluginRegistry(
+    PathEx.EnsureDir(Path(__file__).resolve().parent / "ProjectManagementPlugins"),
+    PathEx.EnsureDir(Path(__file__).resolve().parent.parent),
+)
 
-del _LoadPlugins
+_PLUGIN_NAMES_ENUM                          = Types.StringsToEnum("_PLUGIN_NAMES_ENUM", _PLUGIN_REGISTRY.infos.keys())
 
 
 # ----------------------------------------------------------------------
@@ -132,6 +77,7 @@ class NaturalOrderGrouper(TyperGroup):
 
 
 # ----------------------------------------------------------------------
+@cache
 def _HelpEpilog() -> str:
     return textwrap.dedent(
         """\
@@ -146,8 +92,8 @@ def _HelpEpilog() -> str:
             TextwrapEx.CreateTable(
                 ["Name", "Description"],
                 [
-                    [plugin.name, plugin.__doc__ or ""]
-                    for plugin in _PLUGINS.values()
+                    [plugin_info.name, plugin_info.description]
+                    for plugin_info in _PLUGIN_REGISTRY.infos.values()
                 ],
             ),
             4,
@@ -178,28 +124,156 @@ def GenerateHierarchies(
     url: str=typer.Argument(..., help="Url associated with work items to extract."),
     username: str=typer.Argument(..., help="Username associated with work items to extract."),
     api_token_or_filename: str=typer.Argument(..., help="API token (or filename containing an API token) associated with the work items to extract."),
-    output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for extracted information."),
+    output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for extracted information ('-' writes to stdout, which requires '--stream')."),
     root_work_item_ids: list[str]=typer.Option(None, "--id", help="Work item IDs associated with the root of one or more work item hierarchies."),
+    checkpoint_dir: Optional[Path]=typer.Option(None, "--checkpoint-dir", file_okay=False, help="Directory used to persist each hierarchy as soon as it has been extracted."),
+    resume: bool=typer.Option(False, "--resume", help="Reuse the hierarchies persisted in '--checkpoint-dir' by a previous invocation, extracting only those that are incomplete."),
+    max_num_threads: Optional[int]=typer.Option(None, "--max-threads", min=1, help="Maximum number of hierarchies extracted concurrently."),
+    minimal_history: bool=typer.Option(False, "--minimal-history", help="Request only the fields that are extracted when retrieving the history of work items (the revisions of all work items of the extracted types are retrieved once and cached, and are brought up to date when work items change); this is supported by the AzureDevOps plugin."),
+    normalize_changes: bool=typer.Option(False, "--normalize-changes", help="Normalize the changes of each work item as it is extracted: changes to fields that aren't used to generate events are removed, changes made to a field on the same day are collapsed into one, and changes that don't change values are removed."),
+    shard_index: Optional[int]=typer.Option(None, "--shard-index", min=0, help="Extract only the roots that belong to this shard (roots are assigned to shards by a hash of their ids); the output is a partial result that can be combined with the results of the other shards by 'MergeHierarchies'."),
+    shard_count: Optional[int]=typer.Option(None, "--shard-count", min=1, help="Number of shards used with '--shard-index'."),
+    stream: bool=typer.Option(False, "--stream", help="Write each hierarchy as a JSON Lines record as soon as it has been extracted rather than writing all hierarchies at the end."),
+    dry_run: bool=typer.Option(False, "--dry-run", help="Estimate the number of requests, bytes, and wall-clock time required to extract the hierarchies without extracting them (nothing is written to the output file); this can't be used with '--minimal-history'."),
+    dry_run_latency_ms: Optional[float]=typer.Option(None, "--dry-run-latency-ms", min=0.0, help="Latency of a single request used by '--dry-run' (the default is measured from the requests made to estimate costs)."),
+    dry_run_bytes_per_update: int=typer.Option(1500, "--dry-run-bytes-per-update", min=1, help="Size of a single work item update used by '--dry-run'."),
+    record_filename: Optional[Path]=typer.Option(None, "--record", dir_okay=False, help="Save every plugin response to a fixture archive that can be served offline by the 'Replay' plugin."),
+    metrics_filename: Optional[Path]=typer.Option(None, "--metrics", dir_okay=False, help="Write per-endpoint (and per-root) http metrics to this JSON file at the end of the run."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    trace_filename: Optional[Path]=typer.Option(None, "--trace", dir_okay=False, help="Write a trace of the run (with spans for each root, work item, page, and http request) to this file."),
+    trace_format: TraceFormat=typer.Option(TraceFormat.Chrome, "--trace-format", case_sensitive=False, help="Format of the '--trace' file; 'chrome' files can be viewed with chrome://tracing or https://ui.perfetto.dev, 'otlp' files contain OpenTelemetry (OTLP-JSON) spans."),
     verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
     debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
 ) -> None:
     """Generates hierarchical information associated with one or more work items."""
 
+    # Imported here to avoid the cost when the command isn't invoked
+    from EstimateCosts import EstimateCosts                                                             # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from GenerateHierarchies import GenerateHierarchies as GenerateHierarchiesImpl, StreamHierarchies  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from MergeHierarchies import GetShardRootWorkItemIds, PartialResult                                 # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    is_stdout = str(output_filename) == "-"
+
     with DoneManager.CreateCommandLine(
+        # Status information is written to stderr when the records are written to stdout
+        sys.stderr if is_stdout else sys.stdout,
         output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
-    ) as dm:
-        plugin = _InitPlugin(dm, plugin_name, url, username, api_token_or_filename)
+    ) as dm, ExitStack() as exit_stack:
+        exit_stack.enter_context(_YieldProfiler(dm, profile_dir))
+
+        if resume and checkpoint_dir is None:
+            dm.WriteError("'--checkpoint-dir' must be provided with '--resume'.\n")
+            return
+
+        if not _ValidateShard(dm, shard_index, shard_count):
+            return
+
+        if stream and shard_count is not None:
+            dm.WriteError("'--stream' can't be used with '--shard-count'.\n")
+            return
+
+        if is_stdout and not stream:
+            dm.WriteError("'-' can only be used as the output filename with '--stream'.\n")
+            return
+
+        if dry_run and minimal_history:
+            # The estimate is based on the number of `/updates` pages requested for each work item,
+            # while the history of all work items of the extracted types is retrieved with '--minimal-history'.
+            dm.WriteError("'--dry-run' can't be used with '--minimal-history'.\n")
+            return
+
+        plugin = _InitPlugin(
+            dm,
+            plugin_name,
+            url,
+            username,
+            api_token_or_filename,
+            metrics=_InitMetrics(dm, exit_stack, metrics_filename),
+            tracer=_InitTracer(dm, exit_stack, "GenerateHierarchies", trace_filename, trace_format),
+            minimal_history=minimal_history,
+        )
         if plugin is None:
             return
 
+        if record_filename is not None:
+            plugin = exit_stack.enter_context(RecordingPlugin.Create(plugin, record_filename))
+
         root_work_item_ids = _InitRootWorkItems(dm, plugin, root_work_item_ids)
         if not root_work_item_ids:
             return
 
-        hierarchy_info = GenerateHierarchiesImpl(dm, plugin, root_work_item_ids)
+        change_log_normalizer = _InitChangeLogNormalizer(dm, plugin, normalize_changes)
+
+        all_root_work_item_ids = root_work_item_ids
+
+        if shard_count is not None:
+            assert shard_index is not None
+            root_work_item_ids = GetShardRootWorkItemIds(all_root_work_item_ids, shard_index, shard_count)
+
+        if dry_run:
+            estimate = EstimateCosts(
+                dm,
+                plugin,
+                root_work_item_ids,
+                max_num_threads=max_num_threads,
+                latency_ms=dry_run_latency_ms,
+                bytes_per_update=dry_run_bytes_per_update,
+            )
+            if estimate is None:
+                return
+
+            estimate.WriteSummary(dm)
+            return
+
+        if not _ValidateCheckpoint(
+            dm,
+            checkpoint_dir,
+            resume,
+            root_work_item_ids,
+            {"minimal_history": minimal_history},
+            change_log_normalizer,
+        ):
+            return
+
+        if stream:
+            with _YieldJsonLinesWriter(output_filename) as write_func:
+                StreamHierarchies(
+                    dm,
+                    plugin,
+                    root_work_item_ids,
+                    write_func,
+                    checkpoint_dir=checkpoint_dir,
+                    resume=resume,
+                    checkpoint_options={"minimal_history": minimal_history},
+                    max_num_threads=max_num_threads,
+                    change_log_normalizer=change_log_normalizer,
+                )
+
+            return
+
+        hierarchy_info = GenerateHierarchiesImpl(
+            dm,
+            plugin,
+            root_work_item_ids,
+            checkpoint_dir=checkpoint_dir,
+            resume=resume,
+            checkpoint_options={"minimal_history": minimal_history},
+            max_num_threads=max_num_threads,
+            change_log_normalizer=change_log_normalizer,
+        )
         if hierarchy_info is None:
             return
 
+        if shard_count is not None:
+            assert shard_index is not None
+
+            _WriteJson(
+                dm,
+                output_filename,
+                PartialResult("GenerateHierarchies", plugin.name, shard_index, shard_count, all_root_work_item_ids, hierarchy_info),
+            )
+            return
+
         _WriteJson(dm, output_filename, hierarchy_info)
 
 
@@ -216,30 +290,156 @@ def GenerateEvents(
     api_token_or_filename: str=typer.Argument(..., help="API token (or filename containing an API token) associated with the work items to extract."),
     output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for extracted information."),
     root_work_item_ids: list[str]=typer.Option(None, "--id", help="Work item IDs associated with the root of one or more work item hierarchies."),
+    sqlite_filename: Optional[Path]=typer.Option(None, "--sqlite", dir_okay=False, help="Also write the events to this SQLite database, where they are indexed by date, epic, and work item (see 'EventStore.py')."),
+    chunked_output_dir: Optional[Path]=typer.Option(None, "--chunked-output", file_okay=False, help="Also write the events to this directory as chunks (named by their content hash) and a manifest that describes them, so that clients can fetch only the dates displayed; chunks that haven't changed since a previous invocation aren't written again."),
+    chunk_days: Optional[int]=typer.Option(None, "--chunk-days", min=1, help="Number of days in each chunk written to '--chunked-output' (chunks contain a calendar month of events by default)."),
+    checkpoint_dir: Optional[Path]=typer.Option(None, "--checkpoint-dir", file_okay=False, help="Directory used to persist each hierarchy as soon as it has been extracted."),
+    resume: bool=typer.Option(False, "--resume", help="Reuse the hierarchies persisted in '--checkpoint-dir' by a previous invocation, extracting only those that are incomplete."),
+    max_num_threads: Optional[int]=typer.Option(None, "--max-threads", min=1, help="Maximum number of hierarchies extracted concurrently."),
+    minimal_history: bool=typer.Option(False, "--minimal-history", help="Request only the fields that are extracted when retrieving the history of work items (the revisions of all work items of the extracted types are retrieved once and cached, and are brought up to date when work items change); this is supported by the AzureDevOps plugin."),
+    normalize_changes: bool=typer.Option(False, "--normalize-changes", help="Normalize the changes of each work item as it is extracted: changes to fields that aren't used to generate events are removed, changes made to a field on the same day are collapsed into one, and changes that don't change values are removed."),
+    shard_index: Optional[int]=typer.Option(None, "--shard-index", min=0, help="Extract only the roots that belong to this shard (roots are assigned to shards by a hash of their ids); the output is a partial result that can be combined with the results of the other shards by 'MergeHierarchies'."),
+    shard_count: Optional[int]=typer.Option(None, "--shard-count", min=1, help="Number of shards used with '--shard-index'."),
+    record_filename: Optional[Path]=typer.Option(None, "--record", dir_okay=False, help="Save every plugin response to a fixture archive that can be served offline by the 'Replay' plugin."),
+    metrics_filename: Optional[Path]=typer.Option(None, "--metrics", dir_okay=False, help="Write per-endpoint (and per-root) http metrics to this JSON file at the end of the run."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    trace_filename: Optional[Path]=typer.Option(None, "--trace", dir_okay=False, help="Write a trace of the run (with spans for each root, work item, page, and http request) to this file."),
+    trace_format: TraceFormat=typer.Option(TraceFormat.Chrome, "--trace-format", case_sensitive=False, help="Format of the '--trace' file; 'chrome' files can be viewed with chrome://tracing or https://ui.perfetto.dev, 'otlp' files contain OpenTelemetry (OTLP-JSON) spans."),
     verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
     debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
 ) -> None:
     """Generates events for hierarchies associated with one or more work items."""
 
+    # Imported here to avoid the cost when the command isn't invoked
+    from GenerateEvents import StreamEvents                                         # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from GenerateHierarchies import GenerateHierarchies as GenerateHierarchiesImpl  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from MergeHierarchies import GetShardRootWorkItemIds, PartialResult             # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
     with DoneManager.CreateCommandLine(
         output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
-    ) as dm:
-        plugin = _InitPlugin(dm, plugin_name, url, username, api_token_or_filename)
+    ) as dm, ExitStack() as exit_stack:
+        exit_stack.enter_context(_YieldProfiler(dm, profile_dir))
+
+        if resume and checkpoint_dir is None:
+            dm.WriteError("'--checkpoint-dir' must be provided with '--resume'.\n")
+            return
+
+        if not _ValidateShard(dm, shard_index, shard_count):
+            return
+
+        if shard_count is not None:
+            for option_name, value in [
+                ("--sqlite", sqlite_filename),
+                ("--chunked-output", chunked_output_dir),
+            ]:
+                if value is not None:
+                    dm.WriteError("'{}' cannot be provided with '--shard-count', as events are generated by 'MergeHierarchies'.\n".format(option_name))
+
+            if dm.result != 0:
+                return
+
+        if chunk_days is not None and chunked_output_dir is None:
+            dm.WriteError("'--chunked-output' must be provided with '--chunk-days'.\n")
+            return
+
+        plugin = _InitPlugin(
+            dm,
+            plugin_name,
+            url,
+            username,
+            api_token_or_filename,
+            metrics=_InitMetrics(dm, exit_stack, metrics_filename),
+            tracer=_InitTracer(dm, exit_stack, "GenerateEvents", trace_filename, trace_format),
+            minimal_history=minimal_history,
+        )
         if plugin is None:
             return
 
+        if record_filename is not None:
+            plugin = exit_stack.enter_context(RecordingPlugin.Create(plugin, record_filename))
+
         root_work_item_ids = _InitRootWorkItems(dm, plugin, root_work_item_ids)
         if not root_work_item_ids:
             return
 
-        hierarchy_info = GenerateHierarchiesImpl(dm, plugin, root_work_item_ids)
-        if hierarchy_info is None:
+        change_log_normalizer = _InitChangeLogNormalizer(dm, plugin, normalize_changes)
+
+        all_root_work_item_ids = root_work_item_ids
+
+        if shard_count is not None:
+            assert shard_index is not None
+            root_work_item_ids = GetShardRootWorkItemIds(all_root_work_item_ids, shard_index, shard_count)
+
+            if not _ValidateCheckpoint(
+                dm,
+                checkpoint_dir,
+                resume,
+                root_work_item_ids,
+                {"minimal_history": minimal_history},
+                change_log_normalizer,
+            ):
+                return
+
+            hierarchy_info = GenerateHierarchiesImpl(
+                dm,
+                plugin,
+                root_work_item_ids,
+                checkpoint_dir=checkpoint_dir,
+                resume=resume,
+                checkpoint_options={"minimal_history": minimal_history},
+                max_num_threads=max_num_threads,
+                change_log_normalizer=change_log_normalizer,
+            )
+            if hierarchy_info is None:
+                return
+
+            # Events can only be generated once the hierarchies of all shards are available (see
+            # 'MergeHierarchies').
+            _WriteJson(
+                dm,
+                output_filename,
+                PartialResult("GenerateEvents", plugin.name, shard_index, shard_count, all_root_work_item_ids, hierarchy_info),
+            )
             return
 
-        results = GenerateEventsImpl(dm, plugin, hierarchy_info)
+        if not _ValidateCheckpoint(
+            dm,
+            checkpoint_dir,
+            resume,
+            root_work_item_ids,
+            {"minimal_history": minimal_history},
+            change_log_normalizer,
+        ):
+            return
+
+        # Events are organized as each hierarchy is extracted
+        results = StreamEvents(
+            dm,
+            plugin,
+            root_work_item_ids,
+            checkpoint_dir=checkpoint_dir,
+            resume=resume,
+            checkpoint_options={"minimal_history": minimal_history},
+            max_num_threads=max_num_threads,
+            change_log_normalizer=change_log_normalizer,
+        )
+        if results is None:
+            return
 
         _WriteJson(dm, output_filename, results)
 
+        if sqlite_filename is not None:
+            # Imported here to avoid the cost when the option isn't provided
+            from EventStore import WriteEventStore  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+            WriteEventStore(dm, sqlite_filename, results)
+
+        if chunked_output_dir is not None:
+            # Imported here to avoid the cost when the option isn't provided
+            from ChunkedEvents import WriteChunkedEvents  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+            WriteChunkedEvents(dm, chunked_output_dir, results, chunk_days=chunk_days)
+
 
 # ----------------------------------------------------------------------
 @app.command(
@@ -254,6 +454,11 @@ def GetRootWorkItems(
     api_token_or_filename: str=typer.Argument(..., help="API token (or filename containing an API token) associated with the work items to extract."),
     output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for extracted information."),
     where_clauses: list[str]=typer.Option(None, "--where-clause", help="Provide additional clauses to the query."),
+    record_filename: Optional[Path]=typer.Option(None, "--record", dir_okay=False, help="Save every plugin response to a fixture archive that can be served offline by the 'Replay' plugin."),
+    metrics_filename: Optional[Path]=typer.Option(None, "--metrics", dir_okay=False, help="Write per-endpoint (and per-root) http metrics to this JSON file at the end of the run."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    trace_filename: Optional[Path]=typer.Option(None, "--trace", dir_okay=False, help="Write a trace of the run (with spans for each root, work item, page, and http request) to this file."),
+    trace_format: TraceFormat=typer.Option(TraceFormat.Chrome, "--trace-format", case_sensitive=False, help="Format of the '--trace' file; 'chrome' files can be viewed with chrome://tracing or https://ui.perfetto.dev, 'otlp' files contain OpenTelemetry (OTLP-JSON) spans."),
     verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
     debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
 ) -> None:
@@ -261,18 +466,321 @@ def GetRootWorkItems(
 
     with DoneManager.CreateCommandLine(
         output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
-    ) as dm:
-        plugin = _InitPlugin(dm, plugin_name, url, username, api_token_or_filename)
+    ) as dm, ExitStack() as exit_stack:
+        exit_stack.enter_context(_YieldProfiler(dm, profile_dir))
+
+        plugin = _InitPlugin(
+            dm,
+            plugin_name,
+            url,
+            username,
+            api_token_or_filename,
+            metrics=_InitMetrics(dm, exit_stack, metrics_filename),
+            tracer=_InitTracer(dm, exit_stack, "GetRootWorkItems", trace_filename, trace_format),
+        )
         if plugin is None:
             return
 
-        root_work_item_ids = plugin.GetRootWorkItems(
-            where_clauses=where_clauses,
+        if record_filename is not None:
+            plugin = exit_stack.enter_context(RecordingPlugin.Create(plugin, record_filename))
+
+        root_work_item_ids = list(
+            plugin.GetRootWorkItems(
+                where_clauses=where_clauses,
+            ),
         )
 
         _WriteJson(dm, output_filename, root_work_item_ids)
 
 
+# ----------------------------------------------------------------------
+@app.command(
+    "MergeHierarchies",
+    no_args_is_help=True,
+)
+def MergeHierarchies(
+    output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for the merged information."),
+    partial_filenames: list[Path]=typer.Argument(..., exists=True, dir_okay=False, resolve_path=True, help="Partial results produced by 'GenerateHierarchies' or 'GenerateEvents' with '--shard-index' and '--shard-count' (one for each shard)."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Merges the partial results of sharded 'GenerateHierarchies' or 'GenerateEvents' invocations into the output that a single invocation would have produced."""
+
+    # Imported here to avoid the cost when the command isn't invoked
+    from GenerateEvents import GenerateEvents as GenerateEventsImpl                 # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from MergeHierarchies import MergeHierarchies as MergeHierarchiesImpl           # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm, _YieldProfiler(dm, profile_dir):
+        merge_result = MergeHierarchiesImpl(dm, partial_filenames)
+        if merge_result is None:
+            return
+
+        if merge_result.command_name == "GenerateEvents":
+            # The plugin is only used for its field names, so it doesn't need to be initialized
+            plugin = _PLUGIN_REGISTRY.Load(merge_result.plugin_name)
+
+            content = GenerateEventsImpl(dm, plugin, merge_result.ToHierarchyResults())
+        else:
+            content = merge_result.hierarchies
+
+        _WriteJson(dm, output_filename, content)
+
+
+# ----------------------------------------------------------------------
+@app.command(
+    "MergeEvents",
+    no_args_is_help=True,
+)
+def MergeEvents(
+    output_filename: Path=typer.Argument(..., dir_okay=False, help="Output filename for the merged events."),
+    input_filenames: list[Path]=typer.Argument(..., exists=True, dir_okay=False, resolve_path=True, help="Events produced by 'GenerateEvents' (for example, one file for each project)."),
+    namespaces: list[str]=typer.Option(None, "--namespace", help="Namespace used to qualify the work item ids of each input, in the order that the inputs are provided (the default is the input's filename without its extension)."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Merges the events of multiple projects into a single timeline, summing the counts of each project on each date."""
+
+    # Imported here to avoid the cost when the command isn't invoked
+    from MergeEvents import MergeEvents as MergeEventsImpl                          # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm, _YieldProfiler(dm, profile_dir):
+        if namespaces and len(namespaces) != len(input_filenames):
+            dm.WriteError("A '--namespace' must be provided for each input ({} inputs, {} namespaces).\n".format(len(input_filenames), len(namespaces)))
+            return
+
+        namespaces = namespaces or [input_filename.stem for input_filename in input_filenames]
+
+        duplicate_namespaces = [namespace for namespace, count in Counter(namespaces).items() if count > 1]
+        if duplicate_namespaces:
+            dm.WriteError(
+                "Namespaces must be unique; provide a '--namespace' for each input ({} {} used by multiple inputs).\n".format(
+                    ", ".join("'{}'".format(namespace) for namespace in duplicate_namespaces),
+                    "is" if len(duplicate_namespaces) == 1 else "are",
+                ),
+            )
+            return
+
+        MergeEventsImpl(
+            dm,
+            list(zip(namespaces, input_filenames)),
+            output_filename,
+        )
+
+
+# ----------------------------------------------------------------------
+@app.command(
+    "Run",
+    epilog=_HelpEpilog(),
+    no_args_is_help=True,
+)
+def Run(
+    plugin_name: _PLUGIN_NAMES_ENUM=typer.Argument(..., help="Name of the plugin used to extract information about work items."),  # type: ignore
+    url: str=typer.Argument(..., help="Url associated with work items to extract."),
+    username: str=typer.Argument(..., help="Username associated with work items to extract."),
+    api_token_or_filename: str=typer.Argument(..., help="API token (or filename containing an API token) associated with the work items to extract."),
+    work_dir: Path=typer.Argument(..., file_okay=False, help="Directory used to cache the output of each stage."),
+    root_work_item_ids: list[str]=typer.Option(None, "--id", help="Work item IDs associated with the root of one or more work item hierarchies."),
+    where_clauses: list[str]=typer.Option(None, "--where-clause", help="Provide additional clauses to the query used to extract root work items (ignored when '--id' is provided)."),
+    roots_output_filename: Optional[Path]=typer.Option(None, "--roots-output", dir_okay=False, help="Output filename for root work items."),
+    hierarchies_output_filename: Optional[Path]=typer.Option(None, "--hierarchies-output", dir_okay=False, help="Output filename for hierarchies."),
+    events_output_filename: Optional[Path]=typer.Option(None, "--events-output", dir_okay=False, help="Output filename for events."),
+    force_stage_names: list[str]=typer.Option(None, "--force", help="Name of a stage ('roots', 'hierarchies', 'events') that should be executed even if its cached output is valid."),
+    as_of: Optional[str]=typer.Option(None, "--as-of", help="Label (for example, a date) for the state of the work items; cached output of the stages that retrieve work items ('roots', 'hierarchies') is only reused by invocations with the same label. These stages are executed during every invocation when a label isn't provided."),
+    profile_dir: Optional[Path]=typer.Option(None, "--profile", file_okay=False, help="Profile the time, cpu, and memory of each stage, writing the results (.pstats files and collapsed stacks for flame graphs) to this directory."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Extracts roots, hierarchies, and events in a single invocation, reusing cached output from previous invocations when possible."""
+
+    # Imported here to avoid the cost when the command isn't invoked
+    from GenerateEvents import GenerateEvents as GenerateEventsImpl                 # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from GenerateHierarchies import GenerateHierarchies as GenerateHierarchiesImpl, HierarchyResult  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+    from Pipeline import ExecutePipeline, Stage                                     # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm, _YieldProfiler(dm, profile_dir):
+        plugin = _PLUGIN_REGISTRY.Load(plugin_name.value)
+
+        # Work items change over time, so the output of stages that retrieve them is only valid for the
+        # label; stages that consume this output are still reused when it hasn't changed.
+        if as_of is None:
+            as_of = datetime.now(timezone.utc).isoformat()
+
+        # The plugin is only initialized when a stage needs to be executed
+        initialized_plugin: Optional[Plugin] = None
+
+        # ----------------------------------------------------------------------
+        def GetPlugin(
+            stage_dm: DoneManager,
+        ) -> Optional[Plugin]:
+            nonlocal initialized_plugin
+
+            if initialized_plugin is None:
+                initialized_plugin = _InitPlugin(stage_dm, plugin_name, url, username, api_token_or_filename)
+
+            return initialized_plugin
+
+        # ----------------------------------------------------------------------
+        def ExecuteRoots(
+            stage_dm: DoneManager,
+            inputs: list[Any],  # pylint: disable=unused-argument
+        ) -> Optional[list[str]]:
+            if root_work_item_ids:
+                return root_work_item_ids
+
+            this_plugin = GetPlugin(stage_dm)
+            if this_plugin is None:
+                return None
+
+            return list(
+                this_plugin.GetRootWorkItems(
+                    where_clauses=list(where_clauses or []),
+                ),
+            )
+
+        # ----------------------------------------------------------------------
+        def ExecuteHierarchies(
+            stage_dm: DoneManager,
+            inputs: list[Any],
+        ) -> Optional[list[HierarchyResult]]:
+            this_plugin = GetPlugin(stage_dm)
+            if this_plugin is None:
+                return None
+
+            return GenerateHierarchiesImpl(stage_dm, this_plugin, inputs[0])
+
+        # ----------------------------------------------------------------------
+        def ExecuteEvents(
+            stage_dm: DoneManager,
+            inputs: list[Any],
+        ) -> Any:
+            return GenerateEventsImpl(stage_dm, plugin, inputs[0])
+
+        # ----------------------------------------------------------------------
+
+        results = ExecutePipeline(
+            dm,
+            work_dir,
+            [
+                Stage(
+                    "roots",
+                    [],
+                    {
+                        "ids": root_work_item_ids or [],
+                        "where_clauses": [] if root_work_item_ids else (where_clauses or []),
+                        "as_of": None if root_work_item_ids else as_of,
+                    },
+                    ExecuteRoots,
+                ),
+                Stage(
+                    "hierarchies",
+                    ["roots", ],
+                    {
+                        "as_of": as_of,
+                    },
+                    ExecuteHierarchies,
+                    lambda data: [HierarchyResult.FromJson(item) for item in data],
+                ),
+                Stage(
+                    "events",
+                    ["hierarchies", ],
+                    {},
+                    ExecuteEvents,
+                ),
+            ],
+            {
+                "plugin": plugin.name,
+                "plugin_version": plugin.version,
+                "url": url if url.endswith("/") else url + "/",
+            },
+            force_stage_names=set(force_stage_names or []),
+        )
+
+        if results is None:
+            return
+
+        for stage_name, output_filename in [
+            ("roots", roots_output_filename),
+            ("hierarchies", hierarchies_output_filename),
+            ("events", events_output_filename),
+        ]:
+            if output_filename is None:
+                continue
+
+            with dm.Nested("Writing '{}'...".format(output_filename)):
+                output_filename.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(results[stage_name].artifact_filename, output_filename)
+
+
+# ----------------------------------------------------------------------
+@app.command(
+    "Serve",
+    epilog=_HelpEpilog(),
+    no_args_is_help=True,
+)
+def Serve(
+    plugin_name: _PLUGIN_NAMES_ENUM=typer.Argument(..., help="Name of the plugin used to extract information about work items."),  # type: ignore
+    url: str=typer.Argument(..., help="Url associated with work items to extract."),
+    username: str=typer.Argument(..., help="Username associated with work items to extract."),
+    api_token_or_filename: str=typer.Argument(..., help="API token (or filename containing an API token) associated with the work items to extract."),
+    root_work_item_ids: list[str]=typer.Option(None, "--id", help="Work item IDs associated with the root of one or more work item hierarchies (root work items are extracted during each refresh when not provided)."),
+    where_clauses: list[str]=typer.Option(None, "--where-clause", help="Provide additional clauses to the query used to extract root work items (ignored when '--id' is provided)."),
+    host: str=typer.Option("127.0.0.1", "--host", help="Host name (or address) that the service listens on."),
+    port: int=typer.Option(8000, "--port", min=0, max=65535, help="Port that the service listens on."),
+    refresh_minutes: float=typer.Option(15.0, "--refresh-minutes", min=0.1, help="Minutes between refreshes; a refresh can be requested at any time with 'POST /refresh'."),
+    allow_origin: Optional[str]=typer.Option(None, "--allow-origin", help="Value of the 'Access-Control-Allow-Origin' header, required when the ProjectTimelineProjections UI is served from a different origin (for example, '*')."),
+    notification_secret_or_filename: Optional[str]=typer.Option(None, "--notification-secret", envvar="WORK_ITEM_EXTRACTOR_NOTIFICATION_SECRET", help="Password (or filename containing a password) for basic authentication required by 'POST /refresh' and 'POST /notifications', which applies work item notifications (for example, Azure DevOps 'workitem.created' and 'workitem.updated' service hooks) between refreshes; required when the host isn't a loopback address. Read from the environment variable when not provided, so that the password doesn't appear in the command line."),
+    max_num_threads: Optional[int]=typer.Option(None, "--max-threads", min=1, help="Maximum number of requests made concurrently during a refresh."),
+    chunk_days: Optional[int]=typer.Option(None, "--chunk-days", min=1, help="Number of days in each chunk served by 'GET /chunks/manifest.json' (chunks contain a calendar month of events by default)."),
+    minimal_history: bool=typer.Option(False, "--minimal-history", help="Request only the fields that are extracted when retrieving the history of work items (the revisions of all work items of the extracted types are retrieved once and cached, and are brought up to date when work items change); this is supported by the AzureDevOps plugin."),
+    metrics_filename: Optional[Path]=typer.Option(None, "--metrics", dir_okay=False, help="Write per-endpoint http metrics (for all refreshes) to this JSON file when the service exits."),
+    verbose: bool=typer.Option(False, "--verbose", help="Write verbose information to the terminal."),
+    debug: bool=typer.Option(False, "--debug", help="Write debug information to the terminal."),
+) -> None:
+    """Serves events over http ('GET /events[?start=YYYY-MM-DD][&end=YYYY-MM-DD]'), refreshing them incrementally on a schedule."""
+
+    # Imported here to avoid the cost when the command isn't invoked
+    from Serve import EventsService, Serve as ServeImpl                             # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    with DoneManager.CreateCommandLine(
+        output_flags=DoneManagerFlags.Create(verbose=verbose, debug=debug),
+    ) as dm, ExitStack() as exit_stack:
+        plugin = _InitPlugin(
+            dm,
+            plugin_name,
+            url,
+            username,
+            api_token_or_filename,
+            metrics=_InitMetrics(dm, exit_stack, metrics_filename),
+            minimal_history=minimal_history,
+        )
+        if plugin is None:
+            return
+
+        ServeImpl(
+            dm,
+            EventsService(
+                plugin,
+                root_work_item_ids or [],
+                where_clauses=where_clauses,
+                max_num_threads=max_num_threads,
+                chunk_days=chunk_days,
+            ),
+            host=host,
+            port=port,
+            refresh_interval_seconds=refresh_minutes * 60,
+            allow_origin=allow_origin,
+            notification_secret=None if notification_secret_or_filename is None else _ReadSecret(notification_secret_or_filename),
+        )
+
+
 # ----------------------------------------------------------------------
 # |
 # |  Internal Functions
@@ -284,28 +792,154 @@ def _InitPlugin(
     url: str,
     username: str,
     api_token_or_filename: str,
+    *,
+    metrics: Optional[HttpMetrics]=None,
+    tracer: Optional[Tracer]=None,
+    minimal_history: bool=False,
 ) -> Optional[Plugin]:
-    plugin = _PLUGINS[plugin_name.value]
+    plugin = _PLUGIN_REGISTRY.Load(plugin_name.value)
 
     if not url.endswith("/"):
         url += "/"
 
-    potential_filename = Path(api_token_or_filename)
-    if potential_filename.is_file():
-        with potential_filename.open() as f:
-            api_token = f.read().strip()
-    else:
-        api_token = api_token_or_filename
-
     # Initialize the plugin
     with dm.VerboseNested("Initializing '{}'...".format(plugin.name)) as verbose_dm:
-        plugin.Initialize(verbose_dm, url, username, api_token)
+        plugin.Initialize(
+            verbose_dm,
+            url,
+            username,
+            _ReadSecret(api_token_or_filename),
+            # Plugins that don't make http requests don't need to support metrics or tracing
+            **({"metrics": metrics} if metrics is not None else {}),
+            **({"tracer": tracer} if tracer is not None else {}),
+            **({"minimal_history": True} if minimal_history else {}),
+        )
         if dm.result != 0:
             return None
 
     return plugin
 
 
+# ----------------------------------------------------------------------
+def _InitMetrics(
+    dm: DoneManager,
+    exit_stack: ExitStack,
+    metrics_filename: Optional[Path],
+) -> Optional[HttpMetrics]:
+    if metrics_filename is None:
+        return None
+
+    metrics = HttpMetrics()
+
+    # Write the metrics when the command exits, even if errors were encountered
+    exit_stack.callback(lambda: _WriteJson(dm, metrics_filename, metrics.ToJson()))
+
+    return metrics
+
+
+# ----------------------------------------------------------------------
+def _InitTracer(
+    dm: DoneManager,
+    exit_stack: ExitStack,
+    command_name: str,
+    trace_filename: Optional[Path],
+    trace_format: TraceFormat,
+) -> Optional[Tracer]:
+    if trace_filename is None:
+        return None
+
+    tracer = Tracer()
+
+    # ----------------------------------------------------------------------
+    def Save() -> None:
+        with dm.Nested("Writing '{}'...".format(trace_filename)):
+            tracer.Save(trace_filename, trace_format)
+
+    # ----------------------------------------------------------------------
+
+    # Write the trace when the command exits, even if errors were encountered. The callback is
+    # registered before the tracer is activated so that the span for the command is complete
+    # when the trace is written.
+    exit_stack.callback(Save)
+    exit_stack.enter_context(YieldTracer(tracer, command_name))
+
+    return tracer
+
+
+# ----------------------------------------------------------------------
+def _ReadSecret(
+    secret_or_filename: str,
+) -> str:
+    potential_filename = Path(secret_or_filename)
+    if potential_filename.is_file():
+        with potential_filename.open() as f:
+            return f.read().strip()
+
+    return secret_or_filename
+
+
+# ----------------------------------------------------------------------
+def _ValidateShard(
+    dm: DoneManager,
+    shard_index: Optional[int],
+    shard_count: Optional[int],
+) -> bool:
+    if (shard_index is None) != (shard_count is None):
+        dm.WriteError("'--shard-index' and '--shard-count' must be provided together.\n")
+        return False
+
+    if shard_index is not None and shard_count is not None and shard_index >= shard_count:
+        dm.WriteError("'--shard-index' must be less than '--shard-count'.\n")
+        return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def _ValidateCheckpoint(
+    dm: DoneManager,
+    checkpoint_dir: Optional[Path],
+    resume: bool,
+    root_work_item_ids: list[str],
+    checkpoint_options: dict[str, Any],
+    change_log_normalizer: Optional[ChangeLogNormalizer],
+) -> bool:
+    if checkpoint_dir is None or not resume:
+        return True
+
+    # Imported here to avoid the cost when the option isn't provided
+    from GenerateHierarchies import GetCheckpointOptionsMismatch  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    mismatch = GetCheckpointOptionsMismatch(
+        checkpoint_dir,
+        root_work_item_ids,
+        checkpoint_options=checkpoint_options,
+        change_log_normalizer=change_log_normalizer,
+    )
+
+    if mismatch is not None:
+        dm.WriteError("{} Extract the hierarchies without '--resume' or provide the original options.\n".format(mismatch))
+        return False
+
+    return True
+
+
+# ----------------------------------------------------------------------
+def _InitChangeLogNormalizer(
+    dm: DoneManager,
+    plugin: Plugin,
+    normalize_changes: bool,
+) -> Optional[ChangeLogNormalizer]:
+    if not normalize_changes:
+        return None
+
+    # Imported here to avoid the cost when the option isn't provided
+    from GenerateEvents import GetEventFieldNames  # type: ignore;  pylint: disable=import-error,import-outside-toplevel
+
+    # The serialized size of the changes is only written with verbose output, as measuring it is expensive
+    return ChangeLogNormalizer(GetEventFieldNames(plugin), measure_sizes=dm.is_verbose)
+
+
 # ----------------------------------------------------------------------
 def _InitRootWorkItems(
     dm: DoneManager,
@@ -313,6 +947,8 @@ def _InitRootWorkItems(
     root_work_item_ids: list[str],
 ) -> list[str]:
     if not root_work_item_ids:
+        from Common_FoundationEx.InflectEx import inflect  # pylint: disable=import-outside-toplevel
+
         with dm.Nested(
             "Extracting root work items...",
             lambda: "{} found".format(inflect.no("work item", len(root_work_item_ids))),
@@ -322,41 +958,74 @@ def _InitRootWorkItems(
     return root_work_item_ids
 
 
+# ----------------------------------------------------------------------
+@contextmanager
+def _YieldJsonLinesWriter(
+    output_filename: Path,
+) -> Iterator[Callable[[Any], None]]:
+    """Yields a thread-safe function that writes each provided item as a json record on its own line"""
+
+    lock = threading.Lock()
+
+    with ExitStack() as exit_stack:
+        if str(output_filename) == "-":
+            f = sys.stdout
+        else:
+            output_filename.parent.mkdir(parents=True, exist_ok=True)
+            f = exit_stack.enter_context(output_filename.open("w", encoding="UTF-8"))
+
+        # ----------------------------------------------------------------------
+        def Write(
+            content: Any,
+        ) -> None:
+            line = ToJsonString(content)
+
+            with lock:
+                f.write(line)
+                f.write("\n")
+                f.flush()
+
+        # ----------------------------------------------------------------------
+
+        yield Write
+
+
+# ----------------------------------------------------------------------
+@contextmanager
+def _YieldProfiler(
+    dm: DoneManager,
+    profile_dir: Optional[Path],
+) -> Iterator[None]:
+    if profile_dir is None:
+        yield
+        return
+
+    # Imported here to avoid the cost when profiling isn't requested
+    from Common.Profiling import YieldProfiler  # pylint: disable=import-outside-toplevel
+
+    with YieldProfiler(profile_dir) as profiler:
+        yield
+
+    profiler.WriteSummary(dm)
+
+
 # ----------------------------------------------------------------------
 def _WriteJson(
     dm: DoneManager,
     output_filename: Path,
     content: Any,
 ) -> None:
-    with dm.Nested("Writing '{}'...".format(output_filename)):
+    # Imported here to avoid the cost during startup
+    from Common.Profiling import YieldProfiledNested  # pylint: disable=import-outside-toplevel
+
+    with YieldProfiledNested(dm, "Writing '{}'...".format(output_filename)):
         output_filename.parent.mkdir(parents=True, exist_ok=True)
 
         with output_filename.open("w", encoding="UTF-8") as f:
-            # ----------------------------------------------------------------------
-            class Encoder(json.JSONEncoder):
-                # ----------------------------------------------------------------------
-                @singledispatchmethod
-                def default(self, o) -> Any:
-                    return o.__dict__
-
-                @default.register
-                def _(self, o: date) -> Any:
-                    return o.isoformat()
-
-                @default.register
-                def _(self, o: datetime) -> Any:
-                    return o.isoformat()
-
-                @default.register
-                def _(self, o: Enum) -> Any:
-                    return str(o)
-
-            # ----------------------------------------------------------------------
-
             json.dump(
                 content,
                 f,
-                cls=Encoder,
+                cls=JsonEncoder,
             )
 
 